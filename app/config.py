@@ -2,11 +2,25 @@
 # app/config.py
 # Python 3.9
 from pydantic import BaseSettings, Field, root_validator, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     DB_URL: str = Field(..., env="DB_URL")
+    # Bağlantı havuzu (yazma/sinyal yolu); SQLite'ta yok sayılır
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: int = Field(30, env="DB_POOL_TIMEOUT")
+    # MySQL wait_timeout'tan kısa tutun; pre-ping kopmuş bağlantıyı yeniler
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    # Panel okumaları: replica URL'si (boş → DB_URL) ve ayrı havuz (0 → paylaşımlı)
+    DB_READ_URL: str = Field("", env="DB_READ_URL")
+    DB_READ_POOL_SIZE: int = Field(5, env="DB_READ_POOL_SIZE")
+    DB_READ_MAX_OVERFLOW: int = Field(5, env="DB_READ_MAX_OVERFLOW")
+    # Replica'da, yazan istemcinin (istek içi yazma → çerez) okumaları bu süre
+    # birincil DB'ye gider; arka plan yazmaları etkilemez (0 → kapalı)
+    DB_READ_YOUR_WRITES_SECONDS: float = Field(2.0, env="DB_READ_YOUR_WRITES_SECONDS")
 
     # Çoklu Borsa Yönetimi (CSV formatında, örn: "binance_futures_testnet,binance_futures_mainnet")
     ACTIVE_EXCHANGES: str = Field(..., env="ACTIVE_EXCHANGES")
@@ -62,9 +76,77 @@ class Settings(BaseSettings):
     # Doğrulama döngü intervali (saniye)
     VERIFY_INTERVAL_SECONDS: int = Field(5, env="VERIFY_INTERVAL_SECONDS")
 
+    # Borsa bazlı verifier aralığı (CSV "exchange=saniye"); yoksa VERIFY_INTERVAL_SECONDS
+    VERIFY_INTERVAL_OVERRIDES: str = Field("", env="VERIFY_INTERVAL_OVERRIDES")
+    # Worker başına art arda hata toleransı; aşılınca aralık üstel büyür (tavan)
+    VERIFY_ERROR_BUDGET: int = Field(3, env="VERIFY_ERROR_BUDGET")
+    VERIFY_MAX_BACKOFF_SECONDS: int = Field(120, env="VERIFY_MAX_BACKOFF_SECONDS")
+    # Sinyal sonrası verifier erken uyanır ve bu süre boyunca hızlı tur atar
+    VERIFY_BURST_SECONDS: int = Field(30, env="VERIFY_BURST_SECONDS")
+    VERIFY_BURST_INTERVAL_SECONDS: float = Field(
+        1.0, env="VERIFY_BURST_INTERVAL_SECONDS"
+    )
+    # Pending yokken aralık üstel büyür (tavan); yeni sinyal/pending sıfırlar
+    VERIFY_IDLE_MAX_SECONDS: int = Field(30, env="VERIFY_IDLE_MAX_SECONDS")
+    # db kirasında lider, başka süreçlerden gelen uyandırmayı (verifier_leases.wake_seq)
+    # uykusu boyunca bu aralıkla yoklar
+    VERIFY_WAKE_POLL_SECONDS: float = Field(1.0, env="VERIFY_WAKE_POLL_SECONDS")
+    # Çok süreçli dağıtımda borsa başına tek verifier: auto | db | file | off
+    VERIFY_LEADER_BACKEND: str = Field("auto", env="VERIFY_LEADER_BACKEND")
+    # Lider ölünce kiranın başkasına geçme süresi (denetleyici aralığından büyük)
+    VERIFY_LEASE_TTL_SECONDS: int = Field(30, env="VERIFY_LEASE_TTL_SECONDS")
+    # file backend kilit dizini (boş → sistem temp dizini)
+    VERIFY_LOCK_DIR: str = Field("", env="VERIFY_LOCK_DIR")
+
+    # /api/health/deep eşikleri: son başarılı tur / en eski pending yaşı (saniye)
+    HEALTH_VERIFIER_STALE_SECONDS: int = Field(180, env="HEALTH_VERIFIER_STALE_SECONDS")
+    HEALTH_PENDING_AGE_WARN_SECONDS: int = Field(
+        60, env="HEALTH_PENDING_AGE_WARN_SECONDS"
+    )
+    HEALTH_PENDING_AGE_FAIL_SECONDS: int = Field(
+        300, env="HEALTH_PENDING_AGE_FAIL_SECONDS"
+    )
+
     # Verifier yalnızca DEFAULT_EXCHANGE üzerinde çalışsın mı?
     VERIFY_ONLY_DEFAULT: bool = Field(True, env="VERIFY_ONLY_DEFAULT")
 
+    # Kapanış kaydı sonrası ek doğrulama SELECT'i (audit modu; varsayılan kapalı)
+    CLOSE_AUDIT_VERIFY: bool = Field(False, env="CLOSE_AUDIT_VERIFY")
+
+    # Income ledger senkronu (verifier): borsa başına en sık bu aralıkta,
+    # tick başına en fazla bu kadar sayfa (ilk backfill birkaç tick'e yayılır)
+    INCOME_SYNC_INTERVAL_SECONDS: int = Field(60, env="INCOME_SYNC_INTERVAL_SECONDS")
+    INCOME_SYNC_MAX_PAGES: int = Field(5, env="INCOME_SYNC_MAX_PAGES")
+
+    # raw_signals retention: bu kadar günden eski ve işleme bağlı olmayan
+    # sinyaller sıkıştırılmış raw_signals_archive tablosuna taşınır (0 → kapalı)
+    RAW_SIGNAL_RETENTION_DAYS: int = Field(90, env="RAW_SIGNAL_RETENTION_DAYS")
+    RAW_SIGNAL_ARCHIVE_BATCH: int = Field(1000, env="RAW_SIGNAL_ARCHIVE_BATCH")
+
+    # Sıcak/soğuk ayrımı: 'closed'/'failed' açık işlem satırları bu süreden sonra
+    # strategy_open_trades_history'ye taşınır (0 → kapalı)
+    OPEN_TRADE_RETENTION_DAYS: int = Field(30, env="OPEN_TRADE_RETENTION_DAYS")
+    OPEN_TRADE_ARCHIVE_BATCH: int = Field(500, env="OPEN_TRADE_ARCHIVE_BATCH")
+
+    # Denetim payload'ları (borsa yanıtı / pozisyon görüntüsü) istek yolundan
+    # sonra trade_audit_payloads'a yazılır; kuyruk dolarsa en eski düşer
+    AUDIT_QUEUE_MAX: int = Field(10000, env="AUDIT_QUEUE_MAX")
+
+    # uPnL: panel süreç içi depodan okur; DB'ye yalnızca eşik aşılınca
+    # (mutlak USDT ya da |önceki| oranı; 0 → kapalı) veya heartbeat'te yazılır
+    UPNL_PERSIST_ABS: float = Field(0.5, env="UPNL_PERSIST_ABS")
+    UPNL_PERSIST_REL: float = Field(0.05, env="UPNL_PERSIST_REL")
+    UPNL_HEARTBEAT_SECONDS: int = Field(300, env="UPNL_HEARTBEAT_SECONDS")
+    # Depodaki değer bundan eskiyse panel DB değerini kullanır. Depo yalnızca
+    # verifier lideri süreçte dolar; diğer süreçler yerel motoru (UPNL_ENGINE=local)
+    # kullanır, motor yoksa heartbeat kadar eski olabilen DB değerini
+    UPNL_STORE_MAX_AGE_SECONDS: int = Field(30, env="UPNL_STORE_MAX_AGE_SECONDS")
+    # uPnL kaynağı: local (mark fiyatıyla yerel hesap) | exchange (her tur borsa)
+    UPNL_ENGINE: str = Field("local", env="UPNL_ENGINE")
+    # local motorda borsa değeriyle mutabakat aralığı ve uyarı verilecek sapma
+    UPNL_RECONCILE_SECONDS: int = Field(60, env="UPNL_RECONCILE_SECONDS")
+    UPNL_DRIFT_WARN_ABS: float = Field(1.0, env="UPNL_DRIFT_WARN_ABS")
+
     # Binance Futures Testnet
     BINANCE_FUTURES_TESTNET_API_KEY: str = Field(
         default="", env="BINANCE_FUTURES_TESTNET_API_KEY"
@@ -138,6 +220,21 @@ class Settings(BaseSettings):
             x.strip() for x in self.ALLOWED_FUND_MANAGER_IDS.split(",") if x.strip()
         ]
 
+    @property
+    def verify_interval_overrides(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for part in str(self.VERIFY_INTERVAL_OVERRIDES or "").split(","):
+            name, sep, raw = part.partition("=")
+            if not sep or not name.strip():
+                continue
+            try:
+                val = float(raw)
+            except ValueError:
+                continue
+            if val > 0:
+                out[name.strip()] = val
+        return out
+
     @staticmethod
     def _parse_periods(raw: str) -> List[int]:
         if raw is None:
@@ -1,15 +1,74 @@
 #!/usr/bin/env python3
 # app/database.py
 # Python 3.9
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
 # Veritabanı bağlantı URL'si
 DATABASE_URL = settings.DB_URL
+# Panel okumaları için replica URL'si (boş → aynı URL, ayrı havuz)
+READ_DATABASE_URL = (settings.DB_READ_URL or "").strip() or DATABASE_URL
+
+
+def _engine_kwargs(url: str, pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    """Havuz ayarları; SQLite (tek dosya/bellek) havuz boyutu parametresi almaz."""
+    kw: Dict[str, Any] = {"echo": False, "future": True}
+    if make_url(url).get_backend_name() == "sqlite":
+        return kw
+    kw.update(
+        pool_size=max(1, int(pool_size)),
+        max_overflow=max(0, int(max_overflow)),
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return kw
+
+
+# Async engine oluştur (yazma + sinyal/verifier yolu)
+engine = create_async_engine(
+    DATABASE_URL,
+    **_engine_kwargs(DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+)
+
+
+def _build_read_engine() -> AsyncEngine:
+    """
+    Panel okuma engine'i: replica URL'si ya da aynı URL'de ayrı havuz; böylece
+    dashboard trafiği sinyal yolunun bağlantılarını tüketmez.
+    SQLite'ta (testler/yerel) ve DB_READ_POOL_SIZE=0 iken yazma engine'i paylaşılır.
+    """
+    if (
+        make_url(READ_DATABASE_URL).get_backend_name() == "sqlite"
+        or int(settings.DB_READ_POOL_SIZE) <= 0
+    ):
+        return engine
+    return create_async_engine(
+        READ_DATABASE_URL,
+        **_engine_kwargs(
+            READ_DATABASE_URL,
+            settings.DB_READ_POOL_SIZE,
+            settings.DB_READ_MAX_OVERFLOW,
+        ),
+    )
 
-# Async engine oluştur
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+
+read_engine = _build_read_engine()
+# Okumalar gerçekten farklı bir sunucuya mı gidiyor? (read-your-writes gerekir)
+READ_IS_REPLICA = read_engine is not engine and READ_DATABASE_URL != DATABASE_URL
 
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -17,13 +76,75 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
     class_=AsyncSession,
 )
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
 
 # Alias for compatibility with main.py
 async_session = AsyncSessionLocal
+async_read_session = AsyncReadSessionLocal
 
 # Base sınıf
 Base = declarative_base()
 
+# Read-your-writes istemciye bağlıdır: yalnızca HTTP isteği içinde yapılan
+# yazmalar işaretlenir (istek başına WriteMark, ContextVar). Arka plan işleri
+# (verifier, kira yenileme, audit yazıcı, diğer kullanıcıların webhook'ları)
+# istek bağlamında koşmadığından okumaları birincile çekmez. Yazma zamanı
+# yanıtta RYW_COOKIE ile istemciye verilir; sonraki okuma hangi süreçte
+# işlenirse işlensin çerezden görülür.
+RYW_COOKIE = "sigmom_rw"
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class WriteMark:
+    """Bir isteğin birincil DB'ye son yazma zamanı (epoch ms; yoksa None)."""
+
+    __slots__ = ("at_ms",)
+
+    def __init__(self) -> None:
+        self.at_ms: Optional[int] = None
+
+
+WRITE_MARK_CVAR: ContextVar[Optional[WriteMark]] = ContextVar(
+    "db_write_mark", default=None
+)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def note_write() -> None:
+    mark = WRITE_MARK_CVAR.get()
+    if mark is not None:
+        mark.at_ms = _now_ms()
+
+
+def recent_write(at_ms: Optional[int], window: Optional[float] = None) -> bool:
+    """``at_ms`` son ``window`` (DB_READ_YOUR_WRITES_SECONDS) saniye içinde mi?"""
+    if window is None:
+        window = float(settings.DB_READ_YOUR_WRITES_SECONDS)
+    return window > 0 and at_ms is not None and _now_ms() - at_ms < window * 1000
+
+
+def cookie_write_ms(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _track_writes(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:7].upper().startswith(_WRITE_PREFIXES):
+        note_write()
+
+
+if READ_IS_REPLICA:
+    event.listen(engine.sync_engine, "after_cursor_execute", _track_writes)
+
 
 # FastAPI içinde varsayılan session dependency
 async def get_session() -> AsyncSession:
@@ -35,6 +156,27 @@ async def get_session() -> AsyncSession:
 get_db = get_session
 
 
+async def get_read_db(request: Request = None) -> AsyncSession:  # type: ignore[assignment]
+    """
+    Salt-okuma panel uçları için session (okuma havuzu / replica).
+    Replica kullanılıyorsa ve BU istemci az önce yazdıysa (RYW_COOKIE ya da
+    aynı istekteki yazma; replica gecikmesi) birincil engine'e düşer.
+    """
+    written_ms: Optional[int] = None
+    if READ_IS_REPLICA:
+        mark = WRITE_MARK_CVAR.get()
+        written_ms = mark.at_ms if mark is not None else None
+        if written_ms is None and request is not None:
+            written_ms = cookie_write_ms(request.cookies.get(RYW_COOKIE))
+    factory = (
+        AsyncSessionLocal
+        if READ_IS_REPLICA and recent_write(written_ms)
+        else AsyncReadSessionLocal
+    )
+    async with factory() as session:
+        yield session
+
+
 # Testlerde override edilmek üzere ayrı tanım
 async def override_get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -47,6 +47,14 @@ POSITION_MODE = "one_way"  # "one_way" or "hedge"
 # userTrades aralığı için geriye bakış (ms)
 USERTRADES_LOOKBACK_MS = 120_000  # 60_000 kısa kalabilir bu yüzden 120 önerilir.
 
+# Geçmiş (income/userTrades) çekimi: dilim genişliği borsanın startTime–endTime
+# üst sınırını (7 gün) aşmamalı; since verilmezse en fazla bu kadar geriye gidilir.
+HISTORY_WINDOW_MS = 7 * 24 * 60 * 60 * 1000
+HISTORY_MAX_LOOKBACK_MS = 365 * 24 * 60 * 60 * 1000
+
+# Mark fiyat önbelleği (yerel uPnL motoru): tüm semboller tek imzasız çağrı
+MARK_PRICE_TTL_SECONDS = 1.0
+
 KLINES_PATH = "/fapi/v1/klines"
 
 KLINES_PARAMS = {"symbol": "symbol", "interval": "interval", "limit": "limit"}
@@ -82,4 +90,5 @@ ENDPOINTS = {
     "POSITION_SIDE_DUAL": "/fapi/v1/positionSide/dual",  # GET/POST
     "INCOME": "/fapi/v1/income",
     "USER_TRADES": "/fapi/v1/userTrades",
+    "MARK_PRICE": "/fapi/v1/premiumIndex",  # imzasız; sembolsüz → tüm semboller
 }
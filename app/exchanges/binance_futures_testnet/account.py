@@ -9,14 +9,18 @@ import time
 
 from app.exchanges.common.http.retry import arequest_with_retry
 from datetime import datetime, timezone
-from typing import Optional, Any, Iterable, Dict, Tuple, cast, Union
+from typing import Optional, Any, Iterable, Dict, List, Tuple, cast, Union
+from app.exchanges.common.snapshots import BalanceSnapshot, PositionSnapshot
+from app.exchanges.common.fill_cache import FillCache, PAGE_LIMIT, parse_binance_fill
+from app.exchanges.common.backfill import fetch_time_sliced
 from .settings import (
     BASE_URL,
     ENDPOINTS,
     POSITION_MODE,
     USERTRADES_LOOKBACK_MS,
+    HISTORY_WINDOW_MS,
+    HISTORY_MAX_LOOKBACK_MS,
     RECV_WINDOW_MS,
-    RECV_WINDOW_LONG_MS,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
 )
@@ -135,16 +139,12 @@ def _normalize_symbol(sym: str) -> str:
     return s
 
 
-async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+async def get_position_snapshots(
+    symbol: Optional[str] = None,
+) -> List[PositionSnapshot]:
     """
-    USDⓈ-M açık pozisyonlardan **borsa verisi** ile canlı (unrealized) PnL döndürür.
-    Davranış:
-      • `symbol=None` ve `return_all=True`  → `{"total": float, "positions": [ {..}, ... ]}`
-      • `symbol=None` ve `return_all=False` → `{"unrealized": float}` (toplam)
-      • `symbol='BTCUSDT'` (hedge/one-way fark etmeksizin) → İlgili sembolün **bacak/detay listesi**
-        (toplam tek bir sayı döndürmez). Gerekirse toplam, liste üzerinden
-        çağıran tarafça toplanabilir.
-    Not: Dönen değerler doğrudan borsa yanıtından normalize edilir (örn. `unRealizedProfit`).
+    /fapi/v2/positionRisk → yalnızca AÇIK bacaklar, PositionSnapshot olarak.
+    `symbol` verilirse o sembolün bacakları (hedge'de LONG/SHORT ayrı ayrı).
     """
     ep = ENDPOINTS.get("POSITION_RISK", "/fapi/v2/positionRisk")
     url = BASE_URL + ep
@@ -163,44 +163,47 @@ async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False)
         r.raise_for_status()
         rows = r.json()
 
-    # yalnızca açık (positionAmt != 0)
+    snaps = [PositionSnapshot.from_binance(p) for p in rows or []]
+    want = _normalize_symbol(symbol) if symbol else None
+    return [s for s in snaps if s.is_open and (want is None or s.symbol == want)]
 
-    def fnum(v) -> float:
-        try:
-            return float(v)
-        except (TypeError, ValueError):
-            return 0.0
 
-    open_pos = [p for p in rows if abs(fnum(p.get("positionAmt"))) > 0]
+async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+    """
+    USDⓈ-M açık pozisyonlardan **borsa verisi** ile canlı (unrealized) PnL döndürür.
+    Davranış:
+      • `symbol=None` ve `return_all=True`  → `{"total": float, "positions": [ {..}, ... ]}`
+      • `symbol=None` ve `return_all=False` → `{"unrealized": float}` (toplam)
+      • `symbol='BTCUSDT'` (hedge/one-way fark etmeksizin) → İlgili sembolün **bacak/detay listesi**
+        (toplam tek bir sayı döndürmez). Gerekirse toplam, liste üzerinden
+        çağıran tarafça toplanabilir.
+    Not: Değerler get_position_snapshots() çıktısından üretilir (örn. `unRealizedProfit`).
+    """
+    open_pos = await get_position_snapshots(symbol)
     if symbol:
-        s = _normalize_symbol(symbol)
-        legs = [
+        return [
             {
-                "symbol": str(p.get("symbol", "")).upper(),
-                "positionSide": str(p.get("positionSide") or "").upper(),
-                "unRealizedProfit": fnum(p.get("unRealizedProfit")),
-                "positionAmt": fnum(p.get("positionAmt")),
-                "entryPrice": fnum(p.get("entryPrice")),
-                "leverage": fnum(p.get("leverage")),
-                "markPrice": fnum(p.get("markPrice")),
-                "liquidationPrice": fnum(p.get("liquidationPrice")),
+                "symbol": p.symbol,
+                "positionSide": p.position_side,
+                "unRealizedProfit": float(p.unrealized),
+                "positionAmt": float(p.amt),
+                "entryPrice": float(p.entry_price),
+                "leverage": float(p.leverage),
+                "markPrice": float(p.mark_price),
+                "liquidationPrice": float(p.liquidation_price),
             }
             for p in open_pos
-            if str(p.get("symbol", "")).upper() == s
         ]
-        if return_all:
-            return legs
-        return legs
     # tüm semboller
     details = [
         {
-            "symbol": str(p.get("symbol", "")).upper(),
-            "unrealized": fnum(p.get("unRealizedProfit")),
-            "position_amt": fnum(p.get("positionAmt")),
-            "entry_price": fnum(p.get("entryPrice")),
-            "leverage": fnum(p.get("leverage")),
-            "mark_price": fnum(p.get("markPrice")),
-            "liquidation_price": fnum(p.get("liquidationPrice")),
+            "symbol": p.symbol,
+            "unrealized": float(p.unrealized),
+            "position_amt": float(p.amt),
+            "entry_price": float(p.entry_price),
+            "leverage": float(p.leverage),
+            "mark_price": float(p.mark_price),
+            "liquidation_price": float(p.liquidation_price),
         }
         for p in open_pos
     ]
@@ -219,70 +222,22 @@ async def income_summary(
     """
     Binance USDⓈ-M Futures gelir dökümünden (REALIZED_PNL) net toplamı döndürür.
     - symbol: 'BTCUSDT' gibi (opsiyonel)
-    - since/until: datetime(UTC); sayfalama ile /fapi/v1/income taranır.
-    Not: Testnet'te de bu uç desteklenir; limit=1000 sayfalanır.
+    - since/until: datetime(UTC); aralık order_handler.fetch_income_history ile
+      dilimlenip paralel çekilir (sayfa sınırıyla kesilmez).
+    - since yoksa en fazla HISTORY_MAX_LOOKBACK_MS geriye gidilir.
     """
-    ep = ENDPOINTS.get("INCOME", "/fapi/v1/income")
-    url = BASE_URL + ep
+    from .order_handler import fetch_income_history
 
-    # Zaman damgaları (ms)
-    start_ms = int((since or datetime.utcfromtimestamp(0)).timestamp() * 1000)
-    end_ms: Optional[int] = int(until.timestamp() * 1000) if until else None
-    total = 0.0
-    page_guard = 0
-    cursor = start_ms
+    end_ms = int(until.timestamp() * 1000) if until else int(time.time() * 1000)
+    start_ms = (
+        int(since.timestamp() * 1000) if since else end_ms - HISTORY_MAX_LOOKBACK_MS
+    )
     sym = _normalize_symbol(symbol) if symbol else None
 
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as client:
-        while True:
-            page_guard += 1
-            if page_guard > 20:  # emniyet: 20k kayıt ~ 20 sayfa
-                break
-
-            params = {"incomeType": "REALIZED_PNL", "limit": 1000, "startTime": cursor}
-
-            if end_ms:
-                params["endTime"] = end_ms
-            if sym:
-                params["symbol"] = sym
-
-            full_url, headers = await build_signed_get(
-                url, params, recv_window=RECV_WINDOW_LONG_MS
-            )
-            r = await arequest_with_retry(
-                client,
-                "GET",
-                full_url,
-                headers=headers,
-                timeout=HTTP_TIMEOUT_LONG,
-                max_retries=1,
-                retry_on_binance_1021=False,
-            )
-            r.raise_for_status()
-            rows = r.json() or []
-            if not isinstance(rows, list) or not rows:
-                break
-            # Toplamı ekle; bir sonraki sayfa için zaman imlecini güncelle
-            last_time = cursor
-
-            for it in rows:
-                try:
-                    # Sadece REALIZED_PNL; diğer income türlerini dahil etmiyoruz
-                    if str(it.get("incomeType", "")).upper() != "REALIZED_PNL":
-                        continue
-                    total += float(it.get("income", 0) or 0)
-                    t = int(it.get("time") or 0)
-                    if t > last_time:
-                        last_time = t
-                except (TypeError, ValueError, KeyError):
-                    continue
-
-            # Sayfalama: bir sonraki sorgu, son kaydın +1 ms'inden
-            # (Binance aynı ms'teki kayıtları tekrar döndürmesin diye)
-            if last_time <= cursor:
-                break
-            cursor = last_time + 1
-    return float(total)
+    rows = await fetch_income_history(
+        start_ms, end_ms, symbol=sym, income_type="REALIZED_PNL"
+    )
+    return float(sum(r.amount for r in rows))
 
 
 def _split_symbol_tokens(s: str) -> Optional[Tuple[str, str]]:
@@ -356,15 +311,12 @@ async def get_available(
     if not want and symbol:
         want = await infer_quote_from_symbol(symbol)
 
-    row = next((r for r in rows if str(r.get("asset", "")).upper() == want), None)
-    if not row:
+    bal = next(
+        (b for b in map(BalanceSnapshot.from_binance, rows) if b.asset == want), None
+    )
+    if not bal:
         return {"asset": want or None, "available": 0.0, "balance": 0.0}
-
-    return {
-        "asset": want,
-        "available": float(row.get("availableBalance") or 0.0),
-        "balance": float(row.get("balance") or row.get("walletBalance") or 0.0),
-    }
+    return bal.as_dict()
 
 
 class Account:
@@ -372,6 +324,10 @@ class Account:
     async def get_unrealized(self, symbol=None, return_all=False):
         return await get_unrealized(symbol=symbol, return_all=return_all)
 
+    # noinspection PyMethodMayBeStatic
+    async def get_position_snapshots(self, symbol=None):
+        return await get_position_snapshots(symbol)
+
     # noinspection PyMethodMayBeStatic
     async def get_account_balance(self):
         return await get_account_balance()
@@ -393,14 +349,21 @@ account = Account()
 
 
 # --------------------------- CLOSE PRICE (userTrades→VWAP) ---------------------------
+# (exchange, symbol) başına artımlı fill önbelleği: tekrar çağrılarda yalnızca fromId delta
+_FILLS = FillCache(parse_binance_fill)
+_EXCHANGE_KEY = "binance_futures_testnet"
+
+
 async def get_close_price_from_usertrades(
     symbol: str,
     opened_at: Union[int, float, str, datetime],
     side: str,  # "long" | "short"
-    limit: int = 1000,
+    limit: int = PAGE_LIMIT,
 ) -> dict:
     """
     Pozisyonu KAPATAN fill'lerin VWAP'ını döndürür.
+    Fill'ler _FILLS önbelleğinden gelir; ilk doldurma dilimli paralel çekimle,
+    sonrası yalnızca son görülen id'den sonrası (fromId delta) olarak yapılır.
     Döner: {"success": True, "price": float, "time": int, "fills": int, "qty": float}
            bulunamazsa {"success": False, "message": "..."}
     """
@@ -416,15 +379,11 @@ async def get_close_price_from_usertrades(
         return {"success": False, "message": f"invalid opened_at: {e}"}
     start_ms = max(0, int(start_ms) - int(USERTRADES_LOOKBACK_MS))
 
-    params = {
-        "symbol": sym,
-        "limit": limit,
-        "startTime": int(start_ms),
-    }
-
-    full_url, headers = await build_signed_get(url, params, recv_window=RECV_WINDOW_MS)
-    # rows'u iç blokta doldurup hemen kullanıyoruz (IDE false-positive'lerini kapatmak için)
-    try:
+    async def _fetch_page(extra: Dict[str, Any]) -> list:
+        params = {"symbol": sym, "limit": int(limit), **extra}
+        full_url, headers = await build_signed_get(
+            url, params, recv_window=RECV_WINDOW_MS
+        )
         async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
             r = await arequest_with_retry(
                 c,
@@ -436,7 +395,32 @@ async def get_close_price_from_usertrades(
                 retry_on_binance_1021=False,
             )
             r.raise_for_status()
-            rows = r.json() or []
+            return r.json() or []
+
+    async def _fetch_range(since_ms: int) -> list:
+        # İlk doldurma: [since, şimdi] 7 günlük dilimler hâlinde paralel
+        async def _window(s: int, e: int) -> list:
+            return await _fetch_page({"startTime": s, "endTime": e})
+
+        return await fetch_time_sliced(
+            _window,
+            since_ms,
+            int(time.time() * 1000),
+            window_ms=HISTORY_WINDOW_MS,
+            page_limit=int(limit),
+            time_of=lambda row: int(row.get("time") or 0),
+            key_of=lambda row: str(row.get("id")),
+        )
+
+    try:
+        rows = await _FILLS.get_fills(
+            _EXCHANGE_KEY,
+            sym,
+            start_ms,
+            _fetch_page,
+            page_limit=int(limit),
+            fetch_range=_fetch_range,
+        )
     except httpx.HTTPStatusError as e:
         return {
             "success": False,
@@ -452,20 +436,11 @@ async def get_close_price_from_usertrades(
     last_t = None
 
     for it in rows:
-        s = str(it.get("side", "")).upper()
-        ps = str(it.get("positionSide", "")).upper()
-        if POSITION_MODE == "hedge":
-            if s != want_side or ps != want_pos_side:
-                continue
-        else:
-            if s != want_side:
-                continue
-        try:
-            p = float(it.get("price") or 0.0)
-            q = float(it.get("qty") or 0.0)
-            t = int(it.get("time") or 0)
-        except (ValueError, TypeError):
+        if it.side != want_side:
+            continue
+        if POSITION_MODE == "hedge" and it.position_side != want_pos_side:
             continue
+        p, q, t = it.price, it.qty, it.time
         if p <= 0 or q <= 0:
             continue
         fills.append((p, q, t))
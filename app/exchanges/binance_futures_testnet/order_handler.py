@@ -9,7 +9,7 @@ import asyncio
 
 from app.exchanges.common.http.retry import arequest_with_retry
 from app.models import StrategyOpenTrade
-from typing import Optional, Any
+from typing import Optional, Any, List
 from app.schemas import WebhookSignal
 from .settings import (
     BASE_URL,
@@ -19,6 +19,7 @@ from .settings import (
     RECV_WINDOW_LONG_MS,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
+    HISTORY_WINDOW_MS,
 )
 from .utils import (
     build_signed_get,
@@ -29,6 +30,9 @@ from .utils import (
     set_position_mode,
 )
 from app.exchanges.common.safety import SafetyGate
+from app.exchanges.common.snapshots import PositionSnapshot
+from app.exchanges.common.income import IncomeRow, parse_binance_income
+from app.exchanges.common.backfill import fetch_time_sliced
 
 logger = logging.getLogger(__name__)
 
@@ -191,8 +195,10 @@ async def place_order(
         return {"success": False, "message": str(e), "data": {}}
 
 
-async def get_position(symbol: str, side: Optional[str] = None) -> dict:
-    """Binance Futures pozisyon bilgilerini alır."""
+async def get_position(
+    symbol: str, side: Optional[str] = None
+) -> Optional[PositionSnapshot]:
+    """Binance Futures pozisyon bilgisini PositionSnapshot olarak döndürür (yoksa None)."""
     logger.debug("get_position() → %s", symbol)
     endpoint = ENDPOINTS["POSITION_RISK"]
     url = BASE_URL + endpoint
@@ -226,33 +232,32 @@ async def get_position(symbol: str, side: Optional[str] = None) -> dict:
             exc.response.status_code,
             exc.response.text,
         )
-        return {}
+        return None
     except (httpx.RequestError, asyncio.TimeoutError) as exc:
         logger.error("Network error while fetching position %s: %s", sym, exc)
-        return {}
+        return None
 
     if isinstance(data, list):
-        # Sembol filtrele
-        cands = [p for p in data if p.get("symbol") == sym]
+        # Sembol filtrele; satırlar burada bir kez ayrıştırılır
+        cands = [
+            PositionSnapshot.from_binance(p) for p in data if p.get("symbol") == sym
+        ]
         if not cands:
             logger.error("Position for %s not found: %s", sym, data)
-            return {}
+            return None
         # Hedge: doğru bacağı seç
         side_norm = (side or "").strip().lower()
         if POSITION_MODE == "hedge" and side_norm in ("long", "short"):
             target = "LONG" if side_norm == "long" else "SHORT"
             for p in cands:
-                if p.get("positionSide") == target:
+                if p.position_side == target:
                     return p
         for p in cands:
-            try:
-                if float(p.get("positionAmt", "0")) != 0.0:
-                    return p
-            except (ValueError, TypeError):
-                pass
+            if p.is_open:
+                return p
         return cands[0]
     logger.error("Position for %s not found (non-list): %s", sym, data)
-    return {}
+    return None
 
 
 async def query_order_status(
@@ -317,49 +322,11 @@ async def income_breakdown(
     Dönen 'net', borsanın verdiği tüm gelir/masraf kalemlerinin toplamıdır:
       Net = Σ(REALIZED_PNL, COMMISSION, FUNDING_FEE, …)
     (COMMISSION genelde negatif, FUNDING_FEE pozitif/negatif olabilir.)
+    Aralık fetch_income_history ile dilimlenip paralel çekilir (kesilme yok).
     """
-    endpoint = ENDPOINTS.get("INCOME", "/fapi/v1/income")
-    url = BASE_URL + endpoint
     totals: dict[str, float] = {}
-    last = int(start_ms)
-
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
-            while True:
-                params: dict[str, Any] = {
-                    "startTime": last,
-                    "endTime": int(end_ms),
-                    "limit": limit,
-                }
-                if symbol:
-                    params["symbol"] = (symbol or "").upper()
-
-                full_url, headers = await build_signed_get(
-                    url, params, recv_window=RECV_WINDOW_LONG_MS
-                )
-                r = await arequest_with_retry(
-                    c,
-                    "GET",
-                    full_url,
-                    headers=headers,
-                    timeout=HTTP_TIMEOUT_LONG,
-                    max_retries=1,
-                    retry_on_binance_1021=False,
-                )
-                r.raise_for_status()
-                rows = r.json() or []
-                if not rows:
-                    break
-                for it in rows:
-                    k = str(it.get("incomeType") or "")
-                    v = float(it.get("income") or 0.0)
-                    totals[k] = totals.get(k, 0.0) + v
-                    t = int(it.get("time") or 0)
-                    if t > last:
-                        last = t
-                if len(rows) < limit:
-                    break
-                last += 1  # bir sonraki sayfa
+        rows = await fetch_income_history(start_ms, end_ms, symbol=symbol, limit=limit)
     except httpx.HTTPStatusError as e:
         logger.exception("income_summary HTTP error: %s", e)
         return {"success": False, "net": 0.0, "sum": {}, "message": str(e)}
@@ -367,6 +334,8 @@ async def income_breakdown(
         logger.exception("income_summary network error: %s", e)
         return {"success": False, "net": 0.0, "sum": {}, "message": str(e)}
 
+    for it in rows:
+        totals[it.income_type] = totals.get(it.income_type, 0.0) + float(it.amount)
     net = sum(totals.values())
 
     return {
@@ -386,3 +355,80 @@ async def income_summary(
     limit: int = 1000,
 ) -> dict:
     return await income_breakdown(start_ms, end_ms, symbol=symbol, limit=limit)
+
+
+async def fetch_income_page(
+    start_ms: int,
+    end_ms: Optional[int] = None,
+    limit: int = 1000,
+    symbol: Optional[str] = None,
+    income_type: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[IncomeRow]:
+    """
+    /fapi/v1/income tek sayfa (startTime'dan itibaren, zaman sıralı, tüm tipler).
+    Tip filtresi, sayfalama ve watermark app.services.income_ledger tarafında.
+    client verilirse bağlantı paylaşılır (dilimli history). Hata → raise.
+    """
+    if client is None:
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
+            return await fetch_income_page(
+                start_ms, end_ms, limit, symbol, income_type, client=c
+            )
+
+    url = BASE_URL + ENDPOINTS.get("INCOME", "/fapi/v1/income")
+    params: dict[str, Any] = {"startTime": int(start_ms), "limit": int(limit)}
+    if end_ms is not None:
+        params["endTime"] = int(end_ms)
+    if symbol:
+        params["symbol"] = symbol.upper()
+    if income_type:
+        params["incomeType"] = income_type
+
+    full_url, headers = await build_signed_get(
+        url, params, recv_window=RECV_WINDOW_LONG_MS
+    )
+    r = await arequest_with_retry(
+        client,
+        "GET",
+        full_url,
+        headers=headers,
+        timeout=HTTP_TIMEOUT_LONG,
+        max_retries=1,
+        retry_on_binance_1021=False,
+    )
+    r.raise_for_status()
+    rows = r.json() or []
+    if not isinstance(rows, list):
+        return []
+    return [x for x in map(parse_binance_income, rows) if x is not None]
+
+
+async def fetch_income_history(
+    start_ms: int,
+    end_ms: int,
+    symbol: Optional[str] = None,
+    limit: int = 1000,
+    income_type: Optional[str] = None,
+) -> List[IncomeRow]:
+    """
+    [start_ms, end_ms] aralığındaki TÜM income satırları (tekil, zaman sıralı).
+    Aralık HISTORY_WINDOW_MS dilimlerine bölünüp paralel çekilir; limit'e
+    ulaşan dilim yarılanır. Hata → raise.
+    """
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
+
+        async def _window(s: int, e: int) -> List[IncomeRow]:
+            return await fetch_income_page(
+                s, e, limit=limit, symbol=symbol, income_type=income_type, client=c
+            )
+
+        return await fetch_time_sliced(
+            _window,
+            int(start_ms),
+            int(end_ms),
+            window_ms=HISTORY_WINDOW_MS,
+            page_limit=int(limit),
+            time_of=lambda r: r.time,
+            key_of=lambda r: (r.income_type, r.tran_id, r.symbol),
+        )
@@ -19,8 +19,10 @@ from .settings import (
     HTTP_TIMEOUT_SYNC,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
+    MARK_PRICE_TTL_SECONDS,
 )
 from app.exchanges.common.meta_cache import AsyncTTLCache
+from app.exchanges.common.snapshots import parse_mark_prices
 from app.exchanges.binance_common.http import BinanceHttp
 from app.exchanges.common.http.retry import arequest_with_retry
 
@@ -268,6 +270,30 @@ async def get_symbol_meta_map() -> dict[str, dict]:
     return await _EXINFO.get()
 
 
+# ---------------------- Mark price cache (premiumIndex) ----------------------
+async def _load_mark_prices() -> dict[str, Decimal]:
+    """premiumIndex (sembolsüz, imzasız) → {'SYMBOL': markPrice}."""
+    url = f"{BASE_URL}{ENDPOINTS['MARK_PRICE']}"
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SHORT) as client:
+        resp = await arequest_with_retry(
+            client,
+            "GET",
+            url,
+            timeout=HTTP_TIMEOUT_SHORT,
+            max_retries=1,
+        )
+        resp.raise_for_status()
+        return parse_mark_prices(resp.json(), "markPrice")
+
+
+_MARKS = AsyncTTLCache(ttl=MARK_PRICE_TTL_SECONDS, loader=_load_mark_prices)
+
+
+async def get_mark_prices() -> dict[str, Decimal]:
+    """Tüm sembollerin mark fiyatı (TTL önbellekli; istekler paylaşır)."""
+    return await _MARKS.get()
+
+
 def _q_floor(value: Decimal, step: Decimal) -> Decimal:
     return value.quantize(step, rounding=ROUND_DOWN)
 
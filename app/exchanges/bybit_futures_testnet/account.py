@@ -9,13 +9,15 @@ import time
 
 from app.exchanges.common.http.retry import arequest_with_retry
 from datetime import datetime, timezone
-from typing import Optional, Any, Dict, Tuple, cast, Union
+from typing import Optional, Any, Dict, List, Tuple, cast, Union
+from app.exchanges.common.snapshots import BalanceSnapshot, PositionSnapshot
 from .settings import (
     BASE_URL,
     ENDPOINTS,
     RECV_WINDOW_MS,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
+    HISTORY_MAX_LOOKBACK_MS,
 )
 from .utils import build_signed_get
 
@@ -167,16 +169,12 @@ def _normalize_symbol(sym: str) -> str:
     return s
 
 
-async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+async def get_position_snapshots(
+    symbol: Optional[str] = None,
+) -> List[PositionSnapshot]:
     """
-    USDⓈ-M açık pozisyonlardan **borsa verisi** ile canlı (unrealized) PnL döndürür.
-    Davranış:
-      • `symbol=None` ve `return_all=True`  → `{"total": float, "positions": [ {..}, ... ]}`
-      • `symbol=None` ve `return_all=False` → `{"unrealized": float}` (toplam)
-      • `symbol='BTCUSDT'` (hedge/one-way fark etmeksizin) → İlgili sembolün **bacak/detay listesi**
-        (toplam tek bir sayı döndürmez). Gerekirse toplam, liste üzerinden
-        çağıran tarafça toplanabilir.
-    Not: Dönen değerler doğrudan borsa yanıtından normalize edilir (örn. `unRealizedProfit`).
+    /v5/position/list → yalnızca AÇIK bacaklar (size ≠ 0), PositionSnapshot olarak.
+    `symbol` verilirse o sembolün bacakları.
     """
     ep = ENDPOINTS.get("POSITION_RISK", "/v5/position/list")
     url = BASE_URL + ep
@@ -196,51 +194,48 @@ async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False)
         data = r.json() or {}
         rows = (data.get("result") or {}).get("list") or []
 
-    # yalnızca açık (positionAmt != 0)
+    snaps = [PositionSnapshot.from_bybit(p) for p in rows if isinstance(p, dict)]
+    want = _normalize_symbol(symbol) if symbol else None
+    return [s for s in snaps if s.is_open and (want is None or s.symbol == want)]
 
-    def fnum(v) -> float:
-        try:
-            return float(v)
-        except (TypeError, ValueError):
-            return 0.0
 
-    # Bybit: size alanı (string) ≠ 0 olanları açık kabul
-    open_pos = []
-    for p in rows:
-        try:
-            if abs(fnum(p.get("size"))) > 0.0:
-                open_pos.append(p)
-        except Exception:
-            continue
+async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+    """
+    USDⓈ-M açık pozisyonlardan **borsa verisi** ile canlı (unrealized) PnL döndürür.
+    Davranış:
+      • `symbol=None` ve `return_all=True`  → `{"total": float, "positions": [ {..}, ... ]}`
+      • `symbol=None` ve `return_all=False` → `{"unrealized": float}` (toplam)
+      • `symbol='BTCUSDT'` (hedge/one-way fark etmeksizin) → İlgili sembolün **bacak/detay listesi**
+        (toplam tek bir sayı döndürmez). Gerekirse toplam, liste üzerinden
+        çağıran tarafça toplanabilir.
+    Not: Değerler get_position_snapshots() çıktısından üretilir (örn. `unRealizedProfit`).
+    """
+    open_pos = await get_position_snapshots(symbol)
     if symbol:
-        s = _normalize_symbol(symbol)
-        legs = [
+        return [
             {
-                "symbol": str(p.get("symbol", "")).upper(),
-                # Bybit: bacak için positionIdx (1=LONG, 2=SHORT); taraf metni döndürmüyoruz
-                "unRealizedProfit": fnum(p.get("unrealisedPnl")),
-                "positionAmt": fnum(p.get("size")),
-                "entryPrice": fnum(p.get("avgPrice")),
-                "leverage": fnum(p.get("leverage")),
-                "markPrice": fnum(p.get("markPrice")),
-                "liquidationPrice": fnum(p.get("liqPrice")),
+                "symbol": p.symbol,
+                # Bybit: bacak positionIdx'ten (1=LONG, 2=SHORT, 0=BOTH)
+                "positionSide": p.position_side,
+                "unRealizedProfit": float(p.unrealized),
+                "positionAmt": float(p.amt),
+                "entryPrice": float(p.entry_price),
+                "leverage": float(p.leverage),
+                "markPrice": float(p.mark_price),
+                "liquidationPrice": float(p.liquidation_price),
             }
             for p in open_pos
-            if str(p.get("symbol", "")).upper() == s
         ]
-        if return_all:
-            return legs
-        return legs
     # tüm semboller
     details = [
         {
-            "symbol": str(p.get("symbol", "")).upper(),
-            "unrealized": fnum(p.get("unrealisedPnl")),
-            "position_amt": fnum(p.get("size")),
-            "entry_price": fnum(p.get("avgPrice")),
-            "leverage": fnum(p.get("leverage")),
-            "mark_price": fnum(p.get("markPrice")),
-            "liquidation_price": fnum(p.get("liqPrice")),
+            "symbol": p.symbol,
+            "unrealized": float(p.unrealized),
+            "position_amt": float(p.amt),
+            "entry_price": float(p.entry_price),
+            "leverage": float(p.leverage),
+            "mark_price": float(p.mark_price),
+            "liquidation_price": float(p.liquidation_price),
         }
         for p in open_pos
     ]
@@ -259,65 +254,30 @@ async def income_summary(
     """
     Bybit V5: /v5/position/closed-pnl üzerinden kapatılan işlemlerin NET PnL toplamı.
     - symbol: 'BTCUSDT' gibi (opsiyonel)
-    - since/until: datetime(UTC) (opsiyonel); sağlanmazsa geniş aralık kullanılır.
+    - since/until: datetime(UTC) (opsiyonel); since yoksa HISTORY_MAX_LOOKBACK_MS.
+      Aralık 7 günlük dilimlerde paralel çekilir (order_handler).
     Dönen: float (USDT cinsinden net PnL)
     """
-    base = BASE_URL + "/v5/position/closed-pnl"
-    total = 0.0
-    cursor: Optional[str] = None
+    from .order_handler import fetch_closed_pnl_history
 
-    # Zaman aralığı → ms
-    start_ms: Optional[int] = (
-        int(since.replace(tzinfo=timezone.utc).timestamp() * 1000) if since else None
+    end_ms = (
+        int(until.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        if until
+        else int(time.time() * 1000)
     )
-    end_ms: Optional[int] = (
-        int(until.replace(tzinfo=timezone.utc).timestamp() * 1000) if until else None
+    start_ms = (
+        int(since.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        if since
+        else end_ms - HISTORY_MAX_LOOKBACK_MS
     )
     sym = _normalize_symbol(symbol) if symbol else None
 
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as client:
-        while True:
-            params: Dict[str, Any] = {"category": "linear", "limit": 200}
-            if sym:
-                params["symbol"] = sym
-            if start_ms is not None:
-                params["startTime"] = start_ms
-            if end_ms is not None:
-                params["endTime"] = end_ms
-            if cursor:
-                params["cursor"] = cursor
-
-            full_url, headers = await build_signed_get(
-                base, params, recv_window=RECV_WINDOW_MS
-            )
-            r = await arequest_with_retry(
-                client,
-                "GET",
-                full_url,
-                headers=headers,
-                timeout=HTTP_TIMEOUT_LONG,
-                max_retries=1,
-            )
-            r.raise_for_status()
-            data = r.json() or {}
-            result = data.get("result") if isinstance(data, dict) else None
-            rows = result.get("list") if isinstance(result, dict) else None
-            items = rows if isinstance(rows, list) else []
-
-            for it in items:
-                try:
-                    total += float(it.get("closedPnl") or 0.0)
-                except (TypeError, ValueError):
-                    continue
-
-            # sayfalama
-            next_cursor = (
-                result.get("nextPageCursor") if isinstance(result, dict) else None
-            )
-            if not next_cursor or not items:
-                break
-            cursor = str(next_cursor)
-
+    total = 0.0
+    for it in await fetch_closed_pnl_history(start_ms, end_ms, symbol=sym):
+        try:
+            total += float(it.get("closedPnl") or 0.0)
+        except (TypeError, ValueError):
+            continue
     return float(total)
 
 
@@ -392,15 +352,12 @@ async def get_available(
     if not want and symbol:
         want = await infer_quote_from_symbol(symbol)
 
-    row = next((r for r in rows if str(r.get("asset", "")).upper() == want), None)
-    if not row:
+    bal = next(
+        (b for b in map(BalanceSnapshot.from_binance, rows) if b.asset == want), None
+    )
+    if not bal:
         return {"asset": want or None, "available": 0.0, "balance": 0.0}
-
-    return {
-        "asset": want,
-        "available": float(row.get("availableBalance") or 0.0),
-        "balance": float(row.get("balance") or row.get("walletBalance") or 0.0),
-    }
+    return bal.as_dict()
 
 
 class Account:
@@ -408,6 +365,10 @@ class Account:
     async def get_unrealized(self, symbol=None, return_all=False):
         return await get_unrealized(symbol=symbol, return_all=return_all)
 
+    # noinspection PyMethodMayBeStatic
+    async def get_position_snapshots(self, symbol=None):
+        return await get_position_snapshots(symbol)
+
     # noinspection PyMethodMayBeStatic
     async def get_account_balance(self):
         return await get_account_balance()
@@ -11,7 +11,7 @@ import asyncio
 
 from app.exchanges.common.http.retry import arequest_with_retry
 from app.models import StrategyOpenTrade
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
 from app.schemas import WebhookSignal
 from .settings import (
     BASE_URL,
@@ -21,6 +21,7 @@ from .settings import (
     RECV_WINDOW_LONG_MS,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
+    HISTORY_WINDOW_MS,
 )
 from .utils import (
     build_signed_get,
@@ -31,6 +32,8 @@ from .utils import (
     set_position_mode,
 )
 from app.exchanges.common.safety import SafetyGate
+from app.exchanges.common.snapshots import PositionSnapshot
+from app.exchanges.common.backfill import fetch_time_sliced
 
 logger = logging.getLogger(__name__)
 
@@ -164,7 +167,10 @@ async def place_order(
         return {"success": False, "message": str(e), "data": {}}
 
 
-async def get_position(symbol: str, side: Optional[str] = None) -> dict:
+async def get_position(
+    symbol: str, side: Optional[str] = None
+) -> Optional[PositionSnapshot]:
+    """Bybit V5 pozisyonunu PositionSnapshot olarak döndürür (yoksa None)."""
     endpoint = ENDPOINTS["POSITION_RISK"]
     url = BASE_URL + endpoint
     params = {"category": "linear", "symbol": symbol.upper()}
@@ -183,25 +189,27 @@ async def get_position(symbol: str, side: Optional[str] = None) -> dict:
             data = response.json() or {}
     except Exception as exc:
         logger.error("Position fetch failed (%s): %s", symbol, exc)
-        return {}
+        return None
     if not isinstance(data, dict) or data.get("retCode") != 0:
-        return {}
+        return None
     rows = (data.get("result") or {}).get("list") or []
-    cands = [r for r in rows if str(r.get("symbol") or "").upper() == symbol.upper()]
+    sym = symbol.upper()
+    cands = [
+        PositionSnapshot.from_bybit(r)
+        for r in rows
+        if str(r.get("symbol") or "").upper() == sym
+    ]
     if not cands:
-        return {}
+        return None
     if POSITION_MODE == "hedge" and (side or "").lower() in ("long", "short"):
-        want = "Buy" if side.lower() == "long" else "Sell"
-        for r in cands:
-            if (r.get("side") or "").capitalize() == want:
-                return r
+        want = "LONG" if side.lower() == "long" else "SHORT"
+        for p in cands:
+            if p.position_side == want:
+                return p
     # one_way: açık olanı seç
-    for r in cands:
-        try:
-            if float(r.get("size") or 0) != 0.0:
-                return r
-        except (TypeError, ValueError):
-            pass
+    for p in cands:
+        if p.is_open:
+            return p
     return cands[0]
 
 
@@ -265,6 +273,94 @@ async def query_order_status(
 
 
 # ---------------------- Borsa-onaylı Net PnL (income) ------------------------
+async def _fetch_closed_pnl_window(
+    c: httpx.AsyncClient,
+    start_ms: int,
+    end_ms: int,
+    symbol: Optional[str] = None,
+    limit: int = 200,
+) -> List[Dict[str, Any]]:
+    """
+    /v5/position/closed-pnl: tek zaman dilimi (≤ 7 gün), cursor ile sonuna kadar.
+    Hata → raise.
+    """
+    url = BASE_URL + ENDPOINTS["INCOME"]
+    page_limit = max(1, min(int(limit), 200))
+    out: List[Dict[str, Any]] = []
+    cursor: Optional[str] = None
+
+    while True:
+        params: Dict[str, Any] = {
+            "category": "linear",
+            "limit": page_limit,
+            "startTime": int(start_ms),
+            "endTime": int(end_ms),
+        }
+        if symbol:
+            params["symbol"] = symbol.upper()
+        if cursor:
+            params["cursor"] = cursor
+
+        full_url, headers = await build_signed_get(
+            url, params, recv_window=RECV_WINDOW_LONG_MS
+        )
+        r = await arequest_with_retry(
+            c,
+            "GET",
+            full_url,
+            headers=headers,
+            timeout=HTTP_TIMEOUT_LONG,
+            max_retries=1,
+            retry_on_binance_1021=False,
+        )
+        r.raise_for_status()
+        data = r.json() or {}
+        result = data.get("result") if isinstance(data, dict) else None
+        rows = result.get("list") if isinstance(result, dict) else None
+        items = rows if isinstance(rows, list) else []
+        out.extend(it for it in items if isinstance(it, dict))
+
+        next_cursor = result.get("nextPageCursor") if isinstance(result, dict) else None
+        if not next_cursor or not items:
+            break
+        cursor = str(next_cursor)
+    return out
+
+
+def _closed_pnl_key(it: Dict[str, Any]) -> tuple:
+    """Dilim sınırlarında tekrar gelen satırlar için kimlik (orderId + zaman)."""
+    if it.get("orderId"):
+        return (str(it["orderId"]), str(it.get("updatedTime") or ""))
+    # Kimliksiz satır: tüm alanlar (aynı satırın tekrarı tekilleşir)
+    return tuple(sorted((str(k), str(v)) for k, v in it.items()))
+
+
+async def fetch_closed_pnl_history(
+    start_ms: int,
+    end_ms: int,
+    symbol: Optional[str] = None,
+    limit: int = 200,
+) -> List[Dict[str, Any]]:
+    """
+    [start_ms, end_ms] aralığındaki TÜM closed-pnl satırları (tekil, zaman sıralı).
+    7 günlük dilimler paralel çekilir; dilim içi cursor ile tamamlanır.
+    """
+
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
+
+        async def _window(s: int, e: int) -> List[Dict[str, Any]]:
+            return await _fetch_closed_pnl_window(c, s, e, symbol=symbol, limit=limit)
+
+        return await fetch_time_sliced(
+            _window,
+            int(start_ms),
+            int(end_ms),
+            window_ms=HISTORY_WINDOW_MS,
+            time_of=lambda it: int(it.get("updatedTime") or it.get("createdTime") or 0),
+            key_of=_closed_pnl_key,
+        )
+
+
 async def income_breakdown(
     start_ms: int,
     end_ms: int,
@@ -274,60 +370,13 @@ async def income_breakdown(
     """
     Bybit V5 /v5/position/closed-pnl akışını okuyup işlem tipi bazında toplar.
     Dönen 'net', borsanın verdiği tüm kapalı işlem PnL kalemlerinin toplamıdır.
+    Aralık fetch_closed_pnl_history ile 7 günlük dilimlerde paralel çekilir.
     """
-    endpoint = ENDPOINTS["INCOME"]
-    url = BASE_URL + endpoint
     totals: dict[str, float] = {}
-    cursor: Optional[str] = None
-    page_limit = max(1, min(int(limit), 200))
-
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_LONG) as c:
-            while True:
-                params: dict[str, Any] = {"category": "linear", "limit": page_limit}
-                if start_ms is not None:
-                    params["startTime"] = int(start_ms)
-                if end_ms is not None:
-                    params["endTime"] = int(end_ms)
-                if symbol:
-                    params["symbol"] = (symbol or "").upper()
-                if cursor:
-                    params["cursor"] = cursor
-
-                full_url, headers = await build_signed_get(
-                    url, params, recv_window=RECV_WINDOW_LONG_MS
-                )
-                r = await arequest_with_retry(
-                    c,
-                    "GET",
-                    full_url,
-                    headers=headers,
-                    timeout=HTTP_TIMEOUT_LONG,
-                    max_retries=1,
-                    retry_on_binance_1021=False,
-                )
-                r.raise_for_status()
-                data = r.json() or {}
-                result = data.get("result") if isinstance(data, dict) else None
-                rows = result.get("list") if isinstance(result, dict) else None
-                items = rows if isinstance(rows, list) else []
-                if not items:
-                    break
-                for it in items:
-                    try:
-                        closed_pnl = float(it.get("closedPnl") or 0.0)
-                    except (TypeError, ValueError):
-                        closed_pnl = 0.0
-                    exec_type = it.get("execType") or it.get("category") or "UNKNOWN"
-                    key = str(exec_type)
-                    totals[key] = totals.get(key, 0.0) + closed_pnl
-
-                next_cursor = (
-                    result.get("nextPageCursor") if isinstance(result, dict) else None
-                )
-                if not next_cursor:
-                    break
-                cursor = str(next_cursor)
+        items = await fetch_closed_pnl_history(
+            start_ms, end_ms, symbol=symbol, limit=limit
+        )
     except httpx.HTTPStatusError as e:
         logger.exception("income_summary HTTP error: %s", e)
         return {"success": False, "net": 0.0, "sum": {}, "message": str(e)}
@@ -335,6 +384,15 @@ async def income_breakdown(
         logger.exception("income_summary network error: %s", e)
         return {"success": False, "net": 0.0, "sum": {}, "message": str(e)}
 
+    for it in items:
+        try:
+            closed_pnl = float(it.get("closedPnl") or 0.0)
+        except (TypeError, ValueError):
+            closed_pnl = 0.0
+        exec_type = it.get("execType") or it.get("category") or "UNKNOWN"
+        key = str(exec_type)
+        totals[key] = totals.get(key, 0.0) + closed_pnl
+
     net = sum(totals.values())
 
     return {
@@ -37,6 +37,14 @@ POSITION_MODE = "one_way"  # "one_way" or "hedge"
 # userTrades aralığı için geriye bakış (ms)
 USERTRADES_LOOKBACK_MS = 120_000  # 60_000 kısa kalabilir bu yüzden 120 önerilir.
 
+# closed-pnl geçmişi: startTime–endTime en fazla 7 gün olabilir (V5 kuralı);
+# since verilmezse en fazla bu kadar geriye gidilir.
+HISTORY_WINDOW_MS = 7 * 24 * 60 * 60 * 1000
+HISTORY_MAX_LOOKBACK_MS = 365 * 24 * 60 * 60 * 1000
+
+# Mark fiyat önbelleği (yerel uPnL motoru): tüm semboller tek imzasız çağrı
+MARK_PRICE_TTL_SECONDS = 1.0
+
 if not API_KEY or not API_SECRET:
     raise RuntimeError(
         f"[{EXCHANGE_NAME}] API key/secret eksik. .env dosyasına "
@@ -100,6 +108,7 @@ ENDPOINTS = {
     # UI/contract uyarıları için alias'lar:
     "EXCHANGE_INFO": "/v5/market/instruments-info",
     "KLINES": "/v5/market/kline",
+    "TICKERS": "/v5/market/tickers",  # imzasız; category=linear → tüm semboller
     "ORDER": "/v5/order/create",
     "ORDER_STATUS": "/v5/order/realtime",
     "POSITION_RISK": "/v5/position/list",
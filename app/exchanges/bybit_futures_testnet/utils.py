@@ -21,9 +21,11 @@ from .settings import (
     HTTP_TIMEOUT_SYNC,
     HTTP_TIMEOUT_SHORT,
     HTTP_TIMEOUT_LONG,
+    MARK_PRICE_TTL_SECONDS,
 )
 from app.config import settings
 from app.exchanges.common.meta_cache import AsyncTTLCache
+from app.exchanges.common.snapshots import parse_mark_prices
 from app.exchanges.bybit_common.http import BybitHttp
 from app.exchanges.common.http.retry import arequest_with_retry
 
@@ -428,6 +430,32 @@ async def get_symbol_meta_map() -> dict[str, dict]:
     return await _EXINFO.get()
 
 
+# ---------------------- Mark price cache (TICKERS) ----------------------
+async def _load_mark_prices() -> dict[str, Decimal]:
+    """/v5/market/tickers (category=linear, imzasız) → {'SYMBOL': markPrice}."""
+    url = build_public_url(BASE_URL + ENDPOINTS["TICKERS"], {"category": "linear"})
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SHORT) as client:
+        r = await arequest_with_retry(
+            client,
+            "GET",
+            url,
+            headers=None,
+            timeout=HTTP_TIMEOUT_SHORT,
+            max_retries=1,
+        )
+        r.raise_for_status()
+        data = r.json() or {}
+    return parse_mark_prices((data.get("result") or {}).get("list"), "markPrice")
+
+
+_MARKS = AsyncTTLCache(ttl=MARK_PRICE_TTL_SECONDS, loader=_load_mark_prices)
+
+
+async def get_mark_prices() -> dict[str, Decimal]:
+    """Tüm lineer sembollerin mark fiyatı (TTL önbellekli; istekler paylaşır)."""
+    return await _MARKS.get()
+
+
 def _q_floor(value: Decimal, step: Decimal) -> Decimal:
     return value.quantize(step, rounding=ROUND_DOWN)
 
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# app/exchanges/common/backfill.py
+# Python 3.9
+
+"""
+Zaman dilimli, paralel geçmiş (history) çekimi.
+
+[since, until] aralığı ``window_ms`` genişliğinde dilimlere bölünür ve dilimler
+``concurrency`` sınırı içinde eşzamanlı çekilir. Tek istekte sayfa limitine
+ulaşan (dolu dönen) dilim ikiye bölünüp yeniden çekilir; böylece limit
+yüzünden sessizce kesilen geçmiş kalmaz. Sonuçlar anahtara göre tekilleştirilip
+(zaman, anahtar) sırasıyla birleştirilir — çıktı çağrı sırasından bağımsızdır.
+
+İki kullanım biçimi:
+  • Binance /fapi/v1/income, /fapi/v1/userTrades: ``fetch_window`` tek istek
+    atar, ``page_limit`` verilir → dolu dilim bölünür.
+  • Bybit /v5/position/closed-pnl: ``fetch_window`` dilim içini cursor ile
+    sonuna kadar sayfalar, ``page_limit=None`` → bölme yapılmaz.
+"""
+
+import asyncio
+import logging
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Eşzamanlı istek bütçesi (borsa ağırlık limitine karşı muhafazakâr)
+DEFAULT_CONCURRENCY = 5
+# Bundan dar dilim bölünmez (aynı ms'te limitten fazla kayıt → uyarı)
+MIN_WINDOW_MS = 1
+
+# fetch_window(start_ms, end_ms) → dilimdeki satırlar (uçlar dahil)
+FetchWindow = Callable[[int, int], Awaitable[Sequence[T]]]
+
+
+def split_range(since_ms: int, until_ms: int, window_ms: int) -> List[Tuple[int, int]]:
+    """[since, until] → ardışık, kesişmeyen [start, end] dilimleri (uçlar dahil)."""
+    since_ms, until_ms, window_ms = int(since_ms), int(until_ms), int(window_ms)
+    if until_ms < since_ms:
+        return []
+    if window_ms <= 0:
+        return [(since_ms, until_ms)]
+    out = []
+    start = since_ms
+    while start <= until_ms:
+        end = min(start + window_ms - 1, until_ms)
+        out.append((start, end))
+        start = end + 1
+    return out
+
+
+async def fetch_time_sliced(
+    fetch_window: FetchWindow,
+    since_ms: int,
+    until_ms: int,
+    *,
+    window_ms: int,
+    time_of: Callable[[T], int],
+    key_of: Callable[[T], Hashable],
+    page_limit: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[T]:
+    """
+    [since_ms, until_ms] aralığının tamamını döndürür (tekil, zaman sıralı).
+    Herhangi bir dilim hata verirse hata yukarı taşınır (kısmi sonuç dönmez).
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    merged: Dict[Hashable, T] = {}
+    stats = {"requests": 0, "splits": 0}
+
+    async def _one(start: int, end: int) -> None:
+        async with sem:
+            stats["requests"] += 1
+            rows = list(await fetch_window(start, end))
+        if page_limit is not None and len(rows) >= page_limit:
+            if end - start + 1 > MIN_WINDOW_MS:
+                # Dolu dilim: yarıla ve iki yarıyı da (eşzamanlı) yeniden çek
+                stats["splits"] += 1
+                mid = start + (end - start) // 2
+                await asyncio.gather(_one(start, mid), _one(mid + 1, end))
+                return
+            logger.warning(
+                "[backfill] window %s-%s still full at %d rows; may be truncated",
+                start,
+                end,
+                len(rows),
+            )
+        for row in rows:
+            merged.setdefault(key_of(row), row)
+
+    await asyncio.gather(
+        *(_one(s, e) for s, e in split_range(since_ms, until_ms, window_ms))
+    )
+    logger.debug(
+        "[backfill] %s-%s → %d rows (%d requests, %d splits)",
+        since_ms,
+        until_ms,
+        len(merged),
+        stats["requests"],
+        stats["splits"],
+    )
+    return sorted(merged.values(), key=lambda r: (time_of(r), _sort_key(key_of(r))))
+
+
+def _sort_key(k: Any) -> Tuple:
+    # Karışık tipli anahtarlarda da deterministik sıra (str karşılaştırması)
+    return tuple(str(x) for x in k) if isinstance(k, tuple) else (str(k),)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# app/exchanges/common/fill_cache.py
+# Python 3.9
+
+"""
+userTrades (fill) için artımlı önbellek.
+
+(exchange, symbol) başına son görülen trade id'sini ve kapsanan en eski zamanı
+tutar; sonraki çağrılarda yalnızca ``fromId = last_id + 1`` ile yeni fill'ler
+çekilir. Sayfa dolu geldikçe (limit) devam edilir, böylece 1000'den fazla
+fill de eksiksiz toplanır. Bellek sembol başına MAX_FILLS_PER_KEY ve toplam
+MAX_KEYS (LRU) ile sınırlıdır.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_KEYS = 256
+MAX_FILLS_PER_KEY = 20_000
+PAGE_LIMIT = 1000
+# Tek çağrıda çekilecek azami sayfa (yanlış yapılandırmada sonsuz döngüye karşı)
+MAX_PAGES = 50
+
+# fetch_page(params) → ham satır listesi; params: {"startTime": ms} ya da {"fromId": id}
+FetchPage = Callable[[Dict[str, Any]], Awaitable[List[Mapping[str, Any]]]]
+# fetch_range(start_ms) → start_ms'den şimdiye tüm ham satırlar (ör. dilimli paralel çekim)
+FetchRange = Callable[[int], Awaitable[List[Mapping[str, Any]]]]
+
+
+class Fill(NamedTuple):
+    id: int
+    time: int
+    price: float
+    qty: float
+    side: str  # BUY | SELL
+    position_side: str  # BOTH | LONG | SHORT
+
+
+def parse_binance_fill(row: Mapping[str, Any]) -> Optional[Fill]:
+    """/fapi/v1/userTrades satırı → Fill (bozuk satır → None)."""
+    try:
+        return Fill(
+            id=int(row["id"]),
+            time=int(row.get("time") or 0),
+            price=float(row.get("price") or 0.0),
+            qty=float(row.get("qty") or 0.0),
+            side=str(row.get("side") or "").upper(),
+            position_side=str(row.get("positionSide") or "BOTH").upper(),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class _KeyFills:
+    __slots__ = ("fills", "last_id", "covered_from", "lock")
+
+    def __init__(self) -> None:
+        self.fills: Deque[Fill] = deque()
+        self.last_id: Optional[int] = None
+        # Bu zamandan (ms) itibaren fill'ler eksiksiz önbellekte
+        self.covered_from: Optional[int] = None
+        self.lock = asyncio.Lock()
+
+    def reset(self) -> None:
+        self.fills.clear()
+        self.last_id = None
+        self.covered_from = None
+
+    def extend(self, fills: List[Fill]) -> None:
+        for f in fills:
+            if self.last_id is not None and f.id <= self.last_id:
+                continue
+            self.fills.append(f)
+            self.last_id = f.id
+        # Bellek sınırı: en eskileri at, kapsama başlangıcını ileri kaydır
+        overflow = len(self.fills) - MAX_FILLS_PER_KEY
+        if overflow > 0:
+            for _ in range(overflow):
+                self.fills.popleft()
+            self.covered_from = self.fills[0].time
+
+
+class FillCache:
+    """Adapter başına tek örnek yeterli; anahtar (exchange, symbol)."""
+
+    def __init__(self, parse: Callable[[Mapping[str, Any]], Optional[Fill]]):
+        self._parse = parse
+        self._keys: "OrderedDict[Tuple[str, str], _KeyFills]" = OrderedDict()
+
+    def _entry(self, key: Tuple[str, str]) -> _KeyFills:
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = _KeyFills()
+            while len(self._keys) > MAX_KEYS:
+                old_key, _ = self._keys.popitem(last=False)
+                logger.debug("[fill-cache] evict %s", old_key)
+        else:
+            self._keys.move_to_end(key)
+        return entry
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+    def _parse_page(self, rows: List[Mapping[str, Any]]) -> List[Fill]:
+        out = [f for f in map(self._parse, rows or []) if f is not None]
+        out.sort(key=lambda f: f.id)
+        return out
+
+    async def _page_forward(
+        self,
+        entry: _KeyFills,
+        fetch_page: FetchPage,
+        params: Dict[str, Any],
+        page_limit: int,
+    ) -> int:
+        """params ile başla, sayfa dolu geldikçe fromId ile ilerle."""
+        fetched = 0
+        for _ in range(MAX_PAGES):
+            page = self._parse_page(await fetch_page(params))
+            entry.extend(page)
+            fetched += len(page)
+            if len(page) < page_limit or entry.last_id is None:
+                break
+            params = {"fromId": entry.last_id + 1}
+        else:
+            logger.warning("[fill-cache] page cap reached (%s pages)", MAX_PAGES)
+        return fetched
+
+    async def get_fills(
+        self,
+        exchange: str,
+        symbol: str,
+        start_ms: int,
+        fetch_page: FetchPage,
+        page_limit: int = PAGE_LIMIT,
+        fetch_range: Optional[FetchRange] = None,
+    ) -> List[Fill]:
+        """
+        start_ms'den itibaren tüm fill'ler (id sıralı).
+        Önbellek start_ms'i kapsıyorsa yalnızca last_id sonrası (delta) çekilir.
+        fetch_range verilirse ilk/tam doldurma onunla (tek seferde) yapılır.
+        """
+        key = (exchange, symbol.upper())
+        entry = self._entry(key)
+        async with entry.lock:
+            if entry.covered_from is None or entry.covered_from > start_ms:
+                # Kapsama yok/yetersiz → baştan, startTime ile doldur
+                entry.reset()
+                entry.covered_from = int(start_ms)
+                if fetch_range is not None:
+                    page = self._parse_page(await fetch_range(int(start_ms)))
+                    entry.extend(page)
+                    n = len(page)
+                else:
+                    n = await self._page_forward(
+                        entry, fetch_page, {"startTime": int(start_ms)}, page_limit
+                    )
+                logger.debug("[fill-cache] %s full fetch → %d fills", key, n)
+            else:
+                params = (
+                    {"fromId": entry.last_id + 1}
+                    if entry.last_id is not None
+                    else {"startTime": int(entry.covered_from)}
+                )
+                n = await self._page_forward(entry, fetch_page, params, page_limit)
+                logger.debug("[fill-cache] %s delta fetch → %d fills", key, n)
+            if entry.covered_from is not None and entry.covered_from > start_ms:
+                logger.warning(
+                    "[fill-cache] %s exceeds %d fills; oldest dropped",
+                    key,
+                    MAX_FILLS_PER_KEY,
+                )
+            return [f for f in entry.fills if f.time >= start_ms]
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# app/exchanges/common/income.py
+# Python 3.9
+
+"""
+Gelir (income) satırlarının adapter sınırında ayrıştırılmış hâli.
+
+Adapter'ların ``fetch_income_page`` fonksiyonları ham satırları buradaki
+``IncomeRow`` kayıtlarına çevirip döndürür. Sayfalama tüm tipler üzerinden
+ilerler; yerel income_ledger tablosu yalnızca LEDGER_TYPES kalemlerini tutar.
+"""
+
+from decimal import Decimal
+from typing import Any, Mapping, NamedTuple, Optional
+
+from app.exchanges.common.snapshots import _dec
+
+REALIZED_PNL = "REALIZED_PNL"
+COMMISSION = "COMMISSION"
+FUNDING_FEE = "FUNDING_FEE"
+LEDGER_TYPES = (REALIZED_PNL, COMMISSION, FUNDING_FEE)
+
+
+class IncomeRow(NamedTuple):
+    tran_id: str
+    income_type: str
+    symbol: str
+    amount: Decimal
+    asset: str
+    time: int  # ms (UTC)
+
+
+def parse_binance_income(row: Mapping[str, Any]) -> Optional[IncomeRow]:
+    """/fapi/v1/income satırı → IncomeRow (bozuk satır → None)."""
+    income_type = str(row.get("incomeType") or "").upper()
+    try:
+        tran_id = str(row["tranId"])
+        t = int(row.get("time") or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not tran_id or t <= 0:
+        return None
+    return IncomeRow(
+        tran_id=tran_id,
+        income_type=income_type,
+        symbol=str(row.get("symbol") or "").upper(),
+        amount=_dec(row.get("income")),
+        asset=str(row.get("asset") or "").upper(),
+        time=t,
+    )
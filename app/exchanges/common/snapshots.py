@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# app/exchanges/common/snapshots.py
+# Python 3.9
+
+"""
+Borsa yanıtlarının adapter sınırında BİR KEZ ayrıştırılmış hâlleri.
+
+Adapter'lar ham pozisyon/bakiye satırlarını burada tipli, ``__slots__``'lı
+kayıtlara çevirir; handler/verifier katmanı alias anahtar yoklamadan ve
+tekrar tekrar ``Decimal(str(...))`` yapmadan doğrudan alanları okur.
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Mapping, Optional
+
+_ZERO = Decimal("0")
+
+
+def _dec(v: Any) -> Decimal:
+    """Boş/bozuk değerleri 0 kabul eden tek noktadan Decimal dönüşümü."""
+    if v is None or v == "":
+        return _ZERO
+    try:
+        d = Decimal(str(v))
+    except (InvalidOperation, ValueError, TypeError):
+        return _ZERO
+    return d if d.is_finite() else _ZERO
+
+
+class PositionSnapshot:
+    """
+    Tek bir pozisyon bacağı.
+      • amt: işaretli miktar (long > 0, short < 0) — Binance positionAmt şeması
+      • position_side: "LONG" | "SHORT" | "BOTH"
+    """
+
+    __slots__ = (
+        "symbol",
+        "position_side",
+        "amt",
+        "entry_price",
+        "mark_price",
+        "unrealized",
+        "leverage",
+        "liquidation_price",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        position_side: str = "BOTH",
+        amt: Decimal = _ZERO,
+        entry_price: Decimal = _ZERO,
+        mark_price: Decimal = _ZERO,
+        unrealized: Decimal = _ZERO,
+        leverage: int = 1,
+        liquidation_price: Decimal = _ZERO,
+    ):
+        self.symbol = symbol
+        self.position_side = position_side
+        self.amt = amt
+        self.entry_price = entry_price
+        self.mark_price = mark_price
+        self.unrealized = unrealized
+        self.leverage = leverage
+        self.liquidation_price = liquidation_price
+
+    @property
+    def abs_amt(self) -> Decimal:
+        return self.amt.copy_abs()
+
+    @property
+    def is_open(self) -> bool:
+        return self.amt != 0
+
+    @property
+    def side(self) -> Optional[str]:
+        """Projedeki standart yön (long/short); BOTH için miktarın işaretinden."""
+        if self.position_side == "LONG":
+            return "long"
+        if self.position_side == "SHORT":
+            return "short"
+        if self.amt > 0:
+            return "long"
+        if self.amt < 0:
+            return "short"
+        return None
+
+    # ---- adapter yapıcıları ----
+    @classmethod
+    def from_binance(cls, row: Mapping[str, Any]) -> "PositionSnapshot":
+        """/fapi/v2/positionRisk satırı."""
+        return cls(
+            symbol=str(row.get("symbol") or "").upper(),
+            position_side=str(row.get("positionSide") or "BOTH").upper(),
+            amt=_dec(row.get("positionAmt")),
+            entry_price=_dec(row.get("entryPrice")),
+            mark_price=_dec(row.get("markPrice")),
+            unrealized=_dec(row.get("unRealizedProfit")),
+            leverage=int(_dec(row.get("leverage")) or 1),
+            liquidation_price=_dec(row.get("liquidationPrice")),
+        )
+
+    @classmethod
+    def from_bybit(cls, row: Mapping[str, Any]) -> "PositionSnapshot":
+        """/v5/position/list satırı; size işaretsiz gelir, yön 'side' alanında."""
+        size = _dec(row.get("size")).copy_abs()
+        short = str(row.get("side") or "").capitalize() == "Sell"
+        idx = str(row.get("positionIdx") or "0")
+        position_side = {"1": "LONG", "2": "SHORT"}.get(idx, "BOTH")
+        return cls(
+            symbol=str(row.get("symbol") or "").upper(),
+            position_side=position_side,
+            amt=-size if short else size,
+            entry_price=_dec(row.get("avgPrice")),
+            mark_price=_dec(row.get("markPrice")),
+            unrealized=_dec(row.get("unrealisedPnl")),
+            leverage=int(_dec(row.get("leverage")) or 1),
+            liquidation_price=_dec(row.get("liqPrice")),
+        )
+
+    @classmethod
+    def from_mexc(cls, row: Mapping[str, Any]) -> "PositionSnapshot":
+        """open_positions satırı; positionType 1=long, 2=short, holdVol işaretsiz."""
+        vol = _dec(row.get("holdVol")).copy_abs()
+        short = str(row.get("positionType") or "") == "2"
+        return cls(
+            # BTC_USDT → BTCUSDT (DB/sinyal tarafındaki kanonik biçim)
+            symbol=str(row.get("symbol") or "").upper().replace("_", ""),
+            position_side="SHORT" if short else "LONG",
+            amt=-vol if short else vol,
+            entry_price=_dec(row.get("holdAvgPrice")),
+            # MEXC open_positions mark price / unrealized döndürmez
+            leverage=int(_dec(row.get("leverage")) or 1),
+            liquidation_price=_dec(row.get("liquidatePrice")),
+        )
+
+    def as_dict(self) -> dict:
+        """Log/audit (JSON) için Binance-benzeri düz görünüm."""
+        return {
+            "symbol": self.symbol,
+            "positionSide": self.position_side,
+            "positionAmt": str(self.amt),
+            "entryPrice": str(self.entry_price),
+            "markPrice": str(self.mark_price),
+            "unRealizedProfit": str(self.unrealized),
+            "leverage": self.leverage,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PositionSnapshot({self.symbol} {self.position_side} amt={self.amt} "
+            f"entry={self.entry_price} mark={self.mark_price} upnl={self.unrealized})"
+        )
+
+
+class BalanceSnapshot:
+    """Tek varlık bakiyesi (available / toplam)."""
+
+    __slots__ = ("asset", "available", "balance")
+
+    def __init__(
+        self, asset: str, available: Decimal = _ZERO, balance: Decimal = _ZERO
+    ):
+        self.asset = asset
+        self.available = available
+        self.balance = balance
+
+    @classmethod
+    def from_binance(cls, row: Mapping[str, Any]) -> "BalanceSnapshot":
+        """/fapi/v2/balance satırı (bybit _unwrap_balances çıktısı da aynı şemada)."""
+        return cls(
+            asset=str(row.get("asset") or "").upper(),
+            available=_dec(row.get("availableBalance")),
+            balance=_dec(row.get("balance") or row.get("walletBalance")),
+        )
+
+    @classmethod
+    def from_mexc(cls, row: Mapping[str, Any]) -> "BalanceSnapshot":
+        """/account/assets satırı."""
+        return cls(
+            asset=str(row.get("currency") or "").upper(),
+            available=_dec(row.get("availableBalance")),
+            balance=_dec(row.get("equity")),
+        )
+
+    def as_dict(self) -> dict:
+        """get_available(...) yanıt şeması."""
+        return {
+            "asset": self.asset,
+            "available": float(self.available),
+            "balance": float(self.balance),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"BalanceSnapshot({self.asset} avail={self.available} bal={self.balance})"
+        )
+
+
+def parse_mark_prices(rows: Any, price_key: str = "markPrice") -> Dict[str, Decimal]:
+    """Ticker/premiumIndex listesi → {'SYMBOL': mark}; fiyatı olmayan atlanır."""
+    out: Dict[str, Decimal] = {}
+    for row in rows or []:
+        if not isinstance(row, Mapping):
+            continue
+        sym = str(row.get("symbol") or "").upper()
+        px = _dec(row.get(price_key))
+        if sym and px > 0:
+            out[sym] = px
+    return out
@@ -6,9 +6,10 @@ import httpx
 import re
 
 from datetime import datetime, timezone
-from typing import Optional, Any, Iterable
+from typing import Optional, Any, Iterable, List
 
 from app.exchanges.common.http.retry import arequest_with_retry
+from app.exchanges.common.snapshots import BalanceSnapshot, PositionSnapshot
 from .settings import (
     BASE_URL,
     ENDPOINTS,
@@ -52,29 +53,15 @@ def _unwrap_assets(resp: Any) -> list:
     return list(resp) if isinstance(resp, Iterable) else []
 
 
-async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+async def get_position_snapshots(
+    symbol: Optional[str] = None,
+) -> List[PositionSnapshot]:
     """
-    MEXC tarafında toplam unrealized için /account/assets döndüren satırlardaki 'unrealized' alanı kullanılabilir.
-    Sembole göre bacak bazında detay için open_positions filtrelenir.
+    open_positions → açık bacaklar, PositionSnapshot olarak.
+    `symbol` verilmezse tüm semboller (uç nokta symbol olmadan hepsini döndürür).
     """
-    # Toplam
-    assets = _unwrap_assets(await get_account_balance())
-    total = 0.0
-    for a in assets:
-        try:
-            total += float(a.get("unrealized") or 0.0)
-        except Exception:
-            pass
-    if not symbol:
-        return (
-            {"unrealized": float(total)}
-            if not return_all
-            else {"total": float(total), "positions": []}
-        )
-
-    # Sembole göre bacak detayı
     url = BASE_URL + ENDPOINTS["OPEN_POSITIONS"]
-    params = {"symbol": _normalize_symbol(symbol)}
+    params = {"symbol": _normalize_symbol(symbol)} if symbol else {}
     full_url, headers = await build_signed_get(url, params, recv_window=RECV_WINDOW_MS)
     async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SHORT) as c:
         r = await arequest_with_retry(
@@ -88,28 +75,47 @@ async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False)
         r.raise_for_status()
         j = r.json() or {}
     rows = j.get("data") or []
-    legs = []
-    for p in rows:
-        try:
-            legs.append(
-                {
-                    "symbol": str(p.get("symbol") or ""),
-                    "positionSide": (
-                        "LONG" if int(p.get("positionType") or 0) == 1 else "SHORT"
-                    ),
-                    # MEXC open_positions gerçek zamanlı mark price döndürmez; unrealized hesap dışı.
-                    # Mevcut alanlar:
-                    "unRealizedProfit": 0.0,
-                    "positionAmt": float(p.get("holdVol") or 0.0),
-                    "entryPrice": float(p.get("holdAvgPrice") or 0.0),
-                    "leverage": float(p.get("leverage") or 0.0),
-                    "markPrice": 0.0,
-                    "liquidationPrice": float(p.get("liquidatePrice") or 0.0),
-                }
-            )
-        except Exception:
-            continue
-    return legs if not return_all else legs
+    if not isinstance(rows, list):
+        rows = [rows]
+    snaps = [PositionSnapshot.from_mexc(p) for p in rows if isinstance(p, dict)]
+    return [s for s in snaps if s.is_open]
+
+
+async def get_unrealized(symbol: Optional[str] = None, return_all: bool = False):
+    """
+    MEXC tarafında toplam unrealized için /account/assets döndüren satırlardaki 'unrealized' alanı kullanılabilir.
+    Sembole göre bacak bazında detay için open_positions filtrelenir.
+    """
+    # Toplam
+    if not symbol:
+        assets = _unwrap_assets(await get_account_balance())
+        total = 0.0
+        for a in assets:
+            try:
+                total += float(a.get("unrealized") or 0.0)
+            except (TypeError, ValueError):
+                pass
+        return (
+            {"unrealized": float(total)}
+            if not return_all
+            else {"total": float(total), "positions": []}
+        )
+
+    # Sembole göre bacak detayı
+    # MEXC open_positions gerçek zamanlı mark price döndürmez; unrealized hesap dışı (0).
+    return [
+        {
+            "symbol": p.symbol,
+            "positionSide": p.position_side,
+            "unRealizedProfit": float(p.unrealized),
+            "positionAmt": float(p.abs_amt),
+            "entryPrice": float(p.entry_price),
+            "leverage": float(p.leverage),
+            "markPrice": float(p.mark_price),
+            "liquidationPrice": float(p.liquidation_price),
+        }
+        for p in await get_position_snapshots(symbol)
+    ]
 
 
 # Binance ile eşlenen alt fonksiyonlar ve Account sınıfı
@@ -117,6 +123,9 @@ class Account:
     async def get_unrealized(self, symbol=None, return_all=False):
         return await get_unrealized(symbol=symbol, return_all=return_all)
 
+    async def get_position_snapshots(self, symbol=None):
+        return await get_position_snapshots(symbol)
+
     async def get_account_balance(self):
         return await get_account_balance()
 
@@ -136,16 +145,13 @@ class Account:
         resp = await get_account_balance()
         rows = _unwrap_assets(resp)
         want = (currency or asset or "USDT").upper()
-        row = next(
-            (r for r in rows if str(r.get("currency", "")).upper() == want), None
+        bal = next(
+            (b for b in map(BalanceSnapshot.from_mexc, rows) if b.asset == want),
+            None,
         )
-        if not row:
+        if not bal:
             return {"asset": want, "available": 0.0, "balance": 0.0}
-        return {
-            "asset": want,
-            "available": float(row.get("availableBalance") or 0.0),
-            "balance": float(row.get("equity") or 0.0),
-        }
+        return bal.as_dict()
 
 
 account = Account()
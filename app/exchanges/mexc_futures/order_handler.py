@@ -11,6 +11,7 @@ from typing import Optional, Any
 
 from app.exchanges.common.http.retry import arequest_with_retry
 from app.exchanges.common.safety import SafetyGate
+from app.exchanges.common.snapshots import PositionSnapshot
 from app.models import StrategyOpenTrade
 from app.schemas import WebhookSignal
 
@@ -181,7 +182,10 @@ def _to_mexc_symbol(symbol: str) -> str:
     return s
 
 
-async def get_position(symbol: str, side: Optional[str] = None) -> dict:
+async def get_position(
+    symbol: str, side: Optional[str] = None
+) -> Optional[PositionSnapshot]:
+    """MEXC açık pozisyonunu PositionSnapshot olarak döndürür (yoksa None)."""
     url = BASE_URL + ENDPOINTS["OPEN_POSITIONS"]
     try:
         params = {"symbol": _to_mexc_symbol(symbol)}
@@ -201,33 +205,25 @@ async def get_position(symbol: str, side: Optional[str] = None) -> dict:
             data = r.json() or {}
     except Exception as e:
         logger.error("Position fetch failed (%s): %s", symbol, e)
-        return {}
+        return None
 
     rows = data.get("data") or []
     if not isinstance(rows, list):
         rows = [rows]
-    # side filtreleme (1=long, 2=short)
-    target = None
+    cands = [PositionSnapshot.from_mexc(p) for p in rows if isinstance(p, dict)]
+    if not cands:
+        return None
+    # side filtreleme (positionType 1=long, 2=short → LONG/SHORT)
     if (side or "").lower() in ("long", "short"):
-        want = 1 if side.lower() == "long" else 2
-        for p in rows:
-            if not isinstance(p, dict):
-                continue
-            if int(p.get("positionType", 0)) == want:
-                target = p
-                break
-    if not target:
-        # non-zero holdVol varsa onu yakala
-        for p in rows:
-            if not isinstance(p, dict):
-                continue
-            try:
-                if float(p.get("holdVol", 0)) != 0:
-                    target = p
-                    break
-            except Exception:
-                pass
-    return target or (rows[0] if rows else {})
+        want = "LONG" if side.lower() == "long" else "SHORT"
+        for p in cands:
+            if p.position_side == want:
+                return p
+    # non-zero holdVol varsa onu yakala
+    for p in cands:
+        if p.is_open:
+            return p
+    return cands[0]
 
 
 async def query_order_status(
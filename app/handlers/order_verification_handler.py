@@ -17,7 +17,7 @@ async def verify_closed_trades_for_execution(
     db: AsyncSession, execution, exchange_name: str
 ):
     """
-    Açık trade'leri dolaşır; borsada ilgili sembolde positionAmt == 0 ise
+    Açık trade'leri dolaşır; borsada ilgili sembolde pozisyon miktarı 0 ise
     trade'i kalıcı kayda geçirir ve open listesinden siler.
     (Şimdilik 'close-sinyali gelmiş olanlar' ayrımı yok; tüm open'ları kontrol eder.)
     """
@@ -62,7 +62,7 @@ async def verify_closed_trades_for_execution(
             logger.warning(f"[closed-verify/get_position] {sym} hata: {e}")
             continue
 
-        amt = Decimal(str((pos or {}).get("positionAmt", "0"))).copy_abs()
+        amt = pos.abs_amt if pos is not None else Decimal("0")
         if amt == 0:
             # Bu open trade için zaten bir kapanış trade’i yazılmış mı?
             exists_q = await db.execute(
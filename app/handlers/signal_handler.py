@@ -6,7 +6,7 @@ import logging
 import asyncio
 import httpx
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Dict, Set, Tuple
+from typing import Optional, Set, Tuple
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,16 +14,20 @@ from sqlalchemy import select, update
 from app.models import StrategyOpenTrade
 from app.schemas import WebhookSignal
 from app.utils.exchange_loader import load_execution_module
+from app.exchanges.common.snapshots import PositionSnapshot
 from crud.raw_signal import insert_raw_signal
 from crud.trade import (
     insert_strategy_open_trade,
     get_open_trade_for_close,
     close_open_trade_and_record,
+    resolve_close_price,
     find_merge_candidate,
     verify_close_after_signal,
 )
 from app.utils.position_utils import confirm_open_trade
 from app.database import async_session
+from app.services.signal_timing import SignalTimer
+from app.services import audit_payloads, verifier_wakeup
 
 
 logger = logging.getLogger(__name__)
@@ -68,21 +72,17 @@ async def _bg_verify_close(execution, public_id, symbol, exchange):
 
 
 async def _force_sync_qty(
-    db: AsyncSession, open_trade_id: int, pos: Optional[Dict]
+    db: AsyncSession, open_trade_id: int, pos: Optional[PositionSnapshot]
 ) -> None:
     """
     Exchange → DB senkron emniyet kemeri:
     confirm_open_trade sonrası, DB'deki position_size ve entry_price'ı
     borsadan gelen kesin değerlerle zorlama günceller (gerekirse).
     """
-    if not pos:
-        return
-    try:
-        ex_amt = Decimal(str(pos.get("positionAmt", "0"))).copy_abs()
-        ex_price = Decimal(str(pos.get("entryPrice", "0")))
-    except (InvalidOperation, ValueError, TypeError) as e:
-        logger.warning("[SYNC] parse error: %s", e)
+    if pos is None:
         return
+    ex_amt = pos.abs_amt
+    ex_price = pos.entry_price
     res = await db.execute(
         select(StrategyOpenTrade).where(StrategyOpenTrade.id == open_trade_id)
     )
@@ -127,7 +127,7 @@ def _canon_side(side: Optional[str]) -> Optional[str]:
 
 async def _get_position_for_side(
     execution, symbol: str, side: Optional[str]
-) -> Optional[Dict]:
+) -> Optional[PositionSnapshot]:
     """
     Hedge modunda doğru bacağı (long/short) sorgular; destek yoksa netsiz çağrıya düşer.
     """
@@ -144,8 +144,8 @@ async def _get_position_for_side(
         return None
 
 
-def _amt(pos: Optional[Dict]) -> Decimal:
-    return Decimal(str((pos or {}).get("positionAmt", "0"))).copy_abs()
+def _amt(pos: Optional[PositionSnapshot]) -> Decimal:
+    return pos.abs_amt if pos is not None else Decimal("0")
 
 
 async def _poll_position_change(
@@ -155,7 +155,7 @@ async def _poll_position_change(
     ref_amt: Decimal,
     attempts: int = 8,
     delay: float = 0.25,
-) -> Optional[Dict]:
+) -> Optional[PositionSnapshot]:
     """
     Pozisyon miktarı ref_amt'den farklı olana kadar kısa bir süre poll et.
     one_way'da 'net', hedge'de doğru bacak çekilir.
@@ -163,16 +163,58 @@ async def _poll_position_change(
     last = None
     for _ in range(attempts):
         last = await _get_position_for_side(execution, symbol, side)
-        try:
-            if _amt(last) != ref_amt:
-                break
-        except (InvalidOperation, ValueError, TypeError):
-            pass
+        if _amt(last) != ref_amt:
+            break
         await asyncio.sleep(delay)
     return last
 
 
-async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
+async def _record_close(
+    db: AsyncSession,
+    open_trade: StrategyOpenTrade,
+    position: Optional[PositionSnapshot],
+    timer: SignalTimer,
+) -> bool:
+    """
+    Kapanışı kısa bir transaction'da yazar. handle_signal'ın açtığı
+    transaction (buraya kadar yalnızca okuma) önce bitirilir; kapanış fiyatı
+    (userTrades/VWAP ağ çağrısı olabilir) bağlantı/transaction tutulmadan çözülür.
+    """
+    await db.commit()
+    with timer.stage("close_price"):
+        close_price = await resolve_close_price(open_trade, position)
+    if close_price is None:
+        logger.error("[close-fail] close price unresolved → %s", open_trade.public_id)
+        return False
+    with timer.stage("close_record"):
+        return await close_open_trade_and_record(
+            db, open_trade, position, close_price=close_price
+        )
+
+
+async def handle_signal(
+    signal_data: WebhookSignal, db: AsyncSession, include_timings: bool = False
+) -> dict:
+    """
+    Sinyali işler; aşama sürelerini SignalTimer ile ölçer.
+    include_timings=True ise dönen sözlüğe sinyal-bazlı 'timings' dökümü eklenir.
+    """
+    timer = SignalTimer(signal_data.exchange, signal_data.mode)
+    try:
+        result = await _handle_signal(signal_data, db, timer)
+    except BaseException:
+        # Ret/hata ayrı pencereye: başarılı yüzdelikleri bozmasın
+        timer.finish(ok=False)
+        raise
+    timer.finish(ok=not (isinstance(result, dict) and result.get("success") is False))
+    if include_timings and isinstance(result, dict):
+        result["timings"] = timer.breakdown()
+    return result
+
+
+async def _handle_signal(
+    signal_data: WebhookSignal, db: AsyncSession, timer: SignalTimer
+) -> dict:
     logger.info("Signal received: %s", signal_data)
     logger.info("Order type: %s", signal_data.order_type)
 
@@ -194,8 +236,9 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
         raise HTTPException(status_code=400, detail=str(e))
 
     # Raw sinyali kaydet ve hemen commit et
-    raw_signal = await insert_raw_signal(db, signal_data)
-    await db.commit()
+    with timer.stage("raw_signal_insert"):
+        raw_signal = await insert_raw_signal(db, signal_data)
+        await db.commit()
     logger.info("The received raw signal was recorded.")
 
     # Sonraki işlemler için yeni bir transaction başlat
@@ -206,9 +249,10 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
         try:
             # PRE-FLIGHT: Emirden önce kaldıraç ayarı
             if signal_data.leverage is not None:
-                lev_res = await execution.order_handler.set_leverage(
-                    signal_data.symbol, signal_data.leverage
-                )
+                with timer.stage("leverage_preflight"):
+                    lev_res = await execution.order_handler.set_leverage(
+                        signal_data.symbol, signal_data.leverage
+                    )
                 if not lev_res or not lev_res.get("success", False):
                     logger.warning("Leverage preflight failed: %s", lev_res)
                 else:
@@ -224,32 +268,28 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
             # === one_way MODUNDA TERS YÖN GELDİYSE → REDUCE (CLOSE) ===
             execution = load_execution_module(signal_data.exchange)
             # Mevcut açık trade'i fund_manager_id ile ve her iki side için ara
-            open_trade = await find_merge_candidate(
-                db,
-                symbol=signal_data.symbol,
-                exchange=signal_data.exchange,
-                side="long",
-                fund_manager_id=signal_data.fund_manager_id,
-            ) or await find_merge_candidate(
-                db,
-                symbol=signal_data.symbol,
-                exchange=signal_data.exchange,
-                side="short",
-                fund_manager_id=signal_data.fund_manager_id,
-            )
+            with timer.stage("merge_lookup"):
+                open_trade = await find_merge_candidate(
+                    db,
+                    symbol=signal_data.symbol,
+                    exchange=signal_data.exchange,
+                    side="long",
+                    fund_manager_id=signal_data.fund_manager_id,
+                ) or await find_merge_candidate(
+                    db,
+                    symbol=signal_data.symbol,
+                    exchange=signal_data.exchange,
+                    side="short",
+                    fund_manager_id=signal_data.fund_manager_id,
+                )
 
             if open_trade is not None:
                 # Hedge ise doğru bacağı, değilse net pozisyonu oku
-                pos_now = await _get_position_for_side(
-                    execution, signal_data.symbol, open_trade.side
-                )
-                # positionAmt>0 → long, <0 → short
-                try:
-                    amt_now = Decimal(
-                        str((pos_now or {}).get("positionAmt", "0"))
-                    ).copy_abs()
-                except (InvalidOperation, ValueError, TypeError):
-                    amt_now = Decimal("0")
+                with timer.stage("position_read"):
+                    pos_now = await _get_position_for_side(
+                        execution, signal_data.symbol, open_trade.side
+                    )
+                amt_now = _amt(pos_now)
 
                 # order_handler.settings içindeki mod
                 position_mode = getattr(
@@ -264,9 +304,12 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
                 ):
                     reduce_qty = min(amt_now, Decimal(str(signal_data.position_size)))
                     if reduce_qty > Decimal("0"):
+                        timer.mode = "counter-reduce"
                         # CLOSE sinyali oluştur (schema close exit_price zorunlu, borsa entryPrice ile besliyoruz)
-                        exit_px = (pos_now or {}).get("entryPrice") or str(
-                            signal_data.entry_price
+                        exit_px = (
+                            pos_now.entry_price
+                            if pos_now is not None and pos_now.entry_price > 0
+                            else signal_data.entry_price
                         )
                         close_signal = WebhookSignal(
                             mode="close",
@@ -281,9 +324,10 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
                             leverage=signal_data.leverage,  # close için şart değil ama dolduruyoruz
                         )
                         coid = f"sai_close_{raw_signal.id}"
-                        order_result = await execution.order_handler.place_order(
-                            close_signal, client_order_id=coid
-                        )
+                        with timer.stage("place_order"):
+                            order_result = await execution.order_handler.place_order(
+                                close_signal, client_order_id=coid
+                            )
                         if not order_result.get("success"):
                             await db.rollback()
                             return {
@@ -293,25 +337,19 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
                                 "response_data": order_result.get("data", {}),
                             }
                         # BORSADAN GERÇEK POZİSYONU ÇEK → DB’yi SENKRONLA
-                        pos_after = await _poll_position_change(
-                            execution,
-                            signal_data.symbol,
-                            open_trade.side,
-                            ref_amt=amt_now,
-                        )
-                        try:
-                            amt_after = Decimal(
-                                str((pos_after or {}).get("positionAmt", "0"))
-                            ).copy_abs()
-                        except (InvalidOperation, ValueError, TypeError):
-                            amt_after = Decimal("0")
+                        with timer.stage("position_poll"):
+                            pos_after = await _poll_position_change(
+                                execution,
+                                signal_data.symbol,
+                                open_trade.side,
+                                ref_amt=amt_now,
+                            )
+                        amt_after = _amt(pos_after)
 
                         # amt_after'ı gerçekten kullan → try/except ELSE yapısından çıkar.
                         if amt_after == Decimal("0"):
                             pid = open_trade.public_id
-                            ok = await close_open_trade_and_record(
-                                db, open_trade, pos_after
-                            )
+                            ok = await _record_close(db, open_trade, pos_after, timer)
                             if not ok:
                                 return {
                                     "success": False,
@@ -327,10 +365,14 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
 
                             # Kısmi kapandı → open trade'i borsa verisiyle güncelle,
                             # sonra emniyet kemeriyle zorla eşitle
-                            await confirm_open_trade(db, open_trade, pos_after)
-                            await _force_sync_qty(db, open_trade.id, pos_after)
+                            with timer.stage("confirm_open_trade"):
+                                await confirm_open_trade(db, open_trade, pos_after)
+                            with timer.stage("force_sync_qty"):
+                                await _force_sync_qty(db, open_trade.id, pos_after)
                             pid = open_trade.public_id
-                            await db.commit()
+                            with timer.stage("commit"):
+                                await db.commit()
+                            verifier_wakeup.wake(signal_data.exchange)
 
                             return {
                                 "success": True,
@@ -341,15 +383,17 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
 
             # === NORMAL OPEN (aynı yönde artırma dâhil) ===
             # Emirden önce referans pozisyonu oku (race condition önlemi)
-            pos_before_open = await _get_position_for_side(
-                execution, signal_data.symbol, canonical_side
-            )
+            with timer.stage("position_read"):
+                pos_before_open = await _get_position_for_side(
+                    execution, signal_data.symbol, canonical_side
+                )
             ref_amt = _amt(pos_before_open)
             # Emir gönder
             coid = f"sai_open_{raw_signal.id}"
-            order_result = await execution.order_handler.place_order(
-                signal_data, client_order_id=coid
-            )
+            with timer.stage("place_order"):
+                order_result = await execution.order_handler.place_order(
+                    signal_data, client_order_id=coid
+                )
             if not order_result.get("success"):
 
                 logger.error("OPEN order failed: %s", order_result)
@@ -361,37 +405,47 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
                 }
 
             # Aynı yönde açık pozisyon var mı? (side tekilleştirilmiş)
-            merge_candidate = await find_merge_candidate(
-                db,
-                symbol=signal_data.symbol,
-                exchange=signal_data.exchange,
-                side=canonical_side,
-                fund_manager_id=signal_data.fund_manager_id,
-            )
+            with timer.stage("merge_lookup"):
+                merge_candidate = await find_merge_candidate(
+                    db,
+                    symbol=signal_data.symbol,
+                    exchange=signal_data.exchange,
+                    side=canonical_side,
+                    fund_manager_id=signal_data.fund_manager_id,
+                )
 
             if merge_candidate:
                 open_trade = merge_candidate  # yeni satır açma
             else:
                 # İlk kez açılıyorsa mevcut davranışı koru (INSERT)
-                open_trade = await insert_strategy_open_trade(
-                    db=db,
-                    open_trade=execution.order_handler.build_open_trade_model(
-                        signal_data=signal_data,
-                        order_response=order_result,
-                        raw_signal_id=raw_signal.id,
-                    ),
-                )
+                with timer.stage("open_trade_insert"):
+                    open_trade = await insert_strategy_open_trade(
+                        db=db,
+                        open_trade=execution.order_handler.build_open_trade_model(
+                            signal_data=signal_data,
+                            order_response=order_result,
+                            raw_signal_id=raw_signal.id,
+                        ),
+                    )
 
-            # BORSADAN GERÇEK POZİSYON (race guard ile) → entryPrice & positionAmt ile DB’yi senkronla
-            pos_after_open = await _poll_position_change(
-                execution, signal_data.symbol, open_trade.side, ref_amt=ref_amt
-            )
-            await confirm_open_trade(db, open_trade, pos_after_open)
+            # BORSADAN GERÇEK POZİSYON (race guard ile) → entry_price & amt ile DB’yi senkronla
+            with timer.stage("position_poll"):
+                pos_after_open = await _poll_position_change(
+                    execution, signal_data.symbol, open_trade.side, ref_amt=ref_amt
+                )
+            with timer.stage("confirm_open_trade"):
+                await confirm_open_trade(db, open_trade, pos_after_open)
             # Bazı borsalarda/latency durumlarında qty güncellenmeyebiliyor → emniyet kemeri
-            await _force_sync_qty(db, open_trade.id, pos_after_open)
+            with timer.stage("force_sync_qty"):
+                await _force_sync_qty(db, open_trade.id, pos_after_open)
             # await db.commit()
             pid = open_trade.public_id
-            await db.commit()
+            with timer.stage("commit"):
+                await db.commit()
+            # Borsa emir yanıtı denetim tablosuna (istek yolunun dışında yazılır)
+            audit_payloads.submit(pid, "open_order", order_result.get("data"))
+            # Pending kalmış olabilir → verifier hemen baksın (hızlı pencere)
+            verifier_wakeup.wake(signal_data.exchange)
             return {
                 "success": True,
                 "message": "The position was opened/increased and synced with the exchange.",
@@ -413,16 +467,17 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
         )
 
         # 1) Kapatılacak open trade’i güvenli seç
-        open_trade = await get_open_trade_for_close(
-            db=db,
-            public_id=signal_data.public_id,
-            symbol=signal_data.symbol,
-            exchange=signal_data.exchange,
-            fund_manager_id=signal_data.fund_manager_id,
-            side=_canon_side(
-                getattr(signal_data, "side", None)
-            ),  # hedge için doğru bacak
-        )
+        with timer.stage("merge_lookup"):
+            open_trade = await get_open_trade_for_close(
+                db=db,
+                public_id=signal_data.public_id,
+                symbol=signal_data.symbol,
+                exchange=signal_data.exchange,
+                fund_manager_id=signal_data.fund_manager_id,
+                side=_canon_side(
+                    getattr(signal_data, "side", None)
+                ),  # hedge için doğru bacak
+            )
         # Hedge: sinyalde side geldiyse yanlış bacak seçildiyse düzelt / ya da hiç bulunamadıysa side ile seç
         try:
             position_mode = getattr(execution.order_handler, "POSITION_MODE", "one_way")
@@ -432,13 +487,14 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
         desired_side = _canon_side(getattr(signal_data, "side", None))
         if position_mode == "hedge" and desired_side:
             if open_trade is None or open_trade.side != desired_side:
-                cand = await find_merge_candidate(
-                    db,
-                    symbol=signal_data.symbol,
-                    exchange=signal_data.exchange,
-                    side=desired_side,
-                    fund_manager_id=signal_data.fund_manager_id,
-                )
+                with timer.stage("merge_lookup"):
+                    cand = await find_merge_candidate(
+                        db,
+                        symbol=signal_data.symbol,
+                        exchange=signal_data.exchange,
+                        side=desired_side,
+                        fund_manager_id=signal_data.fund_manager_id,
+                    )
                 if cand:
                     open_trade = cand
 
@@ -454,9 +510,10 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
 
         # 2) Close emrini gönder (LEVERAGE YOK!)
         coid = f"sai_close_{raw_signal.id}"
-        order_result = await execution.order_handler.place_order(
-            signal_data, client_order_id=coid
-        )
+        with timer.stage("place_order"):
+            order_result = await execution.order_handler.place_order(
+                signal_data, client_order_id=coid
+            )
         if not order_result.get("success"):
             logger.error("[CLOSE] Order failed: %s", order_result)
             await db.rollback()
@@ -467,19 +524,21 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
             }
 
         # 3) Pozisyonu race-safe kontrol et (poll ile)
-        pos_first = await _get_position_for_side(
-            execution, signal_data.symbol, open_trade.side
-        )
+        with timer.stage("position_read"):
+            pos_first = await _get_position_for_side(
+                execution, signal_data.symbol, open_trade.side
+            )
         ref_amt = _amt(pos_first)
-        pos_after = await _poll_position_change(
-            execution, signal_data.symbol, open_trade.side, ref_amt=ref_amt
-        )
+        with timer.stage("position_poll"):
+            pos_after = await _poll_position_change(
+                execution, signal_data.symbol, open_trade.side, ref_amt=ref_amt
+            )
 
         if pos_after and _amt(pos_after) == Decimal("0"):
             # Tam kapanış: kalıcı trade’e taşı
             # ok = await close_open_trade_and_record(db, open_trade, pos_after)
             pid = open_trade.public_id
-            ok = await close_open_trade_and_record(db, open_trade, pos_after)
+            ok = await _record_close(db, open_trade, pos_after, timer)
             if ok:
                 return {
                     "success": True,
@@ -495,10 +554,14 @@ async def handle_signal(signal_data: WebhookSignal, db: AsyncSession) -> dict:
             }
         else:
             # Kısmi kapanış: açık trade'i borsa verisiyle hemen güncelle + emniyet kemeri
-            await confirm_open_trade(db, open_trade, pos_after)
-            await _force_sync_qty(db, open_trade.id, pos_after)
+            with timer.stage("confirm_open_trade"):
+                await confirm_open_trade(db, open_trade, pos_after)
+            with timer.stage("force_sync_qty"):
+                await _force_sync_qty(db, open_trade.id, pos_after)
             pid = open_trade.public_id  # commit'ten ÖNCE oku
-            await db.commit()
+            with timer.stage("commit"):
+                await db.commit()
+            verifier_wakeup.wake(signal_data.exchange)
             asyncio.create_task(
                 _bg_verify_close(
                     execution,
@@ -5,27 +5,33 @@
 import asyncio
 import logging
 import logging.config
+import math
 import os
 import sys
 import time
 import uuid
-import contextvars
 
 from app.utils.exchange_validator import validate_all
 from app.config import settings
 from fastapi import FastAPI, Request
+from sqlalchemy import text
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware import Middleware
 from starlette.types import ASGIApp
-from typing import List
+from typing import Dict, List, Optional
 
+from app import database
 from app.database import async_session
 from app.routers import webhook_router
 from app.utils.exchange_loader import load_execution_module
-from crud.trade import verify_pending_trades_for_execution
+from crud.trade import (
+    archive_open_trades,
+    open_trade_status_counts,
+    verify_pending_trades_for_execution,
+)
 from app.handlers.order_verification_handler import verify_closed_trades_for_execution
 from app.routers import panel
 from app.routers import panel_data
@@ -34,20 +40,27 @@ from app.routers import auth_google
 from app.routers import admin_settings
 from app.routers import admin_referrals
 from app.routers import admin_test
+from app.routers import admin_metrics
+from app.routers import admin_audit
 from app.routers import market
 from app.routers import account
 from app.services.referral_maintenance import cleanup_expired_reserved
+from crud.raw_signal import archive_raw_signals
 from app.services.unrealized_sync import sync_unrealized_for_execution
+from app.services.income_ledger import sync_income_ledger
+from app.services import audit_payloads, income_ledger, verifier_health, verifier_wakeup
+from app.services.verifier_lease import LeaderLease
+from app.utils.request_context import RID_CVAR
 
 if sys.version_info < (3, 9):
     sys.exit(f"This app requires Python 3.9+. Found: {sys.version.split()[0]}")
 
-# Global correlation id (rid) için contextvar
-RID_CVAR: "contextvars.ContextVar[str]" = contextvars.ContextVar("rid", default="-")
-
 # Logger ayarları (dictConfig içinde filter kullanacağız)
 verifier_logger = logging.getLogger("verifier")
 
+# exchange → son income ledger senkron zamanı (monotonic)
+_last_income_sync: Dict[str, float] = {}
+
 
 def _session_middleware_factory(asgi: ASGIApp) -> ASGIApp:
     return SessionMiddleware(asgi, secret_key=settings.SESSION_SECRET, same_site="lax")
@@ -67,6 +80,8 @@ app.include_router(referral.router)
 app.include_router(admin_settings.router)
 app.include_router(admin_referrals.router)
 app.include_router(admin_test.router)
+app.include_router(admin_metrics.router)
+app.include_router(admin_audit.router)
 app.include_router(market.router)
 app.include_router(account.page_router)
 app.include_router(account.router)
@@ -125,6 +140,50 @@ async def health():
     return {"status": "alive", "version": "1.0.0"}
 
 
+async def _db_ping(timeout: float = 2.0) -> Optional[str]:
+    """DB'ye SELECT 1; hata metni ya da None."""
+    try:
+        async with async_session() as s:
+            await asyncio.wait_for(s.execute(text("SELECT 1")), timeout=timeout)
+        return None
+    except Exception as exc:  # noqa: BLE001
+        return f"{type(exc).__name__}: {exc}"[:300]
+
+
+@app.get("/api/health/deep", tags=["Health"])
+async def health_deep():
+    """
+    Verifier görevi + DB + borsa bazında verifier gecikmesi (HEALTH_* eşikleri).
+    status=fail → 503 (load balancer / uptime probe için).
+    """
+    report = verifier_health.evaluate()
+    reasons = []
+    task = getattr(app.state, "verifier_task", None)
+    if task is None or task.done():
+        reasons.append("verifier task not running")
+    db_error = await _db_ping()
+    if db_error:
+        reasons.append(f"database: {db_error}")
+    status = verifier_health.STATUS_FAIL if reasons else report["status"]
+    body = {
+        "status": status,
+        "version": "1.0.0",
+        "reasons": reasons,
+        "verifier": report["exchanges"],
+    }
+    return JSONResponse(
+        body, status_code=503 if status == verifier_health.STATUS_FAIL else 200
+    )
+
+
+@app.get("/api/health/metrics", tags=["Health"], include_in_schema=False)
+async def health_metrics():
+    """Verifier gauge'ları (Prometheus text formatı)."""
+    return PlainTextResponse(
+        verifier_health.prometheus_text(), media_type="text/plain; version=0.0.4"
+    )
+
+
 # Basit Request-ID middleware: her isteğe kısa bir rid üret, log’lara ve header’a yaz
 @app.middleware("http")
 async def request_id_middleware(request: Request, call_next):
@@ -132,11 +191,23 @@ async def request_id_middleware(request: Request, call_next):
     incoming = request.headers.get("X-Request-ID", "").strip()
     rid = incoming if incoming else uuid.uuid4().hex[:8]
     token = RID_CVAR.set(rid)
+    # Bu istekte birincile yazılırsa istemciye read-your-writes çerezi
+    mark = database.WriteMark()
+    mark_token = database.WRITE_MARK_CVAR.set(mark)
     try:
         response = await call_next(request)
         response.headers["X-Request-ID"] = rid
+        if mark.at_ms is not None and database.READ_IS_REPLICA:
+            response.set_cookie(
+                database.RYW_COOKIE,
+                str(mark.at_ms),
+                max_age=max(1, math.ceil(settings.DB_READ_YOUR_WRITES_SECONDS)),
+                httponly=True,
+                samesite="lax",
+            )
         return response
     finally:
+        database.WRITE_MARK_CVAR.reset(mark_token)
         RID_CVAR.reset(token)
 
 
@@ -154,6 +225,24 @@ def _verifier_exchanges() -> List[str]:
     only_default = bool(getattr(settings, "VERIFY_ONLY_DEFAULT", True))
     if only_default and default_ex:
         return [default_ex]
+    return _active_exchanges()
+
+
+def _ledger_only_exchanges(verified: List[str]) -> List[str]:
+    """
+    Verifier'ı koşmayan ama income ledger'ı olan aktif borsalar
+    (ör. VERIFY_ONLY_DEFAULT=True iken DEFAULT_EXCHANGE dışındakiler).
+    Bunların ledger'ı da senkronlanır; yoksa netpnl hiç backfill olmaz.
+    """
+    return [
+        ex
+        for ex in _active_exchanges()
+        if ex not in verified and income_ledger.supports_ledger(ex)
+    ]
+
+
+def _active_exchanges() -> List[str]:
+    default_ex = (getattr(settings, "DEFAULT_EXCHANGE", "") or "").strip()
     # settings.active_exchanges genellikle list[str]; yoksa CSV'yi parse et
     active_list = getattr(settings, "active_exchanges", None)
     if isinstance(active_list, (list, tuple)):
@@ -165,75 +254,321 @@ def _verifier_exchanges() -> List[str]:
     return [default_ex] if default_ex else []
 
 
-async def verifier_iteration(db, exchange_name: str) -> None:
+def _income_sync_due(exchange_name: str) -> bool:
+    now_ts = time.monotonic()
+    last_ts = _last_income_sync.get(exchange_name)
+    if last_ts is not None and now_ts - last_ts < settings.INCOME_SYNC_INTERVAL_SECONDS:
+        return False
+    _last_income_sync[exchange_name] = now_ts
+    return True
+
+
+async def sync_income(exchange_name: str) -> None:
+    """Income ledger: watermark'tan artımlı senkron (throttled, ayrı session)."""
+    if not _income_sync_due(exchange_name):
+        return
+    try:
+        async with async_session() as s:
+            n = await sync_income_ledger(
+                s, exchange_name, max_pages=settings.INCOME_SYNC_MAX_PAGES
+            )
+        if n:
+            verifier_logger.info(f"[income] {exchange_name}: inserted={n}")
+    except Exception as exc:  # noqa: BLE001
+        verifier_health.record_error(exchange_name, "income", exc)
+        verifier_logger.exception("[income] %s: sync error: %s", exchange_name, exc)
+
+
+async def verifier_iteration(db, exchange_name: str) -> bool:
+    """
+    Tek borsa için bir doğrulama turu. Birbirine dokunmayan aşamalar eşzamanlı:
+      • pending → open             (verilen db; yalnızca pending satırlar)
+      • closed → uPnL              (ikisi de open satırlar; sıralı, ayrı session)
+      • income ledger (throttled)  (ayrı tablolar, ayrı session)
+    Dönüş: trade aşamaları (pending/closed) hatasızsa True.
+    """
     try:
-        verifier_logger.info("→ Checking pending trades for %s", exchange_name)
         execution = load_execution_module(exchange_name)
+    except Exception as e:  # noqa: BLE001
+        verifier_health.record_error(exchange_name, "load", e)
+        verifier_logger.error(
+            "Verifier error for %s: %s", exchange_name, e, exc_info=True
+        )
+        return False
 
-        # await verify_pending_trades_for_execution(db, exchange_name, execution)
-        await verify_pending_trades_for_execution(
+    async def _pending() -> None:
+        verifier_logger.info("→ Checking pending trades for %s", exchange_name)
+        n = await verify_pending_trades_for_execution(
             db, execution, exchange_name=exchange_name
         )
-        await verify_closed_trades_for_execution(db, execution, exchange_name)
+        if isinstance(n, int):
+            verifier_wakeup.observe_pending(exchange_name, n)
+
+    async def _closed_then_upnl() -> None:
+        async with async_session() as s:
+            await verify_closed_trades_for_execution(s, execution, exchange_name)
+            # Açık pozisyonların unrealized PnL senkronu (borsa → DB)
+            try:
+                n = await sync_unrealized_for_execution(s, exchange_name)
+                verifier_logger.info(f"[uPnL] {exchange_name}: persisted={n}")
+            except Exception as exc:  # noqa: BLE001
+                verifier_health.record_error(exchange_name, "upnl", exc)
+                verifier_logger.exception(
+                    "[uPnL] %s: sync error: %s", exchange_name, exc
+                )
+
+    results = await asyncio.gather(
+        _pending(),
+        _closed_then_upnl(),
+        sync_income(exchange_name),
+        return_exceptions=True,
+    )
+    ok = True
+    for stage, res in zip(("pending", "closed"), results):
+        if isinstance(res, Exception):
+            ok = False
+            verifier_health.record_error(exchange_name, stage, res)
+            verifier_logger.error(
+                "Verifier error for %s (%s): %s",
+                exchange_name,
+                stage,
+                res,
+                exc_info=res,
+            )
+
+    # Sağlık metrikleri: tur sonundaki pending/open sayıları + en eski pending
+    try:
+        counts = await open_trade_status_counts(db, exchange_name)
+        verifier_health.record_counts(
+            exchange_name,
+            pending=counts["pending"],
+            open_count=counts["open"],
+            oldest_pending_at=counts["oldest_pending_at"],
+        )
+    except Exception as exc:  # noqa: BLE001
+        verifier_health.record_error(exchange_name, "stats", exc)
+        verifier_logger.warning("[health] %s: counts error: %s", exchange_name, exc)
+    return ok
+
+
+class VerifierWorker:
+    """
+    Tek borsanın denetimli verifier döngüsü: kendi session'u, aralığı ve hata
+    bütçesi. Ardışık hata sayısı bütçeyi aşınca aralık üstel olarak
+    VERIFY_MAX_BACKOFF_SECONDS'a kadar büyür; ilk başarılı turda sıfırlanır.
+    Hata yokken aralığı verifier_wakeup belirler (sinyal sonrası hızlı,
+    pending'siz turlarda seyrek); yeni sinyal uykuyu erken bitirir.
+    Yavaş/erişilemeyen bir borsa diğer borsaların doğrulamasını geciktirmez.
+    """
 
-        # Açık pozisyonların unrealized PnL senkronu (borsa → DB)
+    def __init__(
+        self,
+        exchange_name: str,
+        interval: float,
+        error_budget: int,
+        max_backoff: float,
+    ):
+        self.exchange_name = exchange_name
+        self.interval = max(0.0, float(interval))
+        self.error_budget = max(0, int(error_budget))
+        self.max_backoff = max(self.interval, float(max_backoff))
+        self.consecutive_errors = 0
+        self.last_ok_at: Optional[float] = None
+        # Kiranın arka ucu (verifier_loop günceller); uyandırmanın nasıl
+        # ulaştığını belirler: off → süreç içi, auto/db → kira satırı, file → yok
+        self.lease_backend = "off"
+
+    @property
+    def shared_wake(self) -> bool:
+        return self.lease_backend in verifier_wakeup.SHARED_WAKE_BACKENDS
+
+    def next_delay(self) -> float:
+        over = self.consecutive_errors - self.error_budget
+        if over <= 0:
+            # Sinyal sonrası hızlı pencere / pending'siz üstel seyreltme.
+            # file kirasında başka süreçteki sinyal lideri uyandıramaz → seyreltme yok
+            return verifier_wakeup.adaptive_delay(
+                self.exchange_name,
+                self.interval,
+                idle_backoff=self.lease_backend != "file",
+            )
+        return min(self.max_backoff, max(self.interval, 1.0) * 2 ** min(over, 16))
+
+    async def run_once(self) -> bool:
+        # Her tura özel rid: bu turdaki tüm loglar gruplanır
+        token = RID_CVAR.set(f"vf-{uuid.uuid4().hex[:8]}")
+        verifier_health.tick_started(self.exchange_name)
         try:
-            n = await sync_unrealized_for_execution(db, exchange_name)
-            verifier_logger.info(f"[uPnL] {exchange_name}: updated={n}")
+            verifier_logger.info("֍ verifier %s tick start", self.exchange_name)
+            async with async_session() as db:
+                ok = await verifier_iteration(db, self.exchange_name) is not False
         except Exception as exc:  # noqa: BLE001
-            verifier_logger.exception("[uPnL] %s: sync error: %s", exchange_name, exc)
-
-    except Exception as e:  # noqa: BLE001
-        verifier_logger.error(
-            "Verifier error for %s: %s", exchange_name, e, exc_info=True
+            verifier_health.record_error(self.exchange_name, "tick", exc)
+            verifier_logger.exception(
+                "Verifier worker %s tick error: %s", self.exchange_name, exc
+            )
+            ok = False
+        finally:
+            RID_CVAR.reset(token)
+
+        if ok:
+            if self.consecutive_errors > self.error_budget:
+                verifier_logger.info(
+                    "Verifier %s recovered after %d errors",
+                    self.exchange_name,
+                    self.consecutive_errors,
+                )
+            self.consecutive_errors = 0
+            self.last_ok_at = time.monotonic()
+        else:
+            self.consecutive_errors += 1
+            if self.consecutive_errors == self.error_budget + 1:
+                verifier_logger.error(
+                    "Verifier %s exceeded error budget (%d); backing off",
+                    self.exchange_name,
+                    self.error_budget,
+                )
+        verifier_health.tick_finished(
+            self.exchange_name, ok, consecutive_errors=self.consecutive_errors
+        )
+        return ok
+
+    async def run(self) -> None:
+        while True:
+            await self.run_once()
+            # handle_signal → verifier_wakeup.wake() uykuyu erken bitirir
+            # (db kirasında hangi süreçte çağrılırsa çağrılsın)
+            if await verifier_wakeup.wait(
+                self.exchange_name, self.next_delay(), shared=self.shared_wake
+            ):
+                verifier_logger.debug("Verifier %s woken early", self.exchange_name)
+
+
+def _build_verifier_workers(poll_interval: float) -> Dict[str, VerifierWorker]:
+    overrides = settings.verify_interval_overrides
+    return {
+        ex: VerifierWorker(
+            ex,
+            interval=overrides.get(ex, poll_interval),
+            error_budget=settings.VERIFY_ERROR_BUDGET,
+            max_backoff=settings.VERIFY_MAX_BACKOFF_SECONDS,
         )
+        for ex in _verifier_exchanges()
+    }
 
 
 async def verifier_loop(poll_interval: int = 5, cleanup_interval_sec: int = 10 * 60):
+    """
+    Denetleyici: borsa başına kira (LeaderLease) alır/yeniler; lider olduğu
+    borsalar için VerifierWorker görevi başlatır, kirayı kaybedince görevi
+    durdurur, beklenmedik şekilde biten görevi yeniden başlatır ve referral
+    cleanup'ı (ayrı kira ile tek süreçte) yürütür.
+    """
     await asyncio.sleep(3)
     verifier_logger.info("Verifier loop was launched at the startup.")
 
+    workers = _build_verifier_workers(poll_interval)
+    leases = {ex: LeaderLease(verifier_wakeup.lease_name(ex)) for ex in workers}
+    for ex in workers:
+        verifier_health.register(ex)
+    cleanup_lease = LeaderLease("referral_cleanup")
+    tasks: Dict[str, asyncio.Task] = {}
+    # Verifier'sız ledger borsaları: yalnızca income senkronu (kendi kirası)
+    income_leases = {
+        ex: LeaderLease(f"income:{ex}") for ex in _ledger_only_exchanges(list(workers))
+    }
+    income_tasks: Dict[str, asyncio.Task] = {}
     last_cleanup_ts = 0.0
 
-    while True:
-        _token = None  # verifier iteration'a özel RID token'ı
-        try:
-            # Her iterasyona özel bir rid üretelim; bu iterasyondaki tüm loglar gruplanır
-            _token = RID_CVAR.set(f"vf-{uuid.uuid4().hex[:8]}")
-            verifier_logger.info("֍ verifier_loop iteration start")
-
-            # 1) Trade doğrulama — kendi session'unda
-            async with async_session() as db:
-                for exchange_name in _verifier_exchanges():
-                    await verifier_iteration(db, exchange_name)
+    try:
+        while True:
+            # 1) Liderlik + worker denetimi
+            for ex, worker in workers.items():
+                task = tasks.get(ex)
+                leader = await leases[ex].ensure()
+                worker.lease_backend = leases[ex].backend  # auto → file düşebilir
+                verifier_health.set_leader(ex, leader)
+                if not leader:
+                    if task is not None:
+                        verifier_logger.warning(
+                            "Verifier %s: lease lost; stopping worker", ex
+                        )
+                        task.cancel()
+                        del tasks[ex]
+                    continue
+                if task is not None and task.done():
+                    exc = None if task.cancelled() else task.exception()
+                    if exc is not None:
+                        verifier_health.record_error(ex, "worker", exc)
+                    verifier_logger.error(
+                        "Verifier worker %s stopped (%r); restarting", ex, exc
+                    )
+                    task = None
+                if task is None:
+                    tasks[ex] = asyncio.create_task(worker.run(), name=f"verifier-{ex}")
+
+            for ex, lease in income_leases.items():
+                task = income_tasks.get(ex)
+                if task is not None and not task.done():
+                    continue
+                # sync_income kendi aralığıyla (INCOME_SYNC_INTERVAL_SECONDS) kısılır
+                if await lease.ensure():
+                    income_tasks[ex] = asyncio.create_task(
+                        sync_income(ex), name=f"income-{ex}"
+                    )
 
             # 2) Referral expiry cleanup — AYRI session
             now_ts = time.monotonic()
             if now_ts - last_cleanup_ts >= cleanup_interval_sec:
                 try:
-                    async with async_session() as s:
-                        async with s.begin():
-                            n = await cleanup_expired_reserved(s)
-                    if n:
-                        verifier_logger.info(
-                            "Referral expiry cleanup: %s rows cleared", n
-                        )
+                    if await cleanup_lease.ensure():
+                        async with async_session() as s:
+                            async with s.begin():
+                                n = await cleanup_expired_reserved(s)
+                        if n:
+                            verifier_logger.info(
+                                "Referral expiry cleanup: %s rows cleared", n
+                            )
                 except Exception as exc:  # noqa: BLE001
                     verifier_logger.exception("Referral expiry cleanup error: %s", exc)
 
-                last_cleanup_ts = now_ts
+                # 3) kapanmış/başarısız açık işlem satırları → history (aynı kira)
+                try:
+                    if cleanup_lease.is_leader:
+                        async with async_session() as s:
+                            n = await archive_open_trades(s)
+                        if n:
+                            verifier_logger.info("Open trades archived: %s rows", n)
+                except Exception as exc:  # noqa: BLE001
+                    verifier_logger.exception("Open trade archive error: %s", exc)
 
-            await asyncio.sleep(poll_interval)
-        except asyncio.CancelledError:
-            verifier_logger.info("Verifier loop cancelled, shutting down.")
-            break
-        finally:
-            verifier_logger.info("֍ verifier_loop iteration end")
-            if _token is not None:
+                # 4) raw_signals retention → sıkıştırılmış arşiv (aynı kira)
                 try:
-                    RID_CVAR.reset(_token)
-                except Exception:  # noqa: BLE001
-                    pass
+                    if cleanup_lease.is_leader:
+                        async with async_session() as s:
+                            n = await archive_raw_signals(s)
+                        if n:
+                            verifier_logger.info("Raw signals archived: %s rows", n)
+                except Exception as exc:  # noqa: BLE001
+                    verifier_logger.exception("Raw signal archive error: %s", exc)
+
+                last_cleanup_ts = now_ts
+
+            await asyncio.sleep(max(1, poll_interval))
+    except asyncio.CancelledError:
+        verifier_logger.info("Verifier loop cancelled, shutting down.")
+    finally:
+        for task in (*tasks.values(), *income_tasks.values()):
+            task.cancel()
+        await asyncio.gather(
+            *tasks.values(), *income_tasks.values(), return_exceptions=True
+        )
+        # Kiraları bırak: diğer süreç TTL beklemeden devralsın
+        for lease in (*leases.values(), *income_leases.values(), cleanup_lease):
+            try:
+                await lease.release()
+            except Exception as exc:  # noqa: BLE001
+                verifier_logger.warning("Lease release error: %s", exc)
 
     verifier_logger.info("Verifier loop terminated.")
 
@@ -275,6 +610,11 @@ async def lifespan(app_: FastAPI):
             await task
         except asyncio.CancelledError:
             verifier_logger.info("Verifier task cancelled.")
+    # Kuyrukta bekleyen denetim payload'larını yaz
+    try:
+        await audit_payloads.flush()
+    except Exception as exc:  # noqa: BLE001
+        verifier_logger.warning("Audit payload flush error: %s", exc)
 
 
 # Lifespan’ı FastAPI’ye tanıt
@@ -7,21 +7,40 @@ from sqlalchemy import (
     BigInteger,
     Integer,
     String,
+    Date,
     DateTime,
     Numeric,
     Boolean,
     JSON,
+    LargeBinary,
     ForeignKey,
+    Index,
+    UniqueConstraint,
     text,
     func,
     Enum as SaEnum,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 
 
+def canonical_symbol(value):
+    """Semboller tek biçimde saklanır (BTCUSDT); sorgular fonksiyonsuz eşitlik kullanır."""
+    return value.strip().upper() if isinstance(value, str) else value
+
+
+def canonical_status(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
 class RawSignal(Base):
     __tablename__ = "raw_signals"
+    __table_args__ = (
+        # panel /signals: son N sinyal (+sembol) ve retention taraması
+        Index("ix_raw_signals_received_at", "received_at"),
+        Index("ix_raw_signals_symbol_received_at", "symbol", "received_at"),
+        Index("ix_raw_signals_exchange_received_at", "exchange", "received_at"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     payload = Column(JSON, nullable=False)
@@ -29,6 +48,11 @@ class RawSignal(Base):
     received_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # payload'dan insert anında çıkarılan filtre alanları
+    symbol = Column(String(32), nullable=True)
+    mode = Column(String(8), nullable=True)
+    side = Column(String(16), nullable=True)
+    exchange = Column(String(64), nullable=True)
 
     open_trades = relationship(
         "StrategyOpenTrade", back_populates="raw_signal", cascade="all, delete-orphan"
@@ -37,9 +61,49 @@ class RawSignal(Base):
         "StrategyTrade", back_populates="raw_signal", cascade="all, delete-orphan"
     )
 
+    @validates("symbol")
+    def _canon_symbol(self, _key, value):
+        return canonical_symbol(value)
+
+
+class RawSignalArchive(Base):
+    """
+    Retention süresini aşan ve hiçbir işleme bağlı olmayan sinyaller (soğuk).
+    payload zlib ile sıkıştırılmış JSON (crud.raw_signal.archived_payload).
+    """
+
+    __tablename__ = "raw_signals_archive"
+    __table_args__ = (
+        Index("ix_raw_signals_archive_received_at", "received_at"),
+        {"mysql_row_format": "COMPRESSED"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    fund_manager_id = Column(String(64), nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False)
+    symbol = Column(String(32), nullable=True)
+    mode = Column(String(8), nullable=True)
+    side = Column(String(16), nullable=True)
+    exchange = Column(String(64), nullable=True)
+    payload_z = Column(LargeBinary, nullable=False)
+    archived_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
 
 class StrategyOpenTrade(Base):
     __tablename__ = "strategy_open_trades"
+    __table_args__ = (
+        # merge adayı / close lookup / panel: exchange+status(+symbol+side+fm) seek
+        Index(
+            "ix_sot_exchange_status_symbol_side_fm",
+            "exchange",
+            "status",
+            "symbol",
+            "side",
+            "fund_manager_id",
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     public_id = Column(
@@ -66,7 +130,6 @@ class StrategyOpenTrade(Base):
     unrealized_pnl = Column(Numeric(18, 8), default=0, nullable=False)
     exchange = Column(String(64), nullable=False)
     exchange_order_id = Column(String(100), nullable=False, index=True)
-    response_data = Column(JSON, nullable=True)
 
     status = Column(
         String(20), nullable=False, server_default=text("'pending'"), index=True
@@ -77,13 +140,74 @@ class StrategyOpenTrade(Base):
     confirmed_at = Column(DateTime(timezone=True), nullable=True)
 
     raw_signal = relationship("RawSignal", back_populates="open_trades")
+    # DB FK yok: kapanışın açılış satırı sıcak tabloda ya da
+    # strategy_open_trades_history'de olabilir (crud.trade.archive_open_trades)
     trades = relationship(
-        "StrategyTrade", back_populates="open_trade", cascade="all, delete-orphan"
+        "StrategyTrade",
+        primaryjoin="StrategyOpenTrade.public_id == foreign(StrategyTrade.open_trade_public_id)",
+        back_populates="open_trade",
+        cascade="all, delete-orphan",
+    )
+
+    @validates("symbol")
+    def _canon_symbol(self, _key, value):
+        return canonical_symbol(value)
+
+    @validates("status")
+    def _canon_status(self, _key, value):
+        return canonical_status(value)
+
+
+class StrategyOpenTradeHistory(Base):
+    """
+    Soğuk katman: eşiği aşmış 'closed'/'failed' strategy_open_trades satırları,
+    aynı şema ve aynı id/public_id ile (crud.trade.archive_open_trades).
+    Denetim sorguları için iki tabloyu birleştiren görünüm:
+    ``strategy_open_trades_all``.
+    """
+
+    __tablename__ = "strategy_open_trades_history"
+    __table_args__ = (
+        Index("ix_soth_exchange_time", "exchange", "timestamp"),
+        Index("ix_soth_symbol_time", "symbol", "timestamp"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    public_id = Column(String(36), unique=True, nullable=False, index=True)
+    raw_signal_id = Column(
+        BigInteger,
+        ForeignKey("raw_signals.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    fund_manager_id = Column(String(64), nullable=False)
+    symbol = Column(String(32), nullable=False)
+    side = Column(SaEnum("long", "short", name="open_side_enum"), nullable=False)
+    entry_price = Column(Numeric(18, 8), nullable=False)
+    position_size = Column(Numeric(18, 8), nullable=False)
+    leverage = Column(Integer, nullable=False)
+    order_type = Column(String(16), nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    unrealized_pnl = Column(Numeric(18, 8), nullable=False)
+    exchange = Column(String(64), nullable=False)
+    exchange_order_id = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False)
+    exchange_verified = Column(Boolean, nullable=False)
+    verification_attempts = Column(Integer, nullable=False)
+    last_checked_at = Column(DateTime(timezone=True), nullable=True)
+    confirmed_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
 
 class StrategyTrade(Base):
     __tablename__ = "strategy_trades"
+    __table_args__ = (
+        # Panel okumaları: exchange(+symbol) filtresi + timestamp sıralama/aralık
+        Index("ix_st_exchange_symbol_time", "exchange", "symbol", "timestamp"),
+        Index("ix_st_exchange_time", "exchange", "timestamp"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     public_id = Column(
@@ -99,12 +223,10 @@ class StrategyTrade(Base):
         nullable=False,
         index=True,
     )
-    open_trade_public_id = Column(
-        String(36),
-        ForeignKey("strategy_open_trades.public_id", ondelete="CASCADE"),
-        nullable=False,
-        index=True,
-    )
+    # strategy_open_trades ∪ strategy_open_trades_history.public_id
+    # (MySQL'de trg_strategy_trades_bi_open_trade ile denetlenir; açılış
+    # silinince kapanışlar *_bd_closes tetikleyicileri ve crud.trade ile silinir)
+    open_trade_public_id = Column(String(36), nullable=False, index=True)
     fund_manager_id = Column(String(64), nullable=False)
     symbol = Column(String(32), nullable=False)
     side = Column(SaEnum("long", "short", name="trade_side_enum"), nullable=False)
@@ -116,10 +238,67 @@ class StrategyTrade(Base):
     order_type = Column(String(16), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False)
     exchange = Column(String(64), nullable=False)
-    response_data = Column(JSON, nullable=True)
 
     raw_signal = relationship("RawSignal", back_populates="close_trades")
-    open_trade = relationship("StrategyOpenTrade", back_populates="trades")
+    open_trade = relationship(
+        "StrategyOpenTrade",
+        primaryjoin="StrategyOpenTrade.public_id == foreign(StrategyTrade.open_trade_public_id)",
+        back_populates="trades",
+    )
+
+    @validates("symbol")
+    def _canon_symbol(self, _key, value):
+        return canonical_symbol(value)
+
+
+class TradeAuditPayload(Base):
+    """
+    Borsa yanıtları / pozisyon görüntüleri (denetim). Sıcak işlem satırları
+    yerine burada, zlib ile sıkıştırılmış JSON olarak tutulur; istek yolundan
+    sonra yazılır (app.services.audit_payloads) ve yalnızca denetim/admin
+    görünümlerinde okunur. trade_public_id açık ya da kapanış public_id'sidir.
+    """
+
+    __tablename__ = "trade_audit_payloads"
+    __table_args__ = (
+        Index("ix_trade_audit_public_id", "trade_public_id", "id"),
+        {"mysql_row_format": "COMPRESSED"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    trade_public_id = Column(String(36), nullable=False)
+    kind = Column(String(32), nullable=False)
+    payload_z = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class DailyPnl(Base):
+    """
+    Kapanan işlemlerin gün (UTC) bazlı özeti; close ile aynı transaction'da
+    artırılır, ``crud.daily_pnl.rebuild`` ile strategy_trades'ten yeniden kurulur.
+    fees: income ledger COMMISSION + FUNDING_FEE (borsa işaretiyle; fon
+    yöneticisi bilinmediğinden fund_manager_id='' satırında).
+    """
+
+    __tablename__ = "daily_pnl"
+    __table_args__ = (Index("ix_daily_pnl_exchange_day", "exchange", "day"),)
+
+    exchange = Column(String(64), primary_key=True)
+    fund_manager_id = Column(String(64), primary_key=True)
+    symbol = Column(String(32), primary_key=True)
+    day = Column(Date, primary_key=True)
+    realized_pnl = Column(Numeric(18, 8), nullable=False, server_default=text("0"))
+    trade_count = Column(Integer, nullable=False, server_default=text("0"))
+    wins = Column(Integer, nullable=False, server_default=text("0"))
+    fees = Column(Numeric(18, 8), nullable=False, server_default=text("0"))
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
 
 
 class User(Base):
@@ -136,3 +315,77 @@ class User(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class IncomeLedger(Base):
+    """Borsa gelir kalemleri (REALIZED_PNL, COMMISSION, FUNDING_FEE) yerel kopyası."""
+
+    __tablename__ = "income_ledger"
+    __table_args__ = (
+        UniqueConstraint(
+            "exchange",
+            "income_type",
+            "tran_id",
+            "symbol",
+            name="uq_income_ledger_exchange_type_tran_symbol",
+        ),
+        Index(
+            "ix_income_ledger_exchange_symbol_type_time",
+            "exchange",
+            "symbol",
+            "income_type",
+            "event_time",
+        ),
+        Index("ix_income_ledger_exchange_time", "exchange", "event_time"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    exchange = Column(String(64), nullable=False)
+    symbol = Column(String(32), nullable=False, server_default=text("''"))
+    income_type = Column(String(32), nullable=False)
+    amount = Column(Numeric(18, 8), nullable=False)
+    asset = Column(String(16), nullable=False, server_default=text("''"))
+    tran_id = Column(String(64), nullable=False)
+    # Borsa zaman damgası (ms, UTC) — watermark ile aynı birim
+    event_time = Column(BigInteger, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class IncomeSyncState(Base):
+    """Borsa başına income senkron watermark'ı (son işlenen kaydın zamanı, ms)."""
+
+    __tablename__ = "income_sync_state"
+
+    exchange = Column(String(64), primary_key=True)
+    watermark_ms = Column(BigInteger, nullable=False)
+    backfilled_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class VerifierLease(Base):
+    """
+    Süreçler arası lider kirası: ``name`` başına tek ``holder``. Kira süresi
+    (lease_until_ms) dolmuşsa başka süreç koşullu UPDATE ile devralır.
+    ``wake_seq``: herhangi bir süreç sinyal yazınca artırır; lider uykusunda
+    okuyup değişmişse erken uyanır (süreçler arası verifier_wakeup).
+    """
+
+    __tablename__ = "verifier_leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), nullable=False)
+    lease_until_ms = Column(BigInteger, nullable=False)
+    wake_seq = Column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
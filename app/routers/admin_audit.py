@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# app/routers/admin_audit.py
+# Python 3.9
+
+from fastapi import APIRouter, Depends, Path
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies.auth import require_admin_db
+from app.models import StrategyTrade
+from app.services import audit_payloads
+
+router = APIRouter(
+    prefix="/admin/audit",
+    tags=["admin-audit"],
+    # Tüm endpoint'ler admin korumalı
+    dependencies=[Depends(require_admin_db)],
+)
+
+
+@router.get("/trades/{public_id}")
+async def trade_audit(
+    public_id: str = Path(..., min_length=1, max_length=36),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Bir işlemin denetim payload'ları (emir yanıtı, kapanış pozisyon görüntüsü).
+    public_id açılış ya da kapanış olabilir; bağlı açılış/kapanışlar da gelir.
+    """
+    linked = (
+        await db.execute(
+            select(StrategyTrade.public_id, StrategyTrade.open_trade_public_id).where(
+                or_(
+                    StrategyTrade.public_id == public_id,
+                    StrategyTrade.open_trade_public_id == public_id,
+                )
+            )
+        )
+    ).all()
+    ids = {public_id}
+    for close_pid, open_pid in linked:
+        ids.update((close_pid, open_pid))
+    return {
+        "public_id": public_id,
+        "payloads": await audit_payloads.load(db, sorted(ids)),
+    }
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# app/routers/admin_metrics.py
+# Python 3.9
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from app.dependencies.auth import require_admin_db
+from app.services import signal_timing
+
+router = APIRouter(
+    prefix="/admin/metrics",
+    tags=["admin-metrics"],
+    # Tüm endpoint'ler admin korumalı
+    dependencies=[Depends(require_admin_db)],
+)
+
+
+@router.get("/signal-latency")
+async def signal_latency(
+    exchange: Optional[str] = Query(None, description="Borsa filtresi"),
+    mode: Optional[str] = Query(None, description="open | close | counter-reduce"),
+):
+    """Sinyal akışı aşama süreleri (ms): exchange → mode → stage → p50/p90/p99."""
+    return {
+        "window": signal_timing.WINDOW_SIZE,
+        "stages": signal_timing.snapshot(exchange=exchange, mode=mode),
+    }
@@ -6,11 +6,13 @@ from decimal import Decimal
 import asyncio
 import httpx
 import math
-from typing import Dict, Any, Tuple, List, Optional, Literal, Sequence
+from typing import Dict, Any, Tuple, List, Optional, Literal
 from datetime import datetime, timezone, timedelta
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import JSONResponse
 from app.config import settings
 from app.utils.exchange_loader import load_execution_module
+from app.utils import pagination
 import importlib
 import inspect
 
@@ -19,9 +21,18 @@ from pydantic import BaseModel, Field
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import StrategyOpenTrade, StrategyTrade, RawSignal
+from app.database import get_read_db
+from app.models import (
+    StrategyOpenTrade,
+    StrategyOpenTradeHistory,
+    StrategyTrade,
+    RawSignal,
+)
 from app.services.entry_lines_helpers import calculate_entry_lines
+from app.services import income_ledger
+from app.services import chart_markers
+from app.services import risk_metrics, trade_analytics, upnl_engine, upnl_store
+from crud import daily_pnl
 from app.services.quick_balance_helpers import (
     DEFAULT_BALANCE_FALLBACK,
     call_get_unrealized,
@@ -46,6 +57,33 @@ def _f(x):
     return None if x is None else float(x)
 
 
+def _cursor_or_400(cursor: Optional[str]):
+    try:
+        return pagination.parse_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+
+def _set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = cursor
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    # pydantic v1 / jsonable_encoder ile aynı biçim
+    return None if dt is None else dt.isoformat()
+
+
+def _lean(content: Any, next_cursor: Optional[str] = None) -> JSONResponse:
+    """
+    Sıcak okuma yolu: sözlükler response_model şemasıyla birebir üretilir ve
+    doğrudan JSON'a yazılır; FastAPI'nin ikinci (pydantic) doğrulaması atlanır.
+    """
+    response = JSONResponse(content)
+    _set_next_cursor(response, next_cursor)
+    return response
+
+
 TF_TO_SEC = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
 
 
@@ -172,7 +210,7 @@ async def panel_status():
 @router.get("/symbols")
 async def symbols_public(
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     q1 = select(func.distinct(StrategyOpenTrade.symbol)).where(
         StrategyOpenTrade.exchange == exchange
@@ -190,143 +228,46 @@ async def markers_public(
     symbol: Optional[str] = Query(None, description="Tek sembol. Örn: BTCUSDT"),
     tf: str = Query(..., description="Timeframe: 1m,5m,15m,1h,4h,1d"),
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
-    db: AsyncSession = Depends(get_db),
+    since_epoch: Optional[int] = Query(
+        None, ge=0, description="Grafiğin görünür aralığı başı (UTC epoch sn)"
+    ),
+    until_epoch: Optional[int] = Query(
+        None, ge=0, description="Görünür aralık sonu (UTC epoch sn); boş → şimdi"
+    ),
+    limit: int = Query(500, ge=1, le=2000, description="Sayfa başına kapanış"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor değeri"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Borsa onaylı veriden marker üretir:
-    - Hâlâ açık pozisyonlar:
+    Borsa onaylı veriden marker üretir (app.services.chart_markers):
+    - Hâlâ açık pozisyonlar (yalnızca ilk sayfa):
     (strategy_open_trades.status='open') -> OPEN
-    - Kapanmış işlemler:
+    - Kapanmış işlemler, yeniden eskiye ``limit`` kadar:
     (strategy_trades) -> aynı open_trade_public_id için EN SON kapanış + eşleşen açılış -> OPEN+CLOSE
+    since/until verilirse yalnızca görünür aralığa değen işlemler; sonuç yeni
+    kapanışa dek önbellekte. Sonraki sayfa: X-Next-Cursor başlığı → ``cursor``.
     """
-    # --- sembol filtresi (tekil) ---
-    sym_list: Optional[Sequence[str]] = None
-    if symbol:
-        sym_list = [symbol.strip().upper()]
-
-    markers: List[Marker] = []
     bar_sec = TF_TO_SEC.get(tf)
     if not bar_sec:
         raise HTTPException(status_code=400, detail=f"Geçersiz tf: {tf}")
-
-    # === 1) Hâlâ açık pozisyonlar -> OPEN ===
-    q_open = (
-        select(StrategyOpenTrade)
-        .where(func.lower(StrategyOpenTrade.status) == "open")
-        .where(StrategyOpenTrade.exchange == exchange)
-    )
-    if sym_list:
-        q_open = q_open.where(func.upper(StrategyOpenTrade.symbol).in_(sym_list))
-    open_rows = (await db.execute(q_open)).scalars().all()
-
-    for r in open_rows:
-        side = str(getattr(r, "side", "")).lower() if hasattr(r, "side") else ""
-        is_long = side == "long"
-        pos = "belowBar" if is_long else "aboveBar"
-        t = _to_epoch(r.timestamp)
-        tb = t - (t % bar_sec)
-        markers.append(
-            Marker(
-                symbol=str(r.symbol),
-                time=tb,
-                position=pos,
-                text="OPEN LONG" if is_long else "OPEN SHORT",
-                price=_f(getattr(r, "entry_price", None)),
-                id=str(r.public_id),
-                kind="open",
-                side=(
-                    ("long" if is_long else "short")
-                    if side in ("long", "short")
-                    else None
-                ),
-                time_bar=tb,  # her zaman dolu
-                is_live=False,  # canlı muma pin yok
-            )
-        )
-
-    q_tr = select(StrategyTrade).where(StrategyTrade.exchange == exchange)
-    if sym_list:
-        q_tr = q_tr.where(func.upper(StrategyTrade.symbol).in_(sym_list))
-    tr_rows = (await db.execute(q_tr)).scalars().all()
-
-    # aynı open_trade_public_id için EN SON kapanış
-    latest_by_open: Dict[str, StrategyTrade] = {}
-    for t in sorted(tr_rows, key=lambda x: x.timestamp, reverse=True):
-        key = getattr(t, "open_trade_public_id", None)
-        if not key:
-            key = f"__{t.public_id}__"  # eşleşmeyen edge case
-        if key not in latest_by_open:
-            latest_by_open[key] = t
-
-    # karşılık gelen açılış kayıtlarını getir
-    open_ids = [k for k in latest_by_open.keys() if not k.startswith("__")]
-    sot_map: Dict[str, StrategyOpenTrade] = {}
-    if open_ids:
-        q_sot = (
-            select(StrategyOpenTrade)
-            .where(StrategyOpenTrade.public_id.in_(open_ids))
-            .where(StrategyOpenTrade.exchange == exchange)
-        )
-        if sym_list:
-            q_sot = q_sot.where(func.upper(StrategyOpenTrade.symbol).in_(sym_list))
-        for sot in (await db.execute(q_sot)).scalars().all():
-            sot_map[str(sot.public_id)] = sot
-
-    for key, t in latest_by_open.items():
-        # OPEN marker (kapanmış işlem için de OPEN görünür kalsın diye)
-        sot = sot_map.get(key)
-        if sot:
-            side_o = (
-                str(getattr(sot, "side", "")).lower() if hasattr(sot, "side") else ""
-            )
-            is_long_o = side_o == "long"
-            pos = "belowBar" if is_long_o else "aboveBar"
-            t0 = _to_epoch(sot.timestamp)
-            tb0 = t0 - (t0 % bar_sec)
-            markers.append(
-                Marker(
-                    symbol=str(sot.symbol),
-                    time=tb0,
-                    position=pos,
-                    text="OPEN LONG" if is_long_o else "OPEN SHORT",
-                    price=_f(getattr(sot, "entry_price", None)),
-                    id=f"{t.public_id}:open",
-                    kind="open",
-                    side=(
-                        ("long" if is_long_o else "short")
-                        if side_o in ("long", "short")
-                        else None
-                    ),
-                    time_bar=tb0,
-                    is_live=False,
-                )
-            )
-
-        # CLOSE marker
-        side_c = str(getattr(t, "side", "")).lower() if hasattr(t, "side") else ""
-        is_long_c = side_c == "long"
-        tc = _to_epoch(t.timestamp)
-        tbc = tc - (tc % bar_sec)
-        markers.append(
-            Marker(
-                symbol=str(t.symbol),
-                time=tbc,
-                position=("aboveBar" if is_long_c else "belowBar"),
-                text="CLOSE",
-                price=_f(getattr(t, "exit_price", None)),
-                id=str(t.public_id),
-                kind="close",
-                side=(
-                    ("long" if is_long_c else "short")
-                    if side_c in ("long", "short")
-                    else None
-                ),
-                time_bar=tbc,
-            )
+    if since_epoch is not None and until_epoch is not None:
+        if until_epoch < since_epoch:
+            raise HTTPException(status_code=400, detail="until_epoch < since_epoch")
+    try:
+        markers, nxt = await chart_markers.get_markers(
+            db,
+            exchange,
+            symbol,
+            bar_sec,
+            since=since_epoch,
+            until=until_epoch,
+            limit=limit,
+            cursor=cursor,
         )
-    # sırala ve dön
-    markers.sort(key=lambda m: (m.time, 0 if m.kind == "open" else 1, m.symbol, m.id))
-    return markers
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    # chart_markers sözlükleri Marker şemasıyla birebir
+    return _lean(markers, nxt)
 
 
 # @router.get("/open-trades", response_model=List[OpenTradeOut])
@@ -334,68 +275,97 @@ async def markers_public(
 async def open_trades_public(
     symbol: Optional[str] = Query(None, min_length=1, max_length=64),
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    import importlib
-
+    sot = StrategyOpenTrade
+    # Yalnızca OpenTradeOut alanları
     q = (
-        select(StrategyOpenTrade)
-        .where(func.lower(StrategyOpenTrade.status) == "open")
-        .where(StrategyOpenTrade.exchange == exchange)
-        .order_by(StrategyOpenTrade.timestamp.desc())
+        select(
+            sot.public_id,
+            sot.symbol,
+            sot.side,
+            sot.entry_price,
+            sot.position_size,
+            sot.leverage,
+            sot.exchange,
+            sot.order_type,
+            sot.timestamp,
+            sot.exchange_order_id,
+            sot.status,
+        )
+        .where(sot.status == "open")
+        .where(sot.exchange == exchange)
+        .order_by(sot.timestamp.desc())
     )
     if symbol:
         sym = symbol.strip().upper()
-        q = q.where(func.upper(StrategyOpenTrade.symbol) == sym)
-    rows = (await db.execute(q)).scalars().all()
-    out: List[OpenTradeOut] = []
+        q = q.where(sot.symbol == sym)
+    rows = (await db.execute(q)).all()
+
+    # Gösterim biçimlendiricisi borsa başına bir kez çözülür
+    fmt_by_exchange: Dict[str, Any] = {}
+
+    def _formatter(ex: str):
+        if ex not in fmt_by_exchange:
+            fn = None
+            try:
+                utils = importlib.import_module(f"app.exchanges.{ex}.utils")
+                # Tercih sırası: format_quantity_text (gösterim) → adjust_quantity (legacy)
+                fn = getattr(utils, "format_quantity_text", None) or getattr(
+                    utils, "adjust_quantity", None
+                )
+            except (ImportError, AttributeError):
+                fn = None
+            fmt_by_exchange[ex] = fn
+        return fmt_by_exchange[ex]
+
+    items: List[Dict[str, Any]] = []
     for r in rows:
         pos_text: Optional[str] = None
-        try:
-            ex = (r.exchange or settings.DEFAULT_EXCHANGE).strip()
-            utils = importlib.import_module(f"app.exchanges.{ex}.utils")
-            # Tercih sırası: format_quantity_text (gösterim) → adjust_quantity (legacy)
-            fn = getattr(utils, "format_quantity_text", None) or getattr(
-                utils, "adjust_quantity", None
-            )
-            if fn:
+        fn = _formatter((r.exchange or settings.DEFAULT_EXCHANGE).strip())
+        if fn:
+            try:
                 pos_text = (
                     await fn(r.symbol, float(r.position_size))
                     if inspect.iscoroutinefunction(fn)
                     else fn(r.symbol, float(r.position_size))
                 )
-        except (
-            ImportError,
-            AttributeError,
-            ValueError,
-            TypeError,
-            httpx.HTTPError,
-            asyncio.TimeoutError,
-        ):
-            pos_text = None
-
-        out.append(
-            OpenTradeOut(
-                public_id=r.public_id,
-                symbol=r.symbol,
-                side=str(r.side).lower(),
-                entry_price=_f(r.entry_price),
-                position_size=_f(r.position_size),
-                position_size_text=pos_text,
-                leverage=int(r.leverage),
-                exchange=r.exchange,
-                order_type=r.order_type,
-                timestamp=r.timestamp,
-                exchange_order_id=getattr(r, "exchange_order_id", None),
-                status=str(r.status),
-            )
+            except (
+                AttributeError,
+                ValueError,
+                TypeError,
+                httpx.HTTPError,
+                asyncio.TimeoutError,
+            ):
+                pos_text = None
+
+        items.append(
+            {
+                "public_id": r.public_id,
+                "symbol": r.symbol,
+                "side": str(r.side).lower(),
+                "entry_price": _f(r.entry_price),
+                "position_size": _f(r.position_size),
+                "position_size_text": pos_text,
+                "leverage": int(r.leverage),
+                "exchange": r.exchange,
+                "order_type": r.order_type,
+                "timestamp": _iso(r.timestamp),
+                "exchange_order_id": r.exchange_order_id,
+                "status": str(r.status),
+            }
         )
-    # return out
-    # entry_lines_map = calculate_entry_lines(rows, symbol=symbol)
-    # return OpenTradesResponse(items=out, entry_lines=EntryLinesOut(**entry_lines_map))
     # Entry line’ları da (LONG/SHORT ortalama giriş) ekleyelim
     entry_lines_map = calculate_entry_lines(rows, symbol=symbol)
-    return OpenTradesResponse(items=out, entry_lines=EntryLinesOut(**entry_lines_map))
+    return _lean(
+        {
+            "items": items,
+            "entry_lines": {
+                "long": entry_lines_map.get("long"),
+                "short": entry_lines_map.get("short"),
+            },
+        }
+    )
 
 
 @router.get("/recent-trades", response_model=List[TradeOut])
@@ -403,75 +373,112 @@ async def recent_trades_public(
     symbol: Optional[str] = Query(None, min_length=1, max_length=64),
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
     limit: int = Query(200, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor değeri"),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    after = _cursor_or_400(cursor)
+    st = StrategyTrade
+    # Yalnızca TradeOut alanları (+ cursor için id)
     q = (
-        select(StrategyTrade)
-        .where(StrategyTrade.exchange == exchange)
-        .order_by(StrategyTrade.timestamp.desc())
-        .limit(limit)
+        select(
+            st.id,
+            st.public_id,
+            st.symbol,
+            st.side,
+            st.entry_price,
+            st.exit_price,
+            st.position_size,
+            st.leverage,
+            st.realized_pnl,
+            st.exchange,
+            st.order_type,
+            st.timestamp,
+            st.open_trade_public_id,
+        )
+        .where(st.exchange == exchange)
+        .order_by(st.timestamp.desc(), st.id.desc())
+        .limit(limit + 1)
     )
     if symbol:
-        q = q.where(StrategyTrade.symbol == symbol)
-
-    rows = (await db.execute(q)).scalars().all()
-    return [
-        TradeOut(
-            public_id=t.public_id,
-            symbol=t.symbol,
-            side=str(t.side).lower(),
-            entry_price=_f(t.entry_price),
-            exit_price=_f(t.exit_price),
-            position_size=_f(t.position_size),
-            leverage=int(t.leverage),
-            realized_pnl=_f(t.realized_pnl),
-            exchange=t.exchange,
-            order_type=t.order_type,
-            timestamp=t.timestamp,
-            open_trade_public_id=t.open_trade_public_id,
-        )
-        for t in rows
-    ]
+        q = q.where(st.symbol == symbol.strip().upper())
+    if after is not None:
+        q = q.where(pagination.before(st.timestamp, st.id, after))
+
+    rows, nxt = pagination.next_cursor((await db.execute(q)).all(), limit, "timestamp")
+    return _lean(
+        [
+            {
+                "public_id": t.public_id,
+                "symbol": t.symbol,
+                "side": str(t.side).lower(),
+                "entry_price": _f(t.entry_price),
+                "exit_price": _f(t.exit_price),
+                "position_size": _f(t.position_size),
+                "leverage": int(t.leverage),
+                "realized_pnl": _f(t.realized_pnl),
+                "exchange": t.exchange,
+                "order_type": t.order_type,
+                "timestamp": _iso(t.timestamp),
+                "open_trade_public_id": t.open_trade_public_id,
+            }
+            for t in rows
+        ],
+        nxt,
+    )
 
 
 @router.get("/signals", response_model=List[RawSignalLite])
 async def raw_signals_public(
+    response: Response,
     symbol: Optional[str] = None,
+    exchange: Optional[str] = Query(None, description="Boş → tüm borsalar"),
     limit: int = Query(200, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor değeri"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    q = select(RawSignal).order_by(RawSignal.received_at.desc()).limit(limit)
-    rows = (await db.execute(q)).scalars().all()
-
-    out: List[RawSignalLite] = []
-    for r in rows:
-        pl = r.payload or {}
-        sym = (pl.get("symbol") or "").strip()
-        if symbol and sym != symbol:
-            continue
-        out.append(
-            RawSignalLite(
-                id=int(r.id),
-                received_at=r.received_at,
-                symbol=sym or None,
-                side=(pl.get("side") or None),
-                mode=(pl.get("mode") or None),
-            )
+    after = _cursor_or_400(cursor)
+    # Filtre SQL'de (çıkarılmış sütunlar); payload okunmaz
+    q = select(
+        RawSignal.id,
+        RawSignal.received_at,
+        RawSignal.symbol,
+        RawSignal.side,
+        RawSignal.mode,
+    )
+    if symbol:
+        q = q.where(RawSignal.symbol == symbol.strip().upper())
+    if exchange:
+        q = q.where(RawSignal.exchange == exchange)
+    if after is not None:
+        q = q.where(pagination.before(RawSignal.received_at, RawSignal.id, after))
+    q = q.order_by(RawSignal.received_at.desc(), RawSignal.id.desc()).limit(limit + 1)
+    rows, nxt = pagination.next_cursor(
+        (await db.execute(q)).all(), limit, "received_at"
+    )
+    _set_next_cursor(response, nxt)
+    return [
+        RawSignalLite(
+            id=int(r.id),
+            received_at=r.received_at,
+            symbol=r.symbol or None,
+            side=r.side or None,
+            mode=r.mode or None,
         )
-    return out
+        for r in rows
+    ]
 
 
 @router.get("/overview")
 async def overview_public(
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Açık pozisyon sayısı
     open_count = (
         await db.scalar(
             select(func.count())
             .select_from(StrategyOpenTrade)
-            .where(func.lower(StrategyOpenTrade.status) == "open")
+            .where(StrategyOpenTrade.status == "open")
             .where(StrategyOpenTrade.exchange == exchange)
         )
         or 0
@@ -480,40 +487,19 @@ async def overview_public(
     # Son ham sinyal zamanı
     last_sig = await db.scalar(select(func.max(RawSignal.received_at)))
 
-    # 7 gün PnL (kapanan işlemlerden)
-    now = datetime.now(timezone.utc)
-    since_7d = now - timedelta(days=7)
-    pnl_7d = (
-        await db.scalar(
-            select(func.coalesce(func.sum(StrategyTrade.realized_pnl), 0.0))
-            .where(StrategyTrade.timestamp >= since_7d)
-            .where(StrategyTrade.exchange == exchange)
-        )
-        or 0.0
-    )
-
-    # 30 gün winrate
-    since_30d = now - timedelta(days=30)
-    total_30 = (
-        await db.scalar(
-            select(func.count())
-            .select_from(StrategyTrade)
-            .where(StrategyTrade.timestamp >= since_30d)
-            .where(StrategyTrade.exchange == exchange)
-        )
-        or 0
-    )
-    wins_30 = (
-        await db.scalar(
-            select(func.count())
-            .select_from(StrategyTrade)
-            .where(StrategyTrade.timestamp >= since_30d)
-            .where(StrategyTrade.exchange == exchange)
-            .where(StrategyTrade.realized_pnl > 0)
-        )
-        or 0
+    # 7g PnL, 30g winrate ve risk metrikleri: daily_pnl rollup'ı (≤ 30 gün × sembol)
+    today = datetime.now(timezone.utc).date()
+    since_30d = today - timedelta(days=29)
+    series = await daily_pnl.daily_series(db, exchange, since_30d)
+    since_7d = today - timedelta(days=6)
+    pnl_7d = sum(
+        (r["realized_pnl"] for r in series if r["day"] >= since_7d), Decimal(0)
     )
+    total_30 = sum(r["trade_count"] for r in series)
+    wins_30 = sum(r["wins"] for r in series)
     winrate_30d = (wins_30 / total_30 * 100.0) if total_30 else None
+    days_30 = risk_metrics.fill_days(series, since_30d, today)
+    sharpe_30d = risk_metrics.sharpe(days_30) if total_30 else None
 
     if last_sig and last_sig.tzinfo is None:
         last_sig = last_sig.replace(tzinfo=timezone.utc)
@@ -522,14 +508,56 @@ async def overview_public(
         "pnl_7d": float(pnl_7d),
         "winrate_30d": round(winrate_30d, 2) if winrate_30d is not None else None,
         "open_trade_count": int(open_count),
-        "max_dd_30d": None,
-        "sharpe_30d": None,
+        "max_dd_30d": (
+            round(risk_metrics.max_drawdown(days_30), 8) if total_30 else None
+        ),
+        "sharpe_30d": round(sharpe_30d, 4) if sharpe_30d is not None else None,
         "last_signal_at": (
             last_sig.isoformat().replace("+00:00", "Z") if last_sig else None
         ),
     }
 
 
+@router.get("/equity-curve")
+async def equity_curve_public(
+    exchange: str = Query(settings.DEFAULT_EXCHANGE),
+    symbol: Optional[str] = Query(None, min_length=1, max_length=64),
+    days: int = Query(90, ge=1, le=3650),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Gün bazlı realized PnL ve kümülatif equity (daily_pnl rollup'ından)."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    series = await daily_pnl.daily_series(db, exchange, since, symbol=symbol)
+    return {
+        "exchange": exchange,
+        "symbol": symbol.strip().upper() if symbol else None,
+        "since": since.isoformat(),
+        "points": risk_metrics.equity_curve(series),
+    }
+
+
+@router.get("/analytics")
+async def analytics_public(
+    exchange: str = Query(settings.DEFAULT_EXCHANGE),
+    days: int = Query(30, ge=1, le=3650, description="Pencere: son N UTC günü"),
+    symbol: Optional[str] = Query(None, min_length=1, max_length=64),
+    fund_manager_id: Optional[str] = Query(None, min_length=1, max_length=64),
+    balance: Optional[float] = Query(
+        None, description="Güncel cüzdan; verilirse getiriler/drawdown yüzde olarak"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Drawdown, Sharpe/Sortino, win rate, profit factor, ortalama tutma süresi."""
+    return await trade_analytics.get_analytics(
+        db,
+        exchange,
+        days,
+        fund_manager_id=fund_manager_id,
+        symbol=symbol,
+        balance=balance,
+    )
+
+
 # Bakiye (borsa-agnostik) — iş mantığı account.py’de
 @router.get("/balance")
 async def me_balance(
@@ -577,7 +605,7 @@ async def me_quick_balance(
     symbol: str = Query(..., description="örn. BTCUSDT"),
     exchange: str = Query(settings.DEFAULT_EXCHANGE),
     trades_limit: int = Query(1000, ge=1, le=2000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Tek çağrıda Quick Balance kartını doldurmak için gerekli tüm veriler."""
 
@@ -587,7 +615,7 @@ async def me_quick_balance(
     # Açık pozisyonları oku (toplam ve sembol bazlı dağılım)
     q_open = (
         select(StrategyOpenTrade)
-        .where(func.lower(StrategyOpenTrade.status) == "open")
+        .where(StrategyOpenTrade.status == "open")
         .where(StrategyOpenTrade.exchange == exchange)
         .order_by(StrategyOpenTrade.timestamp.desc())
     )
@@ -634,7 +662,7 @@ async def me_quick_balance(
     q_trades = (
         select(StrategyTrade)
         .where(StrategyTrade.exchange == exchange)
-        .where(func.upper(StrategyTrade.symbol) == sym)
+        .where(StrategyTrade.symbol == sym)
         .order_by(StrategyTrade.timestamp.desc())
         .limit(trades_limit)
     )
@@ -655,8 +683,20 @@ async def me_quick_balance(
         net_source = "trades-sum"
 
     # === Unrealized PnL ===
-    # 1) ÖNCE DB (verifier yazıyor) → seçili sembol ve borsa için long/short toplamı
+    # 1) ÖNCE yerel motor (mark fiyatı, imzasız ve önbellekli; her süreçte),
+    #    sonra verifier'ın süreç içi taze değeri (upnl_store; yalnızca lider
+    #    süreçte dolu), yoksa DB (eşik/heartbeat ile yazılır → heartbeat kadar eski)
+    #    → seçili sembol ve borsa için long/short
+    live_upnl = upnl_store.snapshot(exchange)
+    if open_for_symbol and upnl_engine.enabled(exchange):
+        marks = await upnl_engine.get_marks(exchange)
+        if marks:
+            live_upnl.update(upnl_engine.local_upnl(open_for_symbol, marks))
+
     def _dec(x):
+        live = live_upnl.get(getattr(x, "id", None))
+        if live is not None:
+            return live
         return to_decimal(getattr(x, "unrealized_pnl", 0))
 
     long_db = sum(
@@ -973,7 +1013,7 @@ async def me_unrealized(
 #     symbol: Optional[str] = Query(None),
 #     since_days: Optional[int] = Query(None, ge=1, le=3650),
 #     since_epoch: Optional[int] = Query(None, description="Unix saniye"),
-#     db: AsyncSession = Depends(get_db),
+#     db: AsyncSession = Depends(get_read_db),
 # ):
 
 
@@ -984,7 +1024,7 @@ async def me_netpnl(
     since_days: Optional[int] = Query(None, ge=1, le=3650),
     since_epoch: Optional[int] = Query(None, description="Unix saniye"),
     detail: bool = Query(False, description="Komisyon/funding ayrıntılarını da döndür"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
 
     ex = exchange
@@ -1000,20 +1040,26 @@ async def me_netpnl(
     elif since_days is not None:
         since_dt = now - timedelta(days=int(since_days))
     else:
-        # 2) Aksi halde DB'deki İLK işlem zamanını bul (closed ve open tablolarından min)
+        # 2) Aksi halde DB'deki İLK işlem zamanını bul (closed, open ve arşiv
+        #    tablolarından min; income_ledger._backfill_start_ms ile aynı kaynaklar)
         q_closed = select(func.min(StrategyTrade.timestamp)).where(
             StrategyTrade.exchange == ex
         )
         q_opened = select(func.min(StrategyOpenTrade.timestamp)).where(
             StrategyOpenTrade.exchange == ex
         )
+        q_archived = select(func.min(StrategyOpenTradeHistory.timestamp)).where(
+            StrategyOpenTradeHistory.exchange == ex
+        )
         if sym:
-            q_closed = q_closed.where(func.upper(StrategyTrade.symbol) == sym)
-            q_opened = q_opened.where(func.upper(StrategyOpenTrade.symbol) == sym)
+            q_closed = q_closed.where(StrategyTrade.symbol == sym)
+            q_opened = q_opened.where(StrategyOpenTrade.symbol == sym)
+            q_archived = q_archived.where(StrategyOpenTradeHistory.symbol == sym)
 
         t_closed = (await db.execute(q_closed)).scalar()
         t_opened = (await db.execute(q_opened)).scalar()
-        since_dt = min([t for t in (t_closed, t_opened) if t], default=None)
+        t_archived = (await db.execute(q_archived)).scalar()
+        since_dt = min([t for t in (t_closed, t_opened, t_archived) if t], default=None)
 
     # Hiç işlem yoksa 0 dön (fallback)
     if since_dt is None:
@@ -1055,10 +1101,37 @@ async def me_netpnl(
                     normed[key] = 0.0
             return normed
 
+        # 3) Yerel income ledger (verifier senkronlar) → yalnızca indeksli SQL toplamı.
+        #    İlk backfill bitmeden ledger eksiktir → canlı yola düş.
+        state = (
+            await income_ledger.get_sync_state(db, ex)
+            if income_ledger.supports_ledger(ex)
+            else None
+        )
+        if state is not None and state.backfilled_at:
+            since_ms = int(since_dt.timestamp() * 1000)
+            sums = await income_ledger.ledger_totals(
+                db, ex, symbol=sym, since_ms=since_ms
+            )
+            out = {
+                "net": float(sum(sums.values())),
+                "window": {"since": since_dt.isoformat(), "until": now.isoformat()},
+                "exchange": ex,
+                "symbol": sym,
+                "source": "exchange-income",
+                "ledger": {
+                    "watermark_ms": int(state.watermark_ms),
+                    "backfilled": True,
+                },
+            }
+            if detail:
+                out["breakdown"] = _norm_keys(sums)
+            return out
+
         total_val: float = 0.0
         breakdown: Optional[dict] = None
 
-        # 3a) account.income_breakdown / income_summary
+        # 3a) Ledger'sız ya da henüz backfill olmamış: canlı income_breakdown / income_summary
         acc = importlib.import_module(f"app.exchanges.{ex}.account")
         # a1) breakdown varsa onu kullan (detail istenmişse)
         if (
@@ -2,7 +2,7 @@
 # app/routers/webhook_router.py
 # Python 3.9
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import WebhookSignal
@@ -20,12 +20,14 @@ router = APIRouter(prefix="/webhook", tags=["Webhook"])
 
 @router.post("/", status_code=status.HTTP_200_OK)
 async def receive_webhook(
-    signal: WebhookSignal, db: AsyncSession = Depends(get_db)
+    signal: WebhookSignal,
+    db: AsyncSession = Depends(get_db),
+    timings: bool = Query(False, description="Yanıta aşama süre dökümünü ekle"),
 ) -> dict:
     ensure_authorized_fund_manager(signal.fund_manager_id)
     # return await handle_signal(signal, db)
     try:
-        result = await handle_signal(signal, db)
+        result = await handle_signal(signal, db, include_timings=timings)
 
         def _safe(obj):
             # 1) SQLAlchemy ORM instance? (I/O tetiklemeden)
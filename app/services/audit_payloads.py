@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# app/services/audit_payloads.py
+# Python 3.9
+
+"""
+İşlem denetim payload'ları (borsa emir yanıtı, kapanış pozisyon görüntüsü).
+
+Sıcak strategy_* satırlarında JSON tutulmaz; ``submit`` payload'ı süreç içi
+kuyruğa bırakır ve hemen döner. Tek bir yazıcı görev kuyruğu kendi
+session'ıyla boşaltır: sıkıştırma (zlib) ve INSERT istek/commit yolunun
+dışında, partiler halinde yapılır. Kuyruk sınırlıdır (AUDIT_QUEUE_MAX);
+dolarsa en eski payload düşer. Kayıt best-effort'tur: süreç çökerse
+kuyrukta bekleyenler kaybolur, işlem satırları etkilenmez.
+Okuma yalnızca denetim/admin görünümlerinde: ``load``.
+"""
+
+import asyncio
+import json
+import logging
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models import TradeAuditPayload
+
+logger = logging.getLogger(__name__)
+
+# Tek INSERT'te yazılacak en fazla payload
+_BATCH = 200
+
+# (trade_public_id, kind, payload, created_at)
+_QUEUE: Deque[Tuple[str, str, Any, datetime]] = deque(
+    maxlen=max(1, settings.AUDIT_QUEUE_MAX)
+)
+_TASK: Optional["asyncio.Task[None]"] = None
+
+
+def pack(payload: Any) -> bytes:
+    raw = json.dumps(jsonable_encoder(payload), separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def unpack(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def submit(trade_public_id: Optional[str], kind: str, payload: Any) -> None:
+    """Payload'ı yazıcı kuyruğuna bırakır (bloklamaz). Boş payload yazılmaz."""
+    global _TASK
+    if not trade_public_id or not payload:
+        return
+    if len(_QUEUE) == _QUEUE.maxlen:
+        logger.warning("[audit] queue full; dropping oldest payload")
+    _QUEUE.append((str(trade_public_id), kind, payload, datetime.utcnow()))
+    if _TASK is None or _TASK.done():
+        try:
+            _TASK = asyncio.get_running_loop().create_task(
+                _writer(), name="audit-payload-writer"
+            )
+        except RuntimeError:
+            # Döngü yok (senkron çağrı): bir sonraki submit/flush yazar
+            _TASK = None
+
+
+async def _write(rows: Sequence[Tuple[str, str, Any, datetime]]) -> None:
+    async with async_session() as s:
+        await s.execute(
+            insert(TradeAuditPayload),
+            [
+                {
+                    "trade_public_id": pid,
+                    "kind": kind,
+                    "payload_z": pack(payload),
+                    "created_at": at,
+                }
+                for pid, kind, payload, at in rows
+            ],
+        )
+        await s.commit()
+
+
+async def _writer() -> None:
+    while _QUEUE:
+        batch = [_QUEUE.popleft() for _ in range(min(_BATCH, len(_QUEUE)))]
+        try:
+            await _write(batch)
+        except Exception as exc:  # noqa: BLE001 — denetim kaydı işlemi bozmamalı
+            logger.exception(
+                "[audit] %d payloads could not be written: %s", len(batch), exc
+            )
+
+
+async def flush() -> None:
+    """Kuyruktakileri yaz ve bekle (kapanışta / testlerde)."""
+    global _TASK
+    task = _TASK
+    if task is not None and not task.done():
+        await task
+    if _QUEUE:
+        _TASK = None
+        await _writer()
+
+
+def pending() -> int:
+    return len(_QUEUE)
+
+
+async def load(
+    db: AsyncSession, trade_public_ids: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """Verilen public_id'lerin payload'ları (yazılış sırasıyla, açılmış)."""
+    if not trade_public_ids:
+        return []
+    rows = (
+        await db.execute(
+            select(
+                TradeAuditPayload.trade_public_id,
+                TradeAuditPayload.kind,
+                TradeAuditPayload.created_at,
+                TradeAuditPayload.payload_z,
+            )
+            .where(TradeAuditPayload.trade_public_id.in_(list(trade_public_ids)))
+            .order_by(TradeAuditPayload.id)
+        )
+    ).all()
+    return [
+        {
+            "trade_public_id": r.trade_public_id,
+            "kind": r.kind,
+            "created_at": r.created_at,
+            "payload": unpack(r.payload_z),
+        }
+        for r in rows
+    ]
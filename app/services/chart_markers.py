@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# app/services/chart_markers.py
+# Python 3.9
+
+"""
+Grafik marker'ları (/api/me/markers) — görünür zaman aralığıyla sınırlı,
+SQL tarafında hesaplanır ve sürüm anahtarıyla önbelleklenir.
+
+• Kapanışlar: open_trade_public_id başına EN SON kapanış (daha yeni kapanışı
+  olanlar NOT EXISTS ile elenir) ve eşleşen açılış tek sorguda (LEFT JOIN;
+  arşivlenmiş açılışlar strategy_open_trades_history'den);
+  yalnızca gereken sütunlar okunur, IN listesi yok.
+• Aralık: kapanışı ``since``'ten sonra ve açılışı ``until``'den önce olan
+  işlemler (grafikte bir ucu görünenler); uçlar bar sınırına yuvarlanır,
+  küçük kaydırmalar aynı önbellek girdisine düşer.
+• Önbellek: (exchange, symbol, bar, aralık, limit, cursor) → marker'lar.
+  Girdi, sürüm anahtarı (en büyük kapanış id'si + borsanın açık pozisyon
+  sayısı/en büyük id'si) değişene dek geçerlidir; anahtar iki indeksli
+  küçük sorgudur, işlem geçmişinin boyutundan bağımsızdır.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade
+from app.utils import pagination
+
+# Aynı anda tutulacak (aralık × sembol × tf) girdisi (LRU)
+_CACHE_MAX = 256
+
+_CACHE: "OrderedDict[Tuple, Tuple[Tuple, List[Dict[str, Any]], Optional[str]]]" = (
+    OrderedDict()
+)
+
+
+def _epoch(dt: Optional[datetime]) -> int:
+    if not dt:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _naive(epoch: int) -> datetime:
+    # DATETIME sütunları naive UTC tutar
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _f(x):
+    return None if x is None else float(x)
+
+
+def _side(value) -> Optional[str]:
+    side = str(value or "").lower()
+    return side if side in ("long", "short") else None
+
+
+def _open_marker(symbol, side, ts, price, marker_id, bar_sec) -> Dict[str, Any]:
+    side = _side(side)
+    t = _epoch(ts)
+    tb = t - (t % bar_sec)
+    return {
+        "symbol": str(symbol),
+        "time": tb,
+        "position": "belowBar" if side == "long" else "aboveBar",
+        "text": "OPEN LONG" if side == "long" else "OPEN SHORT",
+        "price": _f(price),
+        "id": marker_id,
+        "kind": "open",
+        "side": side,
+        "time_bar": tb,  # her zaman dolu
+        "is_live": False,  # canlı muma pin yok
+    }
+
+
+async def version(db: AsyncSession, exchange: str) -> Tuple:
+    """Borsanın marker sürümü: yeni kapanış ya da açık pozisyon değişince değişir."""
+    # Borsanın max(id)'si: geriye tarihli kapanışı da görür; InnoDB ikincil
+    # indeksi PK'yi taşıdığından (exchange, timestamp) indeksinden yanıtlanır
+    last_close = await db.scalar(
+        select(func.max(StrategyTrade.id)).where(StrategyTrade.exchange == exchange)
+    )
+    open_count, open_max = (
+        await db.execute(
+            select(func.count(), func.max(StrategyOpenTrade.id))
+            .where(StrategyOpenTrade.exchange == exchange)
+            .where(StrategyOpenTrade.status == "open")
+        )
+    ).one()
+    return last_close, int(open_count or 0), open_max
+
+
+async def compute(
+    db: AsyncSession,
+    exchange: str,
+    symbol: Optional[str],
+    bar_sec: int,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = 500,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """(marker'lar, sonraki cursor) — önbelleksiz."""
+    markers: List[Dict[str, Any]] = []
+
+    # === 1) Hâlâ açık pozisyonlar -> OPEN (yalnızca ilk sayfa) ===
+    if after is None:
+        q_open = (
+            select(
+                StrategyOpenTrade.public_id,
+                StrategyOpenTrade.symbol,
+                StrategyOpenTrade.side,
+                StrategyOpenTrade.entry_price,
+                StrategyOpenTrade.timestamp,
+            )
+            .where(StrategyOpenTrade.exchange == exchange)
+            .where(StrategyOpenTrade.status == "open")
+        )
+        if symbol:
+            q_open = q_open.where(StrategyOpenTrade.symbol == symbol)
+        if until is not None:
+            q_open = q_open.where(StrategyOpenTrade.timestamp <= _naive(until))
+        for r in (await db.execute(q_open)).all():
+            markers.append(
+                _open_marker(
+                    r.symbol,
+                    r.side,
+                    r.timestamp,
+                    r.entry_price,
+                    str(r.public_id),
+                    bar_sec,
+                )
+            )
+
+    # === 2) open_trade_public_id başına en son kapanış + açılışı (tek sorgu) ===
+    later = aliased(StrategyTrade)
+    st, sot, hist = StrategyTrade, StrategyOpenTrade, StrategyOpenTradeHistory
+    opened_at = func.coalesce(sot.timestamp, hist.timestamp)
+    q_tr = (
+        select(
+            st.id,
+            st.public_id,
+            st.symbol,
+            st.side,
+            st.exit_price,
+            st.timestamp,
+            # açılış satırı sıcak tabloda ya da (arşivlenmişse) history'de
+            func.coalesce(sot.symbol, hist.symbol).label("open_symbol"),
+            func.coalesce(sot.side, hist.side).label("open_side"),
+            func.coalesce(sot.entry_price, hist.entry_price).label("entry_price"),
+            opened_at.label("opened_at"),
+        )
+        .outerjoin(sot, sot.public_id == st.open_trade_public_id)
+        .outerjoin(hist, hist.public_id == st.open_trade_public_id)
+        .where(st.exchange == exchange)
+        .where(
+            ~exists().where(
+                later.open_trade_public_id == st.open_trade_public_id,
+                or_(
+                    later.timestamp > st.timestamp,
+                    and_(later.timestamp == st.timestamp, later.id > st.id),
+                ),
+            )
+        )
+        .order_by(st.timestamp.desc(), st.id.desc())
+        .limit(limit + 1)
+    )
+    if symbol:
+        q_tr = q_tr.where(st.symbol == symbol)
+    if since is not None:
+        q_tr = q_tr.where(st.timestamp >= _naive(since))
+    if until is not None:
+        q_tr = q_tr.where(func.coalesce(opened_at, st.timestamp) <= _naive(until))
+    if after is not None:
+        q_tr = q_tr.where(pagination.before(st.timestamp, st.id, after))
+    rows, nxt = pagination.next_cursor(
+        (await db.execute(q_tr)).all(), limit, "timestamp"
+    )
+
+    for t in rows:
+        # OPEN marker (kapanmış işlem için de OPEN görünür kalsın diye)
+        if t.opened_at is not None:
+            markers.append(
+                _open_marker(
+                    t.open_symbol,
+                    t.open_side,
+                    t.opened_at,
+                    t.entry_price,
+                    f"{t.public_id}:open",
+                    bar_sec,
+                )
+            )
+        # CLOSE marker
+        side_c = _side(t.side)
+        tc = _epoch(t.timestamp)
+        tbc = tc - (tc % bar_sec)
+        markers.append(
+            {
+                "symbol": str(t.symbol),
+                "time": tbc,
+                "position": "aboveBar" if side_c == "long" else "belowBar",
+                "text": "CLOSE",
+                "price": _f(t.exit_price),
+                "id": str(t.public_id),
+                "kind": "close",
+                "side": side_c,
+                "time_bar": tbc,
+                "is_live": None,  # Marker şemasıyla birebir (yanıt doğrulanmaz)
+            }
+        )
+    # sırala ve dön
+    markers.sort(
+        key=lambda m: (m["time"], 0 if m["kind"] == "open" else 1, m["symbol"], m["id"])
+    )
+    return markers, nxt
+
+
+async def get_markers(
+    db: AsyncSession,
+    exchange: str,
+    symbol: Optional[str],
+    bar_sec: int,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = 500,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Önbellekli ``compute``. ``cursor`` geçersizse ValueError.
+    Aralık uçları bar sınırına genişletilir (since ↓, until ↑).
+    """
+    after = pagination.parse_cursor(cursor)
+    symbol = symbol.strip().upper() if symbol else None
+    if since is not None:
+        since -= since % bar_sec
+    if until is not None:
+        until += -until % bar_sec
+    key = (exchange, symbol, bar_sec, since, until, limit, cursor)
+    ver = await version(db, exchange)
+    hit = _CACHE.get(key)
+    if hit is not None and hit[0] == ver:
+        _CACHE.move_to_end(key)
+        return hit[1], hit[2]
+    markers, nxt = await compute(
+        db, exchange, symbol, bar_sec, since, until, limit, after
+    )
+    _CACHE[key] = (ver, markers, nxt)
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > _CACHE_MAX:
+        _CACHE.popitem(last=False)
+    return markers, nxt
+
+
+def reset() -> None:
+    """Önbelleği temizle (testler)."""
+    _CACHE.clear()
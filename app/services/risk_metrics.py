@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# app/services/risk_metrics.py
+# Python 3.9
+
+"""
+Günlük realized PnL serisinden equity eğrisi ve risk metrikleri.
+
+Girdi daily_pnl rollup'ından gelen gün bazlı toplamlardır (birkaç yüz satır);
+sermaye tabanı bilinmediğinden metrikler USDT cinsinden PnL üzerindendir.
+"""
+
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+
+def fill_days(series: Sequence[Dict], start: date, end: date) -> List[float]:
+    """[start, end] aralığındaki her gün için PnL; işlem olmayan gün 0."""
+    by_day = {row["day"]: float(row["realized_pnl"]) for row in series}
+    n = (end - start).days + 1
+    return [by_day.get(start + timedelta(days=i), 0.0) for i in range(max(0, n))]
+
+
+def equity_curve(series: Sequence[Dict]) -> List[Dict]:
+    """[{day, pnl, equity}] — equity kümülatif realized PnL."""
+    total = Decimal("0")
+    out = []
+    for row in series:
+        total += row["realized_pnl"]
+        out.append(
+            {
+                "day": row["day"].isoformat(),
+                "pnl": float(row["realized_pnl"]),
+                "equity": float(total),
+            }
+        )
+    return out
+
+
+def max_drawdown(daily_pnl: Sequence[float]) -> float:
+    """Kümülatif PnL'in tepe noktasından en büyük düşüşü (USDT, ≥ 0)."""
+    peak = equity = worst = 0.0
+    for pnl in daily_pnl:
+        equity += pnl
+        peak = max(peak, equity)
+        worst = max(worst, peak - equity)
+    return worst
+
+
+def sharpe(daily_pnl: Sequence[float], periods_per_year: int = 365) -> Optional[float]:
+    """Yıllıklandırılmış ortalama/sapma oranı; < 2 gün ya da sapma 0 → None."""
+    n = len(daily_pnl)
+    if n < 2:
+        return None
+    mean = sum(daily_pnl) / n
+    var = sum((x - mean) ** 2 for x in daily_pnl) / (n - 1)
+    if var <= 0:
+        return None
+    return mean / math.sqrt(var) * math.sqrt(periods_per_year)
+
+
+def sortino(daily_pnl: Sequence[float], periods_per_year: int = 365) -> Optional[float]:
+    """Ortalama / aşağı yönlü sapma (hedef 0), yıllıklandırılmış; kayıp gün yoksa None."""
+    n = len(daily_pnl)
+    if n < 2:
+        return None
+    downside = sum(x * x for x in daily_pnl if x < 0) / n
+    if downside <= 0:
+        return None
+    return sum(daily_pnl) / n / math.sqrt(downside) * math.sqrt(periods_per_year)
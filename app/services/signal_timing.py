@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# app/services/signal_timing.py
+# Python 3.9
+
+"""Signal pipeline stage timing.
+
+Her webhook sinyali için ``SignalTimer`` aşama sürelerini (ms) toplar ve
+isteğin ``rid`` değeriyle etiketler. Sinyal bitince süreler (exchange, mode,
+stage) anahtarlı kayan pencerelere yazılır; admin uç noktası bu pencerelerden
+p50/p90/p99 özetini okur. Reddedilen/hata ile biten sinyaller ayrı
+``<stage>:error`` anahtarlarına yazılır; hızlı 4xx retleri başarılı
+sinyallerin yüzdeliklerini aşağı çekmez.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.request_context import RID_CVAR
+
+logger = logging.getLogger(__name__)
+
+# Anahtar başına tutulan son örnek sayısı (kayan pencere)
+WINDOW_SIZE = 512
+PERCENTILES = (50, 90, 99)
+TOTAL_STAGE = "total"
+ERROR_SUFFIX = ":error"
+
+# (exchange, mode, stage) → son WINDOW_SIZE süre (ms)
+_SAMPLES: Dict[Tuple[str, str, str], Deque[float]] = {}
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    """Nearest-rank yüzdelik; liste sıralı gelmeli."""
+    if not sorted_vals:
+        return 0.0
+    rank = int(math.ceil(pct / 100.0 * len(sorted_vals))) - 1
+    return sorted_vals[max(0, min(rank, len(sorted_vals) - 1))]
+
+
+def record(exchange: str, mode: str, stage: str, ms: float) -> None:
+    key = (exchange or "-", mode or "-", stage)
+    window = _SAMPLES.get(key)
+    if window is None:
+        window = _SAMPLES[key] = deque(maxlen=WINDOW_SIZE)
+    window.append(float(ms))
+
+
+def snapshot(exchange: Optional[str] = None, mode: Optional[str] = None) -> dict:
+    """
+    {exchange: {mode: {stage: {count, p50, p90, p99, max}}}} döndürür.
+    exchange/mode verilirse yalnızca o kırılım.
+    """
+    out: Dict[str, Dict[str, Dict[str, dict]]] = {}
+    for (ex, md, stage), window in sorted(_SAMPLES.items()):
+        if exchange and ex != exchange:
+            continue
+        if mode and md != mode:
+            continue
+        vals = sorted(window)
+        if not vals:
+            continue
+        stats = {"count": len(vals), "max": round(vals[-1], 3)}
+        for p in PERCENTILES:
+            stats[f"p{p}"] = round(_percentile(vals, p), 3)
+        out.setdefault(ex, {}).setdefault(md, {})[stage] = stats
+    return out
+
+
+def reset() -> None:
+    """Testlerde kullanışlı."""
+    _SAMPLES.clear()
+
+
+class SignalTimer:
+    """
+    Tek bir sinyalin aşama süreleri.
+    Kullanım:
+        timer = SignalTimer(exchange, "open")
+        with timer.stage("place_order"):
+            await ...
+        timer.finish()                 # başarılı
+        timer.finish(ok=False)         # reddedildi / hata → "<stage>:error"
+    """
+
+    def __init__(self, exchange: str, mode: str):
+        self.exchange = exchange
+        self.mode = mode
+        self.rid = RID_CVAR.get()
+        self.stages: List[Tuple[str, float]] = []
+        self._t0 = time.perf_counter()
+        self._total_ms: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - t) * 1000.0))
+
+    def finish(self, ok: bool = True) -> None:
+        """Toplam süreyi sabitler ve kayan pencerelere bir kez yazar."""
+        if self._total_ms is not None:
+            return
+        self._total_ms = (time.perf_counter() - self._t0) * 1000.0
+        suffix = "" if ok else ERROR_SUFFIX
+        # Aynı aşama bir sinyalde birden çok kez koşabilir (ör. merge lookup) → topla
+        per_stage: Dict[str, float] = {}
+        for name, ms in self.stages:
+            per_stage[name] = per_stage.get(name, 0.0) + ms
+        for name, ms in per_stage.items():
+            record(self.exchange, self.mode, name + suffix, ms)
+        record(self.exchange, self.mode, TOTAL_STAGE + suffix, self._total_ms)
+        logger.info(
+            "[timing] rid=%s %s/%s%s total=%.1fms %s",
+            self.rid,
+            self.exchange,
+            self.mode,
+            suffix,
+            self._total_ms,
+            " ".join(f"{n}={ms:.1f}" for n, ms in self.stages),
+        )
+
+    def breakdown(self) -> dict:
+        """Webhook yanıtına eklenebilecek sinyal-bazlı döküm."""
+        total = self._total_ms
+        if total is None:
+            total = (time.perf_counter() - self._t0) * 1000.0
+        return {
+            "rid": self.rid,
+            "exchange": self.exchange,
+            "mode": self.mode,
+            "total_ms": round(total, 3),
+            "stages": [{"stage": n, "ms": round(ms, 3)} for n, ms in self.stages],
+        }
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# app/services/trade_analytics.py
+# Python 3.9
+
+"""
+Kapanmış işlemlerden sunucu tarafı performans analitiği.
+
+(exchange, fund_manager_id, symbol) başına realized PnL serisi bir kez
+yüklenip kompakt ``array('d')`` sütunlarında (kapanış zamanı, PnL, tutma
+süresi) bellekte tutulur. Önbellek anahtarı o filtredeki son işlem id'si
+ve satır sayısıdır: yeni kapanış gelince yalnızca yeni satırlar eklenir,
+silme/geriye dönük kayıtta seri baştan yüklenir.
+
+Pencere (son N UTC günü) dilimi ikili arama ile bulunur; equity, tepe,
+drawdown ve kazanç/kayıp toplamları ``accumulate``/``map``/``filter``
+üzerinden tek geçişlerde hesaplanır (numpy bağımlılığı yok).
+``balance`` verilirse (güncel cüzdan) başlangıç sermayesi
+``balance − pencere net PnL`` kabul edilir ve getiriler/drawdown yüzde
+olarak da döner; yoksa metrikler USDT cinsindendir.
+"""
+
+import math
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from operator import sub
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade
+from app.services import risk_metrics
+
+_DAY_S = 86_400
+# Aynı anda bellekte tutulacak seri sayısı (LRU)
+_CACHE_MAX = 64
+_NAN = float("nan")
+
+
+def _epoch(dt: Optional[datetime]) -> float:
+    if dt is None:
+        return _NAN
+    if dt.tzinfo is None:
+        # DB naive UTC döndürebilir (SQLite/MySQL DATETIME)
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class TradeSeries:
+    """Zamana göre sıralı kapanışlar; sütunlar paralel ``array('d')``."""
+
+    __slots__ = ("ts", "pnl", "hold", "latest_id", "count", "results")
+
+    def __init__(self):
+        self.ts = array("d")
+        self.pnl = array("d")
+        # Tutma süresi (sn); açılış satırı yoksa NaN
+        self.hold = array("d")
+        self.latest_id = 0
+        self.count = 0
+        self.results: Dict[Tuple, dict] = {}
+
+    def extend(self, rows) -> bool:
+        """(id, kapanış, pnl, açılış) satırlarını ekler; sıra bozulursa False."""
+        for tid, closed_at, pnl, opened_at in rows:
+            t = _epoch(closed_at)
+            if self.ts and t < self.ts[-1]:
+                return False
+            self.ts.append(t)
+            self.pnl.append(float(pnl or 0))
+            self.hold.append(t - _epoch(opened_at))
+            self.latest_id = max(self.latest_id, int(tid))
+            self.count += 1
+        return True
+
+
+# (exchange, fund_manager_id, symbol) → TradeSeries
+_SERIES: "OrderedDict[Tuple[str, str, str], TradeSeries]" = OrderedDict()
+
+
+def _filtered(q, exchange: str, fund_manager_id: Optional[str], symbol: Optional[str]):
+    q = q.where(StrategyTrade.exchange == exchange)
+    if symbol:
+        q = q.where(StrategyTrade.symbol == symbol)
+    if fund_manager_id:
+        q = q.where(StrategyTrade.fund_manager_id == fund_manager_id)
+    return q
+
+
+async def load_series(
+    db: AsyncSession,
+    exchange: str,
+    fund_manager_id: Optional[str] = None,
+    symbol: Optional[str] = None,
+) -> TradeSeries:
+    """Önbellekteki seriyi son işlem id'si/sayısıyla doğrular, gerekirse tazeler."""
+    symbol = symbol.strip().upper() if symbol else None
+    key = (exchange, fund_manager_id or "", symbol or "")
+    latest_id, count = (
+        await db.execute(
+            _filtered(
+                select(func.max(StrategyTrade.id), func.count()),
+                exchange,
+                fund_manager_id,
+                symbol,
+            )
+        )
+    ).one()
+    latest_id, count = int(latest_id or 0), int(count or 0)
+
+    series = _SERIES.get(key)
+    if series is not None:
+        _SERIES.move_to_end(key)
+        if (series.latest_id, series.count) == (latest_id, count):
+            return series
+
+    # Açılış satırı sıcak tabloda ya da (arşivlenmişse) history'de
+    hist = StrategyOpenTradeHistory
+    rows_q = _filtered(
+        select(
+            StrategyTrade.id,
+            StrategyTrade.timestamp,
+            StrategyTrade.realized_pnl,
+            func.coalesce(StrategyOpenTrade.timestamp, hist.timestamp),
+        )
+        .outerjoin(
+            StrategyOpenTrade,
+            StrategyOpenTrade.public_id == StrategyTrade.open_trade_public_id,
+        )
+        .outerjoin(hist, hist.public_id == StrategyTrade.open_trade_public_id),
+        exchange,
+        fund_manager_id,
+        symbol,
+    ).order_by(StrategyTrade.timestamp, StrategyTrade.id)
+
+    if series is not None and latest_id > series.latest_id:
+        # Yalnızca yeni kapanışlar; sayılar tutmazsa ya da sıra bozulursa tam yükleme
+        fresh = TradeSeries()
+        fresh.ts, fresh.pnl, fresh.hold = (
+            array("d", series.ts),
+            array("d", series.pnl),
+            array("d", series.hold),
+        )
+        fresh.latest_id, fresh.count = series.latest_id, series.count
+        new_rows = (
+            await db.execute(rows_q.where(StrategyTrade.id > series.latest_id))
+        ).all()
+        if fresh.extend(new_rows) and (fresh.latest_id, fresh.count) == (
+            latest_id,
+            count,
+        ):
+            _SERIES[key] = fresh
+            return fresh
+
+    series = TradeSeries()
+    series.extend((await db.execute(rows_q)).all())
+    _SERIES[key] = series
+    _SERIES.move_to_end(key)
+    while len(_SERIES) > _CACHE_MAX:
+        _SERIES.popitem(last=False)
+    return series
+
+
+def _drawdown(equity: List[float]) -> Tuple[float, Optional[float]]:
+    """(en büyük mutlak düşüş, tepeye göre oran) — tepe ≤ 0 iken oran None."""
+    if not equity:
+        return 0.0, None
+    peaks = list(accumulate(equity, max))
+    dd = list(map(sub, peaks, equity))
+    worst = max(dd)
+    if peaks[0] <= 0:
+        return worst, None
+    return worst, max(map(float.__truediv__, dd, peaks))
+
+
+def analyze(
+    series: TradeSeries,
+    since: date,
+    balance: Optional[float] = None,
+) -> dict:
+    """``since`` (UTC gün başı) sonrası kapanışlar için metrikler."""
+    since_ts = datetime(since.year, since.month, since.day, tzinfo=timezone.utc)
+    i0 = bisect_left(series.ts, since_ts.timestamp())
+    ts, pnl, hold = series.ts[i0:], series.pnl[i0:], series.hold[i0:]
+    n = len(pnl)
+
+    net = math.fsum(pnl)
+    gross_profit = math.fsum(filter((0.0).__lt__, pnl))
+    gross_loss = math.fsum(filter((0.0).__gt__, pnl))
+    wins = sum(map((0.0).__lt__, pnl))
+    start = (float(balance) - net) if balance is not None else 0.0
+
+    # Trade bazlı equity → drawdown
+    equity = list(accumulate(pnl, initial=start))
+    dd_abs, dd_pct = _drawdown(equity)
+    if balance is None:
+        dd_pct = None
+
+    # Gün bazlı seri (işlemsiz gün 0) → Sharpe/Sortino
+    day0 = int(since_ts.timestamp()) // _DAY_S
+    today = int(time.time()) // _DAY_S
+    n_days = max(today - day0 + 1, (int(ts[-1]) // _DAY_S - day0 + 1) if n else 1)
+    day_pnl = [0.0] * n_days
+    for t, p in zip(ts, pnl):
+        day_pnl[int(t) // _DAY_S - day0] += p
+    if balance is not None and start > 0:
+        day_eq = list(accumulate(day_pnl, initial=start))
+        returns = [p / e if e > 0 else 0.0 for p, e in zip(day_pnl, day_eq)]
+    else:
+        returns = day_pnl
+    sharpe = risk_metrics.sharpe(returns) if n else None
+    sortino = risk_metrics.sortino(returns) if n else None
+
+    holds = [h for h in hold if h == h]
+    points = []
+    run = start
+    for i, p in enumerate(day_pnl):
+        if p or i == n_days - 1:
+            run += p
+            points.append(
+                {
+                    "day": (since + timedelta(days=i)).isoformat(),
+                    "pnl": round(p, 8),
+                    "equity": round(run, 8),
+                }
+            )
+
+    def _r(v: Optional[float], nd: int = 8) -> Optional[float]:
+        return None if v is None else round(v, nd)
+
+    return {
+        "trades": n,
+        "net_pnl": _r(net),
+        "gross_profit": _r(gross_profit),
+        "gross_loss": _r(gross_loss),
+        "win_rate": _r(wins / n * 100.0, 2) if n else None,
+        "profit_factor": _r(gross_profit / -gross_loss, 4) if gross_loss else None,
+        "max_drawdown": _r(dd_abs),
+        "max_drawdown_pct": _r(dd_pct * 100.0, 4) if dd_pct is not None else None,
+        "sharpe": _r(sharpe, 4),
+        "sortino": _r(sortino, 4),
+        "avg_holding_seconds": (
+            _r(math.fsum(holds) / len(holds), 1) if holds else None
+        ),
+        "start_capital": _r(start) if balance is not None else None,
+        "points": points,
+    }
+
+
+async def get_analytics(
+    db: AsyncSession,
+    exchange: str,
+    days: int,
+    fund_manager_id: Optional[str] = None,
+    symbol: Optional[str] = None,
+    balance: Optional[float] = None,
+) -> dict:
+    """Son ``days`` UTC günü için metrikler; sonuç son işlem id'sine göre önbellekli."""
+    series = await load_series(db, exchange, fund_manager_id, symbol)
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    rkey = (since, days, balance)
+    out = series.results.get(rkey)
+    if out is None:
+        out = analyze(series, since, balance)
+        if len(series.results) >= 32:
+            series.results.clear()
+        series.results[rkey] = out
+    return {
+        "exchange": exchange,
+        "fund_manager_id": fund_manager_id,
+        "symbol": symbol.strip().upper() if symbol else None,
+        "days": days,
+        "since": since.isoformat(),
+        "latest_trade_id": series.latest_id or None,
+        **out,
+    }
+
+
+def reset() -> None:
+    """Önbelleği temizle (testler)."""
+    _SERIES.clear()
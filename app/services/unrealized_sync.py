@@ -5,59 +5,140 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from decimal import Decimal, InvalidOperation
-from typing import Any
+from decimal import Decimal
+from typing import Any, Optional
 
 import asyncio
 import httpx
 import logging
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import StrategyOpenTrade
+from app.services import upnl_engine, upnl_store
 from app.utils.exchange_loader import load_execution_module
 from importlib import import_module
 
 logger = logging.getLogger("verifier")
 
 
-def _to_dec(x: Any) -> Decimal:
-    """Gelen değeri güvenli şekilde Decimal'e çevir."""
-    try:
-        return Decimal(str(x))
-    except (InvalidOperation, ValueError, TypeError):
-        return Decimal("0")
+def _index_snapshots(
+    snaps: Any,
+    sym_total: dict[str, Decimal],
+    leg_index: dict[str, dict[str, Decimal]],
+) -> None:
+    """Snapshot listesini sembol toplamı ve (sembol, position_side) indeksine ekler."""
+    zero = Decimal("0")
+    for snap in snaps:
+        sym, pside, val = snap.symbol, snap.position_side, snap.unrealized
+        sym_total[sym] = sym_total.get(sym, zero) + val
+        legs = leg_index.setdefault(sym, {})
+        legs[pside] = legs.get(pside, zero) + val
+
+
+async def _fetch_missing_legs(
+    account: Any,
+    symbols: list[str],
+    sym_total: dict[str, Decimal],
+    leg_index: dict[str, dict[str, Decimal]],
+) -> set[str]:
+    """Bulk'ta olmayan semboller için eşzamanlı çağrı; başarısız semboller döner."""
+    results = await asyncio.gather(
+        *(account.get_position_snapshots(sym) for sym in symbols),
+        return_exceptions=True,
+    )
+    failed: set[str] = set()
+    for sym, res in zip(symbols, results):
+        if isinstance(
+            res, (httpx.HTTPError, asyncio.TimeoutError, ValueError, TypeError)
+        ):
+            logger.warning("[uPnL diag] per-symbol legs failed (%s): %s", sym, res)
+            failed.add(sym)
+            continue
+        if isinstance(res, BaseException):
+            raise res
+        logger.info("[uPnL diag] legs for %s → %d", sym, len(res))
+        _index_snapshots(res, sym_total, leg_index)
+        leg_index.setdefault(sym, {})
+    return failed
 
 
-def _desc(obj: Any) -> str:
-    """Kısa tanım: list/dict uzun metin yazmadan loglamak için."""
-    t = type(obj).__name__
-    if isinstance(obj, list):
-        return f"{t} len={len(obj)}"
-    if isinstance(obj, dict):
-        keys = list(obj.keys())[:5]
-        return f"{t} keys={keys}"
-    return t
+def _hedge_leg_value(leg_map: dict[str, Decimal], side: Any) -> Decimal:
+    new_val = (
+        leg_map.get("LONG") if (side or "").lower() == "long" else leg_map.get("SHORT")
+    )
+    if new_val is None:
+        # bazı adapter'lar hedge'de 'BOTH' döndürebilir; onu da kabul et
+        both = leg_map.get("BOTH")
+        if both is None:
+            # hiçbir bacak yoksa toplam yaz (son çare)
+            new_val = sum(leg_map.values(), Decimal("0"))
+        else:
+            new_val = both
+    return new_val
 
 
 async def sync_unrealized_for_execution(db: AsyncSession, exchange_name: str) -> int:
     """
-    Borsadan (exchange adapter) AÇIK işlemlerin unrealized PnL'ini alır
-    ve strategy_open_trades.unrealized_pnl alanını günceller.
-    Kaynak: app.exchanges.<exchange>.account.get_unrealized (borsa verisi).
-    Dönüş: güncellenen satır sayısı.
+    AÇIK işlemlerin unrealized PnL'ini günceller, süreç içi upnl_store'a yazar;
+    strategy_open_trades.unrealized_pnl yalnızca eşik/heartbeat
+    (upnl_store.should_persist) tutunca güncellenir.
+    Kaynak: upnl_engine (mark fiyatıyla yerel hesap, imzasız tek çağrı); her
+    UPNL_RECONCILE_SECONDS'ta bir ya da yerel hesap yapılamazsa borsa
+    (account.get_position_snapshots) — o turda yerel/borsa farkı loglanır.
+    Dönüş: DB'ye yazılan satır sayısı.
     """
     # 'open' durumu: ENUM/kolasyon tuhaflıklarına takılmamak için küçük bir IN filtresi
-    q = select(StrategyOpenTrade).where(
+    # ORM nesnesi yerine yalnızca gereken kolonlar (tick başına tek SELECT)
+    q = select(
+        StrategyOpenTrade.id,
+        StrategyOpenTrade.symbol,
+        StrategyOpenTrade.side,
+        StrategyOpenTrade.entry_price,
+        StrategyOpenTrade.position_size,
+        StrategyOpenTrade.unrealized_pnl,
+        StrategyOpenTrade.last_checked_at,
+    ).where(
         StrategyOpenTrade.status.in_(("open", "Open", "OPEN")),
         StrategyOpenTrade.exchange == exchange_name,
     )
-    result = await db.scalars(q)
-    rows: list[StrategyOpenTrade] = list(result)
+    rows = list((await db.execute(q)).all())
     logger.debug("[uPnL diag] exchange=%s | open_rows=%d", exchange_name, len(rows))
+    upnl_store.retain(exchange_name, (r.id for r in rows))
     if not rows:
         return 0
 
+    # 1) Yerel motor: tüm satırların mark'ı varsa ve mutabakat zamanı değilse yeter
+    local_vals: Optional[dict[int, Decimal]] = None
+    if upnl_engine.enabled(exchange_name):
+        marks = await upnl_engine.get_marks(exchange_name)
+        if marks is not None:
+            local_vals = upnl_engine.local_upnl(rows, marks)
+            if len(local_vals) == len(rows) and not upnl_engine.reconcile_due(
+                exchange_name
+            ):
+                return await _store_and_persist(
+                    db, exchange_name, rows, local_vals, "local"
+                )
+
+    # 2) Borsa değeri (mutabakat turu / yerel hesap yetersiz)
+    values = await _exchange_values(exchange_name, rows)
+    if values is None:
+        if local_vals:
+            return await _store_and_persist(
+                db, exchange_name, rows, local_vals, "local"
+            )
+        return 0
+    upnl_engine.mark_reconciled(exchange_name)
+    if local_vals:
+        upnl_engine.report_drift(exchange_name, local_vals, values)
+    return await _store_and_persist(db, exchange_name, rows, values, "exchange")
+
+
+async def _exchange_values(
+    exchange_name: str, rows: list[Any]
+) -> Optional[dict[int, Decimal]]:
+    """Borsa snapshot'larından {row.id: uPnL}; veri alınamazsa None."""
     execution = load_execution_module(exchange_name)
 
     # __init__.py export etmeyen modüller için: doğrudan submodule'den 'account' çöz
@@ -69,175 +150,108 @@ async def sync_unrealized_for_execution(db: AsyncSession, exchange_name: str) ->
         except (ModuleNotFoundError, ImportError, AttributeError) as e:
             logger.debug("[uPnL diag] account submodule resolve failed: %s", e)
             account = None
-    has_fun = bool(account) and hasattr(account, "get_unrealized")
+    has_fun = bool(account) and hasattr(account, "get_position_snapshots")
     logger.debug(
-        "[uPnL diag] account=%s | has_get_unrealized=%s | pos_mode=%s",
+        "[uPnL diag] account=%s | has_get_position_snapshots=%s | pos_mode=%s",
         type(account).__name__ if account else None,
         has_fun,
         getattr(getattr(execution, "order_handler", None), "POSITION_MODE", None),
     )
     if not has_fun:
-        return 0
+        return None
 
-    # Toplu veri: {"positions":[...]} veya doğrudan liste [...]
+    # Toplu veri: tüm açık bacaklar (adapter sınırında PositionSnapshot'a ayrıştırılmış)
+    # sym_total: sembol → toplam; leg_index: sembol → {position_side → toplam}
     sym_total: dict[str, Decimal] = {}
+    leg_index: dict[str, dict[str, Decimal]] = {}
+    bulk_ok = True
     try:
-        all_res = await account.get_unrealized(symbol=None, return_all=True)
-        logger.debug(
-            "[uPnL diag] bulk=%s", _desc(all_res) if all_res is not None else "None"
+        _index_snapshots(
+            await account.get_position_snapshots(None), sym_total, leg_index
         )
-
-        if isinstance(all_res, list):
-            for it in all_res:
-                if not isinstance(it, dict):
-                    continue
-                sym = str(
-                    it.get("symbol") or it.get("s") or it.get("symbolName") or ""
-                ).upper()
-                if not sym:
-                    continue
-                # Binance/adapter'ların çoğunda 'unRealizedProfit' var; normalize edilmişlerde 'unrealized' olabilir
-                val = (
-                    it.get("unRealizedProfit")
-                    or it.get("unrealized")
-                    or it.get("pnl")
-                    or it.get("pnlValue")
-                    or 0
-                )
-                sym_total[sym] = sym_total.get(sym, Decimal("0")) + _to_dec(val)
-        elif isinstance(all_res, dict) and isinstance(all_res.get("positions"), list):
-            for it in all_res["positions"]:
-                if not isinstance(it, dict):
-                    continue
-                sym = str(it.get("symbol") or "").upper()
-                if not sym:
-                    continue
-                val = (
-                    it.get("unRealizedProfit")
-                    or it.get("unrealized")
-                    or it.get("pnl")
-                    or 0
-                )
-                sym_total[sym] = sym_total.get(sym, Decimal("0")) + _to_dec(val)
     except (httpx.HTTPError, asyncio.TimeoutError, ValueError, TypeError) as e:
-        logger.warning("[uPnL diag] bulk get_unrealized failed: %s", e)
-        pass
+        bulk_ok = False
+        logger.warning("[uPnL diag] bulk get_position_snapshots failed: %s", e)
 
     pos_mode = getattr(
         getattr(execution, "order_handler", None), "POSITION_MODE", "one_way"
     )
-    updated = 0  # değeri gerçekten değişen satır sayısı
-    touched = (
-        0  # borsadan veri çekilip satıra yazılan (last_checked_at dahil) satır sayısı
-    )
-    now = datetime.now(timezone.utc)
+    hedge = str(pos_mode).lower() == "hedge"
+    if not bulk_ok and not hedge:
+        # Veri yokken tüm satırları 0'a çekme; depo/DB son değerde kalsın
+        return None
+
+    failed_syms: set[str] = set()
+    if hedge:
+        # Bulk'ta olmayan semboller: tekilleştirilmiş, eşzamanlı sembol bazlı çağrı
+        missing = sorted({str(r.symbol).upper() for r in rows} - set(leg_index))
+        if missing:
+            failed_syms = await _fetch_missing_legs(
+                account, missing, sym_total, leg_index
+            )
 
+    values: dict[int, Decimal] = {}
     for r in rows:
         sym = str(r.symbol).upper()
-
-        if str(pos_mode).lower() == "hedge":
-            # Bacak bazında çıktı: liste veya {"positions":[...]} olabilir → normalize et
-            try:
-                legs_raw = await account.get_unrealized(symbol=sym, return_all=True)
-                logger.info("[uPnL diag] legs for %s → %s", sym, _desc(legs_raw))
-            except (httpx.HTTPError, asyncio.TimeoutError, ValueError, TypeError) as e:
-                logger.warning("[uPnL diag] per-symbol legs failed (%s): %s", sym, e)
+        if hedge:
+            if sym in failed_syms:
                 continue
+            values[r.id] = _hedge_leg_value(leg_index.get(sym, {}), r.side)
+        else:
+            # one_way: toplam tek satır; bulk'ta yoksa pozisyon borsada kapalı → 0
+            values[r.id] = sym_total.get(sym, Decimal("0"))
+    logger.debug(
+        "[uPnL diag] %s bulk_syms=%s", exchange_name, ",".join(sorted(sym_total)[:5])
+    )
+    return values
 
-            if isinstance(legs_raw, dict) and isinstance(
-                legs_raw.get("positions"), list
-            ):
-                legs = legs_raw["positions"]
-            elif isinstance(legs_raw, list):
-                legs = legs_raw
-            elif isinstance(legs_raw, dict) and (
-                "LONG" in legs_raw or "SHORT" in legs_raw or "BOTH" in legs_raw
-            ):
-                # nadir: {"LONG": n, "SHORT": m} gibi
-                legs = [
-                    {"positionSide": k, "unRealizedProfit": v}
-                    for k, v in legs_raw.items()
-                ]
-            else:
-                continue
 
-            leg_map = {
-                str(it.get("positionSide") or "").upper(): _to_dec(
-                    it.get("unRealizedProfit", 0)
-                )
-                for it in legs
-                if isinstance(it, dict)
-            }
-
-            new_val = (
-                leg_map.get("LONG")
-                if (r.side or "").lower() == "long"
-                else leg_map.get("SHORT")
-            )
-            if new_val is None:
-                # bazı adapter'lar hedge'de 'BOTH' döndürebilir; onu da kabul et
-                both = leg_map.get("BOTH")
-                if both is None:
-                    # hiçbir bacak yoksa toplam yaz (son çare)
-                    new_val = sum(leg_map.values(), Decimal("0"))
-                else:
-                    new_val = both
-        else:
-            # one_way: toplam tek satır
-            if sym not in sym_total:
-                try:
-                    one = await account.get_unrealized(symbol=sym, return_all=True)
-                    logger.warning("[uPnL diag] one for %s → %s", sym, _desc(one))
-                except (
-                    httpx.HTTPError,
-                    asyncio.TimeoutError,
-                    ValueError,
-                    TypeError,
-                ) as e:
-                    logger.exception(
-                        "[uPnL diag] per-symbol one failed (%s): %s", sym, e
-                    )
-                    continue
-
-                if isinstance(one, list):
-                    tot = sum(
-                        _to_dec(it.get("unRealizedProfit", 0))
-                        for it in one
-                        if isinstance(it, dict)
-                    )
-                elif isinstance(one, dict):
-                    tot = _to_dec(one.get("unrealized", 0))
-                else:
-                    tot = Decimal("0")
-                sym_total[sym] = tot
-            new_val = sym_total.get(sym, Decimal("0"))
-
-        prev = r.unrealized_pnl
-        try:
-            r.unrealized_pnl = _to_dec(new_val)
-            r.last_checked_at = now
-            touched += 1
-        except (InvalidOperation, TypeError, ValueError):
+async def _store_and_persist(
+    db: AsyncSession,
+    exchange_name: str,
+    rows: list[Any],
+    values: dict[int, Decimal],
+    source: str,
+) -> int:
+    """Değerleri depoya yazar; eşiği aşanları tek toplu UPDATE ile kalıcılaştırır."""
+    updated = 0  # değeri gerçekten değişen satır sayısı
+    now = datetime.now(timezone.utc)
+    params: list[dict[str, Any]] = []
+
+    for r in rows:
+        new_val = values.get(r.id)
+        if new_val is None:
             continue
+        upnl_store.put(exchange_name, r.id, new_val)
 
-        if prev != r.unrealized_pnl:
+        prev = None if r.unrealized_pnl is None else Decimal(str(r.unrealized_pnl))
+        if prev != new_val:
             updated += 1
+        if upnl_store.should_persist(prev, new_val, r.last_checked_at, now):
+            params.append(
+                {"id": r.id, "unrealized_pnl": new_val, "last_checked_at": now}
+            )
 
-    if touched:
-        await db.flush()
-        await db.commit()
+    if params:
+        # Yalnızca eşiği aşan satırlar: tek PK bazlı toplu UPDATE + tek commit
+        try:
+            await db.execute(update(StrategyOpenTrade), params)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
-    # Bilgi logu (her tur): kaç satır var, kaçına dokunduk, kaçı değişti; sembol eşleşmesi için kısa liste
+    # Bilgi logu (her tur): kaç satır var, kaçına dokunduk, kaçı değişti, kaçı
+    # DB'ye yazıldı; sembol eşleşmesi için kısa liste
     db_syms = sorted({str(r.symbol).upper() for r in rows})
-    bulk_syms = sorted(sym_total.keys())
     logger.info(
-        "[uPnL] %s → open=%d | touched=%d | updated=%d | bulk_syms=%d | db=%s | bulk=%s",
+        "[uPnL] %s (%s) → open=%d | touched=%d | updated=%d | persisted=%d | db=%s",
         exchange_name,
+        source,
         len(rows),
-        touched,
+        len(values),
         updated,
-        len(bulk_syms),
+        len(params),
         ",".join(db_syms[:5]) or "-",
-        ",".join(bulk_syms[:5]) or "-",
     )
-    return updated
+    return len(params)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# app/services/upnl_engine.py
+# Python 3.9
+
+"""
+Yerel (mark fiyatı tabanlı) unrealized PnL motoru.
+
+Açık satırların entry_price / position_size / side alanları zaten DB'de;
+uPnL = (mark − entry) × size × yön (long +1, short −1). Mark fiyatları
+adapter'ın ``utils.get_mark_prices`` fonksiyonundan (tüm semboller tek
+imzasız çağrı, kısa TTL önbellek) gelir. Hesap tüm satırlar için tek
+geçişte yapılır; imzalı hesap çağrısı gerekmez.
+
+Borsanın kendi değeriyle mutabakat daha seyrek (UPNL_RECONCILE_SECONDS):
+o turda verifier borsa snapshot'larını okur, yerel değerle farkı
+``report_drift`` ile loglar ve borsa değerini esas alır.
+"""
+
+import logging
+import time
+from decimal import Decimal
+from importlib import import_module
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional
+
+from app.config import settings
+
+logger = logging.getLogger("verifier")
+
+_ZERO = Decimal("0")
+
+# exchange → son borsa mutabakatı (monotonic)
+_last_reconcile: Dict[str, float] = {}
+
+
+def _mark_loader(
+    exchange: str,
+) -> Optional[Callable[[], Awaitable[Dict[str, Decimal]]]]:
+    try:
+        utils = import_module(f"app.exchanges.{exchange}.utils")
+    except ImportError:
+        return None
+    fn = getattr(utils, "get_mark_prices", None)
+    return fn if callable(fn) else None
+
+
+def enabled(exchange: str) -> bool:
+    """UPNL_ENGINE=local ve adapter mark fiyatı sağlıyorsa True."""
+    if str(settings.UPNL_ENGINE or "").lower() != "local":
+        return False
+    try:
+        return _mark_loader(exchange) is not None
+    except RuntimeError:
+        # Anahtarsız adapter import'u (mainnet/mexc) → motor yok
+        return False
+
+
+async def get_marks(exchange: str) -> Optional[Dict[str, Decimal]]:
+    """{SYMBOL: mark}; adapter desteklemiyorsa ya da çağrı başarısızsa None."""
+    try:
+        loader = _mark_loader(exchange)
+    except RuntimeError:
+        return None
+    if loader is None:
+        return None
+    try:
+        return await loader()
+    except Exception as exc:  # noqa: BLE001 — ağ/parse hatası: borsa yoluna düş
+        logger.warning("[uPnL engine] %s: mark prices unavailable: %s", exchange, exc)
+        return None
+
+
+def _num(v: Any) -> Decimal:
+    return v if isinstance(v, Decimal) else Decimal(str(v or 0))
+
+
+def local_upnl(rows: Iterable[Any], marks: Mapping[str, Decimal]) -> Dict[int, Decimal]:
+    """
+    {row.id: uPnL} — satırlar tek geçişte; mark'ı olmayan sembol atlanır.
+    Satır: id, symbol, side, entry_price, position_size alanları olan herhangi nesne.
+    """
+    out: Dict[int, Decimal] = {}
+    for r in rows:
+        mark = marks.get(str(r.symbol or "").upper())
+        if mark is None:
+            continue
+        sign = -1 if str(r.side or "").lower() == "short" else 1
+        out[int(r.id)] = (mark - _num(r.entry_price)) * _num(r.position_size) * sign
+    return out
+
+
+def reconcile_due(exchange: str) -> bool:
+    last = _last_reconcile.get(exchange)
+    return last is None or (
+        time.monotonic() - last >= float(settings.UPNL_RECONCILE_SECONDS)
+    )
+
+
+def mark_reconciled(exchange: str) -> None:
+    _last_reconcile[exchange] = time.monotonic()
+
+
+def report_drift(
+    exchange: str, local: Mapping[int, Decimal], remote: Mapping[int, Decimal]
+) -> Decimal:
+    """Yerel ve borsa değerleri arasındaki en büyük mutlak farkı loglar/döndürür."""
+    worst = _ZERO
+    worst_id: Optional[int] = None
+    for tid, val in remote.items():
+        if tid not in local:
+            continue
+        d = abs(local[tid] - val)
+        if d > worst:
+            worst, worst_id = d, tid
+    if worst >= Decimal(str(settings.UPNL_DRIFT_WARN_ABS)) and worst > 0:
+        logger.warning(
+            "[uPnL engine] %s: drift %s on trade %s (local vs exchange)",
+            exchange,
+            worst,
+            worst_id,
+        )
+    else:
+        logger.debug("[uPnL engine] %s: max drift %s", exchange, worst)
+    return worst
+
+
+def reset() -> None:
+    """Mutabakat zamanlarını temizle (testler)."""
+    _last_reconcile.clear()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# app/services/upnl_store.py
+# Python 3.9
+
+"""
+Açık işlemlerin canlı unrealized PnL'i için süreç içi depo.
+
+Verifier her turda borsadan okuduğu değeri buraya yazar; panel uçları taze
+(UPNL_STORE_MAX_AGE_SECONDS) değeri doğrudan buradan okur. DB'deki
+strategy_open_trades.unrealized_pnl yalnızca ``should_persist`` eşiği
+aşılınca ya da heartbeat dolunca güncellenir.
+
+Çok süreçli dağıtımda depo yalnızca verifier kirasını tutan süreçte dolar.
+Diğer süreçlerde tazelik kaynağı yerel motordur (upnl_engine; mark fiyatı
+her süreçte önbellekli okunur): quick-balance önce onu kullanır. Motor yoksa
+(UPNL_ENGINE=exchange ya da adapter mark fiyatı vermiyor, ör. MEXC) lider
+olmayan süreçler DB değerine düşer; bu değer en fazla UPNL_HEARTBEAT_SECONDS
+(ya da eşik kadar) eskidir. open-trades uPnL döndürmez, depoyu okumaz.
+"""
+
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from app.config import settings
+
+
+class _Entry(NamedTuple):
+    value: Decimal
+    at: float  # time.time()
+
+
+# exchange → {open_trade_id: _Entry}
+_STORE: Dict[str, Dict[int, _Entry]] = {}
+
+
+def put(exchange: str, trade_id: int, value: Decimal, at: Optional[float] = None):
+    _STORE.setdefault(exchange, {})[int(trade_id)] = _Entry(
+        value, time.time() if at is None else at
+    )
+
+
+def retain(exchange: str, trade_ids: Iterable[int]) -> None:
+    """Artık açık olmayan işlemlerin kayıtlarını at."""
+    keep = {int(i) for i in trade_ids}
+    bucket = _STORE.get(exchange)
+    if bucket:
+        for tid in [t for t in bucket if t not in keep]:
+            del bucket[tid]
+
+
+def snapshot(exchange: str, max_age: Optional[float] = None) -> Dict[int, Decimal]:
+    """{trade_id: uPnL} — yalnızca ``max_age`` saniyeden taze kayıtlar."""
+    if max_age is None:
+        max_age = float(settings.UPNL_STORE_MAX_AGE_SECONDS)
+    cutoff = time.time() - max_age
+    return {
+        tid: e.value for tid, e in _STORE.get(exchange, {}).items() if e.at >= cutoff
+    }
+
+
+def should_persist(
+    prev: Optional[Decimal],
+    new: Decimal,
+    last_written: Optional[datetime],
+    now: datetime,
+) -> bool:
+    """
+    DB'ye yazmalı mı? Değer mutlak (UPNL_PERSIST_ABS) ya da göreli
+    (UPNL_PERSIST_REL, |prev| oranı) eşiği aştıysa veya son yazımdan beri
+    UPNL_HEARTBEAT_SECONDS geçtiyse True. Eşik 0 → o kriter kapalı.
+    """
+    if prev is None or last_written is None:
+        return True
+    if last_written.tzinfo is None:
+        last_written = last_written.replace(tzinfo=timezone.utc)
+    if (now - last_written).total_seconds() >= settings.UPNL_HEARTBEAT_SECONDS:
+        return True
+    delta = abs(new - prev)
+    if delta == 0:
+        return False
+    abs_th = Decimal(str(settings.UPNL_PERSIST_ABS))
+    if abs_th > 0 and delta >= abs_th:
+        return True
+    rel_th = Decimal(str(settings.UPNL_PERSIST_REL))
+    if rel_th > 0:
+        if prev == 0:
+            return True
+        return delta / abs(prev) >= rel_th
+    return False
+
+
+def reset() -> None:
+    """Depoyu temizle (testler)."""
+    _STORE.clear()
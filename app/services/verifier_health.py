@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# app/services/verifier_health.py
+# Python 3.9
+
+"""
+Verifier sağlık ve gecikme metrikleri (süreç içi).
+
+VerifierWorker her turun başını/sonunu, aşama hatalarını ve tur sonundaki
+pending/open sayıları ile en eski pending işlemin zamanını buraya yazar.
+``evaluate`` bunları HEALTH_* eşikleriyle karşılaştırıp borsa bazında
+ok / degraded / fail üretir (/api/health/deep); ``prometheus_text`` aynı
+değerleri scrape için gauge olarak verir (/api/health/metrics).
+
+Çok süreçli dağıtımda metrikler yalnızca lider süreçte dolar; kirası
+olmayan borsa "standby" raporlanır ve genel durumu etkilemez.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_FAIL = "fail"
+STATUS_STANDBY = "standby"
+
+_STATUS_RANK = {STATUS_STANDBY: 0, STATUS_OK: 0, STATUS_DEGRADED: 1, STATUS_FAIL: 2}
+
+
+class _ExchangeHealth:
+    def __init__(self, now: float):
+        self.registered_at = now
+        self.leader: Optional[bool] = None
+        self.tick_started_at: Optional[float] = None
+        self.tick_finished_at: Optional[float] = None
+        self.last_ok_at: Optional[float] = None
+        self.duration_s: Optional[float] = None
+        self.iterations = 0
+        self.consecutive_errors = 0
+        self.errors: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self.pending: Optional[int] = None
+        self.open: Optional[int] = None
+        self.oldest_pending_at: Optional[float] = None
+
+
+# exchange → durum (time.time() tabanlı; scrape tarafında da anlamlı olsun)
+_STATE: Dict[str, _ExchangeHealth] = {}
+
+
+def _get(exchange: str) -> _ExchangeHealth:
+    st = _STATE.get(exchange)
+    if st is None:
+        st = _STATE[exchange] = _ExchangeHealth(time.time())
+    return st
+
+
+def register(exchange: str) -> None:
+    """Worker'ı bilinen borsalara ekle (hiç tur atmasa da stale sayılabilsin)."""
+    _get(exchange)
+
+
+def set_leader(exchange: str, leader: bool) -> None:
+    _get(exchange).leader = bool(leader)
+
+
+def tick_started(exchange: str) -> None:
+    _get(exchange).tick_started_at = time.time()
+
+
+def tick_finished(exchange: str, ok: bool, consecutive_errors: int = 0) -> None:
+    st = _get(exchange)
+    now = time.time()
+    st.tick_finished_at = now
+    if st.tick_started_at is not None:
+        st.duration_s = max(0.0, now - st.tick_started_at)
+    st.iterations += 1
+    st.consecutive_errors = int(consecutive_errors)
+    if ok:
+        st.last_ok_at = now
+
+
+def record_error(exchange: str, stage: str, exc: BaseException) -> None:
+    st = _get(exchange)
+    st.errors[stage] = st.errors.get(stage, 0) + 1
+    st.last_error = f"{stage}: {type(exc).__name__}: {exc}"[:300]
+
+
+def _epoch(dt: Optional[datetime]) -> Optional[float]:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        # DB naive UTC döndürebilir (SQLite/MySQL DATETIME)
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def record_counts(
+    exchange: str,
+    pending: int,
+    open_count: int,
+    oldest_pending_at: Optional[datetime] = None,
+) -> None:
+    st = _get(exchange)
+    st.pending = int(pending)
+    st.open = int(open_count)
+    st.oldest_pending_at = _epoch(oldest_pending_at) if pending else None
+
+
+def _age(ts: Optional[float], now: float) -> Optional[float]:
+    return None if ts is None else max(0.0, now - ts)
+
+
+def _evaluate_one(st: _ExchangeHealth, now: float) -> dict:
+    lag = _age(st.last_ok_at or st.registered_at, now)
+    pending_age = _age(st.oldest_pending_at, now)
+    reasons: List[str] = []
+    status = STATUS_OK
+    if st.leader is False:
+        status = STATUS_STANDBY
+    else:
+
+        def worse(level: str, reason: str) -> None:
+            nonlocal status
+            reasons.append(reason)
+            if _STATUS_RANK[level] > _STATUS_RANK[status]:
+                status = level
+
+        if lag is not None and lag > settings.HEALTH_VERIFIER_STALE_SECONDS:
+            worse(STATUS_FAIL, f"no successful tick for {lag:.0f}s")
+        if pending_age is not None:
+            if pending_age > settings.HEALTH_PENDING_AGE_FAIL_SECONDS:
+                worse(STATUS_FAIL, f"oldest pending trade {pending_age:.0f}s old")
+            elif pending_age > settings.HEALTH_PENDING_AGE_WARN_SECONDS:
+                worse(STATUS_DEGRADED, f"oldest pending trade {pending_age:.0f}s old")
+        if st.consecutive_errors > settings.VERIFY_ERROR_BUDGET:
+            worse(STATUS_DEGRADED, f"{st.consecutive_errors} consecutive failed ticks")
+
+    def _r(v: Optional[float]) -> Optional[float]:
+        return None if v is None else round(v, 3)
+
+    return {
+        "status": status,
+        "reasons": reasons,
+        "leader": st.leader,
+        "iterations": st.iterations,
+        "last_tick_started_at": st.tick_started_at,
+        "last_tick_finished_at": st.tick_finished_at,
+        "last_tick_duration_seconds": _r(st.duration_s),
+        "seconds_since_success": _r(lag),
+        "consecutive_errors": st.consecutive_errors,
+        "errors_by_stage": dict(st.errors),
+        "last_error": st.last_error,
+        "pending_trades": st.pending,
+        "open_trades": st.open,
+        "oldest_pending_age_seconds": _r(pending_age),
+    }
+
+
+def evaluate(now: Optional[float] = None) -> dict:
+    """{"status": en kötü borsa durumu, "exchanges": {exchange: {...}}}."""
+    now = time.time() if now is None else now
+    exchanges = {ex: _evaluate_one(st, now) for ex, st in sorted(_STATE.items())}
+    status = STATUS_OK
+    for info in exchanges.values():
+        if _STATUS_RANK[info["status"]] > _STATUS_RANK[status]:
+            status = info["status"]
+    return {"status": status, "exchanges": exchanges}
+
+
+def _label(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(now: Optional[float] = None) -> str:
+    """Prometheus text exposition (0.0.4) formatında gauge/counter'lar."""
+    now = time.time() if now is None else now
+    health = evaluate(now)["exchanges"]
+    metrics = [
+        ("sigmom_verifier_up", "gauge", "1 if the exchange is ok or standby"),
+        ("sigmom_verifier_leader", "gauge", "1 if this process holds the lease"),
+        ("sigmom_verifier_last_tick_start_timestamp_seconds", "gauge", ""),
+        ("sigmom_verifier_last_tick_end_timestamp_seconds", "gauge", ""),
+        ("sigmom_verifier_tick_duration_seconds", "gauge", "Last tick duration"),
+        ("sigmom_verifier_seconds_since_success", "gauge", "Verification lag"),
+        ("sigmom_verifier_consecutive_errors", "gauge", ""),
+        ("sigmom_verifier_pending_trades", "gauge", ""),
+        ("sigmom_verifier_open_trades", "gauge", ""),
+        ("sigmom_verifier_oldest_pending_age_seconds", "gauge", ""),
+        ("sigmom_verifier_iterations_total", "counter", ""),
+        ("sigmom_verifier_errors_total", "counter", "Errors by stage"),
+    ]
+    lines: List[str] = []
+    for name, kind, help_ in metrics:
+        if help_:
+            lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} {kind}")
+        for ex, h in health.items():
+            st = _STATE[ex]
+            lbl = f'exchange="{_label(ex)}"'
+            if name == "sigmom_verifier_errors_total":
+                for stage, n in sorted(st.errors.items()):
+                    lines.append(f'{name}{{{lbl},stage="{_label(stage)}"}} {n}')
+                continue
+            value = {
+                "sigmom_verifier_up": int(h["status"] in (STATUS_OK, STATUS_STANDBY)),
+                "sigmom_verifier_leader": (
+                    None if st.leader is None else int(st.leader)
+                ),
+                "sigmom_verifier_last_tick_start_timestamp_seconds": st.tick_started_at,
+                "sigmom_verifier_last_tick_end_timestamp_seconds": st.tick_finished_at,
+                "sigmom_verifier_tick_duration_seconds": st.duration_s,
+                "sigmom_verifier_seconds_since_success": h["seconds_since_success"],
+                "sigmom_verifier_consecutive_errors": st.consecutive_errors,
+                "sigmom_verifier_pending_trades": st.pending,
+                "sigmom_verifier_open_trades": st.open,
+                "sigmom_verifier_oldest_pending_age_seconds": (
+                    h["oldest_pending_age_seconds"] or 0
+                ),
+                "sigmom_verifier_iterations_total": st.iterations,
+            }[name]
+            if value is not None:
+                lines.append(f"{name}{{{lbl}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Durumu temizle (testler)."""
+    _STATE.clear()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# app/services/verifier_lease.py
+# Python 3.9
+
+"""
+Verifier lider seçimi: birden çok uvicorn worker / host varken borsa başına
+yalnızca bir süreç verifier çalıştırır.
+
+Arka uçlar (VERIFY_LEADER_BACKEND):
+  • db   — verifier_leases satırı. Kira koşullu tek UPDATE ile alınır/yenilenir
+           (holder bizsek ya da süre dolmuşsa); satır yoksa INSERT, PK
+           çakışması → başkası lider. MySQL ve SQLite'ta atomiktir. Lider
+           ölürse kira VERIFY_LEASE_TTL_SECONDS sonunda başkasına geçer.
+  • file — tek host için flock; süreç ölünce kilidi işletim sistemi bırakır.
+  • auto — db; kira tablosu yoksa (migration uygulanmamış) file'a düşer.
+  • off  — her süreç lider (eski davranış).
+Kira, denetleyici (verifier_loop) her turda ``ensure()`` ile yenilenir;
+TTL denetleyici aralığından belirgin büyük olmalı.
+"""
+
+import logging
+import os
+import socket
+import tempfile
+import time
+import uuid
+from typing import IO, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models import VerifierLease
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger("verifier")
+
+# Bu sürecin kimliği (host:pid:rastgele) — yeniden başlayan süreç eski kirayı
+# "kendisininmiş" gibi yenileyemesin diye rastgele ek
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+BACKENDS = ("auto", "db", "file", "off")
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def try_acquire(db: AsyncSession, name: str, holder: str, ttl_ms: int) -> bool:
+    """Kirayı al ya da yenile (commit dahil); lider isek True."""
+    now = _now_ms()
+    res = await db.execute(
+        update(VerifierLease)
+        .where(VerifierLease.name == name)
+        .where((VerifierLease.holder == holder) | (VerifierLease.lease_until_ms < now))
+        .values(holder=holder, lease_until_ms=now + ttl_ms)
+        .execution_options(synchronize_session=False)
+    )
+    if (res.rowcount or 0) == 1:
+        await db.commit()
+        return True
+    # Satır var ama başkasında (ya da hiç yok → INSERT dene)
+    try:
+        await db.execute(
+            insert(VerifierLease).values(
+                name=name, holder=holder, lease_until_ms=now + ttl_ms
+            )
+        )
+        await db.commit()
+        return True
+    except IntegrityError:
+        await db.rollback()
+        return False
+
+
+async def release(db: AsyncSession, name: str, holder: str) -> None:
+    """Kirayı hemen bırak (kapanışta hızlı devir)."""
+    await db.execute(
+        update(VerifierLease)
+        .where(VerifierLease.name == name, VerifierLease.holder == holder)
+        .values(lease_until_ms=0)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def bump_wake(db: AsyncSession, name: str) -> None:
+    """Kira satırının wake_seq'ini artır (lider hangi süreçteyse uyansın)."""
+    await db.execute(
+        update(VerifierLease)
+        .where(VerifierLease.name == name)
+        .values(wake_seq=VerifierLease.wake_seq + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def read_wake(db: AsyncSession, name: str) -> Optional[int]:
+    """wake_seq (satır yoksa None); PK üzerinden tek satır okuma."""
+    return await db.scalar(
+        select(VerifierLease.wake_seq).where(VerifierLease.name == name)
+    )
+
+
+def _is_missing_table(exc: BaseException) -> bool:
+    msg = str(getattr(exc, "orig", exc) or exc).lower()
+    return "no such table" in msg or "doesn't exist" in msg
+
+
+class LeaderLease:
+    """Tek bir ``name`` için liderlik; durum değişimleri loglanır."""
+
+    def __init__(
+        self,
+        name: str,
+        backend: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        lock_dir: Optional[str] = None,
+    ):
+        backend = (backend or settings.VERIFY_LEADER_BACKEND or "auto").lower()
+        if backend not in BACKENDS:
+            logger.warning("[lease] unknown backend %r; using auto", backend)
+            backend = "auto"
+        self.name = name
+        self.backend = backend
+        ttl = settings.VERIFY_LEASE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.ttl_ms = int(float(ttl) * 1000)
+        self.lock_dir = lock_dir or settings.VERIFY_LOCK_DIR or tempfile.gettempdir()
+        self.is_leader = False
+        self._fh: Optional[IO] = None
+
+    def _set(self, leader: bool) -> bool:
+        if leader != self.is_leader:
+            logger.info(
+                "[lease] %s: %s (%s, %s)",
+                self.name,
+                "acquired" if leader else "lost",
+                self.backend,
+                HOLDER_ID,
+            )
+        self.is_leader = leader
+        return leader
+
+    async def ensure(self) -> bool:
+        """Kirayı al/yenile; bu süreç lider mi?"""
+        if self.backend == "off":
+            return self._set(True)
+        if self.backend in ("auto", "db"):
+            try:
+                async with async_session() as db:
+                    ok = await try_acquire(db, self.name, HOLDER_ID, self.ttl_ms)
+                return self._set(ok)
+            except SQLAlchemyError as exc:
+                if self.backend == "db" or not _is_missing_table(exc):
+                    # DB'ye ulaşamıyorsak liderlik iddia etme (split-brain yok)
+                    logger.warning("[lease] %s: db lease error: %s", self.name, exc)
+                    return self._set(False)
+                logger.warning(
+                    "[lease] verifier_leases table missing; "
+                    "falling back to file lock (single host only)"
+                )
+                self.backend = "file"
+        return self._set(self._file_ensure())
+
+    def _lock_path(self) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.name)
+        return os.path.join(self.lock_dir, f"sigmom-{safe}.lock")
+
+    def _file_ensure(self) -> bool:
+        if self._fh is not None:
+            return True
+        if fcntl is None:
+            # flock yok: tek süreç varsayımı
+            return True
+        fh = open(self._lock_path(), "a+")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(HOLDER_ID)
+        fh.flush()
+        self._fh = fh
+        return True
+
+    async def release(self) -> None:
+        if self._fh is not None:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            finally:
+                self._fh.close()
+                self._fh = None
+        elif self.is_leader and self.backend in ("auto", "db"):
+            try:
+                async with async_session() as db:
+                    await release(db, self.name, HOLDER_ID)
+            except SQLAlchemyError as exc:
+                logger.warning("[lease] %s: release error: %s", self.name, exc)
+        self._set(False)
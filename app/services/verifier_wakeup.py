@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# app/services/verifier_wakeup.py
+# Python 3.9
+
+"""
+Verifier için olay güdümlü uyanma + uyarlanır tur aralığı.
+
+Borsa başına bir durum tutulur:
+  • ``wake(exchange)``: handle_signal yeni pending trade ya da kısmi kapanış
+    yazınca çağırır; uyuyan worker hemen uyanır ve VERIFY_BURST_SECONDS
+    boyunca VERIFY_BURST_INTERVAL_SECONDS aralıkla tur atar.
+  • ``observe_pending(exchange, n)``: her turdaki pending sayısı. Art arda
+    pending'siz turlarda aralık üstel büyür (VERIFY_IDLE_MAX_SECONDS tavanı).
+  • ``wait(exchange, delay)``: worker'ın uykusu; wake() ile erken biter.
+
+Çok süreçli dağıtımda verifier yalnızca kirayı tutan süreçte koşar; webhook
+başka bir worker'a düşebilir. Bu yüzden wake() süreç içi Event'e ek olarak
+kira satırının ``wake_seq``'ini artırır (db/auto kira). Lider ``shared=True``
+ile uyurken satırı VERIFY_WAKE_POLL_SECONDS aralıkla okur; uzak uyanma en
+geç bu kadar gecikir. file kirasında paylaşılan işaret yoktur: orada worker
+pending'siz turlarda da aralığı büyütmez (bkz. ``adaptive_delay``).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.database import async_session
+from app.services import verifier_lease
+
+logger = logging.getLogger("verifier")
+
+# Uzak uyanma işaretini taşıyan kira arka uçları
+SHARED_WAKE_BACKENDS = ("auto", "db")
+
+
+def lease_name(exchange: str) -> str:
+    """Borsanın verifier kirası (ve uzak uyanma işareti) satır adı."""
+    return f"verifier:{(exchange or '').strip()}"
+
+
+class _WakeState:
+    __slots__ = ("event", "burst_until", "idle_ticks", "remote_seq")
+
+    def __init__(self) -> None:
+        self.event: Optional[asyncio.Event] = None
+        self.burst_until = 0.0
+        self.idle_ticks = 0
+        # Liderin son gördüğü wake_seq (None → henüz okunmadı)
+        self.remote_seq: Optional[int] = None
+
+    def get_event(self) -> asyncio.Event:
+        # Event döngü içinde ilk kullanımda oluşturulur
+        if self.event is None:
+            self.event = asyncio.Event()
+        return self.event
+
+
+_STATES: Dict[str, _WakeState] = {}
+# Fire-and-forget yayın görevleri (GC'ye karşı referans)
+_PUBLISHING: Set["asyncio.Task[None]"] = set()
+
+
+def _state(exchange: str) -> _WakeState:
+    key = (exchange or "").strip()
+    st = _STATES.get(key)
+    if st is None:
+        st = _STATES[key] = _WakeState()
+    return st
+
+
+def _start_burst(st: _WakeState) -> None:
+    st.burst_until = time.monotonic() + max(0, settings.VERIFY_BURST_SECONDS)
+    st.idle_ticks = 0
+
+
+def wake(exchange: str) -> None:
+    """Worker'ı erken uyandır ve hızlı tur penceresini (yeniden) başlat."""
+    st = _state(exchange)
+    _start_burst(st)
+    st.get_event().set()
+    _publish(exchange)
+
+
+def _publish(exchange: str) -> None:
+    if (settings.VERIFY_LEADER_BACKEND or "auto").lower() not in SHARED_WAKE_BACKENDS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_publish_remote(exchange))
+    _PUBLISHING.add(task)
+    task.add_done_callback(_PUBLISHING.discard)
+
+
+async def _publish_remote(exchange: str) -> None:
+    try:
+        async with async_session() as db:
+            await verifier_lease.bump_wake(db, lease_name(exchange))
+    except SQLAlchemyError as exc:
+        # Uyandırma best-effort: lider en geç kendi aralığında bakar
+        logger.debug("[wake] %s: publish failed: %s", exchange, exc)
+
+
+async def _remote_woken(exchange: str, st: _WakeState) -> bool:
+    try:
+        async with async_session() as db:
+            seq = await verifier_lease.read_wake(db, lease_name(exchange))
+    except SQLAlchemyError as exc:
+        logger.debug("[wake] %s: poll failed: %s", exchange, exc)
+        return False
+    if seq is None:
+        return False
+    seq = int(seq)
+    prev, st.remote_seq = st.remote_seq, seq
+    return prev is not None and seq != prev
+
+
+def observe_pending(exchange: str, pending: int) -> None:
+    st = _state(exchange)
+    st.idle_ticks = 0 if pending else st.idle_ticks + 1
+
+
+def adaptive_delay(exchange: str, base: float, idle_backoff: bool = True) -> float:
+    """
+    Hızlı pencere → kısa aralık; pending'siz turlar → üstel (tavanlı); aksi base.
+    idle_backoff=False: uyandırma lidere ulaşamıyorsa (file kirası) aralık
+    base'in üstüne çıkmaz.
+    """
+    st = _state(exchange)
+    if time.monotonic() < st.burst_until:
+        return min(base, float(settings.VERIFY_BURST_INTERVAL_SECONDS))
+    if st.idle_ticks <= 0 or not idle_backoff:
+        return base
+    cap = max(base, float(settings.VERIFY_IDLE_MAX_SECONDS))
+    return min(cap, max(base, 1.0) * 2 ** min(st.idle_ticks, 16))
+
+
+async def wait(exchange: str, delay: float, shared: bool = False) -> bool:
+    """
+    En fazla ``delay`` saniye uyur; wake() ile erken uyanınca True.
+    shared=True: başka süreçlerin wake()'i de (kira satırı) uyandırır.
+    """
+    st = _state(exchange)
+    ev = st.get_event()
+    deadline = time.monotonic() + max(0.0, delay)
+    poll = max(0.05, float(settings.VERIFY_WAKE_POLL_SECONDS))
+    woke = False
+    while True:
+        remaining = deadline - time.monotonic()
+        step = min(remaining, poll) if shared else remaining
+        try:
+            await asyncio.wait_for(ev.wait(), timeout=max(0.0, step))
+            woke = True
+            break
+        except asyncio.TimeoutError:
+            pass
+        if shared and await _remote_woken(exchange, st):
+            _start_burst(st)
+            woke = True
+            break
+        if not shared or time.monotonic() >= deadline:
+            break
+    ev.clear()
+    return woke
+
+
+def reset() -> None:
+    """Tüm durumları temizle (testler)."""
+    _STATES.clear()
@@ -349,29 +349,74 @@
         return unwrap(raw).map(normalizeTrade).filter(Boolean);
     }
 
+    // Sunucu analitiği (/api/me/analytics): metrikler + günlük equity noktaları
+    const ANALYTICS_DAYS = 365;
+
+    async function loadAnalytics(walletNow) {
+        const qs = new URLSearchParams({
+            days: String(ANALYTICS_DAYS)
+        });
+        if (Number.isFinite(walletNow)) qs.set("balance", String(walletNow));
+        return await getJSON(`/api/me/analytics?` + qs.toString());
+    }
+
+    function statsFromAnalytics(a, walletNow) {
+        const pts = Array.isArray(a?.points) ? a.points : [];
+        const spanDays = pts.length > 1 ?
+            (new Date(pts[pts.length - 1].day) - new Date(pts[0].day)) / 86400000 :
+            0;
+        let cagr = null;
+        const cap = toNum(a?.start_capital);
+        if (spanDays >= MIN_CAGR_DAYS && cap > 0) {
+            const v = Math.pow(Math.max(walletNow / cap, 1e-9), 365 / spanDays) - 1;
+            if (Number.isFinite(v)) cagr = v;
+        }
+        return {
+            net: toNum(a?.net_pnl),
+            win: toNum(a?.win_rate),
+            sharpe: toNum(a?.sharpe),
+            mdd: toNum(a?.max_drawdown_pct) / 100,
+            cagr,
+            equity: pts.map((p) => ({
+                x: new Date(p.day + "T00:00:00Z"),
+                y: toNum(p.equity)
+            })),
+        };
+    }
+
+    function renderStats(walletNow, st) {
+        // Karttaki bakiye: doğrudan güncel cüzdan (all-time)
+        if (els.statBal) els.statBal.textContent = nf2.format(walletNow);
+        if (els.statNet) els.statNet.textContent =
+            (st.net >= 0 ? "+" : "−") + nf2.format(Math.abs(st.net));
+        if (els.statWin) els.statWin.textContent = nf2.format(st.win) + "%";
+        if (els.statSharpe) els.statSharpe.textContent = nf2.format(st.sharpe);
+        if (els.statMdd) els.statMdd.textContent = nf2.format(st.mdd * 100) + "%";
+        if (els.statCagr) els.statCagr.textContent = fmtAnnualPct(st.cagr);
+    }
+
     // ---- Render loop ----
     async function refresh() {
         try {
-            const rows = await loadTrades();
             // CÜZDANI HER YENİLEMEDE GÜNCELLE (işlem kapanınca değişir)
             try {
                 await initStartCapital();
             } catch {}
             const walletNow = START_CAPITAL;
+            try {
+                const st = statsFromAnalytics(await loadAnalytics(walletNow), walletNow);
+                renderStats(walletNow, st);
+                drawChart(st.equity.length ? st.equity : buildEquity([], walletNow));
+                return;
+            } catch {}
+            // Eski sunucu / analitik hatası: son 200 işlemden istemci tarafı hesap
+            const rows = await loadTrades();
             // Grafiğin referansı: "bugünkü cüzdan" - "grafikte topladığımız realize PnL"
             const baseCap = walletNow - sumPnl(rows);
             // ALL (yüklü işlemler) – çiftlemeyi önlemek için 30G filtresi kaldırıldı
             const statsAll = computeStats(rows, baseCap);
             const equity = buildEquity(rows, baseCap);
-            // Karttaki bakiye: doğrudan güncel cüzdan (all-time)
-            if (els.statBal) els.statBal.textContent = nf2.format(walletNow);
-            // Net Profit (ALL)
-            if (els.statNet) els.statNet.textContent =
-                (statsAll.net >= 0 ? "+" : "−") + nf2.format(Math.abs(statsAll.net));
-            if (els.statWin) els.statWin.textContent = nf2.format(statsAll.win) + "%";
-            if (els.statSharpe) els.statSharpe.textContent = nf2.format(statsAll.sharpe);
-            if (els.statMdd) els.statMdd.textContent = nf2.format(statsAll.mdd * 100) + "%";
-            if (els.statCagr) els.statCagr.textContent = fmtAnnualPct(statsAll.cagr);
+            renderStats(walletNow, statsAll);
 
             drawChart(equity);
         } catch (e) {
@@ -446,11 +491,11 @@
             if (card) card.title = t; // kutunun tamamına
         };
         tip('#stat-balance', 'Mevcut Bakiye (cüzdan: gerçek zaman)');
-        tip('#stat-net', 'Net Kâr (tüm yüklü işlemler)');
-        tip('#stat-win', 'Kazanma Oranı (tüm yüklü işlemler)');
-        tip('#stat-sharpe', 'Sharpe Oranı (tüm yüklü işlemlerin günlük getirileri)');
-        tip('#stat-mdd', 'Maksimum Düşüş (equity eğrisi, tüm yüklü veride)');
-        tip('#stat-cagr', 'Yıllık Getiri (tüm yüklü veride; ≥21 gün gerekiyorsa)');
+        tip('#stat-net', 'Net Kâr (son 365 gün)');
+        tip('#stat-win', 'Kazanma Oranı (son 365 gün)');
+        tip('#stat-sharpe', 'Sharpe Oranı (son 365 günün günlük getirileri)');
+        tip('#stat-mdd', 'Maksimum Düşüş (equity eğrisi, son 365 gün)');
+        tip('#stat-cagr', 'Yıllık Getiri (son 365 gün; ≥21 gün gerekiyorsa)');
 
     });
 })();
@@ -1470,13 +1470,30 @@
         try {
             if (!candle || !symbol) return [];
             const ex = getSelectedExchange();
-            const url = `/api/me/markers?symbol=${encodeURIComponent(symbol)}&tf=${encodeURIComponent(tf)}&exchange=${encodeURIComponent(ex)}`;
-            const res = await fetch(url, {
-                credentials: 'include',
-                cache: 'no-store'
-            });
-            if (!res.ok) throw new Error('markers api fail');
-            const rows = await res.json();
+            let url = `/api/me/markers?symbol=${encodeURIComponent(symbol)}&tf=${encodeURIComponent(tf)}&exchange=${encodeURIComponent(ex)}`;
+            // Yalnızca grafikte yüklü bar aralığı (ilk bar → şimdi)
+            if (Array.isArray(klTimes) && klTimes.length) {
+                url += `&since_epoch=${encodeURIComponent(klTimes[0])}`;
+            }
+            // Sunucu kapanışları sayfalar: X-Next-Cursor boşalana dek tüm sayfalar
+            url += '&limit=2000';
+            const rows = [];
+            let cursor = null;
+            const seen = new Set();
+            do {
+                const pageUrl = cursor ? `${url}&cursor=${encodeURIComponent(cursor)}` : url;
+                const res = await fetch(pageUrl, {
+                    credentials: 'include',
+                    cache: 'no-store'
+                });
+                if (!res.ok) throw new Error('markers api fail');
+                const chunk = await res.json();
+                if (Array.isArray(chunk)) rows.push(...chunk);
+                cursor = res.headers.get('X-Next-Cursor');
+                // cursor hep geriye ilerler; tekrar ederse (bozuk yanıt) döngüyü kes
+                if (cursor && seen.has(cursor)) break;
+                if (cursor) seen.add(cursor);
+            } while (cursor);
             // Bu sembolde canlı OPEN var ise çipi gizle (open-trades gecikirse de sorun olmasın)
             try {
                 const hasLiveOpen = Array.isArray(rows) && rows.some(m =>
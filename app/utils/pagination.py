@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# app/utils/pagination.py
+# Python 3.9
+
+"""
+Keyset (cursor) sayfalama yardımcıları.
+
+Sıralama her zaman (zaman DESC, id DESC); cursor son satırın (zaman, id)
+çiftini taşıyan opak bir dizgedir. Sonraki sayfa "bu çiftten küçük" koşuluyla
+indeks üzerinde kaldığı yerden devam eder; OFFSET yok, derinlikten bağımsız.
+Uçlar sonraki cursor'ı ``X-Next-Cursor`` başlığında döner (gövde şeması değişmez).
+"""
+
+import base64
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        # DB naive UTC döndürebilir (SQLite/MySQL DATETIME)
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    us = int(round(_utc(ts).timestamp() * 1_000_000))
+    raw = f"{us}:{int(row_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Geçersiz cursor → ValueError."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        us, row_id = base64.urlsafe_b64decode(cursor + pad).decode("ascii").split(":")
+        ts = datetime.fromtimestamp(int(us) / 1_000_000, tz=timezone.utc)
+        return ts, int(row_id)
+    except Exception as exc:  # noqa: BLE001 — base64/biçim/sayı hataları tek tip
+        raise ValueError(f"invalid cursor: {cursor!r}") from exc
+
+
+def before(ts_col, id_col, cursor: Tuple[datetime, int]):
+    """(ts_col, id_col) < cursor — ``ts_col <=`` sınırı indeks aralığını daraltır."""
+    ts, row_id = cursor
+    # DATETIME sütunları naive UTC tutar
+    ts = ts.replace(tzinfo=None)
+    return and_(ts_col <= ts, or_(ts_col < ts, id_col < row_id))
+
+
+def next_cursor(rows: Sequence, limit: int, ts_attr: str, id_attr: str = "id"):
+    """
+    ``limit + 1`` satır çekilmiş sayfa için (sayfa, sonraki cursor).
+    Fazladan satır yoksa cursor None (son sayfa).
+    """
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(getattr(last, ts_attr), getattr(last, id_attr))
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    return decode_cursor(cursor) if cursor else None
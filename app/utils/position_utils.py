@@ -2,69 +2,52 @@
 # app/utils/position_utils.py
 # python 3.9
 
-from decimal import Decimal, InvalidOperation
 import logging
 from datetime import datetime
-from sqlalchemy import update, select, func
-from typing import cast
+from sqlalchemy import update, select
+from typing import Any, Dict, Optional, cast
 from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import StrategyOpenTrade
+from app.exchanges.common.snapshots import PositionSnapshot
 
 
 logger = logging.getLogger("verifier")
 
 
 async def confirm_open_trade(
-    db: AsyncSession, trade: StrategyOpenTrade, position_data: dict
+    db: AsyncSession, trade: StrategyOpenTrade, position: Optional[PositionSnapshot]
 ):
     """
     Borsayı tek otorite kabul ederek StrategyOpenTrade kaydını kesinleştirir.
     Config'e bakmaz; yön kararını sadece exchange çıktısından verir:
-      - positionSide == LONG/SHORT → hedge bacağı
-      - positionSide == BOTH       → one-way; yönü positionAmt işaretinden seç
+      - position_side == LONG/SHORT → hedge bacağı
+      - position_side == BOTH       → one-way; yönü amt işaretinden seç
     ONE-WAY (BOTH) durumda ters bacak açıksa kapatır (aynı sembol+exchange için tek açık kayıt).
     """
     # ORM alanlarına commit/flush sonrası dokunmamak için scalarlari baştan al
     sym = trade.symbol
     ex = trade.exchange
     tid = trade.id
-    try:
-        entry_price = Decimal(str(position_data.get("entryPrice", 0)))
-        position_amt = Decimal(
-            str(position_data.get("positionAmt", position_data.get("size", 0)))
-        )
-        leverage = int(float(position_data.get("leverage", 1)))
-        position_side = str(position_data.get("positionSide", "BOTH")).upper()
-    except (InvalidOperation, ValueError, TypeError) as e:
-        logger.warning(f"[confirm_open_trade parse error] {e}")
+    if position is None:
+        logger.warning("[confirm_open_trade] no position data for %s", sym)
         return
-
-    # Yön seçimi (yalnızca exchange verisi)
-    decided_side = None
-    if position_side == "LONG":
-        decided_side = "long"
-    elif position_side == "SHORT":
-        decided_side = "short"
-    elif position_side == "BOTH":
-        if position_amt > 0:
-            decided_side = "long"
-        elif position_amt < 0:
-            decided_side = "short"
-
-    # Guardlar
-    if not decided_side or entry_price <= 0 or position_amt.copy_abs() <= 0:
+    values = confirmation_values(position)
+    if values is None:
         logger.warning(
-            f"(side={decided_side}, entry={entry_price}, amt={position_amt}) for {sym}"
+            f"(side={position.side}, entry={position.entry_price},"
+            f" amt={position.amt}) for {sym}"
         )
         return
+    decided_side = values["side"]
+    position_side = position.position_side
 
     # One-way (BOTH) ise ters bacağı kapat
     if position_side == "BOTH":
         other_side = "short" if decided_side == "long" else "long"
         res = await db.execute(
             select(StrategyOpenTrade)
-            .where(func.upper(StrategyOpenTrade.symbol) == (sym or "").upper())
+            .where(StrategyOpenTrade.symbol == (sym or "").upper())
             .where(StrategyOpenTrade.exchange == (ex or ""))
             .where(StrategyOpenTrade.side == other_side)
             .where(StrategyOpenTrade.status == "open")
@@ -75,37 +58,44 @@ async def confirm_open_trade(
             await db.flush()
 
     # Mevcut trade’i borsa verisiyle kesinleştir
-    now = datetime.utcnow()
     await db.execute(
         update(StrategyOpenTrade)
         .where(cast(ColumnElement[bool], StrategyOpenTrade.id == tid))
-        .values(
-            side=decided_side,
-            entry_price=entry_price,
-            position_size=position_amt,
-            leverage=leverage,
-            status="open",
-            exchange_verified=True,
-            confirmed_at=now,
-            last_checked_at=now,
-        )
+        .values(**values)
     )
     await db.flush()
     logger.info(
         f"[confirm_open_trade] {sym} side={decided_side},"
-        f" entry={entry_price}, size={position_amt}, lev={leverage}"
+        f" entry={values['entry_price']}, size={position.amt},"
+        f" lev={values['leverage']}"
     )
 
 
-def position_matches(position: dict) -> bool:
-    logger.debug("position_matches() real implementation is in use.")
+def confirmation_values(position: PositionSnapshot) -> Optional[Dict[str, Any]]:
+    """
+    Borsa pozisyonundan açık kaydın kesinleşme alanları (UPDATE .values()).
+    Yön/giriş/miktar guard'ı geçmezse None. Tekil ve toplu doğrulama ortak kullanır.
+    """
+    side = position.side
+    if not side or position.entry_price <= 0 or position.amt.copy_abs() <= 0:
+        return None
+    now = datetime.utcnow()
+    return {
+        "side": side,
+        "entry_price": position.entry_price,
+        "position_size": position.abs_amt,
+        "leverage": position.leverage,
+        "status": "open",
+        "exchange_verified": True,
+        "confirmed_at": now,
+        "last_checked_at": now,
+    }
 
-    amt = Decimal(str(position.get("positionAmt", position.get("size", 0)))).copy_abs()
-    entry_price = Decimal(str(position.get("entryPrice", 0)))
 
-    has_position = amt > Decimal("0")
+def position_matches(position: Optional[PositionSnapshot]) -> bool:
+    logger.debug("position_matches() real implementation is in use.")
 
-    logger.debug(
-        f"Pozisyon durumu → has_position={has_position}, positionAmt={amt}, entryPrice={entry_price}"
-    )
+    has_position = position is not None and position.is_open
+
+    logger.debug("Pozisyon durumu → has_position=%s, %r", has_position, position)
     return has_position
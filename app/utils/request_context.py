@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# app/utils/request_context.py
+# Python 3.9
+
+import contextvars
+
+# Global correlation id (rid) için contextvar.
+# main.py middleware'i her HTTP isteğinde, verifier_loop her iterasyonda set eder;
+# handler/servis katmanı app.main'i import etmeden buradan okuyabilir.
+RID_CVAR: "contextvars.ContextVar[str]" = contextvars.ContextVar("rid", default="-")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# crud/daily_pnl.py
+# Python 3.9
+
+"""
+daily_pnl rollup: (exchange, fund_manager_id, symbol, day) başına realized
+PnL, işlem sayısı, kazançlı işlem sayısı ve ücretler.
+
+• ``record_close`` close_open_trade_and_record ile aynı transaction'da çağrılır
+  (commit çağıranda).
+• ``record_fees`` income ledger senkronunda yeni COMMISSION/FUNDING_FEE
+  satırlarını ekler.
+• ``rebuild`` rollup'ı strategy_trades + income_ledger'dan baştan kurar
+  (``python -m scripts.rebuild_daily_pnl``).
+Artırım tek atomik upsert (MySQL ON DUPLICATE KEY / SQLite ON CONFLICT).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DailyPnl, IncomeLedger, StrategyTrade
+
+logger = logging.getLogger(__name__)
+
+FEE_TYPES = ("COMMISSION", "FUNDING_FEE")
+_DAY_MS = 86_400_000
+_ZERO = Decimal("0")
+_KEY_COLS = ("exchange", "fund_manager_id", "symbol", "day")
+_SUM_COLS = ("realized_pnl", "trade_count", "wins", "fees")
+# rebuild: akış/INSERT parça boyutu
+_REBUILD_CHUNK = 1000
+
+
+def _upsert_stmt(dialect: str, row: Dict):
+    """Satır yoksa ekle, varsa toplam sütunlarını artır (tek ifade)."""
+    if dialect == "mysql":
+        stmt = mysql.insert(DailyPnl).values(**row)
+        return stmt.on_duplicate_key_update(
+            {c: getattr(DailyPnl, c) + stmt.inserted[c] for c in _SUM_COLS}
+        )
+    if dialect == "sqlite":
+        stmt = sqlite.insert(DailyPnl).values(**row)
+        return stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLS),
+            set_={c: getattr(DailyPnl, c) + stmt.excluded[c] for c in _SUM_COLS},
+        )
+    return None
+
+
+async def _bump(db: AsyncSession, row: Dict) -> None:
+    stmt = _upsert_stmt(db.get_bind().dialect.name, row)
+    if stmt is not None:
+        await db.execute(stmt)
+        return
+    # Diğer lehçeler: UPDATE, satır yoksa INSERT
+    res = await db.execute(
+        update(DailyPnl)
+        .where(*(getattr(DailyPnl, c) == row[c] for c in _KEY_COLS))
+        .values({c: getattr(DailyPnl, c) + row[c] for c in _SUM_COLS})
+        .execution_options(synchronize_session=False)
+    )
+    if (res.rowcount or 0) == 0:
+        await db.execute(insert(DailyPnl).values(**row))
+
+
+def _utc_day(ts: datetime) -> date:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+def _close_row(
+    exchange: str,
+    fund_manager_id: Optional[str],
+    symbol: Optional[str],
+    closed_at: datetime,
+    pnl: Optional[Decimal],
+) -> Dict:
+    """
+    Tek kapanışın rollup satırı. Anahtar normalizasyonu (boş fund manager → '',
+    büyük harf sembol, UTC gün) record_close ve rebuild için tek yerde.
+    """
+    pnl = pnl if pnl is not None else _ZERO
+    return {
+        "exchange": exchange,
+        "fund_manager_id": fund_manager_id or "",
+        "symbol": (symbol or "").strip().upper(),
+        "day": _utc_day(closed_at),
+        "realized_pnl": pnl,
+        "trade_count": 1,
+        "wins": 1 if pnl > 0 else 0,
+        "fees": _ZERO,
+    }
+
+
+async def record_close(
+    db: AsyncSession,
+    *,
+    exchange: str,
+    fund_manager_id: Optional[str],
+    symbol: str,
+    closed_at: datetime,
+    pnl: Decimal,
+) -> None:
+    """Kapanan işlemi günlük satıra ekler (commit yok)."""
+    await _bump(db, _close_row(exchange, fund_manager_id, symbol, closed_at, pnl))
+
+
+async def record_fees(
+    db: AsyncSession, exchange: str, rows: Iterable[Tuple[str, int, Decimal]]
+) -> None:
+    """(symbol, event_time_ms, amount) ücret kalemlerini gün bazında ekler."""
+    per_day: Dict[Tuple[str, date], Decimal] = defaultdict(lambda: _ZERO)
+    for symbol, event_ms, amount in rows:
+        day = datetime.fromtimestamp(int(event_ms) / 1000, tz=timezone.utc).date()
+        per_day[((symbol or "").upper(), day)] += Decimal(str(amount or 0))
+    for (symbol, day), amount in sorted(per_day.items()):
+        await _bump(
+            db,
+            {
+                "exchange": exchange,
+                "fund_manager_id": "",
+                "symbol": symbol,
+                "day": day,
+                "realized_pnl": _ZERO,
+                "trade_count": 0,
+                "wins": 0,
+                "fees": amount,
+            },
+        )
+
+
+async def rebuild(db: AsyncSession, exchange: Optional[str] = None) -> int:
+    """
+    Rollup'ı (tek borsa ya da tümü) strategy_trades + income_ledger'dan
+    yeniden kurar; tek transaction. Dönüş: yazılan rollup satırı sayısı.
+    """
+    try:
+        q_del = delete(DailyPnl)
+        if exchange:
+            q_del = q_del.where(DailyPnl.exchange == exchange)
+        await db.execute(q_del)
+
+        # Kapanışlar: anahtarlar record_close ile aynı fonksiyondan (_close_row)
+        # geçer; SQL'de GROUP BY lehçenin date()/NULL davranışına bağlı kalırdı.
+        # Satırlar akıtılır, bellekte yalnızca rollup anahtarları tutulur.
+        src = select(
+            StrategyTrade.exchange,
+            StrategyTrade.fund_manager_id,
+            StrategyTrade.symbol,
+            StrategyTrade.timestamp,
+            StrategyTrade.realized_pnl,
+        ).execution_options(yield_per=_REBUILD_CHUNK)
+        if exchange:
+            src = src.where(StrategyTrade.exchange == exchange)
+        totals: Dict[Tuple, Dict] = {}
+        async for ex, fm, sym, ts, pnl in await db.stream(src):
+            row = _close_row(ex, fm, sym, ts, pnl)
+            key = tuple(row[c] for c in _KEY_COLS)
+            acc = totals.get(key)
+            if acc is None:
+                totals[key] = row
+            else:
+                for c in _SUM_COLS:
+                    acc[c] += row[c]
+        rows = list(totals.values())
+        for i in range(0, len(rows), _REBUILD_CHUNK):
+            await db.execute(insert(DailyPnl), rows[i : i + _REBUILD_CHUNK])
+
+        # Ücretler: gün numarası (event_time // 1 gün) lehçe bağımsız tamsayı bölme
+        day_no = (IncomeLedger.event_time - IncomeLedger.event_time % _DAY_MS) / _DAY_MS
+        q_fees = (
+            select(
+                IncomeLedger.exchange,
+                IncomeLedger.symbol,
+                day_no,
+                func.sum(IncomeLedger.amount),
+            )
+            .where(IncomeLedger.income_type.in_(FEE_TYPES))
+            .group_by(IncomeLedger.exchange, IncomeLedger.symbol, day_no)
+        )
+        if exchange:
+            q_fees = q_fees.where(IncomeLedger.exchange == exchange)
+        fee_rows: Dict[str, List[Tuple[str, int, Decimal]]] = defaultdict(list)
+        for ex, sym, dn, amount in (await db.execute(q_fees)).all():
+            fee_rows[ex].append((sym, int(dn) * _DAY_MS, amount))
+        for ex, rows in fee_rows.items():
+            await record_fees(db, ex, rows)
+
+        q_count = select(func.count()).select_from(DailyPnl)
+        if exchange:
+            q_count = q_count.where(DailyPnl.exchange == exchange)
+        n = int((await db.execute(q_count)).scalar_one() or 0)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    logger.info("[daily_pnl] rebuilt %s: %d rows", exchange or "all exchanges", n)
+    return n
+
+
+async def daily_series(
+    db: AsyncSession,
+    exchange: str,
+    since: date,
+    symbol: Optional[str] = None,
+    fund_manager_id: Optional[str] = None,
+) -> List[Dict]:
+    """Gün bazında toplanmış [{day, realized_pnl, trade_count, wins, fees}] (artan)."""
+    q = (
+        select(
+            DailyPnl.day,
+            func.sum(DailyPnl.realized_pnl),
+            func.sum(DailyPnl.trade_count),
+            func.sum(DailyPnl.wins),
+            func.sum(DailyPnl.fees),
+        )
+        .where(DailyPnl.exchange == exchange)
+        .where(DailyPnl.day >= since)
+        .group_by(DailyPnl.day)
+        .order_by(DailyPnl.day)
+    )
+    if symbol:
+        q = q.where(DailyPnl.symbol == symbol.strip().upper())
+    if fund_manager_id:
+        q = q.where(DailyPnl.fund_manager_id == fund_manager_id)
+    return [
+        {
+            "day": d if isinstance(d, date) else date.fromisoformat(str(d)),
+            "realized_pnl": Decimal(str(pnl or 0)),
+            "trade_count": int(n or 0),
+            "wins": int(w or 0),
+            "fees": Decimal(str(fees or 0)),
+        }
+        for d, pnl, n, w, fees in (await db.execute(q)).all()
+    ]
@@ -1,20 +1,48 @@
 #!/usr/bin/env python3
 # crud/raw_signal.py
 # Python 3.9
+import json
 import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, exists, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import RawSignal
+from app.config import settings
+from app.models import (
+    RawSignal,
+    RawSignalArchive,
+    StrategyOpenTrade,
+    StrategyOpenTradeHistory,
+    StrategyTrade,
+)
 from app.schemas import WebhookSignal
 
 logger = logging.getLogger(__name__)
 
 
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
 async def insert_raw_signal(db: AsyncSession, signal: WebhookSignal) -> RawSignal:
-    """Persist the incoming raw webhook payload as-is and return the DB row."""
+    """
+    Persist the incoming raw webhook payload as-is and return the DB row.
+    symbol/mode/side/exchange ayrıca indeksli sütunlara yazılır (panel filtresi).
+    """
     payload = jsonable_encoder(signal)
-    db_signal = RawSignal(payload=payload, fund_manager_id=signal.fund_manager_id)
+    db_signal = RawSignal(
+        payload=payload,
+        fund_manager_id=signal.fund_manager_id,
+        symbol=_clean(signal.symbol),
+        mode=_clean(signal.mode),
+        side=_clean(signal.side),
+        exchange=_clean(signal.exchange),
+    )
     db.add(db_signal)
     await db.flush()  # ensure db_signal.id is assigned
     logger.info(
@@ -23,3 +51,82 @@ async def insert_raw_signal(db: AsyncSession, signal: WebhookSignal) -> RawSigna
         signal.fund_manager_id,
     )
     return db_signal
+
+
+def archived_payload(row: RawSignalArchive) -> dict:
+    """Arşiv satırının sıkıştırılmış payload'ını açar."""
+    return json.loads(zlib.decompress(row.payload_z).decode("utf-8"))
+
+
+async def archive_raw_signals(
+    db: AsyncSession,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: int = 50,
+) -> int:
+    """
+    ``retention_days``'ten eski ve hiçbir açık/kapanmış işleme bağlı olmayan
+    sinyalleri raw_signals_archive'a (zlib payload) taşır. Her parti ayrı
+    transaction; kilitler kısa kalır ve webhook insert'lerini bekletmez.
+    İşleme bağlı sinyaller taşınmaz (FK CASCADE işlemleri silerdi).
+    Dönüş: taşınan satır sayısı (retention 0 → kapalı, 0 döner).
+    """
+    if retention_days is None:
+        retention_days = settings.RAW_SIGNAL_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.RAW_SIGNAL_ARCHIVE_BATCH
+    if int(retention_days) <= 0:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=int(retention_days))
+    # DATETIME sütunları naive UTC tutar
+    cutoff = cutoff.replace(tzinfo=None)
+
+    q = (
+        select(RawSignal)
+        .where(RawSignal.received_at < cutoff)
+        .where(~exists().where(StrategyOpenTrade.raw_signal_id == RawSignal.id))
+        .where(~exists().where(StrategyTrade.raw_signal_id == RawSignal.id))
+        .where(~exists().where(StrategyOpenTradeHistory.raw_signal_id == RawSignal.id))
+        .order_by(RawSignal.received_at)
+        .limit(max(1, int(batch_size)))
+    )
+    moved = 0
+    for _ in range(max(1, max_batches)):
+        try:
+            rows = (await db.execute(q)).scalars().all()
+            if not rows:
+                break
+            await db.execute(
+                insert(RawSignalArchive),
+                [
+                    {
+                        "id": r.id,
+                        "fund_manager_id": r.fund_manager_id,
+                        "received_at": r.received_at,
+                        "symbol": r.symbol,
+                        "mode": r.mode,
+                        "side": r.side,
+                        "exchange": r.exchange,
+                        "payload_z": zlib.compress(
+                            json.dumps(r.payload, separators=(",", ":")).encode("utf-8")
+                        ),
+                    }
+                    for r in rows
+                ],
+            )
+            await db.execute(
+                delete(RawSignal)
+                .where(RawSignal.id.in_([r.id for r in rows]))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        db.expunge_all()
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+    if moved:
+        logger.info("[raw_signals] archived %d rows older than %s", moved, cutoff)
+    return moved
@@ -10,11 +10,16 @@ from decimal import Decimal, InvalidOperation
 from importlib import import_module
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update, desc, func, and_
-from typing import Union, Optional, List, cast
+from sqlalchemy import select, delete, insert, update, desc, func, and_, or_, case
+from sqlalchemy import exists
+from typing import Any, Dict, Union, Optional, List, Set, Tuple, cast
 from sqlalchemy.sql.elements import ColumnElement  # PyCharm tip denetimi için
-from app.models import StrategyOpenTrade, StrategyTrade
-from app.utils.position_utils import position_matches, confirm_open_trade
+from app.config import settings
+from app.models import StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade
+from crud.daily_pnl import record_close as record_daily_close
+from app.utils.position_utils import position_matches, confirmation_values
+from app.exchanges.common.snapshots import PositionSnapshot
+from app.services import audit_payloads
 from sqlalchemy import text
 
 
@@ -32,7 +37,7 @@ async def find_merge_candidate(
     """
     # Koşulları tek tek zincirleyerek ekle (IDE'nin 'bool' şüphesini kaldırır)
     q = select(StrategyOpenTrade)
-    q = q.where(func.upper(StrategyOpenTrade.symbol) == (symbol or "").strip().upper())
+    q = q.where(StrategyOpenTrade.symbol == (symbol or "").strip().upper())
     q = q.where(StrategyOpenTrade.exchange == (exchange or "").strip())
     q = q.where(StrategyOpenTrade.side == (side or "").strip().lower())
     q = q.where(StrategyOpenTrade.fund_manager_id == (fund_manager_id or "").strip())
@@ -42,29 +47,13 @@ async def find_merge_candidate(
     return res.scalar_one_or_none()
 
 
-def pick_close_price(position_data: dict) -> Decimal:
-    """Ortak işlem/piyasa alanlarından geçerli (>0) bir kapanış fiyatı seçin.
-    EntryPrice veya 0'a asla geri dönmeyin.
-    Tercih: avgClosePrice, avgPrice, price, lastPrice, closePrice, markPrice.
+def pick_close_price(position: Optional[PositionSnapshot]) -> Decimal:
+    """Pozisyon anlık görüntüsünden geçerli (>0) bir kapanış fiyatı seçin.
+    EntryPrice veya 0'a asla geri dönmeyin; adapter'lar yalnızca mark_price sağlar.
     """
-    for key in (
-        "avgClosePrice",
-        "avgPrice",
-        "price",
-        "lastPrice",
-        "closePrice",
-        "markPrice",
-    ):
-        v = position_data.get(key)
-        if v is None or str(v).strip() == "":
-            continue
-        try:
-            d = Decimal(str(v))
-        except InvalidOperation:
-            raise ValueError(f"Invalid close_price value: {v}")
-        if d > 0:
-            return d
-    raise ValueError(f"No valid close_price found: position_data={position_data}")
+    if position is not None and position.mark_price > 0:
+        return position.mark_price
+    raise ValueError(f"No valid close_price found: position={position!r}")
 
 
 def compute_pnl(
@@ -107,7 +96,7 @@ async def get_open_trade_for_close(
         return res.scalar_one_or_none()
 
     q = select(StrategyOpenTrade)
-    q = q.where(func.upper(StrategyOpenTrade.symbol) == sym)
+    q = q.where(StrategyOpenTrade.symbol == sym)
     q = q.where(StrategyOpenTrade.exchange == ex)
     q = q.where(StrategyOpenTrade.status == "open")
 
@@ -125,103 +114,113 @@ async def get_open_trade_for_close(
 LOGGER = logging.getLogger("verifier")
 
 
+async def resolve_close_price(
+    open_trade: StrategyOpenTrade, position: Optional[PositionSnapshot]
+) -> Optional[Decimal]:
+    """
+    Kapanış fiyatını DB işlemine girmeden çöz (ağ çağrısı burada yapılır).
+    Çağıran açık bir transaction tutuyorsa önce onu bitirmeli; sinyal yolu
+    fiyatı burada çözüp ``close_open_trade_and_record(close_price=...)``'a verir.
+    Sıra: snapshot mark_price; pozisyon borsada kapalıysa (amt==0) veya fiyat
+    yoksa → userTrades→VWAP. Asla entryPrice/0 değil.
+    """
+    try:
+        close_price: Optional[Decimal] = pick_close_price(position)
+    except ValueError:
+        close_price = None
+
+    amt_zero = position is None or not position.is_open
+    if close_price is not None and not amt_zero:
+        return close_price
+
+    try:
+        ex_name = (open_trade.exchange or "").strip()
+        mod = import_module(f"app.exchanges.{ex_name}.account")
+        helper = getattr(mod, "get_close_price_from_usertrades", None)
+        if callable(helper):
+            res = await helper(
+                open_trade.symbol,
+                getattr(open_trade, "timestamp", None),
+                side=(open_trade.side or "").lower(),
+            )
+            if res and res.get("success"):
+                close_price = Decimal(str(res["price"]))
+                LOGGER.info(
+                    "[fallback-vwap] %s price=%s (fills=%s)",
+                    open_trade.symbol,
+                    close_price,
+                    res.get("fills"),
+                )
+    except Exception as _e:
+        LOGGER.warning("[fallback-vwap-fail] %s: %s", open_trade.symbol, _e)
+    return close_price
+
+
+async def _audit_close_record(db: AsyncSession, open_trade_public_id: str) -> None:
+    """Commit sonrası doğrulama (yalnızca audit modunda; ek bir SELECT maliyeti)."""
+    try:
+        result = await db.execute(
+            text(
+                """
+                SELECT id, public_id, symbol, realized_pnl
+                FROM strategy_trades
+                WHERE open_trade_public_id = :otpid
+                ORDER BY id DESC LIMIT 1
+                """
+            ),
+            {"otpid": open_trade_public_id},
+        )
+        row = result.fetchone()
+        if row:
+            LOGGER.info(
+                "[DB-VERIFY] Trade kaydı bulundu → ID: %s, Symbol: %s, PnL: %s",
+                row.id,
+                row.symbol,
+                row.realized_pnl,
+            )
+        else:
+            LOGGER.warning(
+                "[DB-VERIFY] Commit sonrası trade kaydı BULUNAMADI! → open_trade_public_id=%s",
+                open_trade_public_id,
+            )
+    except Exception as e:
+        LOGGER.exception("[DB-VERIFY-FAIL] %s", e)
+
+
 async def close_open_trade_and_record(
-    db: AsyncSession, open_trade: StrategyOpenTrade, position_data: dict
+    db: AsyncSession,
+    open_trade: StrategyOpenTrade,
+    position: Optional[PositionSnapshot],
+    audit: Optional[bool] = None,
+    close_price: Optional[Decimal] = None,
 ):
     """
     Açık pozisyon kapanmışsa:
-    - PnL hesaplanır,
-    - StrategyTrade tablosuna yazılır,
-    - StrategyOpenTrade status='closed' yapılır.
+    - kapanış fiyatı ve PnL DB'ye dokunmadan önce hesaplanır
+      (close_price verilirse borsaya gidilmez; bkz. resolve_close_price),
+    - StrategyOpenTrade status='closed' + StrategyTrade INSERT + daily_pnl artırımı
+      tek commit'te yazılır,
+    - audit=True (varsayılan: settings.CLOSE_AUDIT_VERIFY) ise commit sonrası kayıt doğrulanır.
     """
 
     # --- Lazy load/expire sorunlarına karşı gerekli alanları snapshota al ---
     _ot_id = getattr(open_trade, "id", None)
+    _ot_pid = getattr(open_trade, "public_id", None)
     _ot_sym = getattr(open_trade, "symbol", None)
     _ot_side = getattr(open_trade, "side", None)
     _ot_fm = getattr(open_trade, "fund_manager_id", None)
     _ot_exch = getattr(open_trade, "exchange", None)
+    if audit is None:
+        audit = settings.CLOSE_AUDIT_VERIFY
 
     try:
-        res = await db.execute(
-            update(StrategyOpenTrade)
-            .where(
-                and_(
-                    StrategyOpenTrade.id == open_trade.id,
-                    StrategyOpenTrade.status == "open",
-                )
-            )
-            .values(status="closed")
-        )
-        if (res.rowcount or 0) == 0:
-            # Başkası bizden önce kapatmış; tekrar trade yazmayalım.
-            LOGGER.info("[idempotent-skip] already closed → %s", open_trade.public_id)
-            await db.rollback()
-            return True
-
-        # 2) Kayıt kapandıktan sonra güncel halini getir (audit için)
-        trade = (
-            await db.execute(
-                select(StrategyOpenTrade).where(
-                    cast(ColumnElement[bool], StrategyOpenTrade.id == open_trade.id)
-                )
-            )
-        ).scalar_one()
-
-        # --- SAFE close price: asla entryPrice/0 değil ---
-        # 1) Mevcut mantıkla dene (sadece beklenen hataları yakala)
-        try:
-            close_price = pick_close_price(position_data)
-        except (ValueError, InvalidOperation, TypeError, KeyError):
-            close_price = None
-
-        # 2) Pozisyon borsada kapalıysa (amt==0) veya bulunamadıysa → userTrades→VWAP
-        try:
-            amt_zero = False
-            try:
-                amt_zero = (
-                    float(str((position_data or {}).get("positionAmt", "0")) or 0)
-                    == 0.0
-                )
-            except (ValueError, TypeError):
-                pass
-
-            if close_price is None or amt_zero:
-                ex_name = (open_trade.exchange or "").strip()
-                mod = import_module(f"app.exchanges.{ex_name}.account")
-                helper = getattr(mod, "get_close_price_from_usertrades", None)
-                if callable(helper):
-                    res = await helper(
-                        open_trade.symbol,
-                        getattr(open_trade, "timestamp", None),
-                        side=(open_trade.side or "").lower(),
-                    )
-                    if res and res.get("success"):
-                        close_price = Decimal(str(res["price"]))
-                        LOGGER.info(
-                            "[fallback-vwap] %s price=%s (fills=%s)",
-                            open_trade.symbol,
-                            close_price,
-                            res.get("fills"),
-                        )
-        except Exception as _e:
-            LOGGER.warning("[fallback-vwap-fail] %s: %s", open_trade.symbol, _e)
-
+        # 1) Fiyat + guard'lar: satır kilidi alınmadan önce (ağ çağrısı dahil)
+        if close_price is None:
+            close_price = await resolve_close_price(open_trade, position)
         if close_price is None:
             raise ValueError("close_price could not be determined")
-        # Audit: kapanış fiyatı hangi alandan geldi?
-        _keys = (
-            "avgClosePrice",
-            "avgPrice",
-            "price",
-            "lastPrice",
-            "closePrice",
-            "markPrice",
-        )
-        _src = next((k for k in _keys if str(position_data.get(k)).strip()), None)
-        LOGGER.info("[close-price-source] %s → vwap=%s", open_trade.symbol, close_price)
+        LOGGER.info("[close-price-source] %s → price=%s", _ot_sym, close_price)
 
-        # --- Zorunlu alanlar / guard'lar ---
         open_price = Decimal(str(open_trade.entry_price))
         if open_price <= 0:
             raise ValueError(f"Geçersiz entry_price={open_price}")
@@ -230,19 +229,18 @@ async def close_open_trade_and_record(
         if position_size <= 0:
             raise ValueError(f"Geçersiz position_size={position_size}")
 
-        side = (getattr(open_trade, "side", "") or "").lower()
+        side = (_ot_side or "").lower()
         if side not in ("long", "short"):
-            raise ValueError(f"Geçersiz side={trade.side}")
+            raise ValueError(f"Geçersiz side={_ot_side}")
 
-        # --- PnL ---
         pnl = compute_pnl(side, open_price, close_price, position_size)
 
         closed_trade = StrategyTrade(
             public_id=str(uuid.uuid4()),
-            open_trade_public_id=open_trade.public_id,
+            open_trade_public_id=_ot_pid,
             raw_signal_id=open_trade.raw_signal_id,
-            symbol=open_trade.symbol,
-            side=open_trade.side,
+            symbol=_ot_sym,
+            side=_ot_side,
             entry_price=open_price,
             exit_price=close_price,
             position_size=position_size,
@@ -250,30 +248,38 @@ async def close_open_trade_and_record(
             realized_pnl=pnl,
             order_type=open_trade.order_type or "market",
             timestamp=datetime.utcnow(),
-            exchange=open_trade.exchange,
-            fund_manager_id=open_trade.fund_manager_id,
-            # audit için kapanış anındaki fiyat alanlarını sakla
-            response_data={
-                **(open_trade.response_data or {}),
-                "position_snapshot": {
-                    k: position_data.get(k)
-                    for k in (
-                        "avgClosePrice",
-                        "avgPrice",
-                        "price",
-                        "lastPrice",
-                        "closePrice",
-                        "markPrice",
-                    )
-                },
-            },
+            exchange=_ot_exch,
+            fund_manager_id=_ot_fm,
         )
+        _ct_pid = closed_trade.public_id
 
-        # 3) Trade tablosuna ekle
-        db.add(closed_trade)
-        await db.flush()
+        # 2) Atomik birim: status flip (yalnızca hâlâ 'open' ise) + INSERT → tek commit
+        res = await db.execute(
+            update(StrategyOpenTrade)
+            .where(
+                and_(
+                    StrategyOpenTrade.id == _ot_id,
+                    StrategyOpenTrade.status == "open",
+                )
+            )
+            .values(status="closed")
+        )
+        if (res.rowcount or 0) == 0:
+            # Başkası bizden önce kapatmış; tekrar trade yazmayalım.
+            LOGGER.info("[idempotent-skip] already closed → %s", _ot_pid)
+            await db.rollback()
+            return True
 
-        # 4) Commit
+        db.add(closed_trade)
+        # daily_pnl rollup'ı aynı transaction'da
+        await record_daily_close(
+            db,
+            exchange=_ot_exch,
+            fund_manager_id=_ot_fm,
+            symbol=_ot_sym,
+            closed_at=closed_trade.timestamp,
+            pnl=pnl,
+        )
         try:
             await db.commit()
         except Exception as e:
@@ -281,34 +287,13 @@ async def close_open_trade_and_record(
             await db.rollback()
             return False
 
-        # Commit sonrası doğrulama
-        try:
-            result = await db.execute(
-                text(
-                    """
-                    SELECT id, public_id, symbol, realized_pnl
-                    FROM strategy_trades
-                    WHERE open_trade_public_id = :otpid
-                    ORDER BY id DESC LIMIT 1
-                    """
-                ),
-                {"otpid": open_trade.public_id},
-            )
-            row = result.fetchone()
-            if row:
-                LOGGER.info(
-                    "[DB-VERIFY] Trade kaydı bulundu → ID: %s, Symbol: %s, PnL: %s",
-                    row.id,
-                    row.symbol,
-                    row.realized_pnl,
-                )
-            else:
-                LOGGER.warning(
-                    "[DB-VERIFY] Commit sonrası trade kaydı BULUNAMADI! → open_trade_public_id=%s",
-                    open_trade.public_id,
-                )
-        except Exception as e:
-            LOGGER.exception("[DB-VERIFY-FAIL] %s", e)
+        # audit için kapanış anındaki pozisyon görüntüsü (commit sonrası, ayrı tablo)
+        audit_payloads.submit(
+            _ct_pid, "position_snapshot", position.as_dict() if position else None
+        )
+
+        if audit:
+            await _audit_close_record(db, _ot_pid)
 
         LOGGER.info(
             "[closed-recorded] %s → PnL: %.2f was written and open trade status set to CLOSED.",
@@ -394,6 +379,8 @@ async def verify_pending_trades_for_execution(
     Pending durumdaki açık pozisyonları exchange ile doğrular.
     Başarılıysa status="open", exchange_verified=True;
     retry aşıldıysa status="failed".
+    Geçişler tick sonunda toplu UPDATE'lerle tek transaction'da yazılır.
+    Dönüş: turun başında bulunan pending trade sayısı.
     """
     verifier_logger = LOGGER
 
@@ -414,6 +401,11 @@ async def verify_pending_trades_for_execution(
         exchange if exchange else "<empty>",
     )
 
+    # Tick boyunca geçişler bellekte toplanır; sonda birkaç toplu UPDATE + tek commit
+    confirmed: List[Dict[str, Any]] = []
+    retry_ids: List[int] = []
+    one_way_legs: Set[Tuple[str, str]] = set()
+
     for open_trade in pending_trades:
         now = datetime.utcnow()
 
@@ -453,19 +445,27 @@ async def verify_pending_trades_for_execution(
             )
             continue
 
-        # Yeni signature ile kullan
         if position_matches(position):
-            open_trade.status = "open"
-            open_trade.exchange_verified = True
-            open_trade.confirmed_at = now
-            await confirm_open_trade(db, open_trade, position)
+            values = confirmation_values(position) or {
+                # guard geçmedi: eski davranış — yalnızca statü/doğrulama alanları
+                "status": "open",
+                "exchange_verified": True,
+                "confirmed_at": now,
+                "last_checked_at": now,
+            }
+            confirmed.append({"id": open_trade.id, **values})
+            if values.get("side") and position.position_side == "BOTH":
+                one_way_legs.add(
+                    (
+                        (open_trade.symbol or "").upper(),
+                        "short" if values["side"] == "long" else "long",
+                    )
+                )
             verifier_logger.info("[verified] %s position confirmed.", open_trade.symbol)
         else:
-            await increment_attempt_count(db, open_trade.id)
-            await db.refresh(open_trade)
-
-            if open_trade.verification_attempts >= max_retries:
-                open_trade.status = "failed"
+            retry_ids.append(open_trade.id)
+            attempts = (open_trade.verification_attempts or 0) + 1
+            if attempts >= max_retries:
                 verifier_logger.warning(
                     "[failed] %s max retries (%s) exceeded, position is invalid.",
                     open_trade.symbol,
@@ -475,12 +475,106 @@ async def verify_pending_trades_for_execution(
                 verifier_logger.debug(
                     "[retry] %s retries %s/%s",
                     open_trade.symbol,
-                    open_trade.verification_attempts,
+                    attempts,
                     max_retries,
                 )
 
-        open_trade.last_checked_at = now
+    if not (confirmed or retry_ids):
+        return len(pending_trades)
+    try:
+        await apply_pending_transitions(
+            db,
+            exchange,
+            confirmed=confirmed,
+            retry_ids=retry_ids,
+            one_way_legs=one_way_legs,
+            max_retries=max_retries,
+        )
         await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return len(pending_trades)
+
+
+async def apply_pending_transitions(
+    db: AsyncSession,
+    exchange: str,
+    *,
+    confirmed: List[Dict[str, Any]],
+    retry_ids: List[int],
+    one_way_legs: Set[Tuple[str, str]],
+    max_retries: int,
+) -> None:
+    """
+    Bir tick'in pending geçişlerini sabit sayıda UPDATE ile uygular (commit yok):
+      1) one-way ters bacak kapatma  → tek UPDATE (OR'lanmış sembol/yön çiftleri)
+      2) pending → open              → PK bazlı toplu UPDATE (executemany)
+      3) attempts+1 / failed         → tek UPDATE, statü CASE ile
+    Sıra önemli: ters bacaklar, yeni açılanlar henüz 'pending' iken kapatılır.
+    """
+    now = datetime.utcnow()
+    if one_way_legs:
+        await db.execute(
+            update(StrategyOpenTrade)
+            .where(StrategyOpenTrade.exchange == exchange)
+            .where(StrategyOpenTrade.status == "open")
+            .where(
+                or_(
+                    *(
+                        and_(
+                            StrategyOpenTrade.symbol == sym,
+                            StrategyOpenTrade.side == side,
+                        )
+                        for sym, side in sorted(one_way_legs)
+                    )
+                )
+            )
+            .values(status="closed")
+            .execution_options(synchronize_session=False)
+        )
+    if confirmed:
+        await db.execute(update(StrategyOpenTrade), confirmed)
+    if retry_ids:
+        attempts = StrategyOpenTrade.verification_attempts + 1
+        await db.execute(
+            update(StrategyOpenTrade)
+            .where(StrategyOpenTrade.id.in_(retry_ids))
+            .values(
+                verification_attempts=attempts,
+                last_checked_at=now,
+                status=case(
+                    (attempts >= max_retries, "failed"),
+                    else_=StrategyOpenTrade.status,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def open_trade_status_counts(db: AsyncSession, exchange: str) -> Dict[str, Any]:
+    """
+    Verifier sağlık metrikleri için tek GROUP BY sorgusu:
+    {"pending": n, "open": n, "oldest_pending_at": datetime | None}.
+    """
+    result = await db.execute(
+        select(
+            StrategyOpenTrade.status,
+            func.count(StrategyOpenTrade.id),
+            func.min(StrategyOpenTrade.timestamp),
+        )
+        .where(
+            StrategyOpenTrade.exchange == (exchange or "").strip(),
+            StrategyOpenTrade.status.in_(("pending", "open")),
+        )
+        .group_by(StrategyOpenTrade.status)
+    )
+    out: Dict[str, Any] = {"pending": 0, "open": 0, "oldest_pending_at": None}
+    for status, count, oldest in result.all():
+        out[status] = int(count or 0)
+        if status == "pending":
+            out["oldest_pending_at"] = oldest
+    return out
 
 
 # -------------------- CLOSE doğrulama / retry --------------------
@@ -528,7 +622,7 @@ async def verify_close_after_signal(
             position = None
 
         # KAPANDI mı? (one-way için net 0, hedge için kaba yaklaşım: işaret değişti ya da 0)
-        amt = Decimal(str((position or {}).get("positionAmt", 0)))
+        amt = position.amt if position is not None else Decimal("0")
         side = (open_trade.side or "").lower()
         closed = (
             (amt == 0)
@@ -537,7 +631,7 @@ async def verify_close_after_signal(
         )
 
         if closed:
-            ok = await close_open_trade_and_record(db, open_trade, position or {})
+            ok = await close_open_trade_and_record(db, open_trade, position)
             if ok:
                 return True
             LOGGER.error(
@@ -594,9 +688,9 @@ async def insert_strategy_trade_from_open(
         timestamp=datetime.utcnow(),
         exchange=signal_data.exchange,
         fund_manager_id=signal_data.fund_manager_id,
-        response_data=order_response.get("data", {}),
     )
     db.add(trade)
+    audit_payloads.submit(trade.public_id, "close_order", order_response.get("data"))
 
 
 async def insert_strategy_open_trade(db: AsyncSession, open_trade: StrategyOpenTrade):
@@ -643,10 +737,10 @@ async def insert_strategy_trade(db: AsyncSession, signal_data, order_response: d
         realized_pnl=realized_pnl,
         exchange=signal_data.exchange,
         fund_manager_id=signal_data.fund_manager_id,
-        response_data=order_response.get("data", {}),
         timestamp=datetime.utcnow(),
     )
     db.add(trade)
+    audit_payloads.submit(trade.public_id, "close_order", order_response.get("data"))
 
 
 async def get_open_trade_by_symbol_and_exchange(
@@ -662,23 +756,112 @@ async def get_open_trade_by_symbol_and_exchange(
     return result.scalar_one_or_none()
 
 
+async def _delete_open_trades(db: AsyncSession, *conds: ColumnElement[bool]) -> None:
+    """
+    Açılış satırlarını bağlı kapanışlarıyla (strategy_trades) birlikte siler;
+    history ayrımıyla kaldırılan FK'nın ON DELETE CASCADE'ini uygulama
+    katmanında sürdürür (tetikleyicisiz DB'lerde de yetim kapanış kalmaz).
+    """
+    ids = select(StrategyOpenTrade.public_id).where(*conds)
+    await db.execute(
+        delete(StrategyTrade)
+        .where(StrategyTrade.open_trade_public_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(StrategyOpenTrade).where(*conds))
+    await db.commit()
+
+
 async def delete_open_trade_by_id(db: AsyncSession, trade_id: str):
     # query = delete(StrategyOpenTrade).where(StrategyOpenTrade.id == trade_id)
-    query = delete(StrategyOpenTrade).where(
-        cast(ColumnElement[bool], StrategyOpenTrade.id == trade_id)
+    await _delete_open_trades(
+        db, cast(ColumnElement[bool], StrategyOpenTrade.id == trade_id)
     )
-    await db.execute(query)
-    await db.commit()
 
 
 async def delete_strategy_open_trade(db: AsyncSession, symbol: str, exchange: str):
     """
-    Belirtilen sembol ve borsaya ait açık pozisyon kaydını siler.
+    Belirtilen sembol ve borsaya ait açık pozisyon kaydını (ve kapanışlarını) siler.
     """
-    query = delete(StrategyOpenTrade)
-    query = query.where(cast(ColumnElement[bool], StrategyOpenTrade.symbol == symbol))
-    query = query.where(
-        cast(ColumnElement[bool], StrategyOpenTrade.exchange == exchange)
+    await _delete_open_trades(
+        db,
+        cast(ColumnElement[bool], StrategyOpenTrade.symbol == symbol),
+        cast(ColumnElement[bool], StrategyOpenTrade.exchange == exchange),
     )
-    await db.execute(query)
-    await db.commit()
+
+
+# -------------------- Sıcak/soğuk ayrımı --------------------
+ARCHIVED_OPEN_TRADE_STATUSES = ("closed", "failed")
+
+
+async def archive_open_trades(
+    db: AsyncSession,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: int = 50,
+) -> int:
+    """
+    ``retention_days``'ten eski 'closed'/'failed' strategy_open_trades satırlarını
+    aynı id/public_id ile strategy_open_trades_history'ye taşır; sıcak tabloda
+    yalnızca canlı ve yakın tarihli pozisyonlar kalır (verifier/merge sorguları).
+
+    Son kontrolü (last_checked_at) ya da kapanışı eşikten yeni olan satırlara
+    dokunulmaz. Her parti INSERT … SELECT + DELETE olarak tek transaction'dır:
+    strategy_trades.open_trade_public_id her an iki tablodan birinde bulunur.
+    Dönüş: taşınan satır sayısı (retention 0 → kapalı, 0 döner).
+    """
+    if retention_days is None:
+        retention_days = settings.OPEN_TRADE_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.OPEN_TRADE_ARCHIVE_BATCH
+    if int(retention_days) <= 0:
+        return 0
+    # DATETIME sütunları naive UTC tutar
+    cutoff = datetime.utcnow() - timedelta(days=int(retention_days))
+
+    sot = StrategyOpenTrade
+    q = (
+        select(sot.id)
+        .where(sot.status.in_(ARCHIVED_OPEN_TRADE_STATUSES))
+        .where(sot.timestamp < cutoff)
+        .where(or_(sot.last_checked_at.is_(None), sot.last_checked_at < cutoff))
+        .where(
+            ~exists().where(
+                StrategyTrade.open_trade_public_id == sot.public_id,
+                StrategyTrade.timestamp >= cutoff,
+            )
+        )
+        .order_by(sot.id)
+        .limit(max(1, int(batch_size)))
+    )
+    columns = [c.name for c in sot.__table__.columns]
+    moved = 0
+    for _ in range(max(1, max_batches)):
+        try:
+            ids = list((await db.execute(q)).scalars().all())
+            if not ids:
+                break
+            # Satır DB içinde kopyalanır (Python'a çekilmez)
+            await db.execute(
+                insert(StrategyOpenTradeHistory).from_select(
+                    columns,
+                    select(*(sot.__table__.c[name] for name in columns)).where(
+                        sot.id.in_(ids)
+                    ),
+                )
+            )
+            await db.execute(
+                delete(sot)
+                .where(sot.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    if moved:
+        LOGGER.info("[open_trades] archived %d rows older than %s", moved, cutoff)
+    return moved
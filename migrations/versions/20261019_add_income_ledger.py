@@ -0,0 +1,89 @@
+"""income_ledger + income_sync_state (yerel gelir defteri, artımlı senkron)
+
+Revision ID: 20261019_add_income_ledger
+Revises: 20250821_enforce_positive_open_trade_insert
+Create Date: 2026-10-19
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# Alembic IDs
+revision: str = "20261019_add_income_ledger"
+down_revision: Union[str, Sequence[str], None] = (
+    "20250821_enforce_positive_open_trade_insert"
+)
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "income_ledger",
+        sa.Column(
+            "id", mysql.BIGINT(unsigned=True), primary_key=True, autoincrement=True
+        ),
+        sa.Column("exchange", sa.String(64), nullable=False),
+        sa.Column("symbol", sa.String(32), nullable=False, server_default=""),
+        sa.Column("income_type", sa.String(32), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 8), nullable=False),
+        sa.Column("asset", sa.String(16), nullable=False, server_default=""),
+        sa.Column("tran_id", sa.String(64), nullable=False),
+        sa.Column("event_time", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.UniqueConstraint(
+            "exchange",
+            "income_type",
+            "tran_id",
+            "symbol",
+            name="uq_income_ledger_exchange_type_tran_symbol",
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    # Net PnL / breakdown: exchange + symbol + tip + zaman aralığı toplamları
+    op.create_index(
+        "ix_income_ledger_exchange_symbol_type_time",
+        "income_ledger",
+        ["exchange", "symbol", "income_type", "event_time"],
+    )
+    # Sembolsüz (tüm hesap) toplamlar
+    op.create_index(
+        "ix_income_ledger_exchange_time",
+        "income_ledger",
+        ["exchange", "event_time"],
+    )
+
+    op.create_table(
+        "income_sync_state",
+        sa.Column("exchange", sa.String(64), primary_key=True),
+        sa.Column("watermark_ms", sa.BigInteger(), nullable=False),
+        sa.Column("backfilled_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("income_sync_state")
+    op.drop_index("ix_income_ledger_exchange_time", table_name="income_ledger")
+    op.drop_index(
+        "ix_income_ledger_exchange_symbol_type_time", table_name="income_ledger"
+    )
+    op.drop_table("income_ledger")
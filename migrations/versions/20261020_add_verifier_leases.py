@@ -0,0 +1,39 @@
+"""verifier_leases (çok süreçli dağıtımda verifier lider kirası)
+
+Revision ID: 20261020_add_verifier_leases
+Revises: 20261019_add_income_ledger
+Create Date: 2026-10-20
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261020_add_verifier_leases"
+down_revision: Union[str, Sequence[str], None] = "20261019_add_income_ledger"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "verifier_leases",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("holder", sa.String(128), nullable=False),
+        sa.Column("lease_until_ms", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("verifier_leases")
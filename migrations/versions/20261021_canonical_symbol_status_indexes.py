@@ -0,0 +1,42 @@
+"""strategy_* symbol/status kanonik biçim + açık işlem bileşik indeksi
+
+Sorgular artık UPPER(symbol) / LOWER(status) sarmadan eşitlik kullanıyor;
+mevcut satırlar kanonik biçime çekilir ve (exchange, status, symbol, side,
+fund_manager_id) indeksi merge adayı / close lookup / panel sorgularını
+index seek'e çevirir.
+
+Revision ID: 20261021_canonical_symbol_status_indexes
+Revises: 20261020_add_verifier_leases
+Create Date: 2026-10-21
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Alembic IDs
+revision: str = "20261021_canonical_symbol_status_indexes"
+down_revision: Union[str, Sequence[str], None] = "20261020_add_verifier_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Koşulsuz UPDATE: MySQL'in *_ci collation'ında "<>" büyük/küçük harf
+    # farkını görmez; tek seferlik normalizasyon
+    op.execute(
+        "UPDATE strategy_open_trades "
+        "SET symbol = UPPER(TRIM(symbol)), status = LOWER(TRIM(status))"
+    )
+    op.execute("UPDATE strategy_trades SET symbol = UPPER(TRIM(symbol))")
+    op.create_index(
+        "ix_sot_exchange_status_symbol_side_fm",
+        "strategy_open_trades",
+        ["exchange", "status", "symbol", "side", "fund_manager_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_sot_exchange_status_symbol_side_fm", table_name="strategy_open_trades"
+    )
@@ -0,0 +1,40 @@
+"""strategy_trades (exchange, symbol, timestamp) ve (exchange, timestamp) indeksleri
+
+Panel recent-trades / quick-balance / overview (7g PnL, 30g winrate) /
+netpnl sorguları exchange(+symbol) filtreleyip timestamp'e göre sıralıyor ya
+da aralık topluyor; bu indekslerle full scan yerine range scan.
+
+Revision ID: 20261022_strategy_trades_time_indexes
+Revises: 20261021_canonical_symbol_status_indexes
+Create Date: 2026-10-22
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Alembic IDs
+revision: str = "20261022_strategy_trades_time_indexes"
+down_revision: Union[str, Sequence[str], None] = (
+    "20261021_canonical_symbol_status_indexes"
+)
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_st_exchange_symbol_time",
+        "strategy_trades",
+        ["exchange", "symbol", "timestamp"],
+    )
+    op.create_index(
+        "ix_st_exchange_time",
+        "strategy_trades",
+        ["exchange", "timestamp"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_st_exchange_time", table_name="strategy_trades")
+    op.drop_index("ix_st_exchange_symbol_time", table_name="strategy_trades")
@@ -0,0 +1,70 @@
+"""daily_pnl rollup (exchange, fund_manager_id, symbol, day)
+
+Kapanışta aynı transaction'da artırılır; mevcut strategy_trades burada bir kez
+toplanır. Ücretler (income ledger) için: python -m scripts.rebuild_daily_pnl
+
+Revision ID: 20261023_add_daily_pnl
+Revises: 20261022_strategy_trades_time_indexes
+Create Date: 2026-10-23
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261023_add_daily_pnl"
+down_revision: Union[str, Sequence[str], None] = "20261022_strategy_trades_time_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_pnl",
+        sa.Column("exchange", sa.String(64), primary_key=True),
+        sa.Column("fund_manager_id", sa.String(64), primary_key=True),
+        sa.Column("symbol", sa.String(32), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column(
+            "realized_pnl",
+            sa.Numeric(18, 8),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "trade_count", sa.Integer(), nullable=False, server_default=sa.text("0")
+        ),
+        sa.Column("wins", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "fees", sa.Numeric(18, 8), nullable=False, server_default=sa.text("0")
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index("ix_daily_pnl_exchange_day", "daily_pnl", ["exchange", "day"])
+    op.execute(
+        """
+        INSERT INTO daily_pnl
+            (exchange, fund_manager_id, symbol, day,
+             realized_pnl, trade_count, wins, fees)
+        SELECT exchange, fund_manager_id, symbol, DATE(timestamp),
+               SUM(realized_pnl), COUNT(*),
+               SUM(CASE WHEN realized_pnl > 0 THEN 1 ELSE 0 END), 0
+        FROM strategy_trades
+        GROUP BY exchange, fund_manager_id, symbol, DATE(timestamp)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_pnl_exchange_day", table_name="daily_pnl")
+    op.drop_table("daily_pnl")
@@ -0,0 +1,92 @@
+"""raw_signals: çıkarılmış symbol/mode/side/exchange sütunları + arşiv tablosu
+
+Panel /signals filtresi payload JSON'u yerine indeksli sütunlarda çalışır;
+mevcut satırlar payload'dan doldurulur. RAW_SIGNAL_RETENTION_DAYS'i aşan ve
+işleme bağlı olmayan sinyaller raw_signals_archive'a (zlib payload) taşınır.
+
+Revision ID: 20261024_raw_signals_columns_archive
+Revises: 20261023_add_daily_pnl
+Create Date: 2026-10-24
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261024_raw_signals_columns_archive"
+down_revision: Union[str, Sequence[str], None] = "20261023_add_daily_pnl"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (("symbol", 32), ("mode", 8), ("side", 16), ("exchange", 64))
+
+
+def upgrade() -> None:
+    for name, length in _COLUMNS:
+        op.add_column("raw_signals", sa.Column(name, sa.String(length), nullable=True))
+
+    if op.get_bind().dialect.name == "mysql":
+
+        def extract(key: str) -> str:
+            return f"JSON_UNQUOTE(JSON_EXTRACT(payload, '$.{key}'))"
+
+    else:
+
+        def extract(key: str) -> str:
+            return f"json_extract(payload, '$.{key}')"
+
+    op.execute(
+        "UPDATE raw_signals SET "
+        f"symbol = NULLIF(UPPER(TRIM({extract('symbol')})), ''), "
+        f"mode = NULLIF(TRIM({extract('mode')}), ''), "
+        f"side = NULLIF(TRIM({extract('side')}), ''), "
+        f"exchange = NULLIF(TRIM({extract('exchange')}), '')"
+    )
+    op.create_index("ix_raw_signals_received_at", "raw_signals", ["received_at"])
+    op.create_index(
+        "ix_raw_signals_symbol_received_at", "raw_signals", ["symbol", "received_at"]
+    )
+    op.create_index(
+        "ix_raw_signals_exchange_received_at",
+        "raw_signals",
+        ["exchange", "received_at"],
+    )
+
+    op.create_table(
+        "raw_signals_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("fund_manager_id", sa.String(64), nullable=False),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+        *(
+            sa.Column(name, sa.String(length), nullable=True)
+            for name, length in _COLUMNS
+        ),
+        sa.Column("payload_z", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+        mysql_row_format="COMPRESSED",
+    )
+    op.create_index(
+        "ix_raw_signals_archive_received_at", "raw_signals_archive", ["received_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_raw_signals_archive_received_at", table_name="raw_signals_archive"
+    )
+    op.drop_table("raw_signals_archive")
+    op.drop_index("ix_raw_signals_exchange_received_at", table_name="raw_signals")
+    op.drop_index("ix_raw_signals_symbol_received_at", table_name="raw_signals")
+    op.drop_index("ix_raw_signals_received_at", table_name="raw_signals")
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column("raw_signals", name)
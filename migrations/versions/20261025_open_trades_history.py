@@ -0,0 +1,214 @@
+"""strategy_open_trades sıcak/soğuk ayrımı: history tablosu + birleşik görünüm
+
+Eşiği aşmış 'closed'/'failed' satırlar aynı id/public_id ile
+strategy_open_trades_history'ye taşınır (crud.trade.archive_open_trades).
+strategy_trades.open_trade_public_id artık iki tablodan birine işaret eder:
+tek tabloya bağlı FK kaldırılır, MySQL'de yerine BEFORE INSERT tetikleyicisi
+iki tabloda da varlığı denetler. FK'nın ON DELETE CASCADE'i iki tablodaki
+BEFORE DELETE tetikleyicileriyle (MySQL ve SQLite) sürer: silinen açılışın
+kapanışları da silinir; satır diğer tabloya taşınmışsa (arşiv) dokunulmaz.
+``strategy_open_trades_all`` görünümü denetim sorguları için iki tabloyu
+birleştirir.
+
+Revision ID: 20261025_open_trades_history
+Revises: 20261024_raw_signals_columns_archive
+Create Date: 2026-10-25
+"""
+
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261025_open_trades_history"
+down_revision: Union[str, Sequence[str], None] = "20261024_raw_signals_columns_archive"
+branch_labels = None
+depends_on = None
+
+_FK_NAME = "fk_strategy_trades_open_trade_public_id"
+
+_COLUMNS = (
+    "id, public_id, raw_signal_id, fund_manager_id, symbol, side, entry_price, "
+    "position_size, leverage, order_type, timestamp, unrealized_pnl, exchange, "
+    "exchange_order_id, response_data, status, exchange_verified, "
+    "verification_attempts, last_checked_at, confirmed_at"
+)
+
+# (tetikleyici, silinen tablo, taşınma hedefi olan diğer tablo)
+_DELETE_TRIGGERS = (
+    (
+        "trg_strategy_open_trades_bd_closes",
+        "strategy_open_trades",
+        "strategy_open_trades_history",
+    ),
+    (
+        "trg_strategy_open_trades_history_bd_closes",
+        "strategy_open_trades_history",
+        "strategy_open_trades",
+    ),
+)
+
+
+def _delete_trigger_sql(dialect: str) -> List[str]:
+    """
+    Açılış silinince bağlı strategy_trades satırlarını da silen tetikleyiciler.
+    Aynı public_id diğer tabloda varsa satır taşınıyordur (archive_open_trades
+    önce INSERT, sonra DELETE yapar): kapanışlar korunur. MySQL tetikleyicileri
+    FK cascade'lerinde (raw_signals silinmesi) çalışmaz; archive_raw_signals
+    işleme bağlı sinyalleri zaten taşımaz.
+    """
+    out = []
+    for name, table, other in _DELETE_TRIGGERS:
+        moved = f"SELECT 1 FROM {other} WHERE public_id = OLD.public_id"
+        cascade = (
+            "DELETE FROM strategy_trades WHERE open_trade_public_id = OLD.public_id;"
+        )
+        if dialect == "mysql":
+            out.append(
+                f"CREATE TRIGGER {name} BEFORE DELETE ON {table} FOR EACH ROW "
+                f"BEGIN IF NOT EXISTS ({moved}) THEN {cascade} END IF; END"
+            )
+        elif dialect == "sqlite":
+            out.append(
+                f"CREATE TRIGGER {name} BEFORE DELETE ON {table} FOR EACH ROW "
+                f"WHEN NOT EXISTS ({moved}) BEGIN {cascade} END"
+            )
+    return out
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.create_table(
+        "strategy_open_trades_history",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("public_id", sa.String(36), nullable=False),
+        sa.Column(
+            "raw_signal_id",
+            sa.BigInteger(),
+            sa.ForeignKey("raw_signals.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("fund_manager_id", sa.String(64), nullable=False),
+        sa.Column("symbol", sa.String(32), nullable=False),
+        sa.Column(
+            "side", sa.Enum("long", "short", name="open_side_enum"), nullable=False
+        ),
+        sa.Column("entry_price", sa.Numeric(18, 8), nullable=False),
+        sa.Column("position_size", sa.Numeric(18, 8), nullable=False),
+        sa.Column("leverage", sa.Integer(), nullable=False),
+        sa.Column("order_type", sa.String(16), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("unrealized_pnl", sa.Numeric(18, 8), nullable=False),
+        sa.Column("exchange", sa.String(64), nullable=False),
+        sa.Column("exchange_order_id", sa.String(100), nullable=False),
+        sa.Column("response_data", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("exchange_verified", sa.Boolean(), nullable=False),
+        sa.Column("verification_attempts", sa.Integer(), nullable=False),
+        sa.Column("last_checked_at", sa.DateTime(), nullable=True),
+        sa.Column("confirmed_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index(
+        "ix_strategy_open_trades_history_public_id",
+        "strategy_open_trades_history",
+        ["public_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_strategy_open_trades_history_raw_signal_id",
+        "strategy_open_trades_history",
+        ["raw_signal_id"],
+    )
+    op.create_index(
+        "ix_soth_exchange_time",
+        "strategy_open_trades_history",
+        ["exchange", "timestamp"],
+    )
+    op.create_index(
+        "ix_soth_symbol_time", "strategy_open_trades_history", ["symbol", "timestamp"]
+    )
+
+    # Tek tabloya bağlı FK taşımayı engeller; adı alembic autogenerate'ten
+    # (None → strategy_trades_ibfk_N) geldiği için inspector ile bulunur.
+    # SQLite FK'ları isimsizdir ve varsayılan olarak denetlenmez.
+    for fk in sa.inspect(bind).get_foreign_keys("strategy_trades"):
+        if fk.get("referred_table") == "strategy_open_trades" and fk.get("name"):
+            op.drop_constraint(fk["name"], "strategy_trades", type_="foreignkey")
+
+    if bind.dialect.name == "mysql":
+        op.execute("DROP TRIGGER IF EXISTS trg_strategy_trades_bi_open_trade;")
+        op.execute(
+            """
+        CREATE TRIGGER trg_strategy_trades_bi_open_trade
+        BEFORE INSERT ON strategy_trades
+        FOR EACH ROW
+        BEGIN
+          IF NOT EXISTS (
+               SELECT 1 FROM strategy_open_trades
+                WHERE public_id = NEW.open_trade_public_id)
+             AND NOT EXISTS (
+               SELECT 1 FROM strategy_open_trades_history
+                WHERE public_id = NEW.open_trade_public_id) THEN
+            SIGNAL SQLSTATE '45000'
+              SET MESSAGE_TEXT = 'open_trade_public_id references no open trade';
+          END IF;
+        END;
+        """
+        )
+
+    for sql in _delete_trigger_sql(bind.dialect.name):
+        op.execute(sql)
+
+    op.execute(
+        "CREATE VIEW strategy_open_trades_all AS "
+        f"SELECT {_COLUMNS}, NULL AS archived_at FROM strategy_open_trades "
+        "UNION ALL "
+        f"SELECT {_COLUMNS}, archived_at FROM strategy_open_trades_history"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute("DROP VIEW IF EXISTS strategy_open_trades_all")
+    if _delete_trigger_sql(bind.dialect.name):
+        for name, _, _ in _DELETE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    if bind.dialect.name == "mysql":
+        op.execute("DROP TRIGGER IF EXISTS trg_strategy_trades_bi_open_trade;")
+
+    # Arşivlenmiş satırlar sıcak tabloya geri döner (FK yeniden kurulabilsin)
+    op.execute(
+        f"INSERT INTO strategy_open_trades ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM strategy_open_trades_history"
+    )
+    if bind.dialect.name != "sqlite":
+        op.create_foreign_key(
+            _FK_NAME,
+            "strategy_trades",
+            "strategy_open_trades",
+            ["open_trade_public_id"],
+            ["public_id"],
+            ondelete="CASCADE",
+        )
+
+    op.drop_index("ix_soth_symbol_time", table_name="strategy_open_trades_history")
+    op.drop_index("ix_soth_exchange_time", table_name="strategy_open_trades_history")
+    op.drop_index(
+        "ix_strategy_open_trades_history_raw_signal_id",
+        table_name="strategy_open_trades_history",
+    )
+    op.drop_index(
+        "ix_strategy_open_trades_history_public_id",
+        table_name="strategy_open_trades_history",
+    )
+    op.drop_table("strategy_open_trades_history")
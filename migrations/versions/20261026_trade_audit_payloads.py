@@ -0,0 +1,157 @@
+"""response_data JSON'ları sıcak işlem satırlarından trade_audit_payloads'a
+
+strategy_open_trades / strategy_open_trades_history / strategy_trades
+satırlarındaki response_data, zlib ile sıkıştırılmış olarak yan tabloya
+(kind='response_data', trade_public_id = satırın public_id'si) taşınır ve
+sütunlar kaldırılır. Yeni payload'lar app.services.audit_payloads ile
+istek yolundan sonra yazılır. strategy_open_trades_all görünümü
+response_data olmadan yeniden kurulur.
+
+Revision ID: 20261026_trade_audit_payloads
+Revises: 20261025_open_trades_history
+Create Date: 2026-10-26
+"""
+
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261026_trade_audit_payloads"
+down_revision: Union[str, Sequence[str], None] = "20261025_open_trades_history"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("strategy_open_trades", "strategy_open_trades_history", "strategy_trades")
+_KIND = "response_data"
+_BATCH = 1000
+
+_COLUMNS = (
+    "id, public_id, raw_signal_id, fund_manager_id, symbol, side, entry_price, "
+    "position_size, leverage, order_type, timestamp, unrealized_pnl, exchange, "
+    "exchange_order_id, {extra}status, exchange_verified, "
+    "verification_attempts, last_checked_at, confirmed_at"
+)
+
+
+def _create_view(with_response_data: bool) -> None:
+    cols = _COLUMNS.format(extra="response_data, " if with_response_data else "")
+    op.execute("DROP VIEW IF EXISTS strategy_open_trades_all")
+    op.execute(
+        "CREATE VIEW strategy_open_trades_all AS "
+        f"SELECT {cols}, NULL AS archived_at FROM strategy_open_trades "
+        "UNION ALL "
+        f"SELECT {cols}, archived_at FROM strategy_open_trades_history"
+    )
+
+
+def _trade_table(name: str) -> sa.Table:
+    return sa.table(
+        name,
+        sa.column("id", sa.BigInteger()),
+        sa.column("public_id", sa.String()),
+        sa.column("timestamp", sa.DateTime()),
+        sa.column("response_data", sa.JSON()),
+    )
+
+
+_audit = sa.table(
+    "trade_audit_payloads",
+    sa.column("id", sa.BigInteger()),
+    sa.column("trade_public_id", sa.String()),
+    sa.column("kind", sa.String()),
+    sa.column("payload_z", sa.LargeBinary()),
+    sa.column("created_at", sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.create_table(
+        "trade_audit_payloads",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("trade_public_id", sa.String(36), nullable=False),
+        sa.Column("kind", sa.String(32), nullable=False),
+        sa.Column("payload_z", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+        mysql_row_format="COMPRESSED",
+    )
+    op.create_index(
+        "ix_trade_audit_public_id", "trade_audit_payloads", ["trade_public_id", "id"]
+    )
+
+    # Mevcut payload'lar: id üzerinden partiler halinde sıkıştırıp taşı
+    for name in _TABLES:
+        t = _trade_table(name)
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(t.c.id, t.c.public_id, t.c.timestamp, t.c.response_data)
+                .where(t.c.id > last_id)
+                .where(t.c.response_data.isnot(None))
+                .order_by(t.c.id)
+                .limit(_BATCH)
+            ).all()
+            if not rows:
+                break
+            values = [
+                {
+                    "trade_public_id": r.public_id,
+                    "kind": _KIND,
+                    "payload_z": zlib.compress(
+                        json.dumps(r.response_data, separators=(",", ":")).encode(
+                            "utf-8"
+                        )
+                    ),
+                    "created_at": r.timestamp,
+                }
+                for r in rows
+                if r.response_data not in (None, {}, [])
+            ]
+            if values:
+                bind.execute(sa.insert(_audit), values)
+            last_id = rows[-1].id
+
+    op.execute("DROP VIEW IF EXISTS strategy_open_trades_all")
+    for name in _TABLES:
+        with op.batch_alter_table(name) as batch:
+            batch.drop_column("response_data")
+    _create_view(with_response_data=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute("DROP VIEW IF EXISTS strategy_open_trades_all")
+    for name in _TABLES:
+        op.add_column(name, sa.Column("response_data", sa.JSON(), nullable=True))
+
+    # Yalnızca taşınmış (kind='response_data') payload'lar geri yazılır
+    rows = bind.execute(
+        sa.select(_audit.c.trade_public_id, _audit.c.payload_z).where(
+            _audit.c.kind == _KIND
+        )
+    ).all()
+    for r in rows:
+        payload = json.loads(zlib.decompress(r.payload_z).decode("utf-8"))
+        for name in _TABLES:
+            t = _trade_table(name)
+            bind.execute(
+                sa.update(t)
+                .where(t.c.public_id == r.trade_public_id)
+                .values(response_data=payload)
+            )
+    _create_view(with_response_data=True)
+
+    op.drop_index("ix_trade_audit_public_id", table_name="trade_audit_payloads")
+    op.drop_table("trade_audit_payloads")
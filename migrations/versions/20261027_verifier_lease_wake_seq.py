@@ -0,0 +1,34 @@
+"""verifier_leases.wake_seq (süreçler arası verifier uyandırma)
+
+Sinyali işleyen süreç borsanın kira satırında wake_seq'i artırır; kirayı
+tutan (verifier koşan) süreç uykusunda bu değeri yoklar ve değişince erken
+uyanır.
+
+Revision ID: 20261027_verifier_lease_wake_seq
+Revises: 20261026_trade_audit_payloads
+Create Date: 2026-10-27
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic IDs
+revision: str = "20261027_verifier_lease_wake_seq"
+down_revision: Union[str, Sequence[str], None] = "20261026_trade_audit_payloads"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "verifier_leases",
+        sa.Column(
+            "wake_seq", sa.BigInteger(), nullable=False, server_default=sa.text("0")
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("verifier_leases", "wake_seq")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# scripts/bench_panel_reads.py
+# Python 3.9
+"""
+Panel okuma uçlarının (open-trades, recent-trades, markers) istek başına CPU
+süresi ve bellek tahsisi: eski yol (ORM varlığı + pydantic model + FastAPI
+response_model doğrulaması) ile yalın yol (Core satırı → dict → JSONResponse).
+
+Bellek içi SQLite, varsayılan 1000 satır; sonuçlar DB sürücüsünü de içerir.
+
+    python -m scripts.bench_panel_reads
+    python -m scripts.bench_panel_reads --rows 5000 --repeat 20
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import parse_obj_as
+from sqlalchemy import BigInteger, Integer, MetaData, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import (
+    RawSignal,
+    StrategyOpenTrade,
+    StrategyOpenTradeHistory,
+    StrategyTrade,
+)
+from app.routers import panel_data
+from app.services import chart_markers
+from app.services.entry_lines_helpers import calculate_entry_lines
+
+EXCHANGE = "bench"
+T0 = datetime(2026, 1, 1)
+
+
+async def _seed(rows: int):
+    md = MetaData()
+    for m in (RawSignal, StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade):
+        t = m.__table__.to_metadata(md)
+        for c in t.primary_key.columns:
+            # SQLite yalnızca INTEGER PK'yı otomatik artırır
+            if isinstance(c.type, BigInteger):
+                c.type = Integer()
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(md.create_all)
+    sm = async_sessionmaker(engine, expire_on_commit=False)
+    async with sm() as s:
+        s.add(RawSignal(id=1, payload={}, fund_manager_id="fm", received_at=T0))
+        for i in range(1, rows + 1):
+            side = "long" if i % 2 else "short"
+            common = dict(
+                raw_signal_id=1,
+                fund_manager_id="fm",
+                symbol="BTCUSDT",
+                side=side,
+                entry_price=Decimal("64000.5") + i,
+                position_size=Decimal("0.015"),
+                leverage=10,
+                order_type="market",
+                exchange=EXCHANGE,
+            )
+            s.add(
+                StrategyOpenTrade(
+                    id=i,
+                    public_id=f"o-{i}",
+                    timestamp=T0 + timedelta(minutes=i),
+                    exchange_order_id=f"x-{i}",
+                    status="open",
+                    **common,
+                )
+            )
+            s.add(
+                StrategyTrade(
+                    id=i,
+                    public_id=f"t-{i}",
+                    open_trade_public_id=f"o-{i}",
+                    exit_price=Decimal("64100.25") + i,
+                    realized_pnl=Decimal("1.2345"),
+                    timestamp=T0 + timedelta(minutes=i, seconds=30),
+                    **common,
+                )
+            )
+        await s.commit()
+    return engine, sm
+
+
+# --- Eski yol (değişiklik öncesi uçların birebir eşdeğeri) ---------------------
+
+
+def _validate(model_type, value):
+    # FastAPI serialize_response: response_model doğrulaması + jsonable_encoder
+    return JSONResponse(
+        jsonable_encoder(parse_obj_as(model_type, jsonable_encoder(value)))
+    )
+
+
+async def legacy_recent_trades(db, limit):
+    q = (
+        select(StrategyTrade)
+        .where(StrategyTrade.exchange == EXCHANGE)
+        .order_by(StrategyTrade.timestamp.desc(), StrategyTrade.id.desc())
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(q)).scalars().all()[:limit]
+    out = [
+        panel_data.TradeOut(
+            public_id=t.public_id,
+            symbol=t.symbol,
+            side=str(t.side).lower(),
+            entry_price=panel_data._f(t.entry_price),
+            exit_price=panel_data._f(t.exit_price),
+            position_size=panel_data._f(t.position_size),
+            leverage=int(t.leverage),
+            realized_pnl=panel_data._f(t.realized_pnl),
+            exchange=t.exchange,
+            order_type=t.order_type,
+            timestamp=t.timestamp,
+            open_trade_public_id=t.open_trade_public_id,
+        )
+        for t in rows
+    ]
+    return _validate(List[panel_data.TradeOut], out)
+
+
+async def legacy_open_trades(db):
+    q = (
+        select(StrategyOpenTrade)
+        .where(StrategyOpenTrade.status == "open")
+        .where(StrategyOpenTrade.exchange == EXCHANGE)
+        .order_by(StrategyOpenTrade.timestamp.desc())
+    )
+    rows = (await db.execute(q)).scalars().all()
+    out = []
+    for r in rows:
+        pos_text = None
+        try:
+            utils = importlib.import_module(f"app.exchanges.{r.exchange}.utils")
+            fn = getattr(utils, "format_quantity_text", None)
+            if fn:
+                pos_text = (
+                    await fn(r.symbol, float(r.position_size))
+                    if inspect.iscoroutinefunction(fn)
+                    else fn(r.symbol, float(r.position_size))
+                )
+        except (ImportError, AttributeError, ValueError, TypeError):
+            pos_text = None
+        out.append(
+            panel_data.OpenTradeOut(
+                public_id=r.public_id,
+                symbol=r.symbol,
+                side=str(r.side).lower(),
+                entry_price=panel_data._f(r.entry_price),
+                position_size=panel_data._f(r.position_size),
+                position_size_text=pos_text,
+                leverage=int(r.leverage),
+                exchange=r.exchange,
+                order_type=r.order_type,
+                timestamp=r.timestamp,
+                exchange_order_id=r.exchange_order_id,
+                status=str(r.status),
+            )
+        )
+    lines = calculate_entry_lines(rows, symbol=None)
+    return _validate(
+        panel_data.OpenTradesResponse,
+        panel_data.OpenTradesResponse(
+            items=out, entry_lines=panel_data.EntryLinesOut(**lines)
+        ),
+    )
+
+
+async def legacy_markers(db, limit):
+    markers, _ = await chart_markers.get_markers(db, EXCHANGE, None, 60, limit=limit)
+    return _validate(List[panel_data.Marker], markers)
+
+
+# --- Ölçüm --------------------------------------------------------------------
+
+
+async def _measure(sm, make_call, repeat):
+    """(istek başına CPU ms, tahsis edilen blok sayısı, tepe KiB)."""
+    async with sm() as db:
+        await make_call(db)  # ısınma (import/önbellek/derlenmiş SQL)
+        cpu0 = time.process_time()
+        for _ in range(repeat):
+            await make_call(db)
+            db.expunge_all()  # identity map birikmesin
+        cpu_ms = (time.process_time() - cpu0) * 1000.0 / repeat
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        resp = await make_call(db)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        db.expunge_all()
+    diff = after.compare_to(before, "filename")
+    blocks = sum(max(d.count_diff, 0) for d in diff)
+    return cpu_ms, blocks, peak / 1024.0, len(resp.body)
+
+
+async def _run(rows: int, repeat: int):
+    engine, sm = await _seed(rows)
+    limit = min(rows, 1000)
+    cases = [
+        (
+            "open-trades",
+            legacy_open_trades,
+            lambda db: panel_data.open_trades_public(
+                symbol=None, exchange=EXCHANGE, db=db
+            ),
+        ),
+        (
+            "recent-trades",
+            lambda db: legacy_recent_trades(db, limit),
+            lambda db: panel_data.recent_trades_public(
+                symbol=None, exchange=EXCHANGE, limit=limit, cursor=None, db=db
+            ),
+        ),
+        (
+            "markers",
+            lambda db: legacy_markers(db, limit),
+            lambda db: panel_data.markers_public(
+                symbol=None,
+                tf="1m",
+                exchange=EXCHANGE,
+                since_epoch=None,
+                until_epoch=None,
+                limit=limit,
+                cursor=None,
+                db=db,
+            ),
+        ),
+    ]
+    print(f"rows={rows} repeat={repeat}")
+    print(
+        f"{'endpoint':<14} {'path':<7} {'cpu ms/req':>11} {'alloc blocks':>13}"
+        f" {'peak KiB':>10} {'body B':>9}"
+    )
+    for name, legacy, lean in cases:
+        results = {}
+        for label, call in (("legacy", legacy), ("lean", lean)):
+            results[label] = await _measure(sm, call, repeat)
+            cpu, blocks, peak, body = results[label]
+            print(
+                f"{name:<14} {label:<7} {cpu:>11.2f} {blocks:>13d}"
+                f" {peak:>10.0f} {body:>9d}"
+            )
+        speedup = results["legacy"][0] / max(results["lean"][0], 1e-9)
+        print(f"{name:<14} {'speedup':<7} {speedup:>10.1f}x")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark panel read endpoints")
+    parser.add_argument("--rows", type=int, default=1000, help="Satır sayısı")
+    parser.add_argument("--repeat", type=int, default=10, help="Ölçüm tekrarı")
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# scripts/rebuild_daily_pnl.py
+# Python 3.9
+"""
+daily_pnl rollup'ını strategy_trades + income_ledger'dan yeniden kurar.
+
+    python -m scripts.rebuild_daily_pnl                 # tüm borsalar
+    python -m scripts.rebuild_daily_pnl --exchange binance_futures_testnet
+"""
+import argparse
+import asyncio
+
+from app.database import async_session
+from crud.daily_pnl import rebuild
+
+
+async def _run(exchange):
+    async with async_session() as db:
+        return await rebuild(db, exchange=exchange)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily_pnl rollup")
+    parser.add_argument("--exchange", default=None, help="Yalnızca bu borsa")
+    args = parser.parse_args()
+    n = asyncio.run(_run(args.exchange))
+    print(f"daily_pnl rebuilt: {n} rows ({args.exchange or 'all exchanges'})")
+
+
+if __name__ == "__main__":
+    main()
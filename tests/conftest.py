@@ -1,5 +1,10 @@
 import os
 
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import BigInteger, Integer, MetaData
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
 os.environ.setdefault("DB_URL", "sqlite+aiosqlite:///:memory:")
 os.environ.setdefault("ACTIVE_EXCHANGES", "binance_futures_testnet")
 os.environ.setdefault("DEFAULT_EXCHANGE", "binance_futures_testnet")
@@ -9,3 +14,38 @@ os.environ.setdefault("SESSION_SECRET", "dummy-session")
 os.environ.setdefault(
     "GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/google/callback"
 )
+
+
+@pytest.fixture
+def sqlite_session(event_loop):
+    """
+    Bellek içi SQLite test DB'si fabrikası:
+    ``engine, sm = await sqlite_session([RawSignal, StrategyTrade])``.
+
+    tables: model sınıfları ya da Table'lar (boş → tablo oluşturulmaz).
+    integer_pks=True: tabloların kopyasında BIGINT PK'ler INTEGER olur (SQLite
+    yalnızca INTEGER PRIMARY KEY'de rowid autoincrement yapar).
+    Engine'ler test sonunda kapatılır.
+    """
+    engines = []
+
+    async def _make(tables=(), integer_pks=False):
+        tables = [getattr(t, "__table__", t) for t in tables]
+        engine = create_async_engine("sqlite+aiosqlite://")
+        engines.append(engine)
+        if tables:
+            md = tables[0].metadata
+            if integer_pks:
+                md = MetaData()
+                tables = [t.to_metadata(md) for t in tables]
+                for t in tables:
+                    for c in t.primary_key.columns:
+                        if isinstance(c.type, BigInteger):
+                            c.type = Integer()
+            async with engine.begin() as conn:
+                await conn.run_sync(md.create_all, tables=tables)
+        return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+    yield _make
+    for engine in engines:
+        event_loop.run_until_complete(engine.dispose())
@@ -0,0 +1,108 @@
+# tests/test_audit_payloads.py
+# Python 3.9
+
+from datetime import datetime
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import func, select
+
+T0 = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def test_trade_rows_carry_no_json_blob():
+    from app.models import (
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+        TradeAuditPayload,
+    )
+
+    for m in (StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade):
+        assert "response_data" not in m.__table__.c
+    assert TradeAuditPayload.__table__.kwargs["mysql_row_format"] == "COMPRESSED"
+
+
+@pytest.mark.asyncio
+async def test_submit_writes_compressed_payloads_off_path(monkeypatch, sqlite_session):
+    from app.models import RawSignal, StrategyTrade, TradeAuditPayload
+    from app.routers import admin_audit
+    from app.services import audit_payloads
+
+    _, sm = await sqlite_session(
+        [RawSignal, StrategyTrade, TradeAuditPayload], integer_pks=True
+    )
+    monkeypatch.setattr(audit_payloads, "async_session", sm)
+
+    snapshot = {"amt": Decimal("0"), "entry_price": Decimal("64000.5"), "side": "BOTH"}
+    audit_payloads.submit("o-1", "open_order", {"orderId": 7, "status": "NEW"})
+    audit_payloads.submit("t-1", "position_snapshot", snapshot)
+    audit_payloads.submit("t-1", "close_order", {})  # boş → yazılmaz
+    audit_payloads.submit(None, "open_order", {"orderId": 8})
+    # submit bloklamaz: yazım yazıcı görevde
+    assert audit_payloads.pending() == 2
+    await audit_payloads.flush()
+    assert audit_payloads.pending() == 0
+
+    async with sm() as s:
+        assert await s.scalar(select(func.count()).select_from(TradeAuditPayload)) == 2
+        blob = await s.scalar(
+            select(TradeAuditPayload.payload_z).where(
+                TradeAuditPayload.kind == "position_snapshot"
+            )
+        )
+        assert audit_payloads.unpack(blob) == {
+            "amt": 0.0,
+            "entry_price": 64000.5,
+            "side": "BOTH",
+        }
+
+        s.add(RawSignal(id=1, payload={}, fund_manager_id="fm", received_at=T0))
+        s.add(
+            StrategyTrade(
+                id=1,
+                public_id="t-1",
+                raw_signal_id=1,
+                open_trade_public_id="o-1",
+                fund_manager_id="fm",
+                symbol="BTCUSDT",
+                side="long",
+                entry_price=Decimal("1"),
+                exit_price=Decimal("2"),
+                position_size=Decimal("1"),
+                leverage=1,
+                realized_pnl=Decimal("1"),
+                order_type="market",
+                timestamp=T0,
+                exchange="bn",
+            )
+        )
+        await s.commit()
+
+        # Admin görünümü: açılış ya da kapanış id'siyle bağlı payload'lar
+        for pid in ("o-1", "t-1"):
+            out = await admin_audit.trade_audit(public_id=pid, db=s)
+            assert [(p["trade_public_id"], p["kind"]) for p in out["payloads"]] == [
+                ("o-1", "open_order"),
+                ("t-1", "position_snapshot"),
+            ]
+        assert (await admin_audit.trade_audit(public_id="nope", db=s))["payloads"] == []
+
+
+@pytest.mark.asyncio
+async def test_writer_failure_does_not_raise(monkeypatch, caplog):
+    from app.services import audit_payloads
+
+    class _Broken:
+        async def __aenter__(self):
+            raise RuntimeError("db down")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(audit_payloads, "async_session", lambda: _Broken())
+    audit_payloads.submit("o-9", "open_order", {"orderId": 9})
+    await audit_payloads.flush()
+    assert audit_payloads.pending() == 0
+    assert "could not be written" in caplog.text
@@ -0,0 +1,92 @@
+# tests/test_backfill.py
+# Python 3.9
+
+import asyncio
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.exchanges.common.backfill import fetch_time_sliced, split_range
+
+
+def test_split_range_is_contiguous_and_inclusive():
+    assert split_range(0, 9, 4) == [(0, 3), (4, 7), (8, 9)]
+    assert split_range(5, 5, 10) == [(5, 5)]
+    assert split_range(10, 5, 3) == []
+
+
+class FakeSource:
+    """startTime/endTime + limit semantiği: aralıktaki ilk `limit` satır."""
+
+    def __init__(self, times, limit):
+        self.rows = [{"id": i, "time": t} for i, t in enumerate(times)]
+        self.limit = limit
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, start, end):
+        self.calls.append((start, end))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        hits = [r for r in self.rows if start <= r["time"] <= end]
+        return hits if self.limit is None else hits[: self.limit]
+
+
+@pytest.mark.asyncio
+async def test_full_windows_are_split_until_complete():
+    # 0-99 aralığında 40 satır, 60-63'te yoğunlaşma; limit 5
+    times = list(range(0, 100, 4)) + [61, 61, 62, 62, 63, 63] * 2 + [99]
+    src = FakeSource(times, limit=5)
+
+    rows = await fetch_time_sliced(
+        src.fetch,
+        0,
+        99,
+        window_ms=50,
+        page_limit=5,
+        concurrency=3,
+        time_of=lambda r: r["time"],
+        key_of=lambda r: r["id"],
+    )
+
+    assert [r["id"] for r in rows] == [
+        r["id"] for r in sorted(src.rows, key=lambda r: (r["time"], str(r["id"])))
+    ]
+    assert len(src.calls) > 2
+    assert src.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_cursor_mode_does_not_split_and_dedupes_overlap():
+    src = FakeSource([1, 2, 3, 10, 11], limit=None)
+
+    async def overlapping(start, end):
+        # komşu dilimlere taşan satırlar (ör. borsa uç davranışı) tekilleşmeli
+        return await src.fetch(max(0, start - 1), end)
+
+    rows = await fetch_time_sliced(
+        overlapping,
+        0,
+        11,
+        window_ms=3,
+        time_of=lambda r: r["time"],
+        key_of=lambda r: r["id"],
+    )
+    assert [r["time"] for r in rows] == [1, 2, 3, 10, 11]
+    assert len(src.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_window_error_propagates():
+    async def boom(start, end):
+        if start > 0:
+            raise RuntimeError("429")
+        return []
+
+    with pytest.raises(RuntimeError):
+        await fetch_time_sliced(
+            boom, 0, 9, window_ms=5, time_of=lambda r: 0, key_of=lambda r: 0
+        )
@@ -0,0 +1,149 @@
+# tests/test_chart_markers.py
+# Python 3.9
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import event
+
+T0 = datetime(2026, 10, 1, 0, 0, 0)
+
+
+def _ep(dt):
+    return int(dt.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _rows(i, opened, closed, status="closed", exchange="bn"):
+    from app.models import StrategyOpenTrade, StrategyTrade
+
+    out = [
+        StrategyOpenTrade(
+            id=i,
+            public_id=f"o-{i}",
+            raw_signal_id=1,
+            fund_manager_id="fm",
+            symbol="BTCUSDT",
+            side="long" if i % 2 else "short",
+            entry_price=Decimal("100"),
+            position_size=Decimal("1"),
+            leverage=1,
+            order_type="market",
+            timestamp=opened,
+            exchange=exchange,
+            exchange_order_id=f"x-{i}",
+            status=status,
+        )
+    ]
+    if closed is not None:
+        out.append(
+            StrategyTrade(
+                id=i,
+                public_id=f"t-{i}",
+                raw_signal_id=1,
+                open_trade_public_id=f"o-{i}",
+                fund_manager_id="fm",
+                symbol="BTCUSDT",
+                side="long" if i % 2 else "short",
+                entry_price=Decimal("100"),
+                exit_price=Decimal("110"),
+                position_size=Decimal("1"),
+                leverage=1,
+                realized_pnl=Decimal("10"),
+                order_type="market",
+                timestamp=closed,
+                exchange=exchange,
+            )
+        )
+    return out
+
+
+@pytest.mark.asyncio
+async def test_markers_window_cache_and_invalidation(sqlite_session):
+    from app.models import (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+    from app.services import chart_markers
+
+    chart_markers.reset()
+    engine, sm = await sqlite_session(
+        [RawSignal, StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade]
+    )
+    async with sm() as s:
+        s.add(RawSignal(id=1, payload={}, fund_manager_id="fm", received_at=T0))
+        h = timedelta(hours=1)
+        for i in range(1, 11):  # her gün bir işlem: açılış 10:00, kapanış 14:00
+            day = T0 + timedelta(days=i)
+            s.add_all(_rows(i, day + 10 * h, day + 14 * h))
+        # pencereden önce açılıp içinde kapanan; pencereden sonra açılan canlı
+        s.add_all(_rows(11, T0 + timedelta(days=4, hours=20), T0 + timedelta(days=5)))
+        s.add_all(_rows(12, T0 + timedelta(days=20), None, status="open"))
+        await s.commit()
+
+        since = _ep(T0 + timedelta(days=5))
+        until = _ep(T0 + timedelta(days=7, hours=12))
+        markers, nxt = await chart_markers.get_markers(
+            s, "bn", "btcusdt", 3600, since=since, until=until
+        )
+        assert nxt is None
+        closes = sorted(m["id"] for m in markers if m["kind"] == "close")
+        # t-5, t-6, t-7 aralıkta; t-11 aralık başında kapanmış; t-8 açılışı sonrası
+        assert closes == ["t-11", "t-5", "t-6", "t-7"]
+        assert "o-12" not in [m["id"] for m in markers]
+        m5 = next(m for m in markers if m["id"] == "t-5:open")
+        assert m5["time"] == _ep(T0 + timedelta(days=5, hours=10))
+        assert (m5["side"], m5["position"], m5["text"]) == (
+            "long",
+            "belowBar",
+            "OPEN LONG",
+        )
+
+        # İkinci çağrı (aynı bar aralığında kaydırılmış): yalnızca sürüm sorguları
+        captured = []
+
+        def _capture(conn, cursor, statement, params, context, executemany):
+            captured.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+        try:
+            again, _ = await chart_markers.get_markers(
+                s, "bn", "BTCUSDT", 3600, since=since + 60, until=until - 60
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+        assert again is markers
+        assert len(captured) == 2
+        assert all("EXISTS" not in sql for sql in captured)
+
+        # Başka borsadaki kapanış bu borsanın önbelleğini geçersiz kılmaz
+        s.add_all(
+            _rows(
+                14,
+                T0 + timedelta(days=6),
+                T0 + timedelta(days=6, hours=1),
+                exchange="by",
+            )
+        )
+        await s.commit()
+        other, _ = await chart_markers.get_markers(
+            s, "bn", "BTCUSDT", 3600, since=since, until=until
+        )
+        assert other is markers
+
+        # Yeni kapanış → sürüm değişir, girdi yeniden hesaplanır
+        s.add_all(_rows(13, T0 + timedelta(days=6), T0 + timedelta(days=6, hours=1)))
+        await s.commit()
+        fresh, _ = await chart_markers.get_markers(
+            s, "bn", "BTCUSDT", 3600, since=since, until=until
+        )
+        assert "t-13" in [m["id"] for m in fresh]
+
+        # Aralıksız ilk sayfa: canlı açılış dahil, tüm kapanışlar
+        full, _ = await chart_markers.get_markers(s, "bn", None, 3600)
+        assert "o-12" in [m["id"] for m in full]
+        assert len([m for m in full if m["kind"] == "close"]) == 12
+    chart_markers.reset()
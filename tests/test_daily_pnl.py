@@ -0,0 +1,181 @@
+# tests/test_daily_pnl.py
+# Python 3.9
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import select
+
+
+def _trade(i, ts, pnl, symbol="btcusdt", fm="fm1"):
+    from app.models import StrategyTrade
+
+    return StrategyTrade(
+        id=i,
+        public_id=f"t-{i}",
+        raw_signal_id=1,
+        open_trade_public_id=f"o-{i}",
+        fund_manager_id=fm,
+        symbol=symbol,
+        side="long",
+        entry_price=Decimal("1"),
+        exit_price=Decimal("1"),
+        position_size=Decimal("1"),
+        leverage=1,
+        realized_pnl=Decimal(pnl),
+        order_type="market",
+        timestamp=ts,
+        exchange="bn",
+    )
+
+
+def _ms(dt):
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+async def _rows(s):
+    from app.models import DailyPnl
+
+    res = await s.execute(
+        select(
+            DailyPnl.fund_manager_id,
+            DailyPnl.symbol,
+            DailyPnl.day,
+            DailyPnl.realized_pnl,
+            DailyPnl.trade_count,
+            DailyPnl.wins,
+            DailyPnl.fees,
+        ).order_by(DailyPnl.fund_manager_id, DailyPnl.symbol, DailyPnl.day)
+    )
+    return [tuple(r) for r in res.all()]
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollup_matches_rebuild(sqlite_session):
+    from app.models import DailyPnl, IncomeLedger, StrategyTrade
+    from crud import daily_pnl
+
+    _, sm = await sqlite_session([StrategyTrade, DailyPnl, IncomeLedger])
+    d0 = datetime(2026, 10, 1, 23, 30)
+    closes = [
+        (1, d0, "10", "btcusdt", "fm1"),
+        (2, d0 + timedelta(minutes=10), "-4", "BTCUSDT", "fm1"),
+        # UTC'de ertesi gün (aware timestamp)
+        (3, datetime(2026, 10, 2, 1, 0, tzinfo=timezone.utc), "3", "ETHUSDT", "fm1"),
+        (4, d0, "7", "BTCUSDT", "fm2"),
+    ]
+    fees = [
+        ("BTCUSDT", _ms(d0), Decimal("-0.5")),
+        ("btcusdt", _ms(d0 + timedelta(minutes=5)), Decimal("-0.25")),
+        ("ETHUSDT", _ms(datetime(2026, 10, 2, 3, 0)), Decimal("-0.1")),
+    ]
+    async with sm() as s:
+        for i, ts, pnl, sym, fm in closes:
+            s.add(_trade(i, ts.replace(tzinfo=None), pnl, sym, fm))
+            await daily_pnl.record_close(
+                s,
+                exchange="bn",
+                fund_manager_id=fm,
+                symbol=sym,
+                closed_at=ts,
+                pnl=Decimal(pnl),
+            )
+        for n, (sym, ms, amount) in enumerate(fees):
+            s.add(
+                IncomeLedger(
+                    id=n + 1,
+                    exchange="bn",
+                    symbol=sym.upper(),
+                    income_type="COMMISSION",
+                    amount=amount,
+                    tran_id=f"tx-{n}",
+                    event_time=ms,
+                )
+            )
+        await daily_pnl.record_fees(s, "bn", fees)
+        await s.commit()
+
+        incremental = await _rows(s)
+        assert (
+            "fm1",
+            "BTCUSDT",
+            date(2026, 10, 1),
+            Decimal("6"),
+            2,
+            1,
+            Decimal("0"),
+        ) in incremental
+        assert ("", "BTCUSDT", date(2026, 10, 1)) in [r[:3] for r in incremental]
+
+        n = await daily_pnl.rebuild(s, exchange="bn")
+        assert n == len(incremental)
+        assert await _rows(s) == incremental
+
+        series = await daily_pnl.daily_series(s, "bn", date(2026, 10, 1))
+        assert [r["day"] for r in series] == [date(2026, 10, 1), date(2026, 10, 2)]
+        assert series[0]["realized_pnl"] == Decimal("13")
+        assert series[0]["trade_count"] == 3
+        assert series[0]["wins"] == 2
+        assert series[0]["fees"] == Decimal("-0.75")
+        only_eth = await daily_pnl.daily_series(
+            s, "bn", date(2026, 10, 1), symbol="ethusdt"
+        )
+        assert [r["realized_pnl"] for r in only_eth] == [Decimal("3")]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_normalises_keys_like_record_close(sqlite_session):
+    from sqlalchemy import insert
+
+    from app.models import DailyPnl, IncomeLedger, StrategyTrade
+    from crud import daily_pnl
+
+    _, sm = await sqlite_session([StrategyTrade, DailyPnl, IncomeLedger])
+    ts = datetime(2026, 10, 3, 12, 0)
+    async with sm() as s:
+        # Core INSERT ORM doğrulayıcısını atlar (eski/elle yazılmış satırlar)
+        for i, sym in ((1, " ethusdt"), (2, "ETHUSDT")):
+            t = _trade(i, ts, "2")
+            row = {
+                c.name: getattr(t, c.key)
+                for c in StrategyTrade.__table__.columns
+                if getattr(t, c.key) is not None
+            }
+            row["symbol"] = sym
+            await s.execute(insert(StrategyTrade).values(**row))
+            await daily_pnl.record_close(
+                s,
+                exchange="bn",
+                fund_manager_id="fm1",
+                symbol=sym,
+                closed_at=ts,
+                pnl=Decimal("2"),
+            )
+        await s.commit()
+        incremental = await _rows(s)
+        assert incremental == [
+            ("fm1", "ETHUSDT", date(2026, 10, 3), Decimal("4"), 2, 2, Decimal("0"))
+        ]
+
+        assert await daily_pnl.rebuild(s, exchange="bn") == 1
+        assert await _rows(s) == incremental
+
+
+def test_risk_metrics():
+    from app.services import risk_metrics
+
+    series = [
+        {"day": date(2026, 10, 1), "realized_pnl": Decimal("10")},
+        {"day": date(2026, 10, 3), "realized_pnl": Decimal("-15")},
+        {"day": date(2026, 10, 4), "realized_pnl": Decimal("8")},
+    ]
+    days = risk_metrics.fill_days(series, date(2026, 9, 30), date(2026, 10, 4))
+    assert days == [0.0, 10.0, 0.0, -15.0, 8.0]
+    assert risk_metrics.max_drawdown(days) == 15.0
+    assert risk_metrics.max_drawdown([-3.0, 1.0]) == 3.0
+    assert [p["equity"] for p in risk_metrics.equity_curve(series)] == [10, -5, 3]
+    assert risk_metrics.sharpe([1.0]) is None
+    assert risk_metrics.sharpe([2.0, 2.0, 2.0]) is None
+    assert risk_metrics.sharpe([1.0, -1.0, 3.0]) == pytest.approx(1.0 / 2.0 * 365**0.5)
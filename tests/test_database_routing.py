@@ -0,0 +1,130 @@
+# tests/test_database_routing.py
+# Python 3.9
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app import database
+from app.config import settings
+
+
+def test_engine_kwargs_pool_settings_skip_sqlite(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 900)
+    kw = database._engine_kwargs("mysql+aiomysql://u:p@h/db", 7, 3)
+    assert (kw["pool_size"], kw["max_overflow"], kw["pool_recycle"]) == (7, 3, 900)
+    assert kw["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert "pool_size" not in database._engine_kwargs("sqlite+aiosqlite://", 7, 3)
+
+
+def test_sqlite_shares_the_primary_engine():
+    # Test ortamı SQLite: ayrı havuz yok, okumalar aynı veriyi görür
+    assert database.read_engine is database.engine
+    assert database.READ_IS_REPLICA is False
+
+
+def test_write_tracking_is_scoped_to_the_request(monkeypatch):
+    # İstek bağlamı dışında (verifier, kira, audit yazıcı) yazma işaretlenmez
+    database._track_writes(None, None, "UPDATE verifier_leases SET", {}, None, False)
+    assert database.WRITE_MARK_CVAR.get() is None
+
+    mark = database.WriteMark()
+    token = database.WRITE_MARK_CVAR.set(mark)
+    try:
+        database._track_writes(None, None, "  SELECT 1", {}, None, False)
+        assert mark.at_ms is None
+        database._track_writes(
+            None, None, "update strategy_open_trades set", {}, None, True
+        )
+        assert database.recent_write(mark.at_ms, 5) is True
+        assert database.recent_write(mark.at_ms, 0) is False
+    finally:
+        database.WRITE_MARK_CVAR.reset(token)
+    assert database.recent_write(None, 5) is False
+    assert database.cookie_write_ms("garbage") is None
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_falls_back_to_primary_after_write(monkeypatch):
+    opened = []
+
+    class _CM:
+        def __init__(self, name):
+            self.name = name
+
+        async def __aenter__(self):
+            opened.append(self.name)
+            return self.name
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class _Req:
+        def __init__(self, cookies):
+            self.cookies = cookies
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: _CM("primary"))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", lambda: _CM("read"))
+    monkeypatch.setattr(database, "READ_IS_REPLICA", True)
+    monkeypatch.setattr(settings, "DB_READ_YOUR_WRITES_SECONDS", 5)
+
+    async def _one(request=None):
+        gen = database.get_read_db(request)
+        s = await gen.__anext__()
+        await gen.aclose()
+        return s
+
+    assert await _one() == "read"
+    # Başka bir istemcinin/arka planın yazması: bu istemcinin çerezi yok
+    assert await _one(_Req({})) == "read"
+    # Bu istemci az önce (herhangi bir süreçte) yazdı → çerez
+    fresh = str(database._now_ms())
+    assert await _one(_Req({database.RYW_COOKIE: fresh})) == "primary"
+    stale = str(database._now_ms() - 10_000)
+    assert await _one(_Req({database.RYW_COOKIE: stale})) == "read"
+
+    # Aynı istek içinde yazma
+    mark = database.WriteMark()
+    token = database.WRITE_MARK_CVAR.set(mark)
+    try:
+        database.note_write()
+        assert await _one() == "primary"
+    finally:
+        database.WRITE_MARK_CVAR.reset(token)
+
+    monkeypatch.setattr(database, "READ_IS_REPLICA", False)
+    assert await _one(_Req({database.RYW_COOKIE: fresh})) == "read"
+
+
+@pytest.mark.asyncio
+async def test_request_that_writes_sets_read_your_writes_cookie(monkeypatch):
+    from fastapi import FastAPI, Request
+    from httpx import ASGITransport, AsyncClient
+
+    monkeypatch.setattr(database, "READ_IS_REPLICA", True)
+    monkeypatch.setattr(settings, "DB_READ_YOUR_WRITES_SECONDS", 2)
+    app = FastAPI()
+    app.middleware("http")(_request_middleware())
+
+    @app.post("/write")
+    async def _write():
+        database._track_writes(None, None, "INSERT INTO t", {}, None, False)
+        return {}
+
+    @app.get("/read")
+    async def _read(request: Request):
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://t"
+    ) as client:
+        r = await client.get("/read")
+        assert database.RYW_COOKIE not in r.cookies
+        r = await client.post("/write")
+        assert int(r.cookies[database.RYW_COOKIE]) > 0
+    assert "Max-Age=2" in r.headers["set-cookie"]
+
+
+def _request_middleware():
+    import importlib
+
+    return importlib.import_module("app.main").request_id_middleware
@@ -0,0 +1,104 @@
+# tests/test_fill_cache.py
+# Python 3.9
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.exchanges.common import fill_cache
+from app.exchanges.common.fill_cache import FillCache, parse_binance_fill
+
+
+def _row(i, t=None, side="SELL"):
+    return {
+        "id": i,
+        "time": 1_000 + i if t is None else t,
+        "price": "100",
+        "qty": "1",
+        "side": side,
+        "positionSide": "BOTH",
+    }
+
+
+class FakeExchange:
+    """fromId/startTime + limit semantiğiyle userTrades taklidi."""
+
+    def __init__(self, n, page_limit=3):
+        self.rows = [_row(i) for i in range(1, n + 1)]
+        self.page_limit = page_limit
+        self.calls = []
+
+    async def fetch_page(self, params):
+        self.calls.append(dict(params))
+        if "fromId" in params:
+            rows = [r for r in self.rows if r["id"] >= params["fromId"]]
+        else:
+            rows = [r for r in self.rows if r["time"] >= params["startTime"]]
+        return rows[: self.page_limit]
+
+
+@pytest.mark.asyncio
+async def test_pages_past_limit_then_fetches_only_delta():
+    ex = FakeExchange(7, page_limit=3)
+    cache = FillCache(parse_binance_fill)
+
+    fills = await cache.get_fills("bn", "btcusdt", 0, ex.fetch_page, page_limit=3)
+    assert [f.id for f in fills] == list(range(1, 8))
+    assert ex.calls == [{"startTime": 0}, {"fromId": 4}, {"fromId": 7}]
+
+    ex.calls.clear()
+    ex.rows.append(_row(8))
+    fills = await cache.get_fills("bn", "BTCUSDT", 0, ex.fetch_page, page_limit=3)
+    assert [f.id for f in fills][-1] == 8
+    assert ex.calls == [{"fromId": 8}]
+
+
+@pytest.mark.asyncio
+async def test_earlier_start_than_coverage_refetches():
+    ex = FakeExchange(5, page_limit=10)
+    cache = FillCache(parse_binance_fill)
+    await cache.get_fills("bn", "BTCUSDT", 1_003, ex.fetch_page, page_limit=10)
+    ex.calls.clear()
+
+    fills = await cache.get_fills("bn", "BTCUSDT", 0, ex.fetch_page, page_limit=10)
+    assert ex.calls == [{"startTime": 0}]
+    assert len(fills) == 5
+
+
+@pytest.mark.asyncio
+async def test_memory_bounds(monkeypatch):
+    monkeypatch.setattr(fill_cache, "MAX_FILLS_PER_KEY", 4)
+    monkeypatch.setattr(fill_cache, "MAX_KEYS", 2)
+    ex = FakeExchange(6, page_limit=10)
+    cache = FillCache(parse_binance_fill)
+
+    fills = await cache.get_fills("bn", "A", 0, ex.fetch_page, page_limit=10)
+    assert [f.id for f in fills] == [3, 4, 5, 6]
+
+    await cache.get_fills("bn", "B", 0, ex.fetch_page, page_limit=10)
+    await cache.get_fills("bn", "C", 0, ex.fetch_page, page_limit=10)
+    assert list(cache._keys) == [("bn", "B"), ("bn", "C")]
+
+
+@pytest.mark.asyncio
+async def test_full_fetch_uses_range_then_delta_by_id():
+    ex = FakeExchange(7, page_limit=3)
+    cache = FillCache(parse_binance_fill)
+    ranges = []
+
+    async def fetch_range(start_ms):
+        ranges.append(start_ms)
+        return [r for r in reversed(ex.rows) if r["time"] >= start_ms]
+
+    fills = await cache.get_fills(
+        "bn", "BTCUSDT", 0, ex.fetch_page, page_limit=3, fetch_range=fetch_range
+    )
+    assert [f.id for f in fills] == list(range(1, 8))
+    assert ranges == [0] and ex.calls == []
+
+    ex.rows.append(_row(8))
+    fills = await cache.get_fills(
+        "bn", "BTCUSDT", 0, ex.fetch_page, page_limit=3, fetch_range=fetch_range
+    )
+    assert [f.id for f in fills][-1] == 8
+    assert ranges == [0]
+    assert ex.calls == [{"fromId": 8}]
@@ -0,0 +1,303 @@
+# tests/test_income_ledger.py
+# Python 3.9
+
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.exchanges.common.income import IncomeRow, parse_binance_income
+from app.models import IncomeSyncState
+from app.services import income_ledger
+
+
+def _inc(i, t, income_type="REALIZED_PNL", amount="1"):
+    return IncomeRow(str(i), income_type, "BTCUSDT", Decimal(amount), "USDT", t)
+
+
+class FakeSession:
+    """sync_income_ledger'ın kullandığı get/add/add_all/commit/rollback alt kümesi."""
+
+    def __init__(self, state=None):
+        self.state = state
+        self.ledger = []
+        self.fees = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def get(self, _model, _key):
+        return self.state
+
+    def add(self, obj):
+        self.state = obj
+
+    def add_all(self, objs):
+        self.ledger.extend(objs)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeSession()
+
+    async def _existing(_db, exchange, tran_ids):
+        return {
+            (r.income_type, r.tran_id, r.symbol)
+            for r in db.ledger
+            if r.exchange == exchange and r.tran_id in tran_ids
+        }
+
+    async def _start(_db, _exchange):
+        return 1_000
+
+    async def _record_fees(_db, exchange, rows):
+        db.fees.extend(rows)
+
+    monkeypatch.setattr(income_ledger, "_existing_keys", _existing)
+    monkeypatch.setattr(income_ledger.daily_pnl, "record_fees", _record_fees)
+    monkeypatch.setattr(income_ledger, "_backfill_start_ms", _start)
+    monkeypatch.setattr(income_ledger, "_history_fetcher", lambda _ex: None)
+    monkeypatch.setattr(income_ledger, "PAGE_LIMIT", 3)
+    monkeypatch.setattr(income_ledger, "OVERLAP_MS", 0)
+    return db
+
+
+class FakeIncome:
+    """startTime + limit semantiğiyle /fapi/v1/income taklidi."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch_page(self, start_ms, limit):
+        self.calls.append(start_ms)
+        return [r for r in self.rows if r.time >= start_ms][:limit]
+
+
+def test_parse_binance_income():
+    row = parse_binance_income(
+        {
+            "symbol": "btcusdt",
+            "incomeType": "COMMISSION",
+            "income": "-0.0123",
+            "asset": "USDT",
+            "time": 1700000000000,
+            "tranId": 9988,
+        }
+    )
+    assert row == IncomeRow(
+        "9988", "COMMISSION", "BTCUSDT", Decimal("-0.0123"), "USDT", 1700000000000
+    )
+    assert parse_binance_income({"incomeType": "COMMISSION", "time": 1}) is None
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_then_syncs_only_from_watermark(fake_db):
+    ex = FakeIncome(
+        [
+            _inc(1, 1_000),
+            _inc(2, 1_001, "COMMISSION", "-0.1"),
+            # aynı ms'te sayfa sınırı + ledger dışı tip (sayfalamada sayılır)
+            _inc(3, 1_002, "TRANSFER", "50"),
+            _inc(4, 1_002, "FUNDING_FEE", "0.2"),
+            _inc(5, 1_003),
+        ]
+    )
+
+    n = await income_ledger.sync_income_ledger(
+        fake_db, "binance_futures_testnet", fetch_page=ex.fetch_page
+    )
+    assert n == 4
+    assert ex.calls == [1_000, 1_002, 1_003]
+    assert sorted(r.tran_id for r in fake_db.ledger) == ["1", "2", "4", "5"]
+    assert isinstance(fake_db.state, IncomeSyncState)
+    assert fake_db.state.watermark_ms == 1_003
+    assert fake_db.state.backfilled_at is not None
+    assert fake_db.commits == 1
+    # Ücret kalemleri daily_pnl'e aynı tick'te
+    assert fake_db.fees == [
+        ("BTCUSDT", 1_001, Decimal("-0.1")),
+        ("BTCUSDT", 1_002, Decimal("0.2")),
+    ]
+
+    ex.calls.clear()
+    ex.rows.append(_inc(6, 1_010))
+    n = await income_ledger.sync_income_ledger(
+        fake_db, "binance_futures_testnet", fetch_page=ex.fetch_page
+    )
+    assert n == 1
+    assert ex.calls == [1_003]
+    assert fake_db.state.watermark_ms == 1_010
+
+
+@pytest.mark.asyncio
+async def test_backfill_spreads_over_ticks(fake_db):
+    ex = FakeIncome([_inc(i, 1_000 + i) for i in range(1, 11)])
+
+    for expected in (5, 9):
+        await income_ledger.sync_income_ledger(
+            fake_db, "bn", max_pages=2, fetch_page=ex.fetch_page
+        )
+        assert len(fake_db.ledger) == expected
+        assert fake_db.state.backfilled_at is None
+
+    await income_ledger.sync_income_ledger(
+        fake_db, "bn", max_pages=2, fetch_page=ex.fetch_page
+    )
+    assert len(fake_db.ledger) == 10
+    assert fake_db.state.watermark_ms == 1_010
+    assert fake_db.state.backfilled_at is not None
+
+
+@pytest.mark.asyncio
+async def test_first_sync_uses_history_backfill_when_available(fake_db, monkeypatch):
+    monkeypatch.setattr(income_ledger, "_now_ms", lambda: 9_000)
+    ex = FakeIncome([_inc(i, 1_000 + i) for i in range(1, 8)])
+    calls = []
+
+    async def history(start_ms, end_ms):
+        calls.append((start_ms, end_ms))
+        return [r for r in ex.rows if start_ms <= r.time <= end_ms]
+
+    n = await income_ledger.sync_income_ledger(
+        fake_db, "bn", fetch_page=ex.fetch_page, fetch_history=history
+    )
+    assert n == 7
+    assert calls == [(1_000, 9_000)]
+    assert ex.calls == []
+    assert fake_db.state.watermark_ms == 9_000
+    assert fake_db.state.backfilled_at is not None
+
+    # Sonraki tick'ler artımlı sayfa yolundan
+    await income_ledger.sync_income_ledger(
+        fake_db, "bn", fetch_page=ex.fetch_page, fetch_history=history
+    )
+    assert ex.calls == [9_000]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_error_rolls_back_without_moving_watermark(fake_db):
+    fake_db.state = IncomeSyncState(exchange="bn", watermark_ms=5_000)
+
+    async def boom(start_ms, limit):
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        await income_ledger.sync_income_ledger(fake_db, "bn", fetch_page=boom)
+    assert fake_db.rollbacks == 1
+    assert fake_db.state.watermark_ms == 5_000
+
+
+def test_only_adapters_with_income_pages_use_ledger():
+    assert income_ledger.supports_ledger("binance_futures_testnet")
+    assert not income_ledger.supports_ledger("no_such_exchange")
+
+
+@pytest.mark.asyncio
+async def test_netpnl_uses_ledger_only_after_backfill(monkeypatch):
+    import sys
+    import types
+    from datetime import datetime, timezone
+
+    from app.routers import panel_data
+
+    acc = types.ModuleType("app.exchanges.ledgerex.account")
+
+    async def income_summary(symbol=None, since=None, until=None):
+        return {"total": 7.5, "breakdown": {"realized": 7.5}}
+
+    acc.income_summary = income_summary
+    monkeypatch.setitem(sys.modules, "app.exchanges.ledgerex.account", acc)
+    monkeypatch.setattr(income_ledger, "supports_ledger", lambda ex: True)
+
+    async def totals(db, ex, symbol=None, since_ms=None):
+        return {"REALIZED_PNL": Decimal("2"), "COMMISSION": Decimal("-0.5")}
+
+    monkeypatch.setattr(income_ledger, "ledger_totals", totals)
+
+    async def netpnl(state):
+        async def _state(db, ex):
+            return state
+
+        monkeypatch.setattr(income_ledger, "get_sync_state", _state)
+        return await panel_data.me_netpnl(
+            exchange="ledgerex",
+            symbol=None,
+            since_days=None,
+            since_epoch=1_700_000_000,
+            detail=False,
+            db=None,
+        )
+
+    # State yok / backfill sürüyor → canlı income yolu (0 değil)
+    for state in (
+        None,
+        IncomeSyncState(exchange="ledgerex", watermark_ms=1, backfilled_at=None),
+    ):
+        out = await netpnl(state)
+        assert out["net"] == 7.5 and "ledger" not in out
+
+    done = IncomeSyncState(
+        exchange="ledgerex",
+        watermark_ms=5_000,
+        backfilled_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+    )
+    out = await netpnl(done)
+    assert out["net"] == 1.5
+    assert out["ledger"] == {"watermark_ms": 5_000, "backfilled": True}
+
+
+@pytest.mark.asyncio
+async def test_netpnl_default_window_includes_archived_trades(monkeypatch):
+    import sys
+    import types
+    from datetime import datetime, timezone
+
+    from app.routers import panel_data
+
+    archived = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    first = {
+        "strategy_trades": datetime(2026, 6, 1, tzinfo=timezone.utc),
+        "strategy_open_trades": datetime(2026, 7, 1, tzinfo=timezone.utc),
+        "strategy_open_trades_history": archived,
+    }
+
+    class _Res:
+        def __init__(self, value):
+            self.value = value
+
+        def scalar(self):
+            return self.value
+
+    class _Db:
+        async def execute(self, stmt):
+            return _Res(first[stmt.get_final_froms()[0].name])
+
+    seen = {}
+    acc = types.ModuleType("app.exchanges.ledgerex.account")
+
+    async def income_summary(symbol=None, since=None, until=None):
+        seen["since"] = since
+        return {"total": 1.0}
+
+    acc.income_summary = income_summary
+    monkeypatch.setitem(sys.modules, "app.exchanges.ledgerex.account", acc)
+    monkeypatch.setattr(income_ledger, "supports_ledger", lambda ex: False)
+
+    out = await panel_data.me_netpnl(
+        exchange="ledgerex",
+        symbol=None,
+        since_days=None,
+        since_epoch=None,
+        detail=False,
+        db=_Db(),
+    )
+    # Arşive taşınmış ilk işlem pencereyi (ve ledger backfill'iyle aynı başlangıcı) belirler
+    assert out["window"]["since"] == archived.isoformat()
+    assert seen["since"] == archived
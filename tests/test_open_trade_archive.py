@@ -0,0 +1,266 @@
+# tests/test_open_trade_archive.py
+# Python 3.9
+
+import importlib.util
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import func, select
+
+NOW = datetime.utcnow().replace(microsecond=0)
+OLD = NOW - timedelta(days=60)
+
+VERSIONS = Path(__file__).resolve().parents[1] / "migrations" / "versions"
+MIGRATION = VERSIONS / "20261026_trade_audit_payloads.py"
+HISTORY_MIGRATION = VERSIONS / "20261025_open_trades_history.py"
+
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location(f"m_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _env(sqlite_session):
+    from app.models import (
+        RawSignal,
+        RawSignalArchive,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+
+    engine, sm = await sqlite_session(
+        [
+            RawSignal,
+            RawSignalArchive,
+            StrategyOpenTrade,
+            StrategyOpenTradeHistory,
+            StrategyTrade,
+        ],
+        integer_pks=True,
+    )
+    return engine, sm
+
+
+def _open(i, status, ts, last_checked_at=None):
+    from app.models import StrategyOpenTrade
+
+    return StrategyOpenTrade(
+        id=i,
+        public_id=f"o-{i}",
+        raw_signal_id=i,
+        fund_manager_id="fm",
+        symbol="BTCUSDT",
+        side="long",
+        entry_price=Decimal("100"),
+        position_size=Decimal("1"),
+        leverage=2,
+        order_type="market",
+        timestamp=ts,
+        exchange="bn",
+        exchange_order_id=f"x-{i}",
+        status=status,
+        last_checked_at=last_checked_at,
+    )
+
+
+def _close(i, ts):
+    from app.models import StrategyTrade
+
+    return StrategyTrade(
+        id=i,
+        public_id=f"t-{i}",
+        raw_signal_id=i,
+        open_trade_public_id=f"o-{i}",
+        fund_manager_id="fm",
+        symbol="BTCUSDT",
+        side="long",
+        entry_price=Decimal("100"),
+        exit_price=Decimal("110"),
+        position_size=Decimal("1"),
+        leverage=2,
+        realized_pnl=Decimal("10"),
+        order_type="market",
+        timestamp=ts,
+        exchange="bn",
+    )
+
+
+async def _dangling(s) -> int:
+    """Açılış satırı iki tabloda da olmayan kapanış sayısı."""
+    from app.models import StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade
+
+    return await s.scalar(
+        select(func.count())
+        .select_from(StrategyTrade)
+        .where(
+            ~StrategyTrade.open_trade_public_id.in_(
+                select(StrategyOpenTrade.public_id).union_all(
+                    select(StrategyOpenTradeHistory.public_id)
+                )
+            )
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_only_old_dead_rows_and_keeps_links(sqlite_session):
+    from app.models import (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+    )
+    from app.services import chart_markers, trade_analytics
+    from crud.raw_signal import archive_raw_signals
+    from crud.trade import archive_open_trades, find_merge_candidate
+
+    _, sm = await _env(sqlite_session)
+    async with sm() as s:
+        for i in range(1, 8):
+            s.add(RawSignal(id=i, payload={}, fund_manager_id="fm", received_at=OLD))
+        s.add(_open(1, "closed", OLD))  # eski kapanış → taşınır
+        s.add(_close(1, OLD + timedelta(hours=1)))
+        s.add(_open(2, "failed", OLD, last_checked_at=OLD))  # → taşınır
+        s.add(_open(3, "closed", OLD))  # eski ve kapanışı eski → taşınır
+        s.add(_close(3, OLD + timedelta(days=1)))
+        s.add(_open(4, "open", OLD))  # canlı
+        s.add(_open(5, "closed", OLD))  # kapanışı yeni
+        s.add(_close(5, NOW - timedelta(days=1)))
+        s.add(_open(6, "closed", NOW - timedelta(days=2)))  # yeni
+        s.add(_open(7, "failed", OLD, last_checked_at=NOW))  # yakın zamanda kontrol
+        await s.commit()
+
+        assert await archive_open_trades(s, retention_days=0) == 0
+        moved = await archive_open_trades(s, retention_days=30, batch_size=2)
+        assert moved == 3
+        assert await archive_open_trades(s, retention_days=30) == 0
+
+        hot = (await s.execute(select(StrategyOpenTrade.public_id))).scalars().all()
+        assert sorted(hot) == ["o-4", "o-5", "o-6", "o-7"]
+        cold = (
+            await s.execute(
+                select(StrategyOpenTradeHistory).order_by(StrategyOpenTradeHistory.id)
+            )
+        ).scalars()
+        cold = list(cold)
+        assert [(r.id, r.public_id, r.status) for r in cold] == [
+            (1, "o-1", "closed"),
+            (2, "o-2", "failed"),
+            (3, "o-3", "closed"),
+        ]
+        assert cold[0].exchange_order_id == "x-1" and cold[0].archived_at
+
+        # Her kapanışın açılış satırı iki tablodan birinde
+        assert await _dangling(s) == 0
+
+        # Sıcak yol: merge adayı yalnızca canlı satırdan
+        cand = await find_merge_candidate(
+            s, symbol="BTCUSDT", exchange="bn", side="long", fund_manager_id="fm"
+        )
+        assert cand.public_id == "o-4"
+
+        # Arşivlenmiş açılışlar marker/analitikte görünmeye devam eder
+        chart_markers.reset()
+        markers, _ = await chart_markers.compute(s, "bn", "BTCUSDT", 60)
+        assert {"t-1:open", "t-3:open"} <= {m["id"] for m in markers}
+        trade_analytics.reset()
+        series = await trade_analytics.load_series(s, "bn")
+        assert all(h == h for h in series.hold)  # NaN yok
+
+        # History'deki satırın sinyali arşive taşınmaz (CASCADE silerdi)
+        await archive_raw_signals(s, retention_days=30)
+        left = (await s.execute(select(RawSignal.id))).scalars().all()
+        assert 2 in left and 1 in left
+
+
+@pytest.mark.asyncio
+async def test_all_view_unions_hot_and_history(sqlite_session):
+    from app.models import RawSignal
+    from crud.trade import archive_open_trades
+
+    migration = _load(MIGRATION)
+    # Görünümün güncel (response_data'sız) sütun listesi
+    columns = migration._COLUMNS.format(extra="")
+
+    engine, sm = await _env(sqlite_session)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "CREATE VIEW strategy_open_trades_all AS "
+            f"SELECT {columns}, NULL AS archived_at "
+            "FROM strategy_open_trades UNION ALL "
+            f"SELECT {columns}, archived_at "
+            "FROM strategy_open_trades_history"
+        )
+    async with sm() as s:
+        for i in (1, 2):
+            s.add(RawSignal(id=i, payload={}, fund_manager_id="fm", received_at=OLD))
+        s.add(_open(1, "closed", OLD))
+        s.add(_open(2, "open", OLD))
+        await s.commit()
+        assert await archive_open_trades(s, retention_days=30) == 1
+        conn = await s.connection()
+        rows = (
+            await conn.exec_driver_sql(
+                "SELECT public_id, status, archived_at IS NOT NULL "
+                "FROM strategy_open_trades_all ORDER BY id"
+            )
+        ).all()
+        assert [tuple(r) for r in rows] == [("o-1", "closed", 1), ("o-2", "open", 0)]
+
+
+@pytest.mark.asyncio
+async def test_deleting_open_trade_leaves_no_orphaned_closes(sqlite_session):
+    from app.models import RawSignal, StrategyTrade
+    from crud.trade import delete_open_trade_by_id, delete_strategy_open_trade
+
+    _, sm = await _env(sqlite_session)
+    async with sm() as s:
+        for i in (1, 2, 3):
+            s.add(RawSignal(id=i, payload={}, fund_manager_id="fm", received_at=OLD))
+        s.add_all([_open(1, "closed", OLD), _close(1, OLD)])
+        s.add_all([_open(2, "closed", NOW), _close(2, NOW)])
+        s.add(_open(3, "open", NOW))
+        await s.commit()
+
+        # Uygulama yolu (tetikleyicisiz şema): kapanışlar açılışla birlikte gider
+        await delete_open_trade_by_id(s, 1)
+        await delete_strategy_open_trade(s, "BTCUSDT", "bn")
+        assert (await s.execute(select(StrategyTrade.public_id))).all() == []
+        assert await _dangling(s) == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_triggers_cascade_except_archive_move(sqlite_session):
+    from app.models import RawSignal, StrategyOpenTradeHistory, StrategyTrade
+    from crud.trade import archive_open_trades
+
+    engine, sm = await _env(sqlite_session)
+    async with engine.begin() as conn:
+        for sql in _load(HISTORY_MIGRATION)._delete_trigger_sql("sqlite"):
+            await conn.exec_driver_sql(sql)
+    async with sm() as s:
+        for i in (1, 2):
+            s.add(RawSignal(id=i, payload={}, fund_manager_id="fm", received_at=OLD))
+            s.add_all([_open(i, "closed", OLD), _close(i, OLD)])
+        await s.commit()
+
+        # Arşiv taşıması (önce INSERT, sonra DELETE) kapanışlara dokunmaz
+        assert await archive_open_trades(s, retention_days=30) == 2
+        closes = (await s.execute(select(StrategyTrade.public_id))).scalars().all()
+        assert sorted(closes) == ["t-1", "t-2"]
+
+        # Doğrudan silme (örn. elle/SQL ile) kapanışları da siler
+        conn = await s.connection()
+        await conn.exec_driver_sql(
+            "DELETE FROM strategy_open_trades_history WHERE public_id = 'o-1'"
+        )
+        await s.commit()
+        closes = (await s.execute(select(StrategyTrade.public_id))).scalars().all()
+        assert closes == ["t-2"]
+        assert await s.scalar(select(func.count(StrategyOpenTradeHistory.id))) == 1
+        assert await _dangling(s) == 0
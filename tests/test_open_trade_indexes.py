@@ -0,0 +1,72 @@
+# tests/test_open_trade_indexes.py
+# Python 3.9
+
+from datetime import datetime
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import event
+
+INDEX = "ix_sot_exchange_status_symbol_side_fm"
+
+
+def test_symbol_and_status_are_canonical_on_write():
+    from app.models import StrategyOpenTrade, StrategyTrade
+
+    ot = StrategyOpenTrade(symbol=" btcusdt ", status="OPEN")
+    assert (ot.symbol, ot.status) == ("BTCUSDT", "open")
+    ot.status = "Closed "
+    assert ot.status == "closed"
+    assert StrategyTrade(symbol="ethusdt").symbol == "ETHUSDT"
+
+
+@pytest.mark.asyncio
+async def test_merge_and_close_lookups_use_composite_index(sqlite_session):
+    from app.models import StrategyOpenTrade
+    from crud.trade import find_merge_candidate, get_open_trade_for_close
+
+    engine, sm = await sqlite_session([StrategyOpenTrade])
+    statements = []
+
+    def _capture(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, params))
+
+    async with sm() as s:
+        s.add(
+            StrategyOpenTrade(
+                id=1,
+                public_id="pid-1",
+                raw_signal_id=1,
+                fund_manager_id="fm",
+                symbol="btcusdt",
+                side="long",
+                entry_price=Decimal("1"),
+                position_size=Decimal("1"),
+                leverage=1,
+                order_type="market",
+                timestamp=datetime(2026, 1, 1),
+                exchange="bn",
+                exchange_order_id="1",
+                status="open",
+            )
+        )
+        await s.commit()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+        merge = await find_merge_candidate(
+            s, symbol="BtcUsdt", exchange="bn", side="long", fund_manager_id="fm"
+        )
+        close = await get_open_trade_for_close(s, None, "btcusdt", "bn")
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+        assert merge is not None and close is not None and merge.id == close.id
+
+        for sql, params in statements:
+            assert "upper(" not in sql.lower() and "lower(" not in sql.lower()
+            conn = await s.connection()
+            plan = (
+                await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params))
+            ).all()
+            detail = " ".join(str(row[-1]) for row in plan)
+            assert INDEX in detail, detail
@@ -0,0 +1,203 @@
+# tests/test_pagination.py
+# Python 3.9
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from fastapi import HTTPException, Response
+
+from app.utils import pagination
+
+T0 = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def test_cursor_roundtrip_and_invalid():
+    ts = datetime(2026, 10, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    cur = pagination.encode_cursor(ts, 42)
+    assert "=" not in cur
+    assert pagination.decode_cursor(cur) == (ts, 42)
+    # naive → UTC kabul edilir
+    assert pagination.decode_cursor(
+        pagination.encode_cursor(ts.replace(tzinfo=None), 42)
+    ) == (ts, 42)
+    for bad in ("", "!!", "bm90LWEtY3Vyc29y"):
+        with pytest.raises(ValueError):
+            pagination.decode_cursor(bad)
+
+
+async def _env(sqlite_session):
+    from app.models import (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+
+    engine, sm = await sqlite_session(
+        [RawSignal, StrategyOpenTrade, StrategyOpenTradeHistory, StrategyTrade],
+        integer_pks=True,
+    )
+    async with sm() as s:
+        s.add(RawSignal(id=1, payload={}, fund_manager_id="fm", received_at=T0))
+        # 12 kapanış; 4'erli gruplar aynı zaman damgasını paylaşır (tie-break: id)
+        for i in range(1, 13):
+            s.add(
+                StrategyOpenTrade(
+                    id=i,
+                    public_id=f"o-{i}",
+                    raw_signal_id=1,
+                    fund_manager_id="fm",
+                    symbol="BTCUSDT",
+                    side="long",
+                    entry_price=Decimal("1"),
+                    position_size=Decimal("1"),
+                    leverage=1,
+                    order_type="market",
+                    timestamp=T0,
+                    exchange="bn",
+                    exchange_order_id=f"x-{i}",
+                    status="closed",
+                )
+            )
+            s.add(_trade(i, f"o-{i}", T0 + timedelta(minutes=(i - 1) // 4)))
+        await s.commit()
+    return engine, sm
+
+
+def _trade(i, open_id, ts):
+    from app.models import StrategyTrade
+
+    return StrategyTrade(
+        id=i,
+        public_id=f"t-{i}",
+        raw_signal_id=1,
+        open_trade_public_id=open_id,
+        fund_manager_id="fm",
+        symbol="BTCUSDT",
+        side="long",
+        entry_price=Decimal("1"),
+        exit_price=Decimal("1"),
+        position_size=Decimal("1"),
+        leverage=1,
+        realized_pnl=Decimal("1"),
+        order_type="market",
+        timestamp=ts,
+        exchange="bn",
+    )
+
+
+async def _walk(call):
+    """Tüm sayfaları gez: [[id...], ...]"""
+    pages, cursor = [], None
+    while True:
+        resp = Response()
+        items = await call(resp, cursor)
+        if isinstance(items, Response):
+            # yalın uçlar JSONResponse döner; cursor onun başlığında
+            resp, items = items, json.loads(items.body)
+        pages.append(items)
+        cursor = resp.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_recent_trades_and_signals_keyset_pages(sqlite_session):
+    from app.models import RawSignal
+    from app.routers import panel_data
+
+    _, sm = await _env(sqlite_session)
+    async with sm() as s:
+        pages = await _walk(
+            lambda _resp, cur: panel_data.recent_trades_public(
+                symbol=None, exchange="bn", limit=5, cursor=cur, db=s
+            )
+        )
+        ids = [[t["public_id"] for t in p] for p in pages]
+        assert [len(p) for p in ids] == [5, 5, 2]
+        flat = [x for p in ids for x in p]
+        assert flat == [f"t-{i}" for i in range(12, 0, -1)]
+
+        # tam dolu son sayfa: fazladan boş sayfa istenmez
+        pages = await _walk(
+            lambda _resp, cur: panel_data.recent_trades_public(
+                symbol="btcusdt", exchange="bn", limit=4, cursor=cur, db=s
+            )
+        )
+        assert [len(p) for p in pages] == [4, 4, 4]
+
+        for i in range(2, 8):
+            s.add(
+                RawSignal(
+                    id=i,
+                    payload={},
+                    fund_manager_id="fm",
+                    symbol="ETHUSDT",
+                    received_at=T0 + timedelta(seconds=i // 3),
+                )
+            )
+        await s.commit()
+        pages = await _walk(
+            lambda resp, cur: panel_data.raw_signals_public(
+                resp, symbol="ethusdt", exchange=None, limit=4, cursor=cur, db=s
+            )
+        )
+        assert [[r.id for r in p] for p in pages] == [[7, 6, 5, 4], [3, 2]]
+
+        with pytest.raises(HTTPException) as ei:
+            await panel_data.raw_signals_public(
+                Response(), symbol=None, exchange=None, limit=4, cursor="@@", db=s
+            )
+        assert ei.value.status_code == 400
+
+        # derin sayfa da indeks aralığıyla gelir (tam tarama yok)
+        conn = await s.connection()
+        cur = pagination.encode_cursor(T0 + timedelta(minutes=1), 6)
+        ts, rid = pagination.decode_cursor(cur)
+        plan = " | ".join(
+            str(r[-1])
+            for r in await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM strategy_trades "
+                "WHERE exchange = 'bn' AND timestamp <= ? "
+                "AND (timestamp < ? OR id < ?) "
+                "ORDER BY timestamp DESC, id DESC LIMIT 6",
+                (ts.replace(tzinfo=None), ts.replace(tzinfo=None), rid),
+            )
+        )
+        assert "ix_st_exchange_time" in plan and "SCAN strategy_trades " not in plan
+
+
+@pytest.mark.asyncio
+async def test_markers_pages_keep_latest_close_per_open(sqlite_session):
+    from app.routers import panel_data
+    from app.services import chart_markers
+
+    chart_markers.reset()
+
+    _, sm = await _env(sqlite_session)
+    async with sm() as s:
+        # o-1 kısmi kapanış: en yeni kapanış (t-13) sayılır, t-1 hiç görünmez
+        s.add(_trade(13, "o-1", T0 + timedelta(minutes=10)))
+        await s.commit()
+        pages = await _walk(
+            lambda _resp, cur: panel_data.markers_public(
+                symbol="BTCUSDT",
+                tf="1m",
+                exchange="bn",
+                since_epoch=None,
+                until_epoch=None,
+                limit=5,
+                cursor=cur,
+                db=s,
+            )
+        )
+    closes = [[m["id"] for m in p if m["kind"] == "close"] for p in pages]
+    assert [len(p) for p in closes] == [5, 5, 2]
+    flat = [x for p in closes for x in p]
+    assert "t-1" not in flat and "t-13" in flat
+    assert sorted(flat) == sorted(f"t-{i}" for i in range(2, 14))
+    opens = [m["id"] for p in pages for m in p if m["kind"] == "open"]
+    assert sorted(opens) == sorted(f"{x}:open" for x in flat)
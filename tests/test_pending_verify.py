@@ -0,0 +1,231 @@
+# tests/test_pending_verify.py
+# Python 3.9
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+# noinspection PyPackageRequirements
+import pytest
+from sqlalchemy import event, select
+
+from app.exchanges.common.snapshots import PositionSnapshot
+from app.models import RawSignal, StrategyOpenTrade
+from crud.trade import verify_pending_trades_for_execution
+
+EX = "binance_futures_testnet"
+
+
+def _snap(symbol, amt, side="BOTH", unrealized="0"):
+    return PositionSnapshot(
+        symbol=symbol,
+        position_side=side,
+        amt=Decimal(amt),
+        entry_price=Decimal("100"),
+        mark_price=Decimal("101"),
+        unrealized=Decimal(unrealized),
+        leverage=5,
+    )
+
+
+def _trade(i, symbol, side="long", status="pending", attempts=0):
+    return StrategyOpenTrade(
+        id=i,
+        public_id=f"pid-{i}",
+        raw_signal_id=1,
+        fund_manager_id="fm",
+        symbol=symbol,
+        side=side,
+        entry_price=Decimal("1"),
+        position_size=Decimal("1"),
+        leverage=1,
+        order_type="market",
+        timestamp=datetime.now(timezone.utc),
+        unrealized_pnl=Decimal("0"),
+        exchange=EX,
+        exchange_order_id=str(i),
+        status=status,
+        verification_attempts=attempts,
+    )
+
+
+async def _make_db(sqlite_session):
+    engine, sm = await sqlite_session([RawSignal, StrategyOpenTrade])
+    async with sm() as s:
+        s.add(RawSignal(id=1, payload={}, fund_manager_id="fm"))
+        await s.commit()
+    return engine, sm
+
+
+@pytest.mark.asyncio
+async def test_pending_tick_is_bulk_and_single_commit(sqlite_session):
+    engine, sm = await _make_db(sqlite_session)
+    n = 30
+    async with sm() as s:
+        # one-way ters bacak: ETH short açık, ETH long pending → short kapanmalı
+        s.add(_trade(1000, "ETHUSDT", side="short", status="open"))
+        for i in range(1, n + 1):
+            sym = "ETHUSDT" if i == 1 else f"S{i}USDT"
+            s.add(_trade(i, sym, attempts=2 if i % 3 == 0 else 0))
+        await s.commit()
+
+    positions = {"ETHUSDT": _snap("ETHUSDT", "2")}
+    for i in range(2, n + 1):
+        positions[f"S{i}USDT"] = _snap(f"S{i}USDT", "1" if i % 2 else "0")
+
+    async def get_position(symbol):
+        return positions[symbol]
+
+    execution = SimpleNamespace(
+        order_handler=SimpleNamespace(get_position=get_position)
+    )
+
+    stmts = []
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith(("UPDATE", "SELECT")):
+            stmts.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    async with sm() as s:
+        commits = []
+        orig_commit = s.commit
+
+        async def _commit():
+            commits.append(1)
+            await orig_commit()
+
+        s.commit = _commit
+        await verify_pending_trades_for_execution(s, execution, EX, max_retries=3)
+    event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    # 1 SELECT (pending) + ters bacak + toplu open + attempts/failed
+    assert len(stmts) == 4
+    assert len(commits) == 1
+
+    async with sm() as s:
+        rows = {t.id: t for t in (await s.execute(select(StrategyOpenTrade))).scalars()}
+    assert rows[1000].status == "closed"
+    assert rows[1].status == "open" and rows[1].position_size == Decimal("2")
+    for i in range(2, n + 1):
+        t = rows[i]
+        if i % 2:
+            assert t.status == "open" and t.exchange_verified
+        else:
+            expected_attempts = (2 if i % 3 == 0 else 0) + 1
+            assert t.verification_attempts == expected_attempts
+            assert t.status == ("failed" if expected_attempts >= 3 else "pending")
+            assert t.last_checked_at is not None
+
+
+@pytest.mark.asyncio
+async def test_unrealized_sync_persists_only_material_changes(
+    monkeypatch, sqlite_session
+):
+    from app.config import settings
+    from app.services import unrealized_sync, upnl_store
+
+    upnl_store.reset()
+    monkeypatch.setattr(settings, "UPNL_PERSIST_ABS", 1.0)
+    monkeypatch.setattr(settings, "UPNL_PERSIST_REL", 0)
+    monkeypatch.setattr(settings, "UPNL_HEARTBEAT_SECONDS", 300)
+    monkeypatch.setattr(settings, "UPNL_ENGINE", "exchange")
+
+    engine, sm = await _make_db(sqlite_session)
+    async with sm() as s:
+        for i in range(1, 6):
+            s.add(_trade(i, f"S{i}USDT", status="open"))
+        await s.commit()
+
+    upnl = {"S1USDT": "3.5"}
+
+    async def get_position_snapshots(_symbol):
+        return [_snap(sym, "1", unrealized=v) for sym, v in upnl.items()]
+
+    execution = SimpleNamespace(
+        account=SimpleNamespace(get_position_snapshots=get_position_snapshots),
+        order_handler=SimpleNamespace(POSITION_MODE="one_way"),
+    )
+    monkeypatch.setattr(unrealized_sync, "load_execution_module", lambda _ex: execution)
+
+    updates = []
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(len(params) if executemany else 1)
+
+    async def _tick():
+        async with sm() as s:
+            return await unrealized_sync.sync_unrealized_for_execution(s, EX)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    # İlk tur: hiç yazılmamış (last_checked_at yok) → hepsi tek executemany
+    assert await _tick() == 5
+    # Küçük oynama: yalnızca depoda, DB'ye yazım yok
+    upnl["S1USDT"] = "3.9"
+    assert await _tick() == 0
+    assert upnl_store.snapshot(EX)[1] == Decimal("3.9")
+    # Eşik aşıldı → yalnızca o satır
+    upnl["S1USDT"] = "5"
+    assert await _tick() == 1
+    event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    assert updates == [5, 1]
+    async with sm() as s:
+        rows = (await s.execute(select(StrategyOpenTrade))).scalars().all()
+    assert {t.id: t.unrealized_pnl for t in rows}[1] == Decimal("5")
+    assert all(t.last_checked_at is not None for t in rows)
+    upnl_store.reset()
+
+
+@pytest.mark.asyncio
+async def test_hedge_unrealized_uses_one_bulk_call(monkeypatch, sqlite_session):
+    from app.config import settings
+    from app.services import unrealized_sync, upnl_store
+
+    upnl_store.reset()
+    monkeypatch.setattr(settings, "UPNL_ENGINE", "exchange")
+    _, sm = await _make_db(sqlite_session)
+    async with sm() as s:
+        s.add(_trade(1, "BTCUSDT", side="long", status="open"))
+        s.add(_trade(2, "BTCUSDT", side="short", status="open"))
+        s.add(_trade(3, "ETHUSDT", side="long", status="open"))
+        s.add(_trade(4, "XRPUSDT", side="long", status="open"))
+        s.add(_trade(5, "DOGEUSDT", side="short", status="open"))
+        s.add(_trade(6, "XRPUSDT", side="long", status="open"))
+        await s.commit()
+
+    calls = []
+
+    async def get_position_snapshots(symbol):
+        calls.append(symbol)
+        if symbol is None:
+            return [
+                _snap("BTCUSDT", "1", side="LONG", unrealized="2"),
+                _snap("BTCUSDT", "-1", side="SHORT", unrealized="-3"),
+                _snap("ETHUSDT", "1", side="LONG", unrealized="7"),
+            ]
+        if symbol == "XRPUSDT":
+            return [_snap("XRPUSDT", "5", side="LONG", unrealized="1.5")]
+        return []
+
+    execution = SimpleNamespace(
+        account=SimpleNamespace(get_position_snapshots=get_position_snapshots),
+        order_handler=SimpleNamespace(POSITION_MODE="hedge"),
+    )
+    monkeypatch.setattr(unrealized_sync, "load_execution_module", lambda _ex: execution)
+
+    async with sm() as s:
+        assert await unrealized_sync.sync_unrealized_for_execution(s, EX) == 6
+
+    # Bulk + bulk'ta olmayan her sembol için tek (tekilleştirilmiş) çağrı
+    assert calls == [None, "DOGEUSDT", "XRPUSDT"]
+    assert upnl_store.snapshot(EX) == {
+        1: Decimal("2"),
+        2: Decimal("-3"),
+        3: Decimal("7"),
+        4: Decimal("1.5"),
+        5: Decimal("0"),
+        6: Decimal("1.5"),
+    }
+    upnl_store.reset()
@@ -0,0 +1,181 @@
+# tests/test_raw_signals.py
+# Python 3.9
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from fastapi import Response
+from sqlalchemy import event, func, select
+
+
+async def _env(sqlite_session):
+    from app.models import (
+        RawSignal,
+        RawSignalArchive,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+
+    # insert_raw_signal id vermez: INTEGER PK kopyası (rowid autoincrement)
+    engine, sm = await sqlite_session(
+        [
+            RawSignal,
+            RawSignalArchive,
+            StrategyOpenTrade,
+            StrategyOpenTradeHistory,
+            StrategyTrade,
+        ],
+        integer_pks=True,
+    )
+    return engine, sm
+
+
+def _signal(symbol="btcusdt", mode="close", exchange="bn"):
+    from app.schemas import WebhookSignal
+
+    return WebhookSignal(
+        mode=mode,
+        symbol=symbol,
+        side="long",
+        position_size=1.0,
+        order_type="market",
+        exchange=exchange,
+        timestamp=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        fund_manager_id="fm",
+        entry_price=1.0,
+        leverage=1,
+        exit_price=1.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_signals_filter_in_sql_with_index(sqlite_session):
+    from app.models import RawSignal
+    from app.routers import panel_data
+    from crud.raw_signal import insert_raw_signal
+
+    engine, sm = await _env(sqlite_session)
+    async with sm() as s:
+        row = await insert_raw_signal(s, _signal(" ethusdt ", mode="open"))
+        assert (row.symbol, row.mode, row.side, row.exchange) == (
+            "ETHUSDT",
+            "open",
+            "long",
+            "bn",
+        )
+        # ETH eskide, BTC sinyalleri yeni: eskiden limit sonra filtreleniyordu
+        await s.execute(
+            RawSignal.__table__.update().values(
+                received_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+            )
+        )
+        for i in range(30):
+            await insert_raw_signal(
+                s, _signal("BTCUSDT", exchange="by" if i % 2 else "bn")
+            )
+        await s.commit()
+
+        eth = await panel_data.raw_signals_public(
+            Response(), cursor=None, symbol="ethusdt", exchange=None, limit=10, db=s
+        )
+        assert [(r.symbol, r.mode, r.side) for r in eth] == [
+            ("ETHUSDT", "open", "long")
+        ]
+        btc_by = await panel_data.raw_signals_public(
+            Response(), cursor=None, symbol="BTCUSDT", exchange="by", limit=100, db=s
+        )
+        assert len(btc_by) == 15
+        latest = await panel_data.raw_signals_public(
+            Response(), cursor=None, symbol=None, exchange=None, limit=5, db=s
+        )
+        assert len(latest) == 5 and all(r.symbol == "BTCUSDT" for r in latest)
+
+        conn = await s.connection()
+        for sql in (
+            "SELECT id FROM raw_signals WHERE symbol = 'BTCUSDT' "
+            "ORDER BY received_at DESC LIMIT 10",
+            "SELECT id FROM raw_signals ORDER BY received_at DESC LIMIT 10",
+        ):
+            plan = " | ".join(
+                str(r[-1])
+                for r in (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+            )
+            assert "ix_raw_signals_" in plan and "TEMP B-TREE" not in plan, plan
+
+        # ?exchange= filtresi: uç noktanın gerçek sorgusunun planı
+        captured = []
+
+        def _capture(conn, cursor, statement, params, context, executemany):
+            if "FROM raw_signals" in statement:
+                captured.append((statement, params))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+        try:
+            by = await panel_data.raw_signals_public(
+                Response(), cursor=None, symbol=None, exchange="by", limit=5, db=s
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+        assert len(by) == 5
+        sql, params = captured[-1]
+        rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params))
+        plan = " | ".join(str(r[-1]) for r in rows)
+        assert "ix_raw_signals_exchange_received_at" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_only_old_unreferenced_signals(sqlite_session):
+    from app.models import RawSignal, RawSignalArchive, StrategyOpenTrade
+    from crud.raw_signal import archive_raw_signals, archived_payload, insert_raw_signal
+
+    _, sm = await _env(sqlite_session)
+    old = datetime.now(timezone.utc) - timedelta(days=120)
+    async with sm() as s:
+        ids = []
+        for i in range(5):
+            ids.append((await insert_raw_signal(s, _signal())).id)
+        await s.execute(
+            RawSignal.__table__.update()
+            .where(RawSignal.id.in_(ids[:4]))
+            .values(received_at=old.replace(tzinfo=None))
+        )
+        # Eski ama işleme bağlı sinyal: taşınmamalı
+        s.add(
+            StrategyOpenTrade(
+                id=1,
+                public_id="o-1",
+                raw_signal_id=ids[0],
+                fund_manager_id="fm",
+                symbol="BTCUSDT",
+                side="long",
+                entry_price=Decimal("1"),
+                position_size=Decimal("1"),
+                leverage=1,
+                order_type="market",
+                timestamp=old.replace(tzinfo=None),
+                exchange="bn",
+                exchange_order_id="x-1",
+            )
+        )
+        await s.commit()
+
+        assert await archive_raw_signals(s, retention_days=0) == 0
+        moved = await archive_raw_signals(s, retention_days=90, batch_size=2)
+        assert moved == 3
+
+        left = (await s.execute(select(RawSignal.id).order_by(RawSignal.id))).all()
+        assert [r[0] for r in left] == [ids[0], ids[4]]
+        archived = (
+            (await s.execute(select(RawSignalArchive).order_by(RawSignalArchive.id)))
+            .scalars()
+            .all()
+        )
+        assert [a.id for a in archived] == ids[1:4]
+        assert archived[0].symbol == "BTCUSDT"
+        assert archived_payload(archived[0])["symbol"] == "btcusdt"
+        n_open = await s.scalar(select(func.count()).select_from(StrategyOpenTrade))
+        assert n_open == 1
@@ -0,0 +1,82 @@
+from app.services import signal_timing
+from app.services.signal_timing import SignalTimer
+from app.utils.request_context import RID_CVAR
+
+
+def setup_function(_):
+    signal_timing.reset()
+
+
+def test_percentiles_nearest_rank():
+    for ms in range(1, 101):
+        signal_timing.record("ex", "open", "place_order", float(ms))
+    snap = signal_timing.snapshot()
+    stats = snap["ex"]["open"]["place_order"]
+    assert stats["count"] == 100
+    assert stats["p50"] == 50.0
+    assert stats["p90"] == 90.0
+    assert stats["p99"] == 99.0
+    assert stats["max"] == 100.0
+
+
+def test_window_is_bounded():
+    for ms in range(signal_timing.WINDOW_SIZE + 10):
+        signal_timing.record("ex", "close", "total", float(ms))
+    stats = signal_timing.snapshot()["ex"]["close"]["total"]
+    assert stats["count"] == signal_timing.WINDOW_SIZE
+
+
+def test_timer_records_stages_and_rid():
+    token = RID_CVAR.set("rid-123")
+    try:
+        timer = SignalTimer("ex", "open")
+    finally:
+        RID_CVAR.reset(token)
+    with timer.stage("merge_lookup"):
+        pass
+    with timer.stage("merge_lookup"):
+        pass
+    with timer.stage("place_order"):
+        pass
+    timer.finish()
+    timer.finish()  # ikinci çağrı tekrar yazmamalı
+
+    snap = signal_timing.snapshot(exchange="ex", mode="open")
+    stages = snap["ex"]["open"]
+    assert set(stages) == {"merge_lookup", "place_order", "total"}
+    # tekrar eden aşama sinyal başına tek örnek olarak toplanır
+    assert stages["merge_lookup"]["count"] == 1
+    assert stages["total"]["count"] == 1
+
+    bd = timer.breakdown()
+    assert bd["rid"] == "rid-123"
+    assert [s["stage"] for s in bd["stages"]] == [
+        "merge_lookup",
+        "merge_lookup",
+        "place_order",
+    ]
+
+
+def test_snapshot_filters():
+    signal_timing.record("a", "open", "total", 1.0)
+    signal_timing.record("b", "close", "total", 2.0)
+    assert list(signal_timing.snapshot(exchange="a")) == ["a"]
+    assert signal_timing.snapshot(mode="open") == {
+        "a": {"open": {"total": signal_timing.snapshot()["a"]["open"]["total"]}}
+    }
+
+
+def test_failed_signal_kept_out_of_success_windows():
+    ok = SignalTimer("ex", "open")
+    with ok.stage("place_order"):
+        pass
+    ok.finish()
+    rejected = SignalTimer("ex", "open")
+    with rejected.stage("place_order"):
+        pass
+    rejected.finish(ok=False)
+
+    stages = signal_timing.snapshot()["ex"]["open"]
+    assert set(stages) == {"place_order", "total", "place_order:error", "total:error"}
+    assert stages["total"]["count"] == 1
+    assert stages["total:error"]["count"] == 1
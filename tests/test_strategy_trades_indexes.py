@@ -0,0 +1,141 @@
+# tests/test_strategy_trades_indexes.py
+# Python 3.9
+
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# MySQL planı için: SIGMOM_TEST_MYSQL_URL=mysql+aiomysql://... (boş DB; tablolar
+# oluşturulup silinir). Tanımlı değilse yalnızca SQLite çalışır.
+MYSQL_URL = os.getenv("SIGMOM_TEST_MYSQL_URL", "").strip()
+URLS = ["sqlite+aiosqlite://"] + ([MYSQL_URL] if MYSQL_URL else [])
+
+
+async def _plan(conn, sql, params) -> str:
+    """Sorgunun strategy_trades için seçtiği indeks(ler) — lehçe bağımsız metin."""
+    if conn.dialect.name == "sqlite":
+        rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params))
+        return " | ".join(str(r[-1]) for r in rows.all())
+    rows = await conn.exec_driver_sql(f"EXPLAIN {sql}", tuple(params))
+    keys = rows.keys()
+    out = []
+    for r in rows.all():
+        rec = dict(zip(keys, r))
+        if rec.get("table") == "strategy_trades":
+            out.append(f"key={rec.get('key')} type={rec.get('type')}")
+    return " | ".join(out)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", URLS)
+async def test_panel_trade_reads_use_time_indexes(url):
+    from app.models import (
+        DailyPnl,
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+    from app.routers import panel_data
+
+    models = (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+        DailyPnl,
+    )
+    tables = [t.__table__ for t in models]
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(StrategyTrade.metadata.create_all, tables=tables)
+    sm = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    async with sm() as s:
+        for i in range(1, 201):
+            s.add(
+                StrategyTrade(
+                    id=i,
+                    public_id=f"t-{i}",
+                    raw_signal_id=1,
+                    open_trade_public_id=f"o-{i}",
+                    fund_manager_id="fm",
+                    symbol=("BTCUSDT", "ETHUSDT", "XRPUSDT", "SOLUSDT")[i % 4],
+                    side="long",
+                    entry_price=Decimal("1"),
+                    exit_price=Decimal("1"),
+                    position_size=Decimal("1"),
+                    leverage=1,
+                    realized_pnl=Decimal(i % 3 - 1),
+                    order_type="market",
+                    timestamp=now - timedelta(hours=i * 6),
+                    exchange=("bn", "by", "mx", "ok")[i // 50 % 4],
+                )
+            )
+        await s.commit()
+        if engine.dialect.name == "mysql":
+            await (await s.connection()).exec_driver_sql(
+                "ANALYZE TABLE strategy_trades"
+            )
+
+        captured = []
+
+        def _capture(conn, cursor, statement, params, context, executemany):
+            if "FROM strategy_trades" in statement:
+                captured.append((statement, params))
+
+        async def plans(call):
+            captured.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+            try:
+                await call
+            except HTTPException:
+                pass  # netpnl: "bn" adapter'ı yok; min(timestamp) sorguları koştu
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+            conn = await s.connection()
+            return [await _plan(conn, sql, p) for sql, p in captured]
+
+        by_symbol = await plans(
+            panel_data.recent_trades_public(
+                symbol="btcusdt", exchange="bn", limit=20, cursor=None, db=s
+            )
+        )
+        assert len(by_symbol) == 1 and "ix_st_exchange_symbol_time" in by_symbol[0]
+
+        recent = await plans(
+            panel_data.recent_trades_public(
+                symbol=None, exchange="bn", limit=20, cursor=None, db=s
+            )
+        )
+        assert len(recent) == 1 and "ix_st_exchange_time" in recent[0]
+
+        # overview artık daily_pnl rollup'ını okur; strategy_trades'e hiç inmez
+        overview = await plans(panel_data.overview_public(exchange="bn", db=s))
+        assert overview == []
+
+        netpnl = await plans(
+            panel_data.me_netpnl(
+                exchange="bn",
+                symbol="BTCUSDT",
+                since_days=None,
+                since_epoch=None,
+                detail=False,
+                db=s,
+            )
+        )
+        # min(timestamp) — yalnızca strategy_trades sorgusu yakalanır
+        assert len(netpnl) == 1 and "ix_st_exchange_symbol_time" in netpnl[0]
+
+        for p in by_symbol + recent + overview + netpnl:
+            assert "SCAN strategy_trades" not in p and "type=ALL" not in p, p
+    if engine.dialect.name == "mysql":
+        async with engine.begin() as conn:
+            await conn.run_sync(StrategyTrade.metadata.drop_all, tables=tables[::-1])
+    await engine.dispose()
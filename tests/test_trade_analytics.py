@@ -0,0 +1,164 @@
+# tests/test_trade_analytics.py
+# Python 3.9
+
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+
+
+def _naive(dt):
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _seed(sm, trades, start_id=1):
+    """trades: [(closed_at, pnl, hold_hours, symbol)]"""
+    from app.models import RawSignal, StrategyOpenTrade, StrategyTrade
+
+    async with sm() as s:
+        if start_id == 1:
+            s.add(
+                RawSignal(
+                    id=1,
+                    payload={},
+                    fund_manager_id="fm",
+                    received_at=_naive(datetime.now(timezone.utc)),
+                )
+            )
+        for i, (closed, pnl, hold_h, sym) in enumerate(trades, start=start_id):
+            s.add(
+                StrategyOpenTrade(
+                    id=i,
+                    public_id=f"o-{i}",
+                    raw_signal_id=1,
+                    fund_manager_id="fm",
+                    symbol=sym,
+                    side="long",
+                    entry_price=Decimal("1"),
+                    position_size=Decimal("1"),
+                    leverage=1,
+                    order_type="market",
+                    timestamp=_naive(closed - timedelta(hours=hold_h)),
+                    exchange="bn",
+                    exchange_order_id=f"x-{i}",
+                    status="closed",
+                )
+            )
+            s.add(
+                StrategyTrade(
+                    id=i,
+                    public_id=f"t-{i}",
+                    raw_signal_id=1,
+                    open_trade_public_id=f"o-{i}",
+                    fund_manager_id="fm",
+                    symbol=sym,
+                    side="long",
+                    entry_price=Decimal("1"),
+                    exit_price=Decimal("1"),
+                    position_size=Decimal("1"),
+                    leverage=1,
+                    realized_pnl=Decimal(str(pnl)),
+                    order_type="market",
+                    timestamp=_naive(closed),
+                    exchange="bn",
+                )
+            )
+        await s.commit()
+
+
+@pytest.fixture
+def analytics_env():
+    from app.models import (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+    from app.services import trade_analytics
+
+    trade_analytics.reset()
+    yield trade_analytics, (
+        RawSignal,
+        StrategyOpenTrade,
+        StrategyOpenTradeHistory,
+        StrategyTrade,
+    )
+    trade_analytics.reset()
+
+
+@pytest.mark.asyncio
+async def test_analytics_metrics_and_cache(analytics_env, sqlite_session):
+    ta, models = analytics_env
+    _, sm = await sqlite_session(models)
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0)
+    await _seed(
+        sm,
+        [
+            (today - timedelta(days=100), 50, 1, "ETHUSDT"),  # 30g penceresi dışında
+            (today - timedelta(days=10), 10, 2, "BTCUSDT"),
+            (today - timedelta(days=9), -30, 4, "BTCUSDT"),
+            (today - timedelta(days=9, hours=-1), 5, 6, "ETHUSDT"),
+            (today - timedelta(days=2), 20, 8, "BTCUSDT"),
+        ],
+    )
+
+    async with sm() as s:
+        out = await ta.get_analytics(s, "bn", 30, balance=1000.0)
+    assert out["trades"] == 4
+    assert out["net_pnl"] == 5
+    assert out["win_rate"] == 75.0
+    assert out["gross_profit"] == 35 and out["gross_loss"] == -30
+    assert out["profit_factor"] == pytest.approx(35 / 30, abs=1e-4)
+    assert out["start_capital"] == 995
+    # equity: 995 → 1005 → 975 → 980 → 1000; tepe 1005'ten 30 düşüş
+    assert out["max_drawdown"] == 30
+    assert out["max_drawdown_pct"] == pytest.approx(30 / 1005 * 100, abs=1e-4)
+    assert out["avg_holding_seconds"] == 5 * 3600
+    assert out["sharpe"] is not None and out["sortino"] is not None
+    assert [p["equity"] for p in out["points"]][-1] == 1000
+    assert out["latest_trade_id"] == 5
+
+    # USDT modu ve sembol filtresi
+    async with sm() as s:
+        btc = await ta.get_analytics(s, "bn", 365, symbol="btcusdt")
+    assert btc["trades"] == 3 and btc["net_pnl"] == 0
+    assert btc["max_drawdown"] == 30 and btc["max_drawdown_pct"] is None
+
+    # Aynı son id → aynı seri (yeniden yükleme yok)
+    async with sm() as s:
+        first = await ta.load_series(s, "bn")
+        again = await ta.load_series(s, "bn")
+    assert again is first and first.count == 5
+
+    # Yeni kapanış → yalnızca yeni satır eklenir, sonuç güncellenir
+    await _seed(sm, [(today, -15, 1, "BTCUSDT")], start_id=6)
+    async with sm() as s:
+        fresh = await ta.load_series(s, "bn")
+        out2 = await ta.get_analytics(s, "bn", 30)
+    assert fresh is not first
+    assert fresh.count == 6 and fresh.latest_id == 6
+    assert out2["trades"] == 5 and out2["net_pnl"] == -10
+    assert out2["max_drawdown"] == 30
+
+
+def test_analyze_large_series_is_fast():
+    from app.services import trade_analytics as ta
+
+    series = ta.TradeSeries()
+    now = datetime.now(timezone.utc)
+    rows = [
+        (i, now - timedelta(minutes=20 * (50_000 - i)), (i % 7) - 3, None)
+        for i in range(1, 50_001)
+    ]
+    assert series.extend(rows)
+    since = (now - timedelta(days=364)).date()
+    t0 = time.perf_counter()
+    out = ta.analyze(series, since, balance=100_000.0)
+    elapsed = time.perf_counter() - t0
+    assert out["trades"] == 50_000 - sum(1 for r in rows if r[1].date() < since)
+    assert out["avg_holding_seconds"] is None
+    assert math.isfinite(out["sharpe"])
+    assert elapsed < 1.0
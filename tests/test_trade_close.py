@@ -48,9 +48,14 @@ class StrategyTrade(SimpleNamespace):
 models_mod = types.ModuleType("app.models")
 models_mod.StrategyOpenTrade = StrategyOpenTrade
 models_mod.StrategyTrade = StrategyTrade
+models_mod.DailyPnl = SimpleNamespace
+models_mod.IncomeLedger = SimpleNamespace
+models_mod.StrategyOpenTradeHistory = SimpleNamespace
+models_mod.TradeAuditPayload = SimpleNamespace
 sys.modules.setdefault("app.models", models_mod)
 
 from crud import trade as trade_module  # noqa: E402
+from app.exchanges.common.snapshots import PositionSnapshot  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Helper fixtures
@@ -98,10 +103,14 @@ def patch_trade_sql(monkeypatch):
     monkeypatch.setattr(trade_module, "text", lambda *a, **k: None)
     # close_open_trade_and_record içinde çağrılan sqlalchemy.update(...)’i de stub’la
     monkeypatch.setattr(trade_module, "update", lambda *a, **k: DummyUpdate())
+    # daily_pnl rollup upsert'ü (ayrı modül, kendi SQL'i)
+    monkeypatch.setattr(trade_module, "record_daily_close", AsyncMock())
     # Model sütunlarını da stub’la (filter'da erişiliyor)
-    setattr(trade_module.StrategyOpenTrade, "status", DummyColumn("status"))
-    setattr(trade_module.StrategyOpenTrade, "id", DummyColumn("id"))
-    setattr(trade_module.StrategyOpenTrade, "public_id", DummyColumn("public_id"))
+    monkeypatch.setattr(trade_module.StrategyOpenTrade, "status", DummyColumn("status"))
+    monkeypatch.setattr(trade_module.StrategyOpenTrade, "id", DummyColumn("id"))
+    monkeypatch.setattr(
+        trade_module.StrategyOpenTrade, "public_id", DummyColumn("public_id")
+    )
     return trade_module
 
 
@@ -176,7 +185,7 @@ async def test_verify_close_after_signal_commits(monkeypatch):
         def __eq__(self, other):
             return self
 
-    setattr(trade_mod.StrategyTrade, "open_trade_public_id", _DummyCol())
+    monkeypatch.setattr(trade_mod.StrategyTrade, "open_trade_public_id", _DummyCol())
 
     # verify_close_after_signal içinde kullanılan select(func.count()).select_from(...)
     # zincirini kırmamak için no-op bir DummySelect verelim.
@@ -226,7 +235,9 @@ async def test_close_open_trade_success(patch_trade_sql, caplog):
         response_data={},
     )
     session = FakeSession(trade)
-    position_data = {"avgClosePrice": "110"}
+    position_data = PositionSnapshot(
+        "BTCUSDT", amt=Decimal("2"), mark_price=Decimal("110")
+    )
     caplog.set_level(logging.INFO, logger="verifier")
     ok = await trade_module.close_open_trade_and_record(session, trade, position_data)
     session.add.assert_called_once()
@@ -234,6 +245,14 @@ async def test_close_open_trade_success(patch_trade_sql, caplog):
     session.rollback.assert_not_called()
     assert ok is True
     assert "[closed-recorded]" in caplog.text
+    trade_module.record_daily_close.assert_awaited_once()
+    kw = trade_module.record_daily_close.call_args.kwargs
+    assert (kw["exchange"], kw["fund_manager_id"], kw["symbol"]) == (
+        "binance",
+        "fm",
+        "BTCUSDT",
+    )
+    assert kw["pnl"] == Decimal("20")
 
 
 @pytest.mark.asyncio
@@ -254,7 +273,9 @@ async def test_close_open_trade_error_rolls_back(patch_trade_sql, caplog):
         response_data={},
     )
     session = FakeSession(trade)
-    position_data = {"avgClosePrice": "110"}
+    position_data = PositionSnapshot(
+        "BTCUSDT", amt=Decimal("2"), mark_price=Decimal("110")
+    )
     caplog.set_level(logging.ERROR, logger="verifier")
     ok = await trade_module.close_open_trade_and_record(session, trade, position_data)
     session.rollback.assert_awaited_once()
@@ -264,6 +285,80 @@ async def test_close_open_trade_error_rolls_back(patch_trade_sql, caplog):
     assert "[close-fail]" in caplog.text
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("audit, expected_calls", [(False, 1), (True, 2)])
+async def test_close_open_trade_audit_query_is_opt_in(
+    patch_trade_sql, audit, expected_calls
+):
+    trade = StrategyOpenTrade(
+        id=1,
+        public_id="abc",
+        raw_signal_id=1,
+        symbol="BTCUSDT",
+        side="short",
+        entry_price="100",
+        position_size="1",
+        leverage=1,
+        order_type="market",
+        exchange="binance",
+        fund_manager_id="fm",
+        status="open",
+        response_data={},
+    )
+    session = FakeSession(trade)
+    calls = []
+
+    async def _execute(*args, **kwargs):
+        calls.append(args)
+        return session._result
+
+    session.execute = _execute
+    position_data = PositionSnapshot(
+        "BTCUSDT", amt=Decimal("-1"), mark_price=Decimal("90")
+    )
+    ok = await trade_module.close_open_trade_and_record(
+        session, trade, position_data, audit=audit
+    )
+    assert ok is True
+    # UPDATE (+ audit SELECT); kapanışı geri okuyan ek SELECT yok
+    assert len(calls) == expected_calls
+    session.commit.assert_awaited_once()
+    added = session.add.call_args[0][0]
+    assert added.realized_pnl == Decimal("10")
+
+
+@pytest.mark.asyncio
+async def test_close_open_trade_uses_given_price_without_exchange_call(
+    patch_trade_sql, monkeypatch
+):
+    trade = StrategyOpenTrade(
+        id=1,
+        public_id="abc",
+        raw_signal_id=1,
+        symbol="BTCUSDT",
+        side="long",
+        entry_price="100",
+        position_size="1",
+        leverage=1,
+        order_type="market",
+        exchange="binance",
+        fund_manager_id="fm",
+        status="open",
+        response_data={},
+    )
+    session = FakeSession(trade)
+    resolve = AsyncMock(return_value=Decimal("1"))
+    monkeypatch.setattr(trade_module, "resolve_close_price", resolve)
+    # Borsada kapalı pozisyon normalde userTrades/VWAP ağ çağrısına gider
+    flat = PositionSnapshot("BTCUSDT", amt=Decimal("0"), mark_price=Decimal("0"))
+    ok = await trade_module.close_open_trade_and_record(
+        session, trade, flat, close_price=Decimal("105")
+    )
+    assert ok is True
+    resolve.assert_not_awaited()
+    assert session.add.call_args[0][0].realized_pnl == Decimal("5")
+
+
 # ---------------------------------------------------------------------------
 # Utilities for importing app.main with heavy dependencies stubbed
 # ---------------------------------------------------------------------------
@@ -298,6 +393,8 @@ def _prepare_main(monkeypatch):
         "admin_settings",
         "admin_referrals",
         "admin_test",
+        "admin_metrics",
+        "admin_audit",
         "auth_logout",
         "market",
     ]
@@ -344,6 +441,31 @@ def _prepare_main(monkeypatch):
     service_mod.cleanup_expired_reserved = _cleanup
     sys.modules["app.services.referral_maintenance"] = service_mod
 
+    income_mod = types.ModuleType("app.services.income_ledger")
+
+    async def _sync_income(db, exchange, max_pages=None):
+        return 0
+
+    income_mod.sync_income_ledger = _sync_income
+    sys.modules["app.services.income_ledger"] = income_mod
+
+    lease_mod = types.ModuleType("app.services.verifier_lease")
+
+    class _LeaderLease:
+        def __init__(self, name, *args, **kwargs):
+            self.name = name
+            self.backend = "off"
+            self.is_leader = True
+
+        async def ensure(self):
+            return True
+
+        async def release(self):
+            pass
+
+    lease_mod.LeaderLease = _LeaderLease
+    sys.modules["app.services.verifier_lease"] = lease_mod
+
     sys.modules["crud.trade"] = trade_module
 
     import importlib
@@ -366,10 +488,15 @@ async def test_verifier_iteration_logs_error(monkeypatch, caplog):
 
     monkeypatch.setattr(main, "verify_pending_trades_for_execution", boom)
     monkeypatch.setattr(main, "verify_closed_trades_for_execution", AsyncMock())
+    # Aşamalar bağımsız koşar; uPnL aşaması bu testte sessiz olsun
+    monkeypatch.setattr(
+        main, "sync_unrealized_for_execution", AsyncMock(return_value=0)
+    )
     monkeypatch.setattr(main, "load_execution_module", lambda name: object())
     error_mock = MagicMock()
     monkeypatch.setattr(main.verifier_logger, "error", error_mock)
-    await main.verifier_iteration("db", "dummy")
+    ok = await main.verifier_iteration("db", "dummy")
+    assert ok is False
     error_mock.assert_called_once()
 
 
@@ -416,3 +543,79 @@ async def test_verifier_loop_can_be_cancelled(monkeypatch):
     await task
     assert task.done()
     assert calls  # at least one iteration executed
+
+
+@pytest.mark.asyncio
+async def test_health_deep_fails_when_verifier_task_is_down(monkeypatch):
+    main = _prepare_main(monkeypatch)
+    monkeypatch.setattr(main, "_db_ping", AsyncMock(return_value=None))
+    monkeypatch.setattr(main.verifier_health, "_STATE", {})
+
+    monkeypatch.setattr(main.app.state, "verifier_task", None, raising=False)
+    resp = await main.health_deep()
+    assert resp.status_code == 503
+
+    running = asyncio.create_task(asyncio.sleep(3600))
+    monkeypatch.setattr(main.app.state, "verifier_task", running, raising=False)
+    resp = await main.health_deep()
+    running.cancel()
+    assert resp.status_code == 200
+
+
+def test_verifier_worker_backoff_respects_error_budget(monkeypatch):
+    main = _prepare_main(monkeypatch)
+    w = main.VerifierWorker("ex1", interval=5, error_budget=2, max_backoff=60)
+
+    delays = []
+    for _ in range(6):
+        delays.append(w.next_delay())
+        w.consecutive_errors += 1
+    assert delays == [5, 5, 5, 10, 20, 40]
+    w.consecutive_errors = 10
+    assert w.next_delay() == 60
+
+
+@pytest.mark.asyncio
+async def test_verifier_workers_do_not_block_each_other(monkeypatch):
+    main = _prepare_main(monkeypatch)
+    slow_started = asyncio.Event()
+    fast_done = asyncio.Event()
+
+    async def fake_iter(db, ex):
+        if ex == "slow":
+            slow_started.set()
+            await asyncio.sleep(3600)
+        fast_done.set()
+        return True
+
+    class CM:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, exc_type, exc, tb):
+            pass
+
+    monkeypatch.setattr(main, "verifier_iteration", fake_iter)
+    monkeypatch.setattr(main, "async_session", lambda: CM())
+
+    slow = main.VerifierWorker("slow", interval=0, error_budget=0, max_backoff=0)
+    fast = main.VerifierWorker("fast", interval=0, error_budget=0, max_backoff=0)
+    t_slow = asyncio.create_task(slow.run_once())
+    await slow_started.wait()
+    assert await asyncio.wait_for(fast.run_once(), timeout=1) is True
+    assert fast_done.is_set() and not t_slow.done()
+    t_slow.cancel()
+
+
+def test_ledger_synced_for_active_exchanges_outside_verifier(monkeypatch):
+    main = _prepare_main(monkeypatch)
+    monkeypatch.setattr(main.settings, "DEFAULT_EXCHANGE", "ex1")
+    monkeypatch.setattr(main.settings, "VERIFY_ONLY_DEFAULT", True)
+    monkeypatch.setattr(main.settings, "ACTIVE_EXCHANGES", "ex1,ex2,ex3")
+    monkeypatch.setattr(
+        main.income_ledger, "supports_ledger", lambda ex: ex in ("ex1", "ex2")
+    )
+    verified = main._verifier_exchanges()
+    assert verified == ["ex1"]
+    # ex2: verifier yok ama ledger var → yalnızca income senkronu
+    assert main._ledger_only_exchanges(verified) == ["ex2"]
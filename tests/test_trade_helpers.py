@@ -5,26 +5,65 @@
 import pytest
 from decimal import Decimal
 from crud.trade import pick_close_price, compute_pnl
+from app.exchanges.common.snapshots import PositionSnapshot
 
 
 class TestPickClosePrice:
-    def test_prefers_avgclose(self):
-        data = {"avgClosePrice": "101.5", "markPrice": "99.9"}
-        assert pick_close_price(data) == Decimal("101.5")
+    def test_uses_mark_price(self):
+        pos = PositionSnapshot("BTCUSDT", amt=Decimal("1"), mark_price=Decimal("99.6"))
+        assert pick_close_price(pos) == Decimal("99.6")
 
-    def test_falls_back_to_avgprice_then_price(self):
-        assert pick_close_price({"avgPrice": "100.1"}) == Decimal("100.1")
-        assert pick_close_price({"price": "100"}) == Decimal("100")
-
-    def test_uses_last_close_mark_as_late_fallbacks(self):
-        assert pick_close_price({"lastPrice": "99.8"}) == Decimal("99.8")
-        assert pick_close_price({"closePrice": "99.7"}) == Decimal("99.7")
-        assert pick_close_price({"markPrice": "99.6"}) == Decimal("99.6")
+    def test_never_falls_back_to_entry(self):
+        pos = PositionSnapshot("BTCUSDT", entry_price=Decimal("100"))
+        with pytest.raises(ValueError):
+            pick_close_price(pos)
 
-    @pytest.mark.parametrize("bad", [None, "", "0", 0, "0.0"])
-    def test_rejects_none_or_non_positive(self, bad):
+    def test_rejects_missing_position(self):
         with pytest.raises(ValueError):
-            pick_close_price({"avgPrice": bad})
+            pick_close_price(None)
+
+
+class TestPositionSnapshot:
+    def test_binance_row(self):
+        pos = PositionSnapshot.from_binance(
+            {
+                "symbol": "btcusdt",
+                "positionSide": "BOTH",
+                "positionAmt": "-0.5",
+                "entryPrice": "100",
+                "markPrice": "",
+                "unRealizedProfit": "1.25",
+                "leverage": "10",
+            }
+        )
+        assert pos.symbol == "BTCUSDT"
+        assert pos.amt == Decimal("-0.5")
+        assert pos.abs_amt == Decimal("0.5")
+        assert pos.side == "short"
+        assert pos.mark_price == Decimal("0")
+        assert pos.unrealized == Decimal("1.25")
+        assert pos.leverage == 10
+
+    def test_bybit_row_signs_size_and_maps_leg(self):
+        pos = PositionSnapshot.from_bybit(
+            {"symbol": "ETHUSDT", "side": "Sell", "size": "2", "positionIdx": 2}
+        )
+        assert pos.amt == Decimal("-2")
+        assert pos.position_side == "SHORT"
+        assert pos.is_open
+
+    def test_mexc_row_canonical_symbol(self):
+        pos = PositionSnapshot.from_mexc(
+            {"symbol": "BTC_USDT", "positionType": 1, "holdVol": "3"}
+        )
+        assert pos.symbol == "BTCUSDT"
+        assert pos.side == "long"
+        assert pos.amt == Decimal("3")
+
+    def test_slots(self):
+        pos = PositionSnapshot("BTCUSDT")
+        with pytest.raises(AttributeError):
+            pos.extra = 1
 
 
 class TestComputePnL:
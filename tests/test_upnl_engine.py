@@ -0,0 +1,154 @@
+# tests/test_upnl_engine.py
+# Python 3.9
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.config import settings
+from app.exchanges.common.snapshots import PositionSnapshot, parse_mark_prices
+from app.services import upnl_engine
+
+EX = "binance_futures_testnet"
+
+
+def _row(i, symbol, side, entry, size, upnl="0", checked=None):
+    return SimpleNamespace(
+        id=i,
+        symbol=symbol,
+        side=side,
+        entry_price=Decimal(entry),
+        position_size=Decimal(size),
+        unrealized_pnl=Decimal(upnl),
+        last_checked_at=checked,
+    )
+
+
+def test_parse_mark_prices_skips_bad_rows():
+    rows = [
+        {"symbol": "btcusdt", "markPrice": "65000.5"},
+        {"symbol": "ETHUSDT", "markPrice": ""},
+        {"markPrice": "1"},
+        "junk",
+    ]
+    assert parse_mark_prices(rows) == {"BTCUSDT": Decimal("65000.5")}
+
+
+def test_local_upnl_sign_and_missing_marks():
+    rows = [
+        _row(1, "BTCUSDT", "long", "100", "2"),
+        _row(2, "btcusdt", "short", "100", "0.5"),
+        _row(3, "ETHUSDT", "long", "10", "1"),
+    ]
+    out = upnl_engine.local_upnl(rows, {"BTCUSDT": Decimal("103")})
+    assert out == {1: Decimal("6"), 2: Decimal("-1.5")}
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class _FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.writes = []
+
+    async def execute(self, stmt, params=None):
+        if params is not None:
+            self.writes.append(params)
+        return _FakeResult(self.rows)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def engine_env(monkeypatch):
+    # unrealized_sync app.models'i çeker; test_trade_close stub'larıyla
+    # çakışmasın diye toplama (collection) anında değil burada import edilir
+    from app.services import unrealized_sync, upnl_store
+
+    upnl_store.reset()
+    upnl_engine.reset()
+    monkeypatch.setattr(settings, "UPNL_ENGINE", "local")
+    monkeypatch.setattr(settings, "UPNL_RECONCILE_SECONDS", 60)
+    monkeypatch.setattr(settings, "UPNL_DRIFT_WARN_ABS", 1.0)
+    monkeypatch.setattr(settings, "UPNL_PERSIST_ABS", 0)
+    monkeypatch.setattr(settings, "UPNL_PERSIST_REL", 0)
+    monkeypatch.setattr(settings, "UPNL_HEARTBEAT_SECONDS", 300)
+
+    marks = {"BTCUSDT": Decimal("103")}
+    account_calls = []
+
+    async def get_marks(_ex):
+        return dict(marks)
+
+    async def get_position_snapshots(symbol):
+        account_calls.append(symbol)
+        return [
+            PositionSnapshot(
+                symbol="BTCUSDT",
+                position_side="BOTH",
+                amt=Decimal("2"),
+                entry_price=Decimal("100"),
+                mark_price=Decimal("103"),
+                unrealized=Decimal("4.5"),
+                leverage=5,
+            )
+        ]
+
+    execution = SimpleNamespace(
+        account=SimpleNamespace(get_position_snapshots=get_position_snapshots),
+        order_handler=SimpleNamespace(POSITION_MODE="one_way"),
+    )
+    monkeypatch.setattr(upnl_engine, "get_marks", get_marks)
+    monkeypatch.setattr(unrealized_sync, "load_execution_module", lambda _ex: execution)
+    yield SimpleNamespace(
+        sync=unrealized_sync,
+        store=upnl_store,
+        marks=marks,
+        account_calls=account_calls,
+    )
+    upnl_store.reset()
+    upnl_engine.reset()
+
+
+@pytest.mark.asyncio
+async def test_sync_reconciles_then_computes_locally(engine_env, caplog):
+    db = _FakeDB([_row(1, "BTCUSDT", "long", "100", "2")])
+
+    # İlk tur: mutabakat zamanı → borsa değeri esas, sapma (6 vs 4.5) loglanır
+    with caplog.at_level("WARNING", logger="verifier"):
+        await engine_env.sync.sync_unrealized_for_execution(db, EX)
+    assert engine_env.account_calls == [None]
+    assert engine_env.store.snapshot(EX) == {1: Decimal("4.5")}
+    assert any("drift 1.5" in r.getMessage() for r in caplog.records)
+
+    # Sonraki turlar: imzalı hesap çağrısı yok, mark fiyatıyla yerel hesap
+    engine_env.marks["BTCUSDT"] = Decimal("104")
+    await engine_env.sync.sync_unrealized_for_execution(db, EX)
+    assert engine_env.account_calls == [None]
+    assert engine_env.store.snapshot(EX) == {1: Decimal("8")}
+
+
+@pytest.mark.asyncio
+async def test_missing_mark_falls_back_to_exchange(engine_env):
+    upnl_engine.mark_reconciled(EX)
+    db = _FakeDB(
+        [
+            _row(1, "BTCUSDT", "long", "100", "2"),
+            _row(2, "ETHUSDT", "long", "10", "1"),
+        ]
+    )
+    await engine_env.sync.sync_unrealized_for_execution(db, EX)
+    assert engine_env.account_calls == [None]
+    assert engine_env.store.snapshot(EX)[1] == Decimal("4.5")
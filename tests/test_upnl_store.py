@@ -0,0 +1,59 @@
+# tests/test_upnl_store.py
+# Python 3.9
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.config import settings
+from app.services import upnl_store
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    upnl_store.reset()
+    monkeypatch.setattr(settings, "UPNL_PERSIST_ABS", 1.0)
+    monkeypatch.setattr(settings, "UPNL_PERSIST_REL", 0.1)
+    monkeypatch.setattr(settings, "UPNL_HEARTBEAT_SECONDS", 300)
+    monkeypatch.setattr(settings, "UPNL_STORE_MAX_AGE_SECONDS", 30)
+    yield
+    upnl_store.reset()
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "prev,new,age_s,expected",
+    [
+        (None, "0", 0, True),  # hiç yazılmamış
+        ("100", "100.5", 10, False),  # ne mutlak ne göreli eşik
+        ("100", "101", 10, True),  # mutlak eşik
+        ("2", "2.3", 10, True),  # göreli eşik (%15)
+        ("0", "0.2", 10, True),  # sıfırdan ayrılış (göreli)
+        ("100", "100", 299, False),
+        ("100", "100", 300, True),  # heartbeat
+    ],
+)
+def test_should_persist_thresholds(prev, new, age_s, expected):
+    last = NOW - timedelta(seconds=age_s)
+    prev_dec = None if prev is None else Decimal(prev)
+    assert upnl_store.should_persist(prev_dec, Decimal(new), last, NOW) is expected
+
+
+def test_should_persist_accepts_naive_timestamps():
+    last = (NOW - timedelta(seconds=400)).replace(tzinfo=None)
+    assert upnl_store.should_persist(Decimal("1"), Decimal("1"), last, NOW)
+
+
+def test_snapshot_serves_fresh_values_and_retain_drops_closed():
+    upnl_store.put("bn", 1, Decimal("2.5"))
+    upnl_store.put("bn", 2, Decimal("-1"))
+    upnl_store.put("bn", 3, Decimal("9"), at=0)  # bayat
+    assert upnl_store.snapshot("bn") == {1: Decimal("2.5"), 2: Decimal("-1")}
+
+    upnl_store.retain("bn", [2])
+    assert upnl_store.snapshot("bn") == {2: Decimal("-1")}
+    assert upnl_store.snapshot("other") == {}
@@ -0,0 +1,118 @@
+# tests/test_verifier_health.py
+# Python 3.9
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.config import settings
+from app.services import verifier_health
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    verifier_health.reset()
+    monkeypatch.setattr(settings, "HEALTH_VERIFIER_STALE_SECONDS", 60)
+    monkeypatch.setattr(settings, "HEALTH_PENDING_AGE_WARN_SECONDS", 30)
+    monkeypatch.setattr(settings, "HEALTH_PENDING_AGE_FAIL_SECONDS", 120)
+    monkeypatch.setattr(settings, "VERIFY_ERROR_BUDGET", 2)
+    yield
+    verifier_health.reset()
+
+
+def _tick(ex, ok=True, errors=0):
+    verifier_health.tick_started(ex)
+    verifier_health.tick_finished(ex, ok, consecutive_errors=errors)
+
+
+def test_thresholds_drive_status():
+    ex = "bn"
+    verifier_health.set_leader(ex, True)
+    _tick(ex)
+    now = verifier_health._STATE[ex].last_ok_at
+    old = datetime.fromtimestamp(now, timezone.utc) - timedelta(seconds=45)
+    verifier_health.record_counts(ex, pending=2, open_count=5, oldest_pending_at=old)
+
+    rep = verifier_health.evaluate(now)
+    assert rep["status"] == "degraded"
+    info = rep["exchanges"][ex]
+    assert (info["pending_trades"], info["open_trades"]) == (2, 5)
+    assert info["oldest_pending_age_seconds"] == pytest.approx(45, abs=0.01)
+
+    # Verifier takıldı: son başarılı turdan bu yana eşik aşıldı → fail
+    rep = verifier_health.evaluate(now + 61)
+    assert rep["status"] == "fail"
+    assert any("no successful tick" in r for r in rep["exchanges"][ex]["reasons"])
+
+    # Pending kalmadı, hata bütçesi aşıldı → degraded
+    verifier_health.record_counts(ex, pending=0, open_count=5)
+    _tick(ex, ok=False, errors=3)
+    assert verifier_health.evaluate(now + 1)["status"] == "degraded"
+
+
+def test_never_ticked_goes_stale_and_standby_is_ignored():
+    verifier_health.register("bn")
+    verifier_health.register("by")
+    verifier_health.set_leader("by", False)
+    t0 = verifier_health._STATE["bn"].registered_at
+    assert verifier_health.evaluate(t0 + 1)["status"] == "ok"
+    rep = verifier_health.evaluate(t0 + 120)
+    assert rep["status"] == "fail"
+    assert rep["exchanges"]["by"]["status"] == "standby"
+
+
+def test_prometheus_text_exposes_gauges_and_stage_errors():
+    ex = "bn"
+    verifier_health.set_leader(ex, True)
+    _tick(ex)
+    verifier_health.record_counts(ex, pending=0, open_count=3)
+    verifier_health.record_error(ex, "pending", RuntimeError("x"))
+    verifier_health.record_error(ex, "pending", RuntimeError("y"))
+
+    text = verifier_health.prometheus_text()
+    assert "# TYPE sigmom_verifier_pending_trades gauge" in text
+    assert 'sigmom_verifier_open_trades{exchange="bn"} 3' in text
+    assert 'sigmom_verifier_errors_total{exchange="bn",stage="pending"} 2' in text
+    assert 'sigmom_verifier_up{exchange="bn"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_open_trade_status_counts_single_query(sqlite_session):
+    from app.models import StrategyOpenTrade
+    from crud.trade import open_trade_status_counts
+
+    _, sm = await sqlite_session([StrategyOpenTrade])
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    rows = [
+        (1, "pending", "bn", base + timedelta(minutes=5)),
+        (2, "pending", "bn", base),
+        (3, "open", "bn", base),
+        (4, "failed", "bn", base),
+        (5, "pending", "by", base - timedelta(hours=1)),
+    ]
+    async with sm() as s:
+        for i, status, ex, ts in rows:
+            s.add(
+                StrategyOpenTrade(
+                    id=i,
+                    public_id=f"pid-{i}",
+                    raw_signal_id=1,
+                    fund_manager_id="fm",
+                    symbol="BTCUSDT",
+                    side="long",
+                    entry_price=Decimal("1"),
+                    position_size=Decimal("1"),
+                    leverage=1,
+                    order_type="market",
+                    timestamp=ts,
+                    exchange=ex,
+                    exchange_order_id=str(i),
+                    status=status,
+                )
+            )
+        await s.commit()
+        out = await open_trade_status_counts(s, "bn")
+    assert out["pending"] == 2 and out["open"] == 1
+    assert out["oldest_pending_at"].replace(tzinfo=None) == base
@@ -0,0 +1,69 @@
+# tests/test_verifier_lease.py
+# Python 3.9
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.models import VerifierLease
+from app.services import verifier_lease
+
+
+@pytest.mark.asyncio
+async def test_db_lease_single_holder_and_failover(monkeypatch, sqlite_session):
+    _, sm = await sqlite_session([VerifierLease])
+    now = [1_000_000]
+    monkeypatch.setattr(verifier_lease, "_now_ms", lambda: now[0])
+
+    async def acquire(holder):
+        async with sm() as db:
+            return await verifier_lease.try_acquire(db, "verifier:bn", holder, 30_000)
+
+    assert await acquire("a") is True
+    assert await acquire("b") is False
+    now[0] += 20_000
+    assert await acquire("a") is True  # yenileme
+    now[0] += 20_000
+    assert await acquire("b") is False  # yenilenen kira hâlâ geçerli
+
+    # Lider öldü (yenileme yok) → TTL sonunda b devralır, a artık lider değil
+    now[0] += 30_001
+    assert await acquire("b") is True
+    assert await acquire("a") is False
+
+    # release → TTL beklemeden devir
+    async with sm() as db:
+        await verifier_lease.release(db, "verifier:bn", "b")
+    assert await acquire("a") is True
+
+
+@pytest.mark.asyncio
+async def test_auto_falls_back_to_file_lock_without_table(
+    monkeypatch, tmp_path, sqlite_session
+):
+    _, sm = await sqlite_session()
+    monkeypatch.setattr(verifier_lease, "async_session", sm)
+
+    first = verifier_lease.LeaderLease("verifier:bn", "auto", 30, str(tmp_path))
+    second = verifier_lease.LeaderLease("verifier:bn", "file", 30, str(tmp_path))
+    assert await first.ensure() is True
+    assert first.backend == "file"
+    assert await first.ensure() is True
+    assert await second.ensure() is False
+
+    await first.release()
+    assert first.is_leader is False
+    assert await second.ensure() is True
+    await second.release()
+
+
+@pytest.mark.asyncio
+async def test_db_backend_errors_do_not_claim_leadership(
+    monkeypatch, tmp_path, sqlite_session
+):
+    _, sm = await sqlite_session()
+    monkeypatch.setattr(verifier_lease, "async_session", sm)
+
+    lease = verifier_lease.LeaderLease("verifier:bn", "db", 30, str(tmp_path))
+    assert await lease.ensure() is False
+    assert lease.backend == "db"
+    assert await verifier_lease.LeaderLease("x", "off").ensure() is True
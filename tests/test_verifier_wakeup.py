@@ -0,0 +1,104 @@
+# tests/test_verifier_wakeup.py
+# Python 3.9
+
+import asyncio
+import time
+
+# noinspection PyPackageRequirements
+import pytest
+
+from app.config import settings
+from app.models import VerifierLease
+from app.services import verifier_lease, verifier_wakeup
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    verifier_wakeup.reset()
+    monkeypatch.setattr(settings, "VERIFY_BURST_SECONDS", 30)
+    monkeypatch.setattr(settings, "VERIFY_BURST_INTERVAL_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "VERIFY_IDLE_MAX_SECONDS", 30)
+    # Süreç içi testler: kira satırına yayın yok
+    monkeypatch.setattr(settings, "VERIFY_LEADER_BACKEND", "off")
+    yield
+    verifier_wakeup.reset()
+
+
+def test_idle_ticks_back_off_and_pending_resets():
+    ex = "bn"
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 5
+
+    delays = []
+    for _ in range(4):
+        verifier_wakeup.observe_pending(ex, 0)
+        delays.append(verifier_wakeup.adaptive_delay(ex, 5))
+    assert delays == [10, 20, 30, 30]
+
+    verifier_wakeup.observe_pending(ex, 2)
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 5
+
+
+def test_wake_starts_fast_burst_window(monkeypatch):
+    ex = "bn"
+    for _ in range(3):
+        verifier_wakeup.observe_pending(ex, 0)
+    verifier_wakeup.wake(ex)
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 1.0
+
+    # Pencere bitince normal aralığa dön (idle sayacı sıfırlandı)
+    now = time.monotonic()
+    monkeypatch.setattr(verifier_wakeup.time, "monotonic", lambda: now + 31)
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 5
+
+
+@pytest.mark.asyncio
+async def test_wake_interrupts_sleep():
+    ex = "bn"
+    assert await verifier_wakeup.wait(ex, 0.01) is False
+
+    waiter = asyncio.create_task(verifier_wakeup.wait(ex, 3600))
+    await asyncio.sleep(0)
+    verifier_wakeup.wake("bn")
+    assert await asyncio.wait_for(waiter, timeout=1) is True
+
+    # Event temizlendi: sonraki uyku yine zaman aşımıyla biter
+    assert await verifier_wakeup.wait(ex, 0.01) is False
+
+
+def test_idle_backoff_disabled_without_shared_wake():
+    ex = "bn"
+    for _ in range(3):
+        verifier_wakeup.observe_pending(ex, 0)
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 30
+    assert verifier_wakeup.adaptive_delay(ex, 5, idle_backoff=False) == 5
+
+
+@pytest.mark.asyncio
+async def test_wake_from_another_process_reaches_leader(monkeypatch, sqlite_session):
+    _, sm = await sqlite_session([VerifierLease])
+    monkeypatch.setattr(verifier_wakeup, "async_session", sm)
+    monkeypatch.setattr(settings, "VERIFY_LEADER_BACKEND", "db")
+    monkeypatch.setattr(settings, "VERIFY_WAKE_POLL_SECONDS", 0.05)
+    async with sm() as db:
+        assert await verifier_lease.try_acquire(db, "verifier:bn", "leader", 30_000)
+
+    ex = "bn"
+    for _ in range(3):
+        verifier_wakeup.observe_pending(ex, 0)
+    # İlk yoklama taban değeri okur; kendiliğinden uyanma yok
+    assert await verifier_wakeup.wait(ex, 0.12, shared=True) is False
+
+    waiter = asyncio.create_task(verifier_wakeup.wait(ex, 3600, shared=True))
+    await asyncio.sleep(0.01)
+    # Webhook'u başka bir süreç işledi: yalnızca kira satırı değişir
+    async with sm() as db:
+        await verifier_lease.bump_wake(db, verifier_wakeup.lease_name(ex))
+    assert await asyncio.wait_for(waiter, timeout=1) is True
+    # Uzak uyanma da hızlı pencereyi başlatır
+    assert verifier_wakeup.adaptive_delay(ex, 5) == 1.0
+
+    # wake() yerelde çağrılınca da satır güncellenir
+    verifier_wakeup.wake(ex)
+    await asyncio.gather(*verifier_wakeup._PUBLISHING)
+    async with sm() as db:
+        assert await verifier_lease.read_wake(db, "verifier:bn") == 2